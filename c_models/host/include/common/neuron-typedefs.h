@@ -0,0 +1,32 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the neuron types the ear kernels share with spynnaker
+
+#ifndef HOST_NEURON_TYPEDEFS_H_
+#define HOST_NEURON_TYPEDEFS_H_
+
+#include <stdint.h>
+#include <stdfix.h>
+#include <stdfix-exp.h>
+
+typedef uint32_t index_t;
+
+typedef accum input_t;
+
+#endif /* HOST_NEURON_TYPEDEFS_H_ */
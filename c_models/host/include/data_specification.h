@@ -0,0 +1,43 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the region table of a core, filled in from a region blob
+
+#ifndef HOST_DATA_SPECIFICATION_H_
+#define HOST_DATA_SPECIFICATION_H_
+
+#include "spin1_api.h"
+
+//! \brief the most regions a region blob can hold
+#define MAX_REGIONS 32
+
+//! \brief the regions of a core
+typedef struct data_specification_metadata_t {
+    uint32_t magic_number;
+    uint32_t version;
+    void *regions[MAX_REGIONS];
+} data_specification_metadata_t;
+
+data_specification_metadata_t *data_specification_get_data_address(void);
+
+static inline void *data_specification_get_region(
+        uint32_t region, data_specification_metadata_t *ds_regions) {
+    return ds_regions->regions[region];
+}
+
+#endif /* HOST_DATA_SPECIFICATION_H_ */
@@ -0,0 +1,63 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief what the kernels send and record, captured to files in the output
+//! directory for comparing runs, and the region blob format
+
+#ifndef HOST_CAPTURE_H_
+#define HOST_CAPTURE_H_
+
+#include <stdint.h>
+
+//! \brief the magic number at the start of a region blob, "EARB"
+#define REGION_BLOB_MAGIC 0x42524145
+
+//! \brief a multicast packet, as sent by a kernel or fed to one
+typedef struct host_packet {
+    uint32_t tick;
+    uint32_t key;
+    uint32_t payload;
+    uint32_t has_payload;
+} host_packet;
+
+//! \brief how a recorded value was set
+typedef enum host_recording_kinds {
+    HOST_RECORDING_FLOAT, HOST_RECORDING_DOUBLE, HOST_RECORDING_SPIKE
+} host_recording_kinds;
+
+//! \brief a value set through the neuron recording interface
+typedef struct host_recording {
+    uint32_t tick;
+    uint32_t var_index;
+    uint32_t neuron_index;
+    uint32_t kind;
+    double value;
+} host_recording;
+
+//! \brief the tick the event loop is on
+uint32_t host_tick(void);
+
+//! \brief stores a recorded value, if capturing
+//! \param[in] var_index: the recorded variable
+//! \param[in] neuron_index: the neuron
+//! \param[in] kind: how the value was set
+//! \param[in] value: the value, 1 for a spike
+void host_capture_recording(
+    uint32_t var_index, uint32_t neuron_index, uint32_t kind, double value);
+
+#endif /* HOST_CAPTURE_H_ */
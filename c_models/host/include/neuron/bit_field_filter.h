@@ -0,0 +1,31 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the bit field filter, empty on the host
+
+#ifndef HOST_BIT_FIELD_FILTER_H_
+#define HOST_BIT_FIELD_FILTER_H_
+
+#include "spin1_api.h"
+
+static inline bool bit_field_filter_initialise(address_t bitfield_address) {
+    use(bitfield_address);
+    return true;
+}
+
+#endif /* HOST_BIT_FIELD_FILTER_H_ */
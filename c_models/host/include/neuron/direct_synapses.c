@@ -0,0 +1,33 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the direct synapses, empty on the host
+
+#ifndef HOST_DIRECT_SYNAPSES_C_
+#define HOST_DIRECT_SYNAPSES_C_
+
+#include "spin1_api.h"
+
+bool direct_synapses_initialise(
+        address_t direct_matrix_address, address_t *direct_synapses_address) {
+    use(direct_matrix_address);
+    *direct_synapses_address = NULL;
+    return true;
+}
+
+#endif /* HOST_DIRECT_SYNAPSES_C_ */
@@ -0,0 +1,44 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the neuron recording interface, with every value set captured
+//! rather than written to the recording regions
+
+#ifndef HOST_NEURON_RECORDING_H_
+#define HOST_NEURON_RECORDING_H_
+
+#include "spin1_api.h"
+
+bool neuron_recording_initialise(
+    void *recording_address, uint32_t *recording_flags, uint32_t n_neurons);
+
+void neuron_recording_set_float_recorded_param(
+    uint32_t var_index, uint32_t neuron_index, float value);
+
+void neuron_recording_set_double_recorded_param(
+    uint32_t var_index, uint32_t neuron_index, double value);
+
+void neuron_recording_set_spike(uint32_t var_index, uint32_t neuron_index);
+
+void neuron_recording_record(uint32_t time);
+
+void neuron_recording_do_timestep_update(uint32_t time);
+
+void neuron_recording_finalise(void);
+
+#endif /* HOST_NEURON_RECORDING_H_ */
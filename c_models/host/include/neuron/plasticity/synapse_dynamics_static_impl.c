@@ -0,0 +1,36 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief static synapse dynamics, which do nothing on the host
+
+#ifndef HOST_SYNAPSE_DYNAMICS_STATIC_IMPL_C_
+#define HOST_SYNAPSE_DYNAMICS_STATIC_IMPL_C_
+
+#include "spin1_api.h"
+
+bool synapse_dynamics_initialise(
+        address_t address, uint32_t n_neurons, uint32_t n_synapse_types,
+        uint32_t *ring_buffer_to_input_buffer_left_shifts) {
+    use(address);
+    use(n_neurons);
+    use(n_synapse_types);
+    use(ring_buffer_to_input_buffer_left_shifts);
+    return true;
+}
+
+#endif /* HOST_SYNAPSE_DYNAMICS_STATIC_IMPL_C_ */
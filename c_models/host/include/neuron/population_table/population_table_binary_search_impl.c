@@ -0,0 +1,36 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the master population table, empty on the host
+
+#ifndef HOST_POPULATION_TABLE_C_
+#define HOST_POPULATION_TABLE_C_
+
+#include "spin1_api.h"
+
+bool population_table_initialise(
+        address_t table_address, address_t synapse_rows_address,
+        address_t direct_rows_address, uint32_t *row_max_n_words) {
+    use(table_address);
+    use(synapse_rows_address);
+    use(direct_rows_address);
+    *row_max_n_words = 0;
+    return true;
+}
+
+#endif /* HOST_POPULATION_TABLE_C_ */
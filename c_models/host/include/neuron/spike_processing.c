@@ -0,0 +1,39 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief spike processing, with no spikes to process on the host
+
+#ifndef HOST_SPIKE_PROCESSING_C_
+#define HOST_SPIKE_PROCESSING_C_
+
+#include "spin1_api.h"
+
+bool spike_processing_initialise(
+        size_t row_max_n_bytes, uint mc_packet_callback_priority,
+        uint user_event_priority, uint incoming_spike_buffer_size) {
+    use(row_max_n_bytes);
+    use(mc_packet_callback_priority);
+    use(user_event_priority);
+    use(incoming_spike_buffer_size);
+    return true;
+}
+
+void setup_synaptic_dma_read(void) {
+}
+
+#endif /* HOST_SPIKE_PROCESSING_C_ */
@@ -0,0 +1,51 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the synapses, which get no spikes on the host, so the moc of a
+//! drnl kernel stays at rest
+
+#ifndef HOST_SYNAPSES_C_
+#define HOST_SYNAPSES_C_
+
+#include "spin1_api.h"
+#include "common/neuron-typedefs.h"
+
+//! \brief the left shifts of the ring buffers, one per synapse type
+static uint32_t host_ring_buffer_left_shifts[4];
+
+//! \brief implemented by the kernel, never called on the host
+void neuron_add_inputs(
+    index_t synapse_type_index, index_t neuron_index,
+    input_t weights_this_timestep);
+
+bool synapses_initialise(
+        address_t synapse_params_address, uint32_t n_neurons,
+        uint32_t n_synapse_types,
+        uint32_t **ring_buffer_to_input_buffer_left_shifts) {
+    use(synapse_params_address);
+    use(n_neurons);
+    use(n_synapse_types);
+    *ring_buffer_to_input_buffer_left_shifts = host_ring_buffer_left_shifts;
+    return true;
+}
+
+void synapses_do_timestep_update(uint32_t time) {
+    use(time);
+}
+
+#endif /* HOST_SYNAPSES_C_ */
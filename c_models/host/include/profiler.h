@@ -0,0 +1,37 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief profiling is left to the host tools, so the profiler does nothing
+
+#ifndef HOST_PROFILER_H_
+#define HOST_PROFILER_H_
+
+//! \brief profiler entry states
+#define PROFILER_EXIT 0
+#define PROFILER_ENTER (1u << 31)
+
+//! \brief profiler tags
+typedef enum profiler_tags {
+    PROFILER_TIMER, PROFILER_DMA_READ
+} profiler_tags;
+
+#define profiler_init(address) do {} while (0)
+#define profiler_write_entry_disable_irq_fiq(tag) do {} while (0)
+#define profiler_finalise() do {} while (0)
+
+#endif /* HOST_PROFILER_H_ */
@@ -0,0 +1,54 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the marsaglia kiss 64 generator, as in spinn_common, so a kernel
+//! makes the same numbers from the same seeds as on the board
+
+#ifndef HOST_RANDOM_H_
+#define HOST_RANDOM_H_
+
+#include <stdint.h>
+
+typedef uint32_t mars_kiss64_seed_t[4];
+
+//! \brief makes a seed usable, as spinn_common does
+//! \param[in] seed: the seed to fix up
+static inline void validate_mars_kiss64_seed(mars_kiss64_seed_t seed) {
+    if (seed[1] == 0) {
+        seed[1] = 13031301;
+    }
+    seed[3] = seed[3] % 698769068 + 1;
+}
+
+//! \brief the next number from a seed
+//! \param[in] seed: the seed, which is advanced
+//! \return the random number
+static inline uint32_t mars_kiss64_seed(mars_kiss64_seed_t seed) {
+    uint64_t t;
+
+    seed[0] = 314527869 * seed[0] + 1234567;
+    seed[1] ^= seed[1] << 5;
+    seed[1] ^= seed[1] >> 7;
+    seed[1] ^= seed[1] << 22;
+    t = 4294584393ULL * seed[2] + seed[3];
+    seed[3] = t >> 32;
+    seed[2] = t;
+    return seed[0] + seed[1] + seed[2];
+}
+
+#endif /* HOST_RANDOM_H_ */
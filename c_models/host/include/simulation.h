@@ -0,0 +1,49 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the simulation interface, run by the event loop in src/spin1_host.c
+
+#ifndef HOST_SIMULATION_H_
+#define HOST_SIMULATION_H_
+
+#include "spin1_api.h"
+
+typedef void (*prov_callback_t)(address_t);
+
+typedef void (*resume_callback_t)(void);
+
+bool simulation_initialise(
+    address_t address, uint32_t expected_app_magic_number,
+    uint32_t *timer_period, uint32_t *simulation_ticks_pointer,
+    uint32_t *infinite_run_pointer, uint32_t *time_pointer,
+    int sdp_packet_callback_priority, int dma_transfer_complete_priority);
+
+void simulation_set_provenance_function(
+    prov_callback_t provenance_function, address_t provenance_data_address);
+
+bool simulation_sdp_callback_on(uint sdp_port, callback_t sdp_callback);
+
+bool simulation_dma_transfer_done_callback_on(uint tag, callback_t cback);
+
+void simulation_run(void);
+
+void simulation_handle_pause_resume(resume_callback_t callback);
+
+void simulation_ready_to_read(void);
+
+#endif /* HOST_SIMULATION_H_ */
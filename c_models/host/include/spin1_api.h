@@ -0,0 +1,149 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the parts of the spin1 api the ear kernels use, for building them
+//! as linux programs. The event loop behind these is in src/spin1_host.c
+
+#ifndef HOST_SPIN1_API_H_
+#define HOST_SPIN1_API_H_
+
+#include <stdint.h>
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdlib.h>
+#include <string.h>
+
+typedef unsigned int uint;
+typedef unsigned short ushort;
+typedef unsigned char uchar;
+typedef uint32_t *address_t;
+
+#define TRUE 1
+#define FALSE 0
+
+//! \brief marks an argument as used
+#define use(x) do {} while ((x) != (x))
+
+//! \brief the events a callback can be registered for
+typedef enum events {
+    MC_PACKET_RECEIVED, DMA_TRANSFER_DONE, TIMER_TICK, SDP_PACKET_RX,
+    USER_EVENT, MCPL_PACKET_RECEIVED, NUM_EVENTS
+} events;
+
+//! \brief dma directions
+#define DMA_READ 0
+#define DMA_WRITE 1
+
+//! \brief multicast payload flags
+#define NO_PAYLOAD 0
+#define WITH_PAYLOAD 1
+
+//! \brief where the port sits in an sdp port byte
+#define PORT_SHIFT 5
+
+//! \brief the bytes of data in an sdp message
+#define SDP_BUF_SIZE 256
+
+//! \brief run time error codes
+typedef enum rte_codes {
+    RTE_NONE, RTE_RESET, RTE_UNDEF, RTE_SVC, RTE_PABT, RTE_DABT, RTE_IRQ,
+    RTE_FIQ, RTE_VIC, RTE_ABORT, RTE_MALLOC, RTE_DIV0, RTE_EVENT,
+    RTE_SWERR, RTE_IOBUF, RTE_ENABLE, RTE_NULL, RTE_PKT, RTE_TIMER,
+    RTE_API, RTE_VER
+} rte_codes;
+
+//! \brief an sdp header, laid out as sark does
+typedef struct sdp_hdr {
+    uchar flags;
+    uchar tag;
+    uchar dest_port;
+    uchar srce_port;
+    ushort dest_addr;
+    ushort srce_addr;
+} sdp_hdr_t;
+
+//! \brief an sdp message, laid out as sark does
+typedef struct sdp_msg {
+    struct sdp_msg *next;
+    ushort length;
+    ushort checksum;
+    uchar flags;
+    uchar tag;
+    uchar dest_port;
+    uchar srce_port;
+    ushort dest_addr;
+    ushort srce_addr;
+    ushort cmd_rc;
+    ushort seq;
+    uint arg1;
+    uint arg2;
+    uint arg3;
+    uchar data[SDP_BUF_SIZE];
+    uint _PAD;
+} sdp_msg_t;
+
+typedef void (*callback_t)(uint, uint);
+
+void spin1_callback_on(uint event_id, callback_t cback, int priority);
+
+void spin1_set_timer_tick(uint time);
+
+uint spin1_schedule_callback(
+    callback_t cback, uint arg0, uint arg1, uint priority);
+
+uint spin1_trigger_user_event(uint arg0, uint arg1);
+
+uint spin1_dma_transfer(
+    uint tag, void *system_address, void *tcm_address, uint direction,
+    uint length);
+
+uint spin1_send_mc_packet(uint key, uint data, uint load);
+
+uint spin1_send_sdp_msg(sdp_msg_t *msg, uint timeout);
+
+void rt_error(uint code, ...);
+
+static inline void spin1_msg_free(sdp_msg_t *msg) {
+    use(msg);
+}
+
+static inline void spin1_delay_us(uint n) {
+    use(n);
+}
+
+static inline uint spin1_get_core_id(void) {
+    return 1;
+}
+
+static inline uint spin1_get_chip_id(void) {
+    return 0;
+}
+
+static inline void spin1_memcpy(void *dst, void const *src, uint len) {
+    memcpy(dst, src, len);
+}
+
+static inline void *spin1_malloc(uint bytes) {
+    return malloc(bytes);
+}
+
+static inline void *sark_alloc(uint count, uint size) {
+    return malloc(count * size);
+}
+
+#endif /* HOST_SPIN1_API_H_ */
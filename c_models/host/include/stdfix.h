@@ -0,0 +1,27 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief x86 has no fixed point types, so accum is a double on the host.
+//! The kernels only use accum for the arguments and results of expk and logk
+
+#ifndef HOST_STDFIX_H_
+#define HOST_STDFIX_H_
+
+typedef double accum;
+
+#endif /* HOST_STDFIX_H_ */
@@ -0,0 +1,60 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the neuron recording interface, capturing every value set. The
+//! recording regions themselves are left as the host wrote them
+
+#include "neuron/neuron_recording.h"
+#include "host_capture.h"
+
+bool neuron_recording_initialise(
+        void *recording_address, uint32_t *recording_flags,
+        uint32_t n_neurons) {
+    use(recording_address);
+    use(n_neurons);
+    *recording_flags = 0;
+    return true;
+}
+
+void neuron_recording_set_float_recorded_param(
+        uint32_t var_index, uint32_t neuron_index, float value) {
+    host_capture_recording(
+        var_index, neuron_index, HOST_RECORDING_FLOAT, value);
+}
+
+void neuron_recording_set_double_recorded_param(
+        uint32_t var_index, uint32_t neuron_index, double value) {
+    host_capture_recording(
+        var_index, neuron_index, HOST_RECORDING_DOUBLE, value);
+}
+
+void neuron_recording_set_spike(uint32_t var_index, uint32_t neuron_index) {
+    host_capture_recording(
+        var_index, neuron_index, HOST_RECORDING_SPIKE, 1.0);
+}
+
+void neuron_recording_record(uint32_t time) {
+    use(time);
+}
+
+void neuron_recording_do_timestep_update(uint32_t time) {
+    use(time);
+}
+
+void neuron_recording_finalise(void) {
+}
@@ -0,0 +1,537 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief runs an ear kernel as a linux program. Loads the regions of the
+//! core from a region blob, maps the board sdram the vertices put their
+//! sdram edges in at the same address, then runs the kernel's callbacks one
+//! tick at a time until it pauses, capturing what it sends and records.
+//!
+//! usage: KERNEL REGION_BLOB N_TICKS [-o OUT_DIR] [-i PACKETS] [-s SDRAM]
+//!     [-n N_SAMPLES]
+//!
+//! REGION_BLOB   the regions, as written by HostRegionSpec
+//! N_TICKS       the ticks to run for
+//! -o OUT_DIR    writes packets.bin, recording.bin and the regions after the
+//!               run as regions.bin there
+//! -i PACKETS    multicast packets to feed the kernel, each after the timer
+//!               tick they are stamped with, as a kernel run with -o sends
+//! -s SDRAM      backs the sdram with this file, so kernels run one after
+//!               another see what the one before left in it
+//! -n N_SAMPLES  the samples the run processes, to report the ns per sample
+//!
+//! Callbacks run one at a time in the order they are raised, whatever their
+//! priority; a dma completes as soon as it is asked for, and its done
+//! callback runs after the callback that asked for it.
+
+#include <errno.h>
+#include <fcntl.h>
+#include <stdarg.h>
+#include <stdio.h>
+#include <sys/mman.h>
+#include <time.h>
+#include <unistd.h>
+
+#include "spin1_api.h"
+#include "data_specification.h"
+#include "simulation.h"
+#include "host_capture.h"
+
+//! \brief where the board sdram starts
+#define HOST_SDRAM_BASE 0x60000000
+
+//! \brief the size of the board sdram
+#define HOST_SDRAM_SIZE 0x08000000
+
+//! \brief the most callbacks that can be waiting to run
+#define CALLBACK_QUEUE_SIZE 4096
+
+//! \brief the most dma tags a callback can be registered for
+#define N_DMA_TAGS 16
+
+//! \brief the words of a region blob before the regions
+typedef struct region_blob_header {
+    uint32_t magic;
+    uint32_t n_regions;
+} region_blob_header;
+
+//! \brief the words of a region blob before each region's data
+typedef struct region_blob_entry {
+    uint32_t index;
+    uint32_t size;
+} region_blob_entry;
+
+//! \brief a callback waiting to run
+typedef struct queued_callback {
+    callback_t cback;
+    uint arg0;
+    uint arg1;
+} queued_callback;
+
+//! \brief the kernel's entry point
+extern void c_main(void);
+
+//! \brief the regions of the core
+static data_specification_metadata_t ds_regions;
+
+//! \brief the size of each region in bytes
+static uint32_t region_sizes[MAX_REGIONS];
+
+//! \brief the callback of each event
+static callback_t callbacks[NUM_EVENTS];
+
+//! \brief the dma done callback of each tag, overriding the event's
+static callback_t dma_tag_callbacks[N_DMA_TAGS];
+
+//! \brief the callbacks waiting to run
+static queued_callback callback_queue[CALLBACK_QUEUE_SIZE];
+
+//! \brief where the next callback is taken from and put in the queue
+static uint32_t queue_read = 0;
+static uint32_t queue_write = 0;
+
+//! \brief the provenance function and region of the kernel
+static prov_callback_t provenance_function = NULL;
+static address_t provenance_data_address = NULL;
+
+//! \brief the ticks to run for
+static uint32_t n_ticks;
+
+//! \brief the tick being run
+static uint32_t current_tick = 0;
+
+//! \brief set when the kernel pauses
+static bool paused = false;
+
+//! \brief the packets to feed the kernel, in tick order
+static host_packet *input_packets = NULL;
+static uint32_t n_input_packets = 0;
+
+//! \brief where the kernel's output goes, or NULL to not capture it
+static FILE *packets_out = NULL;
+static FILE *recording_out = NULL;
+
+//! \brief counters for the report
+static uint32_t n_packets_sent = 0;
+static uint32_t n_dma_transfers = 0;
+static uint32_t n_callbacks = 0;
+static uint32_t n_sdp_messages_sent = 0;
+static uint64_t elapsed_ns = 0;
+
+//! \brief stops with a message
+//! \param[in] format: printf format of the message
+static void host_fail(const char *format, ...) {
+    va_list args;
+    va_start(args, format);
+    vfprintf(stderr, format, args);
+    va_end(args);
+    fprintf(stderr, "\n");
+    exit(1);
+}
+
+//! \brief the time now in ns
+static uint64_t now_ns(void) {
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return (uint64_t) now.tv_sec * 1000000000ULL + now.tv_nsec;
+}
+
+//! \brief queues a callback, as the board does when a callback is raised
+//! \return whether there was room
+static bool queue_callback(callback_t cback, uint arg0, uint arg1) {
+    if (cback == NULL) {
+        return true;
+    }
+    if (queue_write - queue_read >= CALLBACK_QUEUE_SIZE) {
+        return false;
+    }
+    queued_callback *entry =
+        &callback_queue[queue_write++ % CALLBACK_QUEUE_SIZE];
+    entry->cback = cback;
+    entry->arg0 = arg0;
+    entry->arg1 = arg1;
+    return true;
+}
+
+//! \brief runs callbacks until none are waiting
+static void run_queued_callbacks(void) {
+    while (queue_read != queue_write) {
+        queued_callback entry =
+            callback_queue[queue_read++ % CALLBACK_QUEUE_SIZE];
+        n_callbacks++;
+        entry.cback(entry.arg0, entry.arg1);
+    }
+}
+
+//! \brief maps the board sdram at its board address
+//! \param[in] sdram_file: the file to back it with, or NULL for none
+static void map_sdram(const char *sdram_file) {
+    int flags = MAP_FIXED;
+#ifdef MAP_FIXED_NOREPLACE
+    flags = MAP_FIXED_NOREPLACE;
+#endif
+    int fd = -1;
+    if (sdram_file != NULL) {
+        fd = open(sdram_file, O_RDWR | O_CREAT, 0644);
+        if (fd < 0 || ftruncate(fd, HOST_SDRAM_SIZE) != 0) {
+            host_fail("cannot open sdram file %s", sdram_file);
+        }
+        flags |= MAP_SHARED;
+    } else {
+        flags |= MAP_PRIVATE | MAP_ANONYMOUS;
+    }
+    void *sdram = mmap(
+        (void *) HOST_SDRAM_BASE, HOST_SDRAM_SIZE, PROT_READ | PROT_WRITE,
+        flags, fd, 0);
+    if (sdram != (void *) HOST_SDRAM_BASE) {
+        host_fail(
+            "cannot map sdram at 0x%08x: %s", HOST_SDRAM_BASE,
+            strerror(errno));
+    }
+    if (fd >= 0) {
+        close(fd);
+    }
+}
+
+//! \brief reads a whole file
+//! \param[in] path: the file
+//! \param[out] size: its size in bytes
+//! \return its contents
+static void *read_file(const char *path, size_t *size) {
+    FILE *file = fopen(path, "rb");
+    if (file == NULL) {
+        host_fail("cannot open %s", path);
+    }
+    fseek(file, 0, SEEK_END);
+    *size = ftell(file);
+    fseek(file, 0, SEEK_SET);
+    void *data = malloc(*size + 1);
+    if (data == NULL || fread(data, 1, *size, file) != *size) {
+        host_fail("cannot read %s", path);
+    }
+    fclose(file);
+    return data;
+}
+
+//! \brief loads the regions of the core
+//! \param[in] path: the region blob
+static void load_regions(const char *path) {
+    size_t size;
+    uint8_t *blob = read_file(path, &size);
+    region_blob_header *header = (region_blob_header *) blob;
+    if (size < sizeof(region_blob_header) ||
+            header->magic != REGION_BLOB_MAGIC) {
+        host_fail("%s is not a region blob", path);
+    }
+    size_t offset = sizeof(region_blob_header);
+    for (uint32_t i = 0; i < header->n_regions; i++) {
+        region_blob_entry *entry = (region_blob_entry *) &blob[offset];
+        offset += sizeof(region_blob_entry);
+        if (entry->index >= MAX_REGIONS || offset + entry->size > size) {
+            host_fail("bad region %u in %s", entry->index, path);
+        }
+        // regions are word aligned and at least a word, as on the board
+        void *region = calloc((entry->size + 7) & ~3u, 1);
+        memcpy(region, &blob[offset], entry->size);
+        ds_regions.regions[entry->index] = region;
+        region_sizes[entry->index] = entry->size;
+        offset += (entry->size + 3) & ~3u;
+    }
+    free(blob);
+}
+
+//! \brief writes the regions of the core after the run, in the same format
+//! \param[in] path: the region blob to write
+static void save_regions(const char *path) {
+    FILE *file = fopen(path, "wb");
+    if (file == NULL) {
+        host_fail("cannot write %s", path);
+    }
+    region_blob_header header = {REGION_BLOB_MAGIC, 0};
+    for (uint32_t i = 0; i < MAX_REGIONS; i++) {
+        if (ds_regions.regions[i] != NULL) {
+            header.n_regions++;
+        }
+    }
+    fwrite(&header, sizeof(header), 1, file);
+    uint32_t padding = 0;
+    for (uint32_t i = 0; i < MAX_REGIONS; i++) {
+        if (ds_regions.regions[i] != NULL) {
+            region_blob_entry entry = {i, region_sizes[i]};
+            fwrite(&entry, sizeof(entry), 1, file);
+            fwrite(ds_regions.regions[i], 1, region_sizes[i], file);
+            fwrite(&padding, 1, (4 - region_sizes[i]) & 3u, file);
+        }
+    }
+    fclose(file);
+}
+
+//! \brief loads the packets to feed the kernel
+//! \param[in] path: the packets, as captured from a kernel run
+static void load_input_packets(const char *path) {
+    size_t size;
+    input_packets = read_file(path, &size);
+    n_input_packets = size / sizeof(host_packet);
+}
+
+//! \brief opens an output file in the output directory
+//! \param[in] out_dir: the output directory
+//! \param[in] name: the file name
+//! \param[in] mode: the fopen mode
+static FILE *open_output(const char *out_dir, const char *name,
+        const char *mode) {
+    char path[4096];
+    snprintf(path, sizeof(path), "%s/%s", out_dir, name);
+    FILE *file = fopen(path, mode);
+    if (file == NULL) {
+        host_fail("cannot write %s", path);
+    }
+    return file;
+}
+
+//! \brief feeds the kernel the packets stamped with the current tick
+//! \param[in] next_packet: the first packet not yet fed
+//! \return the first packet still not fed
+static uint32_t feed_input_packets(uint32_t next_packet) {
+    while (next_packet < n_input_packets && !paused &&
+            input_packets[next_packet].tick <= current_tick) {
+        host_packet *packet = &input_packets[next_packet++];
+        callback_t cback = callbacks[MC_PACKET_RECEIVED];
+        if (packet->has_payload && callbacks[MCPL_PACKET_RECEIVED] != NULL) {
+            cback = callbacks[MCPL_PACKET_RECEIVED];
+        }
+        if (cback != NULL) {
+            n_callbacks++;
+            cback(packet->key, packet->payload);
+            run_queued_callbacks();
+        }
+    }
+    return next_packet;
+}
+
+//************** the spin1 api *************//
+
+void spin1_callback_on(uint event_id, callback_t cback, int priority) {
+    use(priority);
+    callbacks[event_id] = cback;
+}
+
+void spin1_set_timer_tick(uint time) {
+    use(time);
+}
+
+uint spin1_schedule_callback(
+        callback_t cback, uint arg0, uint arg1, uint priority) {
+    use(priority);
+    return queue_callback(cback, arg0, arg1);
+}
+
+uint spin1_trigger_user_event(uint arg0, uint arg1) {
+    return queue_callback(callbacks[USER_EVENT], arg0, arg1);
+}
+
+uint spin1_dma_transfer(
+        uint tag, void *system_address, void *tcm_address, uint direction,
+        uint length) {
+    if (direction == DMA_READ) {
+        memcpy(tcm_address, system_address, length);
+    } else {
+        memcpy(system_address, tcm_address, length);
+    }
+    uint transfer_id = ++n_dma_transfers;
+    callback_t cback = callbacks[DMA_TRANSFER_DONE];
+    if (tag < N_DMA_TAGS && dma_tag_callbacks[tag] != NULL) {
+        cback = dma_tag_callbacks[tag];
+    }
+    queue_callback(cback, transfer_id, tag);
+    return transfer_id;
+}
+
+uint spin1_send_mc_packet(uint key, uint data, uint load) {
+    n_packets_sent++;
+    if (packets_out != NULL) {
+        host_packet packet = {current_tick, key, data, load};
+        fwrite(&packet, sizeof(packet), 1, packets_out);
+    }
+    return TRUE;
+}
+
+uint spin1_send_sdp_msg(sdp_msg_t *msg, uint timeout) {
+    use(msg);
+    use(timeout);
+    n_sdp_messages_sent++;
+    return TRUE;
+}
+
+void rt_error(uint code, ...) {
+    host_fail("rt_error %u at tick %u", code, current_tick);
+}
+
+//************** the data specification interface *************//
+
+data_specification_metadata_t *data_specification_get_data_address(void) {
+    return &ds_regions;
+}
+
+//************** the simulation interface *************//
+
+bool simulation_initialise(
+        address_t address, uint32_t expected_app_magic_number,
+        uint32_t *timer_period, uint32_t *simulation_ticks,
+        uint32_t *infinite_run, uint32_t *time_pointer,
+        int sdp_packet_callback_priority, int dma_transfer_complete_priority) {
+    use(expected_app_magic_number);
+    use(time_pointer);
+    use(sdp_packet_callback_priority);
+    use(dma_transfer_complete_priority);
+
+    // the system region starts with the app hash then the timer period
+    *timer_period = address[1];
+    *simulation_ticks = n_ticks;
+    *infinite_run = FALSE;
+    return true;
+}
+
+void simulation_set_provenance_function(
+        prov_callback_t provenance_function_in,
+        address_t provenance_data_address_in) {
+    provenance_function = provenance_function_in;
+    provenance_data_address = provenance_data_address_in;
+}
+
+bool simulation_sdp_callback_on(uint sdp_port, callback_t sdp_callback) {
+    use(sdp_port);
+    use(sdp_callback);
+    return true;
+}
+
+bool simulation_dma_transfer_done_callback_on(uint tag, callback_t cback) {
+    if (tag >= N_DMA_TAGS) {
+        return false;
+    }
+    dma_tag_callbacks[tag] = cback;
+    return true;
+}
+
+void simulation_handle_pause_resume(resume_callback_t callback) {
+    use(callback);
+    paused = true;
+}
+
+void simulation_ready_to_read(void) {
+}
+
+void simulation_run(void) {
+    uint32_t next_packet = 0;
+    uint64_t start = now_ns();
+
+    // a tick past the end, in which the kernel sees it is done and pauses
+    for (current_tick = 0; !paused && current_tick <= n_ticks;
+            current_tick++) {
+        if (queue_callback(callbacks[TIMER_TICK], current_tick, 0)) {
+            run_queued_callbacks();
+        }
+        next_packet = feed_input_packets(next_packet);
+    }
+    elapsed_ns = now_ns() - start;
+
+    if (provenance_function != NULL) {
+        provenance_function(provenance_data_address);
+    }
+}
+
+//************** the capture interface *************//
+
+uint32_t host_tick(void) {
+    return current_tick;
+}
+
+void host_capture_recording(
+        uint32_t var_index, uint32_t neuron_index, uint32_t kind,
+        double value) {
+    if (recording_out != NULL) {
+        host_recording recording = {
+            current_tick, var_index, neuron_index, kind, value};
+        fwrite(&recording, sizeof(recording), 1, recording_out);
+    }
+}
+
+int main(int argc, char *argv[]) {
+    const char *out_dir = NULL;
+    const char *packets_in = NULL;
+    const char *sdram_file = NULL;
+    uint64_t n_samples = 0;
+    int option;
+    while ((option = getopt(argc, argv, "o:i:s:n:")) != -1) {
+        switch (option) {
+        case 'o':
+            out_dir = optarg;
+            break;
+        case 'i':
+            packets_in = optarg;
+            break;
+        case 's':
+            sdram_file = optarg;
+            break;
+        case 'n':
+            n_samples = strtoull(optarg, NULL, 10);
+            break;
+        default:
+            host_fail(
+                "usage: %s REGION_BLOB N_TICKS [-o OUT_DIR] [-i PACKETS] "
+                "[-s SDRAM] [-n N_SAMPLES]", argv[0]);
+        }
+    }
+    if (argc - optind != 2) {
+        host_fail(
+            "usage: %s REGION_BLOB N_TICKS [-o OUT_DIR] [-i PACKETS] "
+            "[-s SDRAM] [-n N_SAMPLES]", argv[0]);
+    }
+    n_ticks = strtoul(argv[optind + 1], NULL, 10);
+
+    map_sdram(sdram_file);
+    load_regions(argv[optind]);
+    if (packets_in != NULL) {
+        load_input_packets(packets_in);
+    }
+    if (out_dir != NULL) {
+        packets_out = open_output(out_dir, "packets.bin", "wb");
+        recording_out = open_output(out_dir, "recording.bin", "wb");
+    }
+
+    c_main();
+
+    if (out_dir != NULL) {
+        fclose(packets_out);
+        fclose(recording_out);
+        char path[4096];
+        snprintf(path, sizeof(path), "%s/regions.bin", out_dir);
+        save_regions(path);
+    }
+
+    // one line of name=value pairs, for the benchmark driver to read
+    printf(
+        "ticks=%u elapsed_ns=%llu callbacks=%u packets_sent=%u "
+        "dma_transfers=%u sdp_messages_sent=%u",
+        current_tick, (unsigned long long) elapsed_ns, n_callbacks,
+        n_packets_sent, n_dma_transfers, n_sdp_messages_sent);
+    if (n_samples > 0) {
+        printf(" ns_per_sample=%.3f", (double) elapsed_ns / n_samples);
+    }
+    printf("\n");
+    return paused ? 0 : 2;
+}
@@ -18,24 +18,29 @@
 #ifndef AN_group_node_H_
 #define AN_group_node_H_
 
+#include "AN_group_node_regions.h"
+
 //! \ brief marker to fill out api for packet sending without payload
 #define PARAM_FILLER 0
 
-//! \brief table entry
-typedef struct key_mask_table_entry {
-    uint32_t key;
-    uint32_t mask;
-    uint32_t offset;
-} key_mask_table_entry;
+//! \brief the words at the front of a live output packet. 1. the time,
+//! 2. the index of this node in the final row, 3. the number of ids
+typedef enum live_output_header {
+    LIVE_OUTPUT_TIME, LIVE_OUTPUT_INDEX, LIVE_OUTPUT_N_IDS,
+    LIVE_OUTPUT_HEADER_WORDS
+} live_output_header;
+
+//! \brief how many words of an sdp message follow the sdp header
+#define SDP_PAYLOAD_WORDS ((SDP_BUF_SIZE + 16) >> 2)
+
+//! \brief how many neuron ids fit in a live output packet
+#define LIVE_OUTPUT_MAX_IDS (SDP_PAYLOAD_WORDS - LIVE_OUTPUT_HEADER_WORDS)
+
+//! \brief sdp flags for a message with no reply
+#define SDP_NO_REPLY_FLAGS 0x07
 
-//! \brief params from parameter region
-typedef struct params_struct {
-    int n_children;
-    int has_key;
-    int key;
-    int is_final_row;
-    int n_atoms;
-} params_struct;
+//! \brief the sdp port of the ethernet
+#define SDP_ETHERNET_PORT 0xFF
 
 //! \brief key map struct
 typedef struct key_map_struct {
@@ -58,7 +63,8 @@ typedef enum regions {
     SYSTEM,
     PARAMS,
     KEY_MAP,
-    PROVENANCE
+    PROVENANCE,
+    LIVE_OUTPUT
 } regions;
 
 #endif /*AN_group_node_H_ */
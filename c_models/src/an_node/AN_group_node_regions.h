@@ -0,0 +1,49 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+// GENERATED by spinnak_ear.spinnak_ear_utilities.ear_region_schemas, do
+// not edit. Change the schemas there and regenerate instead.
+
+#ifndef AN_GROUP_NODE_REGIONS_H_
+#define AN_GROUP_NODE_REGIONS_H_
+
+#include <stdint.h>
+
+//! \brief table entry
+typedef struct key_mask_table_entry{
+    uint32_t key;
+    uint32_t mask;
+    uint32_t offset;
+} key_mask_table_entry;
+
+//! \brief params from parameter region
+typedef struct params_struct{
+    int32_t n_children;
+    int32_t has_key;
+    uint32_t key;
+    int32_t is_final_row;
+    int32_t n_atoms;
+} params_struct;
+
+//! \brief live output params from the live output region
+typedef struct live_output_struct{
+    uint32_t enabled;
+    uint32_t tag;
+    uint32_t index;
+} live_output_struct;
+
+#endif /* AN_GROUP_NODE_REGIONS_H_ */
@@ -38,6 +38,15 @@ static key_map_struct key_mask_table;
 //! \brief params
 static params_struct parameters;
 
+//! \brief live output params
+static live_output_struct live_output;
+
+//! \brief the live output packet being filled
+static sdp_msg_t live_output_msg;
+
+//! \brief the words of the live output packet after the sdp header
+static uint32_t *live_output_payload;
+
 //************** simulation interface demands *******//
 //! \brief how many ticks done
 static uint32_t simulation_ticks = 0;
@@ -48,6 +57,36 @@ uint32_t time;
 //! \brief infinite run pointer
 static uint32_t infinite_run;
 
+//! \brief sends the live output packet to the host if it holds any ids
+//! \return None
+static void live_output_flush(void) {
+    uint n_ids = live_output_payload[LIVE_OUTPUT_N_IDS];
+    if (n_ids == 0) {
+        return;
+    }
+    live_output_msg.length = sizeof(sdp_hdr_t) + (
+        (LIVE_OUTPUT_HEADER_WORDS + n_ids) * sizeof(uint32_t));
+    spin1_send_sdp_msg(&live_output_msg, 1);
+    live_output_payload[LIVE_OUTPUT_N_IDS] = 0;
+}
+
+//! \brief adds a neuron id to the live output packet, sending it when full
+//! \param[in] neuron_id: the id of the neuron which spiked
+//! \return None
+static inline void live_output_add(int neuron_id) {
+    uint n_ids = live_output_payload[LIVE_OUTPUT_N_IDS];
+    if (n_ids > 0 && live_output_payload[LIVE_OUTPUT_TIME] != time) {
+        live_output_flush();
+        n_ids = 0;
+    }
+    live_output_payload[LIVE_OUTPUT_TIME] = time;
+    live_output_payload[LIVE_OUTPUT_HEADER_WORDS + n_ids] = neuron_id;
+    live_output_payload[LIVE_OUTPUT_N_IDS] = n_ids + 1;
+    if (n_ids + 1 == LIVE_OUTPUT_MAX_IDS) {
+        live_output_flush();
+    }
+}
+
 //! \brief locate new key and transmit
 //! \param[in] spike: the key received
 //! \param[in] null_a: forced by api.
@@ -75,9 +114,15 @@ void key_search_and_send(uint spike, uint null_a) {
                 log_error("incorrect neuron ID generated %d", neuron_id);
                 rt_error(RTE_SWERR);
             }
-            while (!spin1_send_mc_packet(
-                    parameters.key | neuron_id, PARAM_FILLER, NO_PAYLOAD)){
-                spin1_delay_us(1);
+            if (parameters.has_key) {
+                while (!spin1_send_mc_packet(
+                        parameters.key | neuron_id, PARAM_FILLER,
+                        NO_PAYLOAD)){
+                    spin1_delay_us(1);
+                }
+            }
+            if (live_output.enabled) {
+                live_output_add(neuron_id);
             }
             return;
         }
@@ -98,8 +143,8 @@ void key_search_and_send(uint spike, uint null_a) {
 void spike_rx(uint mc_key, uint null) {
     use(null);
 
-    // only going to process and retransmit if i have a key
-    if (parameters.has_key) {
+    // only going to process if there is somewhere for the spike to go
+    if (parameters.has_key || live_output.enabled) {
         spin1_schedule_callback(
             key_search_and_send, mc_key, PARAM_FILLER, USER);
     }
@@ -125,6 +170,11 @@ void count_ticks(uint null_a, uint null_b){
     use(null_a);
     use(null_b);
 
+    // the spikes of the last tick go to the host together
+    if (live_output.enabled) {
+        live_output_flush();
+    }
+
     time++;
     // If a fixed number of simulation ticks are specified and these have passed
     if (infinite_run != TRUE && time >= simulation_ticks) {
@@ -194,6 +244,26 @@ bool app_init(uint32_t *timer_period) {
             key_mask_table.entries[i].offset);
     }
 
+    // live output to the host
+    spin1_memcpy(
+        &live_output,
+        data_specification_get_region(LIVE_OUTPUT, data_address),
+        sizeof(live_output_struct));
+    log_info(
+        "live output = %d, tag = %d, index = %d", live_output.enabled,
+        live_output.tag, live_output.index);
+    if (live_output.enabled) {
+        live_output_msg.tag = live_output.tag;
+        live_output_msg.flags = SDP_NO_REPLY_FLAGS;
+        live_output_msg.dest_port = SDP_ETHERNET_PORT;
+        live_output_msg.dest_addr = 0;
+        live_output_msg.srce_port = (1 << PORT_SHIFT) | spin1_get_core_id();
+        live_output_msg.srce_addr = spin1_get_chip_id();
+        live_output_payload = (uint32_t *) &live_output_msg.cmd_rc;
+        live_output_payload[LIVE_OUTPUT_INDEX] = live_output.index;
+        live_output_payload[LIVE_OUTPUT_N_IDS] = 0;
+    }
+
     // sort out provenance data
     simulation_set_provenance_function(
         _store_provenance_data,
@@ -19,6 +19,7 @@
 #define DRNL_spiNN_h_
 
 #include "spin1_api.h"
+#include "DRNL_regions.h"
 
 //data spec regions
 typedef enum regions {
@@ -37,9 +38,16 @@ typedef enum regions {
     DIRECT_MATRIX = 12,
     BIT_FIELD_FILTER = 13,
     BIT_FIELD_BUILDER = 14,
-    BIT_FIELD_KEY_MAP = 15
+    BIT_FIELD_KEY_MAP = 15,
+    HOST_INPUT_DATA = 16,
+    SHARED_INPUT_SDRAM = 17
 } regions;
 
+//where the input samples come from
+typedef enum input_modes {
+    MULTICAST_INPUT = 0, HOST_INPUT = 1, SHARED_SDRAM_INPUT = 2
+} input_modes;
+
 typedef enum priorities {
     SPIKE_CHECK_PRIORITY = 1, PROCESS_HANDLER_PRIORITY = 1,
     APP_END_PRIORITY = 2, DATA_WRITE_PRIORITY = 0, COUNT_TICKS_PRIORITY = 0,
@@ -50,6 +58,9 @@ typedef enum synapse_type_indices {
     EXCITATORY = 0, INHIBITORY = 1
 } synapse_type_indices;
 
+// dma tag for reading the shared OME output, clear of the synapse tags
+#define SHARED_INPUT_DMA_TAG 3
+
 // recording region
 #define MOC_RECORDING_REGION 0
 
@@ -68,7 +79,7 @@ typedef enum synapse_type_indices {
 //linear pathway. unknown what each of these are for.
 #define LIN_GAIN 200.0
 #define A 30e4
-#define C 0.25k
+#define C ((accum) 0.25)
 
 // max of 2 numbers
 #define max(a, b) \
@@ -88,43 +99,4 @@ typedef union {
 	float f;
 } uint_float_union;
 
-// params from the parameter region in sdram
-typedef struct parameters_struct{
-   uint key;
-   uint ome_data_key;
-   int seq_size;
-   int n_buffers_in_sdram;
-   int n_synapse_types;
-   uint moc_resample_factor;
-} parameters_struct;
-
-// params from the parameter region in sdram
-typedef struct double_parameters_struct{
-   double moc_dec_1;
-   double moc_dec_2;
-   double moc_dec_3;
-   double moc_factor_1;
-   double ctbm;
-   double receip_ctbm;
-   double disp_thresh;
-} double_parameters_struct;
-
-// params from the filter params region in sdram
-typedef struct filter_params_struct{
-   double la1;
-   double la2;
-   double lb0;
-   double lb1;
-   double nla1;
-   double nla2;
-   double nlb0;
-   double nlb1;
-} filter_params_struct;
-
-// sdram edge data from sdram
-typedef struct sdram_out_buffer_param{
-    double* sdram_base_address;
-    int sdram_edge_size;
-} sdram_out_buffer_param;
-
 #endif /* DRNL_spiNN_h_ */
@@ -0,0 +1,83 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+// GENERATED by spinnak_ear.spinnak_ear_utilities.ear_region_schemas, do
+// not edit. Change the schemas there and regenerate instead.
+
+#ifndef DRNL_REGIONS_H_
+#define DRNL_REGIONS_H_
+
+#include <stdint.h>
+
+//! \brief params from the parameter region in sdram
+typedef struct parameters_struct{
+    uint32_t key;
+    uint32_t ome_data_key;
+    int32_t seq_size;
+    int32_t n_buffers_in_sdram;
+    int32_t n_synapse_types;
+    uint32_t moc_decimation_factor;
+    uint32_t input_mode;
+    uint32_t moc_decimation_average;
+    uint32_t moc_float32;
+} parameters_struct;
+
+//! \brief params from the double parameter region in sdram
+typedef struct double_parameters_struct{
+    double moc_dec_1;
+    double moc_dec_2;
+    double moc_dec_3;
+    double moc_factor_1;
+    double ctbm;
+    double receip_ctbm;
+    double disp_thresh;
+} double_parameters_struct;
+
+//! \brief params from the filter params region in sdram
+typedef struct filter_params_struct{
+    double la1;
+    double la2;
+    double lb0;
+    double lb1;
+    double nla1;
+    double nla2;
+    double nlb0;
+    double nlb1;
+} filter_params_struct;
+
+//! \brief host generated stapes displacement
+typedef struct host_input_data_struct{
+    uint32_t n_samples;
+    float samples[];
+} host_input_data_struct;
+
+//! \brief shared sdram ring buffer written by the OME
+typedef struct shared_input_struct{
+    float* sdram_base_address;
+    uint32_t n_buffers;
+} shared_input_struct;
+
+//! \brief sdram edge the ihcans read the output from
+typedef struct sdram_out_buffer_param{
+    double* sdram_base_address;
+    // in bytes
+    int32_t sdram_edge_size;
+    // in doubles
+    uint32_t n_elements;
+} sdram_out_buffer_param;
+
+#endif /* DRNL_REGIONS_H_ */
@@ -59,6 +59,8 @@ int overall_sample_id = 0;
 uint_float_union MC_union;
 
 double moc;
+double moc_window_sum = 0.0;
+uint moc_window_count = 0;
 double moc_now_1;
 double moc_now_2;
 double moc_now_3;
@@ -89,6 +91,15 @@ double *dtcm_buffer_y;
 // sdram edge buffer.
 double *sdram_out_buffer;
 
+// host generated input, used instead of the OME packets
+host_input_data_struct *host_input_data;
+
+// the next sample to read from the host generated input
+uint host_input_index = 0;
+
+// the OME output ring buffer shared with the other DRNLs on this chip
+shared_input_struct shared_input;
+
 // multicast bits
 double moc_spike_weight = 0;
 
@@ -169,6 +180,37 @@ void data_write(uint arg_1, uint arg_2)
     write_switch = !write_switch;
 }
 
+//! \brief records the moc once every decimation factor samples, as either
+//! the mean of those samples or the last of them
+//! \return none
+static inline void record_moc(void) {
+    moc_window_sum += moc;
+    moc_window_count++;
+    if (moc_window_count < parameters.moc_decimation_factor) {
+        return;
+    }
+
+    double moc_value = moc;
+    if (parameters.moc_decimation_average) {
+        moc_value = moc_window_sum / moc_window_count;
+    }
+    moc_window_sum = 0.0;
+    moc_window_count = 0;
+
+    log_debug("recording for moc the value %F", moc_value);
+    if (parameters.moc_float32) {
+        neuron_recording_set_float_recorded_param(
+            MOC_RECORDING_REGION, 0, (float) moc_value);
+    } else {
+        neuron_recording_set_double_recorded_param(
+            MOC_RECORDING_REGION, 0, moc_value);
+    }
+    neuron_recording_record(overall_sample_id);
+    neuron_recording_do_timestep_update(overall_sample_id);
+    log_debug("overall sample id is %d", overall_sample_id);
+    overall_sample_id += 1;
+}
+
 //! \brief processes a channel
 //! \param[in] out_buffer: where to store results
 //! \param[in] in_buffer: in data
@@ -305,13 +347,7 @@ uint process_chan(double *out_buffer, float *in_buffer) {
 		// changed moc att to channel output
 		out_buffer[i] = linout2 + non_linout_2b;
 
-        log_debug("recording for moc index %d the value %F", i, moc);
-		neuron_recording_set_double_recorded_param(
-		    MOC_RECORDING_REGION, 0, moc);
-		neuron_recording_record(overall_sample_id);
-        neuron_recording_do_timestep_update(overall_sample_id);
-        log_debug("overall sample id is %d", overall_sample_id);
-        overall_sample_id += 1;
+        record_moc();
 	}
 	return segment_offset;
 }
@@ -365,7 +401,31 @@ void write_complete(uint tid, uint ttag) {
 //! \param[in] payload: payload of packet
 //! \return none
 void data_read(uint mc_key, uint payload) {
-    if (mc_key == parameters.ome_data_key) {
+    if (mc_key == parameters.ome_data_key &&
+            parameters.input_mode == SHARED_SDRAM_INPUT) {
+        //payload is the index of the segment the OME put in sdram
+        #ifdef PROFILE
+            profiler_write_entry_disable_irq_fiq(
+                PROFILER_ENTER | PROFILER_TIMER);
+        #endif
+
+        //assign receive buffer
+        float *dtcm_buffer_in;
+        if (!read_switch) {
+            dtcm_buffer_in = dtcm_buffer_a;
+            read_switch = 1;
+        } else {
+            dtcm_buffer_in = dtcm_buffer_b;
+            read_switch = 0;
+        }
+
+        spin1_dma_transfer(
+            SHARED_INPUT_DMA_TAG, &shared_input.sdram_base_address[
+                (payload & (shared_input.n_buffers - 1)) *
+                parameters.seq_size],
+            dtcm_buffer_in, DMA_READ, parameters.seq_size * sizeof(float));
+    }
+    else if (mc_key == parameters.ome_data_key) {
         //payload is OME output value
         //convert payload to float
         MC_union.u = payload;
@@ -418,6 +478,47 @@ void data_read(uint mc_key, uint payload) {
     }
 }
 
+//! \brief sets off processing of a segment read from the shared sdram
+//! \param[in] tid: forced by api
+//! \param[in] ttag: forced by api
+//! \return none
+void shared_input_read_complete(uint tid, uint ttag) {
+    use(tid);
+    use(ttag);
+    spin1_schedule_callback(
+        process_handler, DRNL_FILLER_ARG, DRNL_FILLER_ARG,
+        PROCESS_HANDLER_PRIORITY);
+}
+
+//! \brief copies the next segment of host generated input into the current
+//! receive buffer and sets off its processing
+//! \return none
+void host_input_read(void) {
+    if (host_input_index + parameters.seq_size >
+            host_input_data->n_samples) {
+        return;
+    }
+
+    //assign receive buffer
+    float *dtcm_buffer_in;
+    if (!read_switch) {
+        dtcm_buffer_in = dtcm_buffer_a;
+        read_switch = 1;
+    } else {
+        dtcm_buffer_in = dtcm_buffer_b;
+        read_switch = 0;
+    }
+
+    spin1_memcpy(
+        dtcm_buffer_in, &host_input_data->samples[host_input_index],
+        parameters.seq_size * sizeof(float));
+    host_input_index += parameters.seq_size;
+
+    spin1_schedule_callback(
+        process_handler, DRNL_FILLER_ARG, DRNL_FILLER_ARG,
+        PROCESS_HANDLER_PRIORITY);
+}
+
 //! \brief write data to sdram edge
 //! \param[in] tid: forced by api
 //! \param[in] ttag: forced by api
@@ -450,6 +551,11 @@ void count_ticks(uint null_a, uint null_b) {
         simulation_ready_to_read();
         return;
     }
+
+    // no OME core, so feed a segment per tick from the host data
+    if (parameters.input_mode == HOST_INPUT) {
+        host_input_read();
+    }
 }
 
 //application initialisation
@@ -483,10 +589,27 @@ static inline bool app_init(uint32_t *timer_period) {
         data_specification_get_region(DOUBLE_PARAMS, data_address),
         sizeof(double_parameters_struct));
 
-    log_info("moc resample factor =%d\n",  parameters.moc_resample_factor);
+    log_info(
+        "moc decimation factor = %d, average = %d, float32 = %d",
+        parameters.moc_decimation_factor, parameters.moc_decimation_average,
+        parameters.moc_float32);
 
 	log_info("ome_data_key=%d\n", parameters.ome_data_key);
 
+    host_input_data = data_specification_get_region(
+        HOST_INPUT_DATA, data_address);
+    log_info(
+        "input mode = %d with %d host samples", parameters.input_mode,
+        host_input_data->n_samples);
+
+    spin1_memcpy(
+        &shared_input,
+        data_specification_get_region(SHARED_INPUT_SDRAM, data_address),
+        sizeof(shared_input_struct));
+    log_info(
+        "shared input %x with %d buffers", shared_input.sdram_base_address,
+        shared_input.n_buffers);
+
 	//output results buffer (shared with child IHCANs)
     sdram_out_buffer_param sdram_params;
     spin1_memcpy(
@@ -656,6 +779,8 @@ void c_main() {
         //setup callbacks
         //process channel once data input has been read to DTCM
         simulation_dma_transfer_done_callback_on(DMA_WRITE, write_complete);
+        simulation_dma_transfer_done_callback_on(
+            SHARED_INPUT_DMA_TAG, shared_input_read_complete);
         spin1_callback_on(MCPL_PACKET_RECEIVED, data_read, MC_PACKET_PRIORITY);
         spin1_callback_on(USER_EVENT, data_write, DATA_WRITE_PRIORITY);
         spin1_callback_on(TIMER_TICK, count_ticks, COUNT_TICKS_PRIORITY);
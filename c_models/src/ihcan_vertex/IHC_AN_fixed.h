@@ -0,0 +1,164 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! \file
+//! \brief the fixed point arithmetic of the fixed point IHCAN kernel. Values
+//! are held as the bits of s16.15 accums and u0.32 unsigned long fracts and
+//! worked on with integer operations, so the host build of the kernel does
+//! exactly the same arithmetic as the arm. The regions, recording and
+//! provenance are those of the float kernel, from IHC_AN_softfloat.h
+
+#ifndef IHC_AN_fixed_H_
+#define IHC_AN_fixed_H_
+
+#include "IHC_AN_softfloat.h"
+
+//! \brief the bits of an s16.15
+typedef int32_t s1615_bits;
+
+//! \brief the bits of a u0.32
+typedef uint32_t u032_bits;
+
+//! \brief the fractional bits of an s16.15
+#define S1615_SHIFT 15
+
+//! \brief 1 as an s16.15
+#define S1615_ONE (1 << S1615_SHIFT)
+
+//! \brief the largest s16.15
+#define S1615_MAX INT32_MAX
+
+//! \brief the largest u0.32, standing in for 1
+#define U032_MAX UINT32_MAX
+
+//! \brief turns an s16.15 into a float, for recording
+#define S1615_TO_FLOAT (1.0f / (float) S1615_ONE)
+
+//! \brief turns a displacement in m from the drnl into an s16.15 in nm
+#define DISPLACEMENT_TO_NM_S1615 (1e9 * (double) S1615_ONE)
+
+//! \brief the cube root of the largest release rate an s16.15 can hold
+#define MAX_CA_RATE_ROOT (40 * S1615_ONE)
+
+//! \brief the fractional bits of the exp2 polynomial
+#define EXP2_SHIFT 30
+
+//! \brief log2(e) with EXP2_SHIFT fractional bits
+#define LOG2_E 1549082005ll
+
+//! \brief the coefficients of the polynomial fit of 2^f - 1 over [0, 1),
+//! with EXP2_SHIFT fractional bits, good to 2e-7 of 2^f
+#define EXP2_C1 744269316ll
+#define EXP2_C2 257839907ll
+#define EXP2_C3 60017587ll
+#define EXP2_C4 9560093ll
+#define EXP2_C5 2054895ll
+
+//! \brief multiplies two s16.15s, rounding
+//! \param[in] a: an s16.15
+//! \param[in] b: an s16.15
+//! \return the s16.15 product
+static inline s1615_bits mul_s1615(s1615_bits a, s1615_bits b) {
+    return (s1615_bits) (
+        ((int64_t) a * b + (1 << (S1615_SHIFT - 1))) >> S1615_SHIFT);
+}
+
+//! \brief multiplies an s16.15 by a u0.32, rounding
+//! \param[in] a: the s16.15
+//! \param[in] b: the u0.32
+//! \return the s16.15 product
+static inline s1615_bits mul_s1615_u032(s1615_bits a, u032_bits b) {
+    return (s1615_bits) (((int64_t) a * b + (1ll << 31)) >> 32);
+}
+
+//! \brief multiplies two u0.32s, rounding
+//! \param[in] a: a u0.32
+//! \param[in] b: a u0.32
+//! \return the u0.32 product
+static inline u032_bits mul_u032(u032_bits a, u032_bits b) {
+    return (u032_bits) (((uint64_t) a * b + (1ull << 31)) >> 32);
+}
+
+//! \brief e to the power of an s16.15, saturating at the largest s16.15.
+//! Splits x log2(e) into a whole power of 2, done with a shift, and a
+//! fraction, done with a polynomial
+//! \param[in] x: the s16.15 power
+//! \return the s16.15 exponential
+static inline s1615_bits exp_s1615(s1615_bits x) {
+    // x log2(e), with S1615_SHIFT + EXP2_SHIFT fractional bits
+    int64_t y = (int64_t) x * LOG2_E;
+    int32_t whole = (int32_t) (y >> (S1615_SHIFT + EXP2_SHIFT));
+    if (whole >= 16) {
+        return S1615_MAX;
+    }
+    if (whole < -(EXP2_SHIFT + 1)) {
+        return 0;
+    }
+    int64_t f = (y >> S1615_SHIFT) & ((1ll << EXP2_SHIFT) - 1);
+
+    // 2^f, with EXP2_SHIFT fractional bits
+    int64_t p = EXP2_C5;
+    p = EXP2_C4 + ((p * f) >> EXP2_SHIFT);
+    p = EXP2_C3 + ((p * f) >> EXP2_SHIFT);
+    p = EXP2_C2 + ((p * f) >> EXP2_SHIFT);
+    p = EXP2_C1 + ((p * f) >> EXP2_SHIFT);
+    p = (1ll << EXP2_SHIFT) + ((p * f) >> EXP2_SHIFT);
+
+    // 2^whole 2^f, as an s16.15
+    int shift = EXP2_SHIFT - S1615_SHIFT - whole;
+    int64_t result;
+    if (shift > 0) {
+        result = (p + (1ll << (shift - 1))) >> shift;
+    } else {
+        result = p << -shift;
+    }
+    if (result > S1615_MAX) {
+        return S1615_MAX;
+    }
+    return (s1615_bits) result;
+}
+
+//! \brief 1 / (1 + x) of a positive s16.15, as a u0.32
+//! \param[in] x: the s16.15
+//! \return the u0.32 reciprocal
+static inline u032_bits recip_one_plus_s1615(s1615_bits x) {
+    uint64_t recip = (1ull << (32 + S1615_SHIFT)) / (uint32_t) (S1615_ONE + x);
+    if (recip > U032_MAX) {
+        return U032_MAX;
+    }
+    return (u032_bits) recip;
+}
+
+//! \brief 1 - p of a u0.32, to within its smallest step
+//! \param[in] p: the u0.32
+//! \return the u0.32 complement
+static inline u032_bits complement_u032(u032_bits p) {
+    return ~p;
+}
+
+//! \brief how many times a for loop counting up from 0 while below an
+//! s16.15 runs, as the float kernel's vesicle loops do
+//! \param[in] x: the s16.15 bound
+//! \return the whole count
+static inline int32_t loop_count_s1615(s1615_bits x) {
+    if (x <= 0) {
+        return 0;
+    }
+    return (x + S1615_ONE - 1) >> S1615_SHIFT;
+}
+
+#endif /* IHC_AN_fixed_H_ */
@@ -0,0 +1,194 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+// GENERATED by spinnak_ear.spinnak_ear_utilities.ear_region_schemas, do
+// not edit. Change the schemas there and regenerate instead.
+
+#ifndef IHC_AN_REGIONS_H_
+#define IHC_AN_REGIONS_H_
+
+#include <stdint.h>
+
+//! \brief the data items in sdram from the params region
+typedef struct parameters_struct{
+    int32_t resampling_factor;
+    int32_t number_fibres;
+    int32_t seg_size;
+    int32_t number_of_sdram_buffers;
+    int32_t num_lsr;
+    int32_t num_msr;
+    int32_t num_hsr;
+    uint32_t my_key;
+} parameters_struct;
+
+//! \brief spikes packed as a bit per fibre per sample, a row per segment
+typedef struct packed_spikes_struct{
+    uint32_t n_words_per_row;
+    uint32_t n_rows;
+    uint32_t n_rows_recorded;
+    uint32_t rows[];
+} packed_spikes_struct;
+
+//! \brief spike probs quantized to 8 or 16 bits, a row per segment
+typedef struct quantized_spike_prob_struct{
+    uint32_t bytes_per_value;
+    float full_scale;
+    uint32_t n_words_per_row;
+    uint32_t n_rows;
+    uint32_t n_rows_recorded;
+    uint32_t rows[];
+} quantized_spike_prob_struct;
+
+//! \brief elements based off dt
+typedef struct dt_params_struct{
+    float dt;
+    float z;
+} dt_params_struct;
+
+//! \brief sdram edge data from sdram
+typedef struct sdram_out_buffer_param{
+    double* sdram_base_address;
+} sdram_out_buffer_param;
+
+//! \brief cilia constants struct params
+typedef struct cilia_constants_struct{
+    float recips0;
+    float recips1;
+} cilia_constants_struct;
+
+//! \brief inner ear params
+typedef struct inner_ear_param_struct{
+    float an_cleft_lsr;
+    float an_cleft_msr;
+    float an_cleft_hsr;
+    float an_avail_lsr;
+    float an_avail_msr;
+    float an_avail_hsr;
+    float an_repro_lsr;
+    float an_repro_msr;
+    float an_repro_hsr;
+    float ihcv;
+    float m_ica_curr;
+    float ekp;
+    float ca_curr_lsr;
+    float ca_curr_msr;
+    float ca_curr_hsr;
+    float r_max_recip;
+} inner_ear_param_struct;
+
+//! \brief the constants of the fixed point kernel, already in its formats
+typedef struct fixed_point_params_struct{
+    // s16.15, cilia filter b2 - a1
+    int32_t cilia_feedback;
+    // u0.32
+    uint32_t cilia_c;
+    // s16.15 nm
+    int32_t cilia_u0;
+    // s16.15 nm
+    int32_t cilia_u1;
+    // s16.15 per nm
+    int32_t cilia_recips0;
+    // s16.15 per nm
+    int32_t cilia_recips1;
+    // s16.15 nS
+    int32_t cilia_ga;
+    // s16.15 nS
+    int32_t cilia_g_max;
+    // s16.15 nS
+    int32_t cilia_gk;
+    // s16.15 mV
+    int32_t cilia_et;
+    // s16.15 mV
+    int32_t ekp;
+    // u0.32 mV per pA per sample
+    uint32_t cilia_dt_cap;
+    // u0.32 per mV
+    uint32_t gamma;
+    // u0.32
+    uint32_t recip_beta;
+    // s16.15
+    int32_t dt_tau_m;
+    // s16.15 mV, at rest
+    int32_t ihcv;
+    // u0.32, at rest
+    uint32_t m_ica_curr;
+    // s16.15 mV
+    int32_t eca;
+    // u0.32, cube root release rate added per mV of calcium drive
+    uint32_t ca_gain;
+    // u0.32 per sample
+    uint32_t ca_decay_lsr;
+    // u0.32 per sample
+    uint32_t ca_decay_msr;
+    // u0.32 per sample
+    uint32_t ca_decay_hsr;
+    // s16.15 cube root of the release rate in Hz, at rest
+    int32_t ca_rate_root_lsr;
+    int32_t ca_rate_root_msr;
+    int32_t ca_rate_root_hsr;
+    // s16.15
+    int32_t an_cleft_lsr;
+    // s16.15
+    int32_t an_cleft_msr;
+    // s16.15
+    int32_t an_cleft_hsr;
+    // whole vesicles
+    int32_t an_avail_lsr;
+    // whole vesicles
+    int32_t an_avail_msr;
+    // whole vesicles
+    int32_t an_avail_hsr;
+    // s16.15
+    int32_t an_repro_lsr;
+    // s16.15
+    int32_t an_repro_msr;
+    // s16.15
+    int32_t an_repro_hsr;
+    // whole vesicles
+    int32_t max_neurotransmitters;
+    // u0.32 s
+    uint32_t dt_spikes;
+    // s16.15 resampled samples
+    int32_t refrac_period;
+    // u0.32, 1 - ydt
+    uint32_t y_keep;
+    // u0.32, 1 - xdt
+    uint32_t x_keep;
+    // u0.32
+    uint32_t rdt;
+    // u0.32, rdt + ldt
+    uint32_t cleft_loss;
+} fixed_point_params_struct;
+
+//! \brief tables in place of exponentials and powers, then their values
+typedef struct lookup_tables_struct{
+    // displacement of the first point in m
+    float apical_start;
+    // points per m
+    float apical_recip_step;
+    uint32_t n_apical_points;
+    // potential of the first point in V
+    float calcium_start;
+    // points per V
+    float calcium_recip_step;
+    uint32_t n_calcium_points;
+    uint32_t n_replenish_powers;
+    uint32_t n_reprocessing_powers;
+    float values[];
+} lookup_tables_struct;
+
+#endif /* IHC_AN_REGIONS_H_ */
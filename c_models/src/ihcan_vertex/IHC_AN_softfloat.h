@@ -19,19 +19,11 @@
 #define IHC_AN_softfloat_H_
 
 #include "spin1_api.h"
-
-//! \brief
-#define RECIP_BETA 1.0 / 400.0f
-
-//! \brief
-#define GAMMA 100.0f
+#include "IHC_AN_regions.h"
 
 //! \brief
 #define ECA 0.066f
 
-//! \brief power -1 for genering cubed powers (for effeicey sake)
-#define POWER 2.0f
-
 //!*********************************** cilia constants *************//
 
 //! \brief
@@ -43,18 +35,6 @@
 //! \brief
 #define CILIA_C 0.05f
 
-//! \brief
-#define CILIA_U0 0.3e-9f
-
-//! \brief
-#define CILIA_U1 1e-9f
-
-//! \brief
-#define CILIA_G_MAX 6e-9f
-
-//! \brief
-#define CILIA_GA 0.1e-9f
-
 //! \brief
 #define CILIA_ET 0.1f
 
@@ -130,6 +110,10 @@ typedef enum regions {
     SDRAM_EDGE_ADDRESS = 7,
     PROFILER = 8,
     PROVENANCE = 9,
+    PACKED_SPIKES = 10,
+    QUANTIZED_SPIKE_PROB = 11,
+    FIXED_POINT_PARAMS = 12,
+    LOOKUP_TABLES = 13
 } regions;
 
 //! \brief recording regions
@@ -150,32 +134,10 @@ typedef enum extra_provenance_data_region_entries{
     DATA_WRITE_COUNT_SPIKES = 3,
     DATA_WRITE_COUNT_SPIKE_PROB = 4,
     MC_RX_COUNT = 5,
-    MC_TRANSMISSION_COUNT = 6
+    MC_TRANSMISSION_COUNT = 6,
+    PEAK_BUFFER_OCCUPANCY = 7
 } extra_provenance_data_region_entries;
 
-//! \brief the data items in sdram from the params region
-typedef struct parameters_struct{
-    int resampling_factor;
-    int number_fibres;
-    int seg_size;
-    int number_of_sdram_buffers;
-    int num_lsr;
-    int num_msr;
-    int num_hsr;
-    uint my_key;
-} parameters_struct;
-
-//! \brief elements based off dt
-typedef struct dt_params_struct{
-    float dt;
-    float z;
-}dt_params_struct;
-
-//! \brief sdram edge data from sdram
-typedef struct sdram_out_buffer_param{
-    double* sdram_base_address;
-} sdram_out_buffer_param;
-
 //! \brief synapse params
 typedef struct synapse_params_struct{
     float refrac_period;
@@ -185,30 +147,4 @@ typedef struct synapse_params_struct{
     float rdt;
 } synapse_params_struct;
 
-//! \brief cilia constants struct params
-typedef struct cilia_constants_struct{
-    float recips0;
-    float recips1;
-} cilia_constants_struct;
-
-//! \brief inner ear params
-typedef struct inner_ear_param_struct{
-    float an_cleft_lsr;
-    float an_cleft_msr;
-    float an_cleft_hsr;
-    float an_avail_lsr;
-    float an_avail_msr;
-    float an_avail_hsr;
-    float an_repro_lsr;
-    float an_repro_msr;
-    float an_repro_hsr;
-    float ihcv;
-    float m_ica_curr;
-    float ekp;
-    float ca_curr_lsr;
-    float ca_curr_msr;
-    float ca_curr_hsr;
-    float r_max_recip;
-} inner_ear_param_struct;
-
 #endif /* IHC_AN_H_ */
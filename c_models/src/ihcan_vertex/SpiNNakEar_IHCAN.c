@@ -19,7 +19,6 @@
 #include "IHC_AN_softfloat.h"
 #include "spin1_api.h"
 #include "random.h"
-#include "stdfix-exp.h"
 #include "log.h"
 #include "bit_field.h"
 #include "neuron/neuron_recording.h"
@@ -48,6 +47,9 @@ int mc_rx_count = 0;
 //! \brief state variable for which sdram buffer to read
 int seg_index = 0;
 
+//! \brief most segments written to sdram but not yet processed at once
+int peak_buffer_occupancy = 0;
+
 // ****************** globals ******************************//
 
 //! \brief sim ticks
@@ -81,6 +83,25 @@ double *dtcm_buffer_b;
 //! \brief sdram edge buffer
 double *sdram_in_buffer;
 
+//! \brief the packed spike region
+packed_spikes_struct *packed_spikes;
+
+//! \brief the packed spikes of the segment being processed
+uint32_t *packed_spike_row;
+
+//! \brief the quantized spike prob region
+quantized_spike_prob_struct *quantized_spike_prob;
+
+//! \brief the quantized spike probs of the segment being processed
+uint8_t *quantized_spike_prob_row;
+
+//! \brief the largest code a quantized spike prob can take
+float quantized_spike_prob_max_code;
+
+//! \brief the codes per unit of probability, the largest code standing for
+//! the full scale probability
+float quantized_spike_prob_code_scale;
+
 //************************* cilia **************** //
 
 //! \brief ???????
@@ -112,6 +133,23 @@ inner_ear_param_struct inner_ear_params;
 //! \brief dt based params
 dt_params_struct dt_params;
 
+//! \brief the lookup tables, copied into dtcm
+lookup_tables_struct *lookup_tables;
+
+//! \brief apical conductance in S, by scaled cilia displacement
+float *apical_conductance_table;
+
+//! \brief steady state calcium channel activation, by receptor potential
+float *calcium_activation_table;
+
+//! \brief the chance of a missing vesicle not being replenished, by the
+//! vesicles missing
+float *replenish_powers;
+
+//! \brief the chance of a vesicle in the reprocessing store not being
+//! reprocessed, by the vesicles in it
+float *reprocessing_powers;
+
 //! *********************** recurring values ******************//
 
 //! \brief ????
@@ -152,9 +190,6 @@ float *g_max_ca;
 //! \brief ????????
 float *ca_th;
 
-//! \brief ????????
-uint *refact;
-
 //! \brief ?????????
 float *synapse_m;
 
@@ -184,6 +219,13 @@ void data_read(uint mc_key, uint payload) {
 
     use(mc_key);
     use(payload);
+    mc_rx_count++;
+
+    // segments the drnl has written that this core has yet to process
+    int buffer_occupancy = mc_rx_count - seg_index;
+    if (buffer_occupancy > peak_buffer_occupancy) {
+        peak_buffer_occupancy = buffer_occupancy;
+    }
 
     // measure time between each call of this function (should approximate
     // the global clock in OME)
@@ -213,6 +255,112 @@ void data_read(uint mc_key, uint payload) {
     data_read_count ++;
 }
 
+//! \brief copies the packed spikes of the segment just processed into its
+//! row in sdram, and clears them for the next segment
+//! \return None
+static inline void record_packed_spikes(void) {
+    if (packed_spikes->n_rows == 0) {
+        return;
+    }
+    uint row = seg_index - 1;
+    if (row < packed_spikes->n_rows) {
+        spin1_memcpy(
+            &packed_spikes->rows[row * packed_spikes->n_words_per_row],
+            packed_spike_row,
+            packed_spikes->n_words_per_row * sizeof(uint32_t));
+        packed_spikes->n_rows_recorded = row + 1;
+    }
+    for (uint i = 0; i < packed_spikes->n_words_per_row; i++) {
+        packed_spike_row[i] = 0;
+    }
+}
+
+//! \brief quantizes the release probability of a sample into the row of
+//! the segment being processed
+//! \param[in] index: the index of the sample in the row
+//! \param[in] rate: the vesicle release rate of the sample
+//! \return None
+static inline void quantize_spike_prob(uint index, float rate) {
+    float prob = rate * dt_spikes;
+    if (prob < 0.0f) {
+        prob = 0.0f;
+    } else if (prob > quantized_spike_prob->full_scale) {
+        prob = quantized_spike_prob->full_scale;
+    }
+    uint code = (uint) ((prob * quantized_spike_prob_code_scale) + 0.5f);
+    uint byte = index * quantized_spike_prob->bytes_per_value;
+    quantized_spike_prob_row[byte] = (uint8_t) code;
+    if (quantized_spike_prob->bytes_per_value > 1) {
+        quantized_spike_prob_row[byte + 1] = (uint8_t) (code >> 8);
+    }
+}
+
+//! \brief copies the quantized spike probs of the segment just processed
+//! into its row in sdram
+//! \return None
+static inline void record_quantized_spike_probs(void) {
+    if (quantized_spike_prob->n_rows == 0) {
+        return;
+    }
+    uint row = seg_index - 1;
+    if (row < quantized_spike_prob->n_rows) {
+        spin1_memcpy(
+            &quantized_spike_prob->rows[
+                row * quantized_spike_prob->n_words_per_row],
+            quantized_spike_prob_row,
+            quantized_spike_prob->n_words_per_row * sizeof(uint32_t));
+        quantized_spike_prob->n_rows_recorded = row + 1;
+    }
+}
+
+//! \brief linearly interpolates a lookup table, clamping to its ends
+//! \param[in] values: the values of the table
+//! \param[in] n_points: the points of the table
+//! \param[in] start: the argument of the first point
+//! \param[in] recip_step: the points per unit of the argument
+//! \param[in] x: the argument to look up
+//! \return the interpolated value
+static inline float interpolate(
+        const float *values, uint32_t n_points, float start,
+        float recip_step, float x) {
+    float position = (x - start) * recip_step;
+    if (position <= 0.0f) {
+        return values[0];
+    }
+    if (position >= (float) (n_points - 1)) {
+        return values[n_points - 1];
+    }
+    uint32_t index = (uint32_t) position;
+    float fraction = position - (float) index;
+    return values[index] + fraction * (values[index + 1] - values[index]);
+}
+
+//! \brief raises the base of a power table to the number of times a loop
+//! counting up from 0 while below a count runs, multiplying on past the end
+//! of the table
+//! \param[in] powers: the powers of the base, from 0
+//! \param[in] n_powers: the powers in the table
+//! \param[in] count: the loop bound
+//! \return the power
+static inline float table_power(
+        const float *powers, uint32_t n_powers, float count) {
+    if (count <= 0.0f) {
+        return powers[0];
+    }
+    uint32_t n = (uint32_t) count;
+    if ((float) n < count) {
+        n++;
+    }
+    if (n < n_powers) {
+        return powers[n];
+    }
+    float result = powers[n_powers - 1];
+    for (uint32_t k = n_powers - 1; k < n; k++) {
+        result *= powers[1];
+    }
+    return result;
+}
+
 //! \brief Main segment processing loop
 //select correct output buffer type
 void process_chan(double *in_buffer) {
@@ -238,9 +386,10 @@ void process_chan(double *in_buffer) {
         float utconv = past_cilia_disp;
 
         //=========Apical Conductance========//
-        float ex1 = expk((accum)( -(utconv - CILIA_U1) * cilia_params.recips1));
-        float ex2 = expk((accum)( -(utconv - CILIA_U0) * cilia_params.recips0));
-        float guconv = (CILIA_GA + (CILIA_G_MAX / (1.0f + ex2 * (1.0f + ex1))));
+        float guconv = interpolate(
+            apical_conductance_table, lookup_tables->n_apical_points,
+            lookup_tables->apical_start, lookup_tables->apical_recip_step,
+            utconv);
 
         //========Receptor Potential=========//
         ihcv_now += (
@@ -248,15 +397,14 @@ void process_chan(double *in_buffer) {
              (CILIA_GK * (ihcv_now - inner_ear_params.ekp))) * cilia_dt_cap);
 
         //================mICa===============//
-        float ex3 = expk((accum) - GAMMA * ihcv_now);
-        float mi_ca_inf = 1.0f / (1.0f + ex3 * RECIP_BETA);
+        float mi_ca_inf = interpolate(
+            calcium_activation_table, lookup_tables->n_calcium_points,
+            lookup_tables->calcium_start, lookup_tables->calcium_recip_step,
+            ihcv_now);
         m_ica_curr += (mi_ca_inf - m_ica_curr) * dt_tau_m;
 
         //================ICa================//
-        float mica_pow_conv = m_ica_curr;
-        for (float k = 0; k < POWER; k++) {
-            mica_pow_conv *= m_ica_curr;
-        }
+        float mica_pow_conv = m_ica_curr * m_ica_curr * m_ica_curr;
         log_debug(
             "mica_pow_conv %d is %f",
             ((seg_index-1)*parameters.seg_size) + i,
@@ -294,11 +442,9 @@ void process_chan(double *in_buffer) {
 
             if (i % parameters.resampling_factor == 0) {
 
-                ca_curr_pow = pos_ca_curr * dt_params.z;
                 //=====Vesicle Release Rate MAP_BS=====//
-                for (float k = 0.0; k < POWER; k++) {
-                    ca_curr_pow *= pos_ca_curr * dt_params.z;
-                }
+                float ca_rate_root = pos_ca_curr * dt_params.z;
+                ca_curr_pow = ca_rate_root * ca_rate_root * ca_rate_root;
 
                 //=====Release Probability=======//
                 float release_prob = ca_curr_pow * dt_spikes;
@@ -347,16 +493,11 @@ void process_chan(double *in_buffer) {
                 }
 
                 //=========Reprocessed=========//
-                float repro_rate = synapse_params.xdt;
-                float x_pow = 1.0f;
-                float y_pow = 1.0f;
-
-                for (float k = 0.0; k < m_q; k++) {
-                    y_pow *= (1.0f - synapse_params.ydt);
-                }
-                for (float k = 0; k < an_repro[j]; k++) {
-                    x_pow *= (1.0f - repro_rate);
-                }
+                float y_pow = table_power(
+                    replenish_powers, lookup_tables->n_replenish_powers, m_q);
+                float x_pow = table_power(
+                    reprocessing_powers, lookup_tables->n_reprocessing_powers,
+                    an_repro[j]);
 
                 probability = 1.0f - x_pow;
                 float reprocessed;
@@ -388,15 +529,23 @@ void process_chan(double *in_buffer) {
                 an_repro[j] = an_repro[j] + re_uptake - reprocessed;
 
                 //=======write output value to buffer to go to SDRAM ========//
+                if (spiked && packed_spikes->n_rows > 0) {
+                    uint bit = (j * parameters.seg_size) + i;
+                    packed_spike_row[bit >> 5] |= 1u << (bit & 0x1F);
+                }
                 if (spiked) {
                     neuron_recording_set_spike(
                         SPIKE_RECORDING_REGION_ID,
                         (j * parameters.seg_size) + i);
                 }
             }
-            neuron_recording_set_float_recorded_param(
-                SPIKE_PROBABILITY_REGION_ID, (j * parameters.seg_size) + i,
-                 ca_curr_pow);
+            if (quantized_spike_prob->n_rows > 0) {
+                quantize_spike_prob((j * parameters.seg_size) + i, ca_curr_pow);
+            } else {
+                neuron_recording_set_float_recorded_param(
+                    SPIKE_PROBABILITY_REGION_ID, (j * parameters.seg_size) + i,
+                    ca_curr_pow);
+            }
 
             log_debug(
                 " ca curr pow for fiber %d index %d= %f",
@@ -405,6 +554,8 @@ void process_chan(double *in_buffer) {
     }
 	// set off the record to sdram
 	neuron_recording_record(seg_index);
+	record_packed_spikes();
+	record_quantized_spike_probs();
 }
 
 //! \brief interface for when dma transfer is successful
@@ -466,6 +617,7 @@ void _store_provenance_data(address_t provenance_region) {
         data_write_count_spikes_prob;
     provenance_region[MC_RX_COUNT] = mc_rx_count;
     provenance_region[MC_TRANSMISSION_COUNT] = spike_count;
+    provenance_region[PEAK_BUFFER_OCCUPANCY] = peak_buffer_occupancy;
 
     log_debug("finished other provenance data");
 }
@@ -523,6 +675,28 @@ bool app_init(uint32_t *timer_period)
 
     log_debug(" dt is %f", dt_params.dt);
 
+    // get the lookup tables, copied into dtcm as they are read every sample
+    lookup_tables_struct *sdram_tables =
+        data_specification_get_region(LOOKUP_TABLES, data_address);
+    uint32_t n_table_values =
+        sdram_tables->n_apical_points + sdram_tables->n_calcium_points +
+        sdram_tables->n_replenish_powers + sdram_tables->n_reprocessing_powers;
+    uint32_t table_bytes =
+        sizeof(lookup_tables_struct) + n_table_values * sizeof(float);
+    lookup_tables = spin1_malloc(table_bytes);
+    if (lookup_tables == NULL) {
+        log_error("cannot allocate %d bytes of lookup tables", table_bytes);
+        return false;
+    }
+    spin1_memcpy(lookup_tables, sdram_tables, table_bytes);
+    apical_conductance_table = lookup_tables->values;
+    calcium_activation_table =
+        &apical_conductance_table[lookup_tables->n_apical_points];
+    replenish_powers =
+        &calcium_activation_table[lookup_tables->n_calcium_points];
+    reprocessing_powers =
+        &replenish_powers[lookup_tables->n_replenish_powers];
+
     // set the current ihcv to the start point
     ihcv_now = inner_ear_params.ihcv;
     m_ica_curr = inner_ear_params.m_ica_curr;
@@ -573,7 +747,7 @@ bool app_init(uint32_t *timer_period)
     }
 
     //******************** array defs off num fibres **************//
-    refact = spin1_malloc(parameters.number_fibres * sizeof(uint));
+    refrac = spin1_malloc(parameters.number_fibres * sizeof(uint));
     ca_curr = spin1_malloc(parameters.number_fibres * sizeof(float));
     an_cleft = spin1_malloc(parameters.number_fibres * sizeof(float));
     an_avail = spin1_malloc(parameters.number_fibres * sizeof(float));
@@ -584,7 +758,7 @@ bool app_init(uint32_t *timer_period)
     synapse_m = spin1_malloc(parameters.number_fibres * sizeof(float));
 
     // verify buffers were actually initialised
-	if (refact == NULL || ca_curr == NULL || an_cleft == NULL ||
+	if (refrac == NULL || ca_curr == NULL || an_cleft == NULL ||
 	        an_avail == NULL || an_repro == NULL || ca_th == NULL ||
 	        synapse_m == NULL || rec_tau_ca == NULL ||
 	        g_max_ca == NULL) {
@@ -601,6 +775,46 @@ bool app_init(uint32_t *timer_period)
 	sdram_in_buffer = sdram_params.sdram_base_address;
     log_info("sdram in buffer @ 0x%08x\n", (uint) sdram_in_buffer);
 
+    // packed spike recording
+    packed_spikes = data_specification_get_region(PACKED_SPIKES, data_address);
+    if (packed_spikes->n_rows > 0) {
+        packed_spike_row = (uint32_t *) sark_alloc(
+            packed_spikes->n_words_per_row, sizeof(uint32_t));
+        if (packed_spike_row == NULL) {
+            log_error("cannot allocate the packed spike row");
+            return false;
+        }
+        for (uint i = 0; i < packed_spikes->n_words_per_row; i++) {
+            packed_spike_row[i] = 0;
+        }
+    }
+    log_info(
+        "packed spikes for %d rows of %d words", packed_spikes->n_rows,
+        packed_spikes->n_words_per_row);
+
+    // quantized spike prob recording
+    quantized_spike_prob = data_specification_get_region(
+        QUANTIZED_SPIKE_PROB, data_address);
+    if (quantized_spike_prob->n_rows > 0) {
+        quantized_spike_prob_row = (uint8_t *) sark_alloc(
+            quantized_spike_prob->n_words_per_row, sizeof(uint32_t));
+        if (quantized_spike_prob_row == NULL) {
+            log_error("cannot allocate the quantized spike prob row");
+            return false;
+        }
+        uint32_t *row_words = (uint32_t *) quantized_spike_prob_row;
+        for (uint i = 0; i < quantized_spike_prob->n_words_per_row; i++) {
+            row_words[i] = 0;
+        }
+        quantized_spike_prob_max_code =
+            (float) ((1u << (quantized_spike_prob->bytes_per_value * 8)) - 1);
+        quantized_spike_prob_code_scale =
+            quantized_spike_prob_max_code / quantized_spike_prob->full_scale;
+    }
+    log_info(
+        "quantized spike probs for %d rows of %d words",
+        quantized_spike_prob->n_rows, quantized_spike_prob->n_words_per_row);
+
 	//****************MODEL INITIALISATION******************//
 
     //initialise random number generator
@@ -0,0 +1,745 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+//! Inner Hair Cell + Auditory Nerve model for use in SpiNNakEar system, in
+//! s16.15 and u0.32 fixed point. The same model as SpiNNakEar_IHCAN.c, with
+//! the states held in units that suit the fixed point formats: displacement
+//! in nm, potentials in mV, conductances in nS and the calcium current of
+//! each fibre as the cube root of the vesicle release rate it drives
+#include "IHC_AN_fixed.h"
+#include "spin1_api.h"
+#include "random.h"
+#include "log.h"
+#include "bit_field.h"
+#include "neuron/neuron_recording.h"
+#include <data_specification.h>
+#include <profiler.h>
+#include <simulation.h>
+#include <debug.h>
+
+//****************** provenance data ***************************//
+
+//! \brief how many spikes sent
+int spike_count = 0;
+
+//! \brief how many reads done
+int data_read_count = 0;
+
+//! \brief how many writes done for spikes
+int data_write_count_spikes = 0;
+
+//! \brief how many writes done for spikes prob
+int data_write_count_spikes_prob = 0;
+
+//! \brief how many mc packets received
+int mc_rx_count = 0;
+
+//! \brief state variable for which sdram buffer to read
+int seg_index = 0;
+
+//! \brief most segments written to sdram but not yet processed at once
+int peak_buffer_occupancy = 0;
+
+// ****************** globals ******************************//
+
+//! \brief sim ticks
+static uint32_t simulation_ticks = 0;
+
+//! \brief infinite run pointer
+static uint32_t infinite_run;
+
+//! \brief time / ticks done
+uint32_t time;
+
+//! \brief simulation timer tick (based on its time step)
+uint32_t time_pointer;
+
+//********************* switch **************//
+
+//! \brief bool state for switching dtcm input buffers
+uint read_switch = 0;
+
+//! \random number generator seed
+mars_kiss64_seed_t local_seed;
+
+//**************** buffers **********************//
+//! \brief input buffers
+double *dtcm_buffer_a;
+double *dtcm_buffer_b;
+
+//! \brief sdram edge buffer
+double *sdram_in_buffer;
+
+//! \brief the packed spike region
+packed_spikes_struct *packed_spikes;
+
+//! \brief the packed spikes of the segment being processed
+uint32_t *packed_spike_row;
+
+//! \brief the quantized spike prob region
+quantized_spike_prob_struct *quantized_spike_prob;
+
+//! \brief the quantized spike probs of the segment being processed
+uint8_t *quantized_spike_prob_row;
+
+//! \brief the largest code a quantized spike prob can take
+uint32_t quantized_spike_prob_max_code;
+
+//! \brief the codes per unit of probability, the largest code standing for
+//! the full scale probability
+uint32_t quantized_spike_prob_code_scale;
+
+//! ********************** param structs ***************** //
+
+//! \brief struct holding params from the param region
+parameters_struct parameters;
+
+//! \brief the fixed point constants
+fixed_point_params_struct fixed_params;
+
+//! *********************** recurring values ******************//
+
+//! \brief the scaled cilia displacement of the last sample, s16.15 nm
+s1615_bits past_cilia_disp = 0;
+
+//! \brief receptor potential, s16.15 mV
+s1615_bits ihcv_now;
+
+//! \brief calcium channel activation, u0.32
+u032_bits m_ica_curr;
+
+//! \brief recording flags
+uint32_t recording_flags;
+
+//! ****************************** arrays ******************//
+
+//! \brief cube root of the vesicle release rate in Hz of each fibre, which
+//! is the calcium current scaled by -z, s16.15
+s1615_bits *ca_rate_root;
+
+//! \brief calcium current decay per sample of each fibre, u0.32
+u032_bits *ca_decay;
+
+//! \brief neurotransmitter in the cleft of each fibre, s16.15
+s1615_bits *an_cleft;
+
+//! \brief vesicles available to release of each fibre
+int32_t *an_avail;
+
+//! \brief neurotransmitter in the reprocessing store of each fibre, s16.15
+s1615_bits *an_repro;
+
+//! \brief samples left in the refractory period of each fibre
+uint *refrac;
+
+//! \brief tracker for when recording finishes putting spike data into sdram.
+//! Switches write buffers and handles profiling if needed
+void record_finished_spikes(void) {
+    #ifdef PROFILE
+        profiler_write_entry_disable_irq_fiq(PROFILER_EXIT | PROFILER_TIMER);
+    #endif
+    data_write_count_spikes++;
+}
+
+//! \brief tracker for when recording finishes putting spike prob data into
+//! sdram. Switches write buffers and handles profiling if needed
+void record_finished_spikes_prob(void) {
+    #ifdef PROFILE
+        profiler_write_entry_disable_irq_fiq(PROFILER_EXIT | PROFILER_TIMER);
+    #endif
+    data_write_count_spikes_prob++;
+}
+
+// processes multicast packets
+//! \param[in] mc_key: the multicast key
+//! \param[in] payload: the payload of the MC packet
+//! \return None
+void data_read(uint mc_key, uint payload) {
+
+    use(mc_key);
+    use(payload);
+    mc_rx_count++;
+
+    // segments the drnl has written that this core has yet to process
+    int buffer_occupancy = mc_rx_count - seg_index;
+    if (buffer_occupancy > peak_buffer_occupancy) {
+        peak_buffer_occupancy = buffer_occupancy;
+    }
+
+    // measure time between each call of this function (should approximate
+    // the global clock in OME)
+    #ifdef PROFILE
+        profiler_write_entry_disable_irq_fiq(
+            PROFILER_ENTER | PROFILER_TIMER);
+    #endif
+
+    double *dtcm_buffer_in;
+
+    //read from DMA and copy into DTCM
+    //assign receive buffer
+    if (!read_switch) {
+        dtcm_buffer_in = dtcm_buffer_a;
+        read_switch = 1;
+    } else {
+        dtcm_buffer_in = dtcm_buffer_b;
+        read_switch = 0;
+    }
+    spin1_dma_transfer(
+        DMA_READ,
+        &sdram_in_buffer[
+            (seg_index & (parameters.number_of_sdram_buffers - 1)) *
+            parameters.seg_size],
+        dtcm_buffer_in, DMA_READ, parameters.seg_size * sizeof(double));
+
+    data_read_count ++;
+}
+
+//! \brief copies the packed spikes of the segment just processed into its
+//! row in sdram, and clears them for the next segment
+//! \return None
+static inline void record_packed_spikes(void) {
+    if (packed_spikes->n_rows == 0) {
+        return;
+    }
+    uint row = seg_index - 1;
+    if (row < packed_spikes->n_rows) {
+        spin1_memcpy(
+            &packed_spikes->rows[row * packed_spikes->n_words_per_row],
+            packed_spike_row,
+            packed_spikes->n_words_per_row * sizeof(uint32_t));
+        packed_spikes->n_rows_recorded = row + 1;
+    }
+    for (uint i = 0; i < packed_spikes->n_words_per_row; i++) {
+        packed_spike_row[i] = 0;
+    }
+}
+
+//! \brief quantizes the release probability of a sample into the row of
+//! the segment being processed
+//! \param[in] index: the index of the sample in the row
+//! \param[in] prob: the u0.32 release probability of the sample
+//! \return None
+static inline void quantize_spike_prob(uint index, u032_bits prob) {
+    uint code = (uint) (
+        ((uint64_t) prob * quantized_spike_prob_code_scale + (1ull << 31))
+        >> 32);
+    if (code > quantized_spike_prob_max_code) {
+        code = quantized_spike_prob_max_code;
+    }
+    uint byte = index * quantized_spike_prob->bytes_per_value;
+    quantized_spike_prob_row[byte] = (uint8_t) code;
+    if (quantized_spike_prob->bytes_per_value > 1) {
+        quantized_spike_prob_row[byte + 1] = (uint8_t) (code >> 8);
+    }
+}
+
+//! \brief copies the quantized spike probs of the segment just processed
+//! into its row in sdram
+//! \return None
+static inline void record_quantized_spike_probs(void) {
+    if (quantized_spike_prob->n_rows == 0) {
+        return;
+    }
+    uint row = seg_index - 1;
+    if (row < quantized_spike_prob->n_rows) {
+        spin1_memcpy(
+            &quantized_spike_prob->rows[
+                row * quantized_spike_prob->n_words_per_row],
+            quantized_spike_prob_row,
+            quantized_spike_prob->n_words_per_row * sizeof(uint32_t));
+        quantized_spike_prob->n_rows_recorded = row + 1;
+    }
+}
+
+//! \brief Main segment processing loop
+//select correct output buffer type
+void process_chan(double *in_buffer) {
+
+    for (int i = 0; i < parameters.seg_size; i++) {
+        log_debug("in buffer %d is %f", i, in_buffer[i]);
+    }
+
+    log_debug("prcess channel for time %d", seg_index);
+
+	for (int i = 0; i < parameters.seg_size; i++) {
+        //==========cilia_params filter===============//
+        // the drnl output is the only float left, turned into nm once a
+        // sample for every fibre
+        s1615_bits in_nm = (s1615_bits) (
+            in_buffer[i] * DISPLACEMENT_TO_NM_S1615);
+        s1615_bits cilia_disp = in_nm + mul_s1615(
+            fixed_params.cilia_feedback, past_cilia_disp);
+        past_cilia_disp = mul_s1615_u032(cilia_disp, fixed_params.cilia_c);
+
+        //===========Apply Scaler============//
+        s1615_bits utconv = past_cilia_disp;
+
+        //=========Apical Conductance========//
+        s1615_bits ex1 = exp_s1615(mul_s1615(
+            fixed_params.cilia_u1 - utconv, fixed_params.cilia_recips1));
+        s1615_bits ex2 = exp_s1615(mul_s1615(
+            fixed_params.cilia_u0 - utconv, fixed_params.cilia_recips0));
+        int64_t boltzmann = S1615_ONE + (
+            ((int64_t) ex2 * (S1615_ONE + (int64_t) ex1)) >> S1615_SHIFT);
+        s1615_bits guconv = fixed_params.cilia_ga + (s1615_bits) (
+            ((int64_t) fixed_params.cilia_g_max << S1615_SHIFT) / boltzmann);
+
+        //========Receptor Potential=========//
+        // in pA
+        s1615_bits current =
+            -mul_s1615(guconv, ihcv_now - fixed_params.cilia_et) -
+            mul_s1615(fixed_params.cilia_gk, ihcv_now - fixed_params.ekp);
+        ihcv_now += mul_s1615_u032(current, fixed_params.cilia_dt_cap);
+
+        //================mICa===============//
+        s1615_bits ex3 = exp_s1615(
+            mul_s1615_u032(-ihcv_now, fixed_params.gamma));
+        u032_bits mi_ca_inf = recip_one_plus_s1615(
+            mul_s1615_u032(ex3, fixed_params.recip_beta));
+        int64_t m_ica_next = (int64_t) m_ica_curr + (
+            (((int64_t) mi_ca_inf - m_ica_curr) * fixed_params.dt_tau_m) >>
+            S1615_SHIFT);
+        if (m_ica_next < 0) {
+            m_ica_next = 0;
+        } else if (m_ica_next > U032_MAX) {
+            m_ica_next = U032_MAX;
+        }
+        m_ica_curr = (u032_bits) m_ica_next;
+
+        //================ICa================//
+        u032_bits mica_pow_conv = mul_u032(
+            mul_u032(m_ica_curr, m_ica_curr), m_ica_curr);
+
+        // the calcium current each fibre gains this sample, as the cube
+        // root of a release rate; the same for every fibre
+        s1615_bits ca_drive = mul_s1615_u032(
+            fixed_params.eca - ihcv_now,
+            mul_u032(mica_pow_conv, fixed_params.ca_gain));
+
+        //============Fibres=============//
+        s1615_bits ca_curr_pow = 0;
+        u032_bits release_prob = 0;
+        for (int j = 0; j < parameters.number_fibres; j++) {
+
+            //======Synaptic Ca========//
+            ca_rate_root[j] += ca_drive - mul_s1615_u032(
+                ca_rate_root[j], ca_decay[j]);
+
+            if (i % parameters.resampling_factor == 0) {
+
+                //=====Vesicle Release Rate MAP_BS=====//
+                s1615_bits rate_root = ca_rate_root[j];
+                if (rate_root < 0) {
+                    rate_root = 0;
+                } else if (rate_root > MAX_CA_RATE_ROOT) {
+                    rate_root = MAX_CA_RATE_ROOT;
+                }
+                ca_curr_pow = mul_s1615(
+                    mul_s1615(rate_root, rate_root), rate_root);
+
+                //=====Release Probability=======//
+                uint64_t prob = (
+                    (uint64_t) ca_curr_pow * fixed_params.dt_spikes) >>
+                    S1615_SHIFT;
+                release_prob = (prob > U032_MAX) ? U032_MAX : (u032_bits) prob;
+                int32_t m_q =
+                    fixed_params.max_neurotransmitters - an_avail[j];
+                if (m_q < 0) {
+                    m_q = 0;
+                }
+
+                //===========Ejected============//
+                u032_bits release_keep = complement_u032(release_prob);
+                u032_bits release_prob_pow = U032_MAX;
+                for (int32_t k = 0; k < an_avail[j]; k++) {
+                    release_prob_pow = mul_u032(
+                        release_prob_pow, release_keep);
+                }
+
+                u032_bits probability = complement_u032(release_prob_pow);
+                if (refrac[j] > 0) {
+                    refrac[j] --;
+                }
+
+                int32_t ejected;
+                bool spiked;
+                if (probability > mars_kiss64_seed(local_seed)) {
+                    ejected = 1;
+                    if (refrac[j] <= 0) {
+                        log_debug(
+                            "will spike with key %d", parameters.my_key | j);
+                        spiked = TRUE;
+                        spin1_send_mc_packet(
+                            parameters.my_key | j, 0, NO_PAYLOAD);
+
+                        refrac[j] = (uint) ((
+                            fixed_params.refrac_period + mul_s1615_u032(
+                                fixed_params.refrac_period,
+                                mars_kiss64_seed(local_seed)) +
+                            (S1615_ONE >> 1)) >> S1615_SHIFT);
+                    } else {
+                        spiked = FALSE;
+                    }
+                } else {
+                    ejected = 0;
+                    spiked = FALSE;
+                }
+
+                //=========Reprocessed=========//
+                u032_bits x_pow = U032_MAX;
+                u032_bits y_pow = U032_MAX;
+
+                for (int32_t k = 0; k < m_q; k++) {
+                    y_pow = mul_u032(y_pow, fixed_params.y_keep);
+                }
+                int32_t n_repro = loop_count_s1615(an_repro[j]);
+                for (int32_t k = 0; k < n_repro; k++) {
+                    x_pow = mul_u032(x_pow, fixed_params.x_keep);
+                }
+
+                probability = complement_u032(x_pow);
+                int32_t reprocessed = 0;
+                if (probability > mars_kiss64_seed(local_seed)) {
+                    reprocessed = 1;
+                }
+
+                //========Replenish==========//
+                probability = complement_u032(y_pow);
+                int32_t replenish = 0;
+                if (probability > mars_kiss64_seed(local_seed)) {
+                    replenish = 1;
+                }
+
+                //==========Update Variables=========//
+                an_avail[j] = an_avail[j] + replenish + reprocessed - ejected;
+                s1615_bits re_uptake_and_lost = mul_s1615_u032(
+                    an_cleft[j], fixed_params.cleft_loss);
+                s1615_bits re_uptake = mul_s1615_u032(
+                    an_cleft[j], fixed_params.rdt);
+                an_cleft[j] += ejected * S1615_ONE - re_uptake_and_lost;
+                an_repro[j] += re_uptake - reprocessed * S1615_ONE;
+
+                //=======write output value to buffer to go to SDRAM ========//
+                if (spiked && packed_spikes->n_rows > 0) {
+                    uint bit = (j * parameters.seg_size) + i;
+                    packed_spike_row[bit >> 5] |= 1u << (bit & 0x1F);
+                }
+                if (spiked) {
+                    neuron_recording_set_spike(
+                        SPIKE_RECORDING_REGION_ID,
+                        (j * parameters.seg_size) + i);
+                }
+            }
+            if (quantized_spike_prob->n_rows > 0) {
+                quantize_spike_prob(
+                    (j * parameters.seg_size) + i, release_prob);
+            } else {
+                neuron_recording_set_float_recorded_param(
+                    SPIKE_PROBABILITY_REGION_ID, (j * parameters.seg_size) + i,
+                    (float) ca_curr_pow * S1615_TO_FLOAT);
+            }
+        }
+    }
+	// set off the record to sdram
+	neuron_recording_record(seg_index);
+	record_packed_spikes();
+	record_quantized_spike_probs();
+}
+
+//! \brief interface for when dma transfer is successful
+//! \param[in] tid:  forced by api
+//! \param[in] ttag:  forced by api
+//! \return None
+void transfer_handler(uint tid, uint ttag) {
+    use(tid);
+    use(ttag);
+
+    //increment segment index
+    seg_index ++;
+
+    //choose current available buffers
+    if (!read_switch) {
+        process_chan(dtcm_buffer_b);
+    } else {
+        process_chan(dtcm_buffer_a);
+    }
+}
+
+//! \brief timer control
+//! \param[in] null_a:  forced by api
+//! \param[in] null_b:  forced by api
+//! \return None
+void count_ticks(uint null_a, uint null_b) {
+    use(null_a);
+    use(null_b);
+
+    time++;
+
+    neuron_recording_do_timestep_update(time);
+
+    // If a fixed number of simulation ticks are specified and these have passed
+    if (infinite_run != TRUE && time >= simulation_ticks) {
+
+        // handle the pause and resume functionality
+        neuron_recording_finalise();
+        simulation_handle_pause_resume(NULL);
+
+         // Subtract 1 from the time so this tick gets done again on the next
+        // run
+        time -= 1;
+
+        simulation_ready_to_read();
+        return;
+    }
+}
+
+void _store_provenance_data(address_t provenance_region) {
+    log_debug("writing other provenance data");
+
+    // store the data into the provenance data region
+    provenance_region[N_SIMULATION_TICKS] = simulation_ticks;
+    provenance_region[SEG_INDEX] = seg_index;
+    provenance_region[DATA_READ_COUNT] = data_read_count;
+    provenance_region[DATA_WRITE_COUNT_SPIKES] = data_write_count_spikes;
+    provenance_region[DATA_WRITE_COUNT_SPIKE_PROB] =
+        data_write_count_spikes_prob;
+    provenance_region[MC_RX_COUNT] = mc_rx_count;
+    provenance_region[MC_TRANSMISSION_COUNT] = spike_count;
+    provenance_region[PEAK_BUFFER_OCCUPANCY] = peak_buffer_occupancy;
+
+    log_debug("finished other provenance data");
+}
+
+//application initialisation
+//! \param[in] timer_period: the pointer for the timer period
+//! \return bool stating if the init was successful
+bool app_init(uint32_t *timer_period)
+{
+	log_info("starting init \n");
+
+	//obtain data spec
+	data_specification_metadata_t *data_address =
+	    data_specification_get_data_address();
+	// Get the timing details and set up the simulation interface
+    if (!simulation_initialise(
+            data_specification_get_region(SYSTEM, data_address),
+            APPLICATION_NAME_HASH, timer_period, &simulation_ticks,
+            &infinite_run, &time_pointer, SDP_PRIORITY, DMA)) {
+        return false;
+    }
+
+    // sort out provenance data
+    simulation_set_provenance_function(
+        _store_provenance_data,
+        data_specification_get_region(PROVENANCE, data_address));
+
+    // get parameters region
+    spin1_memcpy(
+        &parameters, data_specification_get_region(PARAMS, data_address),
+        sizeof(parameters_struct));
+
+    // get the fixed point constants
+    spin1_memcpy(
+        &fixed_params,
+        data_specification_get_region(FIXED_POINT_PARAMS, data_address),
+        sizeof(fixed_point_params_struct));
+
+    // set the current ihcv to the start point
+    ihcv_now = fixed_params.ihcv;
+    m_ica_curr = fixed_params.m_ica_curr;
+
+    // factor to perform vesicle model resampling by
+    log_debug("AN key=%d", parameters.my_key);
+    log_debug("n_lsr=%d", parameters.num_lsr);
+    log_debug("n_msr=%d", parameters.num_msr);
+    log_debug("n_hsr=%d", parameters.num_hsr);
+
+    #ifdef PROFILE
+        // configure timer 2 for profiling
+        profiler_init(
+            data_specification_get_region(PROFILER, data_address));
+    #endif
+
+	//********  Allocate buffers in DTCM **********//
+
+	// input buffers
+	dtcm_buffer_a = (double *) sark_alloc (
+	    parameters.seg_size, sizeof(double));
+	dtcm_buffer_b = (double *) sark_alloc (
+	    parameters.seg_size, sizeof(double));
+
+    // verify buffers were actually initialised
+	if (dtcm_buffer_a == NULL || dtcm_buffer_b == NULL) {
+		log_error("error - cannot allocate buffers");
+		return false;
+	}
+
+	// set up recording
+	log_info(
+	    "address of recording %x",
+	    data_specification_get_region(NEURON_RECORDING, data_address));
+	if (!neuron_recording_initialise(
+            data_specification_get_region(NEURON_RECORDING, data_address),
+            &recording_flags, parameters.number_fibres * parameters.seg_size)) {
+        log_error("failed to set up recording");
+        return false;
+    }
+
+    // ********** initialize sections of DTCM **************/
+
+    // input buffers
+    for (int i = 0; i < parameters.seg_size; i++) {
+        dtcm_buffer_a[i] = 0.0;
+        dtcm_buffer_b[i] = 0.0;
+    }
+
+    //******************** array defs off num fibres **************//
+    refrac = spin1_malloc(parameters.number_fibres * sizeof(uint));
+    ca_rate_root = spin1_malloc(parameters.number_fibres * sizeof(s1615_bits));
+    ca_decay = spin1_malloc(parameters.number_fibres * sizeof(u032_bits));
+    an_cleft = spin1_malloc(parameters.number_fibres * sizeof(s1615_bits));
+    an_avail = spin1_malloc(parameters.number_fibres * sizeof(int32_t));
+    an_repro = spin1_malloc(parameters.number_fibres * sizeof(s1615_bits));
+
+    // verify buffers were actually initialised
+	if (refrac == NULL || ca_rate_root == NULL || ca_decay == NULL ||
+	        an_cleft == NULL || an_avail == NULL || an_repro == NULL) {
+		log_error("cannot allocate params based off number of fibres\n");
+		return false;
+	}
+
+    //*********************** sdram edge data ******************//
+    sdram_out_buffer_param sdram_params;
+    spin1_memcpy(
+        &sdram_params,
+        data_specification_get_region(SDRAM_EDGE_ADDRESS, data_address),
+        sizeof(sdram_out_buffer_param));
+	sdram_in_buffer = sdram_params.sdram_base_address;
+    log_info("sdram in buffer @ 0x%08x\n", (uint) sdram_in_buffer);
+
+    // packed spike recording
+    packed_spikes = data_specification_get_region(PACKED_SPIKES, data_address);
+    if (packed_spikes->n_rows > 0) {
+        packed_spike_row = (uint32_t *) sark_alloc(
+            packed_spikes->n_words_per_row, sizeof(uint32_t));
+        if (packed_spike_row == NULL) {
+            log_error("cannot allocate the packed spike row");
+            return false;
+        }
+        for (uint i = 0; i < packed_spikes->n_words_per_row; i++) {
+            packed_spike_row[i] = 0;
+        }
+    }
+    log_info(
+        "packed spikes for %d rows of %d words", packed_spikes->n_rows,
+        packed_spikes->n_words_per_row);
+
+    // quantized spike prob recording
+    quantized_spike_prob = data_specification_get_region(
+        QUANTIZED_SPIKE_PROB, data_address);
+    if (quantized_spike_prob->n_rows > 0) {
+        quantized_spike_prob_row = (uint8_t *) sark_alloc(
+            quantized_spike_prob->n_words_per_row, sizeof(uint32_t));
+        if (quantized_spike_prob_row == NULL) {
+            log_error("cannot allocate the quantized spike prob row");
+            return false;
+        }
+        uint32_t *row_words = (uint32_t *) quantized_spike_prob_row;
+        for (uint i = 0; i < quantized_spike_prob->n_words_per_row; i++) {
+            row_words[i] = 0;
+        }
+        quantized_spike_prob_max_code =
+            (1u << (quantized_spike_prob->bytes_per_value * 8)) - 1;
+        quantized_spike_prob_code_scale = (uint32_t) (
+            (float) quantized_spike_prob_max_code /
+            quantized_spike_prob->full_scale + 0.5f);
+    }
+    log_info(
+        "quantized spike probs for %d rows of %d words",
+        quantized_spike_prob->n_rows, quantized_spike_prob->n_words_per_row);
+
+	//****************MODEL INITIALISATION******************//
+
+    //initialise random number generator
+	spin1_memcpy(
+        &local_seed,
+        data_specification_get_region(RANDOM_SEEDS, data_address),
+        sizeof(mars_kiss64_seed_t));
+    validate_mars_kiss64_seed(local_seed);
+
+	//==========Recurring Values=================//
+	for (int i=0; i < parameters.num_lsr; i++) {
+		ca_rate_root[i] = fixed_params.ca_rate_root_lsr;
+		ca_decay[i] = fixed_params.ca_decay_lsr;
+		an_cleft[i] = fixed_params.an_cleft_lsr;
+		an_avail[i] = fixed_params.an_avail_lsr;
+		an_repro[i] = fixed_params.an_repro_lsr;
+		refrac[i] = 0;
+	}
+
+	for (int i = 0; i < parameters.num_msr; i++) {
+		ca_rate_root[i + parameters.num_lsr] = fixed_params.ca_rate_root_msr;
+		ca_decay[i + parameters.num_lsr] = fixed_params.ca_decay_msr;
+		an_cleft[i + parameters.num_lsr] = fixed_params.an_cleft_msr;
+		an_avail[i + parameters.num_lsr] = fixed_params.an_avail_msr;
+		an_repro[i + parameters.num_lsr] = fixed_params.an_repro_msr;
+		refrac[i + parameters.num_lsr] = 0;
+	}
+
+	for (int i = 0; i < parameters.num_hsr; i++) {
+		ca_rate_root[i + parameters.num_lsr + parameters.num_msr] =
+		    fixed_params.ca_rate_root_hsr;
+		ca_decay[i + parameters.num_lsr + parameters.num_msr] =
+		    fixed_params.ca_decay_hsr;
+		an_cleft[i + parameters.num_lsr + parameters.num_msr] =
+		    fixed_params.an_cleft_hsr;
+		an_avail[i + parameters.num_lsr + parameters.num_msr] =
+		    fixed_params.an_avail_hsr;
+		an_repro[i + parameters.num_lsr + parameters.num_msr] =
+		    fixed_params.an_repro_hsr;
+		refrac[i + parameters.num_lsr + parameters.num_msr] = 0;
+	}
+
+    return true;
+}
+
+//! \brief c main
+void c_main()
+{
+    // Get core and chip IDs
+    uint32_t timer_period;
+    // Start the time at "-1" so that the first tick will be 0
+    time = UINT32_MAX;
+
+    if (app_init(&timer_period)) {
+
+        // Set timer tick (in microseconds)
+        log_info("setting timer tick callback for %d microseconds",
+        timer_period);
+        spin1_set_timer_tick(timer_period);
+
+        //setup callbacks
+        //process channel once data input has been read to DTCM
+        simulation_dma_transfer_done_callback_on(DMA_READ, transfer_handler);
+
+        //reads from DMA to DTCM every MC packet received
+        spin1_callback_on (MC_PACKET_RECEIVED, data_read, MC_PACKET_PRIORITY);
+        spin1_callback_on (TIMER_TICK, count_ticks, TIMER);
+
+        simulation_run();
+    }
+}
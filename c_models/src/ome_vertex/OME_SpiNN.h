@@ -18,38 +18,35 @@
 #ifndef OME_SpiNN_H_
 #define OME_SpiNN_H_
 
+#include "OME_regions.h"
 
 #define REAL double
 
-//! \brief params region data format
-typedef struct parameters_struct{
-    uint32_t total_ticks;
-    int seg_size;
-    uint key;
-    uint PADDING;
-    REAL dt;
-} parameters_struct;
-
-//! \brief filter coeffs struct
-typedef struct filter_coeffs_struct{
-    REAL shb1;
-    REAL shb2;
-    REAL shb3;
-    REAL sha1;
-    REAL sha2;
-    REAL sha3;
-} filter_coeffs_struct;
-
 //! \brief input data struct
 typedef struct data_struct{
     REAL * in_data;
 } data_struct;
 
-//! \brief concha params
-typedef struct concha_params_struct{
-    REAL concha_gain_scalar;
-    REAL ear_canal_gain_scalar;
-} concha_params_struct;
+//! \brief live input counters, stored after the filter coeffs provenance
+typedef struct live_input_provenance_struct{
+    uint n_segments_received;
+    uint n_underruns;
+    uint n_overflows;
+    uint peak_occupancy;
+} live_input_provenance_struct;
+
+//! \brief live audio packet from the host, after the sdp header
+typedef struct live_input_packet{
+    uint n_segments;
+    float samples[];
+} live_input_packet;
+
+//! \brief credit packet to the host, after the sdp header
+typedef struct live_input_credit_packet{
+    uint n_segments_played;
+    uint n_underruns;
+    uint n_overflows;
+} live_input_credit_packet;
 
 //! \brief data spec regions
 typedef enum regions {
@@ -59,7 +56,9 @@ typedef enum regions {
     DATA,
     CONCHA_PARAMS,
     PROFILER,
-    PROVENANCE
+    PROVENANCE,
+    SDRAM_BROADCAST,
+    LIVE_INPUT
 } regions;
 
 //! \brief provenance data items
@@ -74,6 +73,15 @@ typedef enum callback_priorities {
 
 #define DMA_TAG 0
 
+//! \brief the sdp port live audio packets arrive on
+#define LIVE_INPUT_SDP_PORT 2
+
+//! \brief sdp flags for a message with no reply
+#define SDP_NO_REPLY_FLAGS 0x07
+
+//! \brief the sdp port of the ethernet
+#define SDP_ETHERNET_PORT 0xFF
+
 #define SEGSIZE 8
 
 #define MAX_SIGNAL_S 1
@@ -0,0 +1,67 @@
+/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+// GENERATED by spinnak_ear.spinnak_ear_utilities.ear_region_schemas, do
+// not edit. Change the schemas there and regenerate instead.
+
+#ifndef OME_REGIONS_H_
+#define OME_REGIONS_H_
+
+#include <stdint.h>
+
+//! \brief params region data format
+typedef struct parameters_struct{
+    uint32_t total_ticks;
+    int32_t seg_size;
+    uint32_t key;
+    // bumped by the host each time it swaps the input audio
+    uint32_t input_generation;
+    double dt;
+} parameters_struct;
+
+//! \brief filter coeffs struct
+typedef struct filter_coeffs_struct{
+    double shb1;
+    double shb2;
+    double shb3;
+    double sha1;
+    double sha2;
+    double sha3;
+} filter_coeffs_struct;
+
+//! \brief concha params
+typedef struct concha_params_struct{
+    double concha_gain_scalar;
+    double ear_canal_gain_scalar;
+} concha_params_struct;
+
+//! \brief shared sdram ring buffer the drnls read the output from
+typedef struct sdram_broadcast_struct{
+    uint32_t enabled;
+    float* sdram_base_address;
+    uint32_t n_buffers;
+} sdram_broadcast_struct;
+
+//! \brief live input params region data format
+typedef struct live_input_struct{
+    uint32_t enabled;
+    uint32_t n_buffers;
+    uint32_t credit_tag;
+    uint32_t segments_per_credit;
+} live_input_struct;
+
+#endif /* OME_REGIONS_H_ */
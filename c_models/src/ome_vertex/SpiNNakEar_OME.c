@@ -36,6 +36,10 @@
 
 //=========GLOBAL VARIABLES============//
 uint seg_index = 0;
+
+//! \brief the segment and tick the current input audio started at
+uint input_start_seg = 0;
+uint32_t input_start_tick = 0;
 uint read_switch = 0;
 
 //! \brief the conversion between uint32_t and floats
@@ -105,11 +109,29 @@ uint *dtcm_buffer_x;
 //! input data buffer
 REAL *sdram_in_buffer;
 
+//! \brief the sdram params region, reread on resume for swapped audio
+parameters_struct *parameters_sdram;
+
 // The sdram parameter structs
 parameters_struct parameters;
 filter_coeffs_struct filter_coeffs;
 data_struct data;
 concha_params_struct concha_params;
+sdram_broadcast_struct sdram_broadcast;
+live_input_struct live_input;
+
+//! \brief the jitter buffer of live segments, n_buffers segments long
+float *live_input_buffer;
+
+//! \brief how many live segments have arrived and been played
+uint live_input_write_index = 0;
+uint live_input_read_index = 0;
+
+//! \brief live input counters for provenance
+live_input_provenance_struct live_input_provenance;
+
+//! \brief the credit packet sent back to the host
+sdp_msg_t live_input_credit_msg;
 
 //! \brief stores provenance data
 //! \param[in] provenance_region: the sdram location for the prov data.
@@ -126,6 +148,11 @@ void _store_provenance_data(address_t provenance_region) {
     prov_struct->sha2 = stapes_hp_a[1];
     prov_struct->sha3 = stapes_hp_a[2];
 
+    // live input counters follow the coeffs
+    spin1_memcpy(
+        &prov_struct[1], &live_input_provenance,
+        sizeof(live_input_provenance_struct));
+
 
     log_info("b0:%F", stapes_hp_b[0]);
     log_info("b1:%F", stapes_hp_b[1]);
@@ -137,6 +164,115 @@ void _store_provenance_data(address_t provenance_region) {
     log_debug("finished other provenance data");
 }
 
+//! \brief stores the segments of a live audio packet in the jitter buffer
+//! \param[in] mailbox: the sdp message
+//! \param[in] port: forced by api
+//! \return None
+void live_input_receive(uint mailbox, uint port) {
+    use(port);
+    sdp_msg_t *msg = (sdp_msg_t *) mailbox;
+    live_input_packet *packet = (live_input_packet *) &msg->cmd_rc;
+
+    for (uint s = 0; s < packet->n_segments; s++) {
+        live_input_provenance.n_segments_received++;
+        uint occupancy = live_input_write_index - live_input_read_index;
+        if (occupancy >= live_input.n_buffers) {
+            live_input_provenance.n_overflows++;
+            continue;
+        }
+        spin1_memcpy(
+            &live_input_buffer[
+                (live_input_write_index & (live_input.n_buffers - 1)) *
+                parameters.seg_size],
+            &packet->samples[s * parameters.seg_size],
+            parameters.seg_size * sizeof(float));
+        live_input_write_index++;
+        if (occupancy + 1 > live_input_provenance.peak_occupancy) {
+            live_input_provenance.peak_occupancy = occupancy + 1;
+        }
+    }
+    spin1_msg_free(msg);
+}
+
+//! \brief tells the host how many segments have been played, so it can
+//! send more
+//! \return None
+static void live_input_send_credit(void) {
+    live_input_credit_packet *credit =
+        (live_input_credit_packet *) &live_input_credit_msg.cmd_rc;
+    credit->n_segments_played = live_input_read_index;
+    credit->n_underruns = live_input_provenance.n_underruns;
+    credit->n_overflows = live_input_provenance.n_overflows;
+    spin1_send_sdp_msg(&live_input_credit_msg, 1);
+}
+
+void process_chan(REAL *in_buffer);
+
+//! \brief takes the next live segment from the jitter buffer, playing
+//! silence if it has run dry, and processes it
+//! \param[in] dtcm_buffer_in: the buffer to put the segment in
+//! \return None
+static void live_input_play(REAL *dtcm_buffer_in) {
+    if (live_input_write_index == live_input_read_index) {
+        live_input_provenance.n_underruns++;
+        for (int i = 0; i < parameters.seg_size; i++) {
+            dtcm_buffer_in[i] = 0.0;
+        }
+    } else {
+        float *segment = &live_input_buffer[
+            (live_input_read_index & (live_input.n_buffers - 1)) *
+            parameters.seg_size];
+        for (int i = 0; i < parameters.seg_size; i++) {
+            dtcm_buffer_in[i] = (REAL) segment[i];
+        }
+        live_input_read_index++;
+        if (live_input_read_index % live_input.segments_per_credit == 0) {
+            live_input_send_credit();
+        }
+    }
+
+    // no dma to wait for
+    seg_index++;
+    process_chan(dtcm_buffer_in);
+}
+
+//! \brief zeros the past values of the filters, so new audio starts from
+//! silence
+//! \return None
+static void reset_filter_state(void) {
+    past_input[0] = 0.0;
+    past_input[1] = 0.0;
+    past_concha[0] = 0.0;
+    past_concha[1] = 0.0;
+
+    past_ear_canal_input[0] = 0.0;
+    past_ear_canal_input[1] = 0.0;
+    past_ear_canal[0] = 0.0;
+    past_ear_canal[1] = 0.0;
+
+    past_stapes_input[0] = 0.0;
+    past_stapes_input[1] = 0.0;
+    past_stapes[0] = 0.0;
+    past_stapes[1] = 0.0;
+    past_stapes_disp = 0.0;
+}
+
+//! \brief rereads the params on resume. If the host has swapped the input
+//! audio in the data region, plays it from its start with fresh filters
+//! \return None
+static void resume_callback(void) {
+    uint input_generation = parameters.input_generation;
+    spin1_memcpy(&parameters, parameters_sdram, sizeof(parameters_struct));
+    if (parameters.input_generation != input_generation) {
+        log_info(
+            "input audio swapped to generation %d, %d ticks",
+            parameters.input_generation, parameters.total_ticks);
+        input_start_seg = seg_index;
+        input_start_tick = read_ticks + 1;
+        reset_filter_state();
+    }
+}
+
 //! \brief DMA read every timer tick to get input data.
 //! \param[in] unused_a: forced by api
 //! \param[in] unused_b: forced by api
@@ -149,10 +285,10 @@ void data_read(uint unused_a, uint unused_b) {
 	read_ticks++;
 
 	// check if there's anything to do
-	if (read_ticks >= parameters.total_ticks ||
+	if (read_ticks - input_start_tick >= parameters.total_ticks ||
             read_ticks >= time_to_reach) {
 
-        simulation_handle_pause_resume(NULL);
+        simulation_handle_pause_resume(resume_callback);
         #ifdef PROFILE
             profiler_write_entry_disable_irq_fiq(
                 PROFILER_EXIT | PROFILER_DMA_READ);
@@ -182,9 +318,17 @@ void data_read(uint unused_a, uint unused_b) {
             read_switch = 0;
         }
 
+        // live audio is already in dtcm
+        if (live_input.enabled) {
+            live_input_play(dtcm_buffer_in);
+            return;
+        }
+
         // set off a dma
+        // the input audio restarts at input_start_seg when swapped
+        uint input_seg = seg_index - input_start_seg;
         spin1_dma_transfer(
-            DMA_TAG, &sdram_in_buffer[seg_index * parameters.seg_size],
+            DMA_TAG, &sdram_in_buffer[input_seg * parameters.seg_size],
             dtcm_buffer_in, DMA_READ, parameters.seg_size * sizeof(REAL));
     }
 }
@@ -280,6 +424,14 @@ void process_chan(REAL *in_buffer) {
         //assign output to float/uint union
         multicast_union.f = stapes_displacement;
 
+        if (sdram_broadcast.enabled) {
+            //stash output in the shared ring buffer slot for this segment
+            sdram_broadcast.sdram_base_address[
+                ((seg_index - 1) & (sdram_broadcast.n_buffers - 1)) *
+                parameters.seg_size + i] = multicast_union.f;
+            continue;
+        }
+
 		//transmit uint output as MC with payload to all DRNLs
 		log_debug(
 		    "i=%d %u",
@@ -287,6 +439,15 @@ void process_chan(REAL *in_buffer) {
         spin1_send_mc_packet(parameters.key, multicast_union.u, WITH_PAYLOAD);
 	}
 
+    //tell the DRNLs which ring buffer slot holds the new segment
+    if (sdram_broadcast.enabled) {
+        log_debug("segment %d in sdram", seg_index - 1);
+        while (!spin1_send_mc_packet(
+                parameters.key, seg_index - 1, WITH_PAYLOAD)) {
+            spin1_delay_us(1);
+        }
+    }
+
     #ifdef PROFILE
         profiler_write_entry_disable_irq_fiq(PROFILER_EXIT | PROFILER_TIMER);
     #endif
@@ -336,14 +497,49 @@ bool app_init(uint32_t *timer_period)
         data_specification_get_region(PROVENANCE, data_address));
 
     // get params from sdram
-    spin1_memcpy(
-        &parameters, data_specification_get_region(PARAMS, data_address),
-         sizeof(parameters_struct));
+    parameters_sdram = (parameters_struct *)
+        data_specification_get_region(PARAMS, data_address);
+    spin1_memcpy(&parameters, parameters_sdram, sizeof(parameters_struct));
 
     log_debug("dt is %F", parameters.dt);
     log_debug("total_ticks=%d", parameters.total_ticks);
     log_debug("OME-->DRNL key=%d\n", parameters.key);
 
+    // get the shared sdram ring buffer, if the drnls read from it
+    spin1_memcpy(
+        &sdram_broadcast,
+        data_specification_get_region(SDRAM_BROADCAST, data_address),
+        sizeof(sdram_broadcast_struct));
+    log_debug(
+        "sdram broadcast %d at %x with %d buffers", sdram_broadcast.enabled,
+        sdram_broadcast.sdram_base_address, sdram_broadcast.n_buffers);
+
+    // get the live input params, if the audio is streamed in
+    spin1_memcpy(
+        &live_input, data_specification_get_region(LIVE_INPUT, data_address),
+        sizeof(live_input_struct));
+    log_debug(
+        "live input %d with %d buffers", live_input.enabled,
+        live_input.n_buffers);
+    if (live_input.enabled) {
+        live_input_buffer = (float *) sark_alloc(
+            live_input.n_buffers * parameters.seg_size, sizeof(float));
+        if (live_input_buffer == NULL) {
+            log_error("cannot allocate the live input jitter buffer");
+            return false;
+        }
+        live_input_credit_msg.tag = live_input.credit_tag;
+        live_input_credit_msg.flags = SDP_NO_REPLY_FLAGS;
+        live_input_credit_msg.dest_port = SDP_ETHERNET_PORT;
+        live_input_credit_msg.dest_addr = 0;
+        live_input_credit_msg.srce_port =
+            (LIVE_INPUT_SDP_PORT << PORT_SHIFT) | spin1_get_core_id();
+        live_input_credit_msg.srce_addr = spin1_get_chip_id();
+        live_input_credit_msg.length =
+            sizeof(sdp_hdr_t) + sizeof(live_input_credit_packet);
+        simulation_sdp_callback_on(LIVE_INPUT_SDP_PORT, live_input_receive);
+    }
+
     // Get a pointer to the input data buffer
     sdram_in_buffer =
         (REAL *) data_specification_get_region(DATA, data_address);
@@ -456,20 +652,7 @@ bool app_init(uint32_t *timer_period)
     stapes_lp_b = 1.0 + stapes_lp_a[1];
 
     //--Initialise recurring variables--/
-    past_input[0] = 0.0;
-    past_input[1] = 0.0;
-    past_concha[0] = 0.0;
-    past_concha[1] = 0.0;
-
-    past_ear_canal_input[0] = 0.0;
-    past_ear_canal_input[1] = 0.0;
-    past_ear_canal[0] = 0.0;
-    past_ear_canal[1] = 0.0;
-
-    past_stapes_input[0] = 0.0;
-    past_stapes_input[1] = 0.0;
-    past_stapes[0] = 0.0;
-    past_stapes[1] = 0.0;
+    reset_filter_state();
 
     #ifdef PROFILE
         // Setup profiler
@@ -13,11 +13,16 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from pacman.model.constraints.key_allocator_constraints import \
+    FixedKeyAndMaskConstraint
+from pacman.model.constraints.placer_constraints import \
+    SameChipAsConstraint
 from pacman.model.graphs.application import ApplicationEdge
 from pacman.model.graphs.common import Slice, EdgeTrafficType
 from pacman.model.graphs.impl.constant_sdram_machine_partition import \
     ConstantSDRAMMachinePartition
 from pacman.model.graphs.machine.machine_sdram_edge import SDRAMMachineEdge
+from pacman.model.routing_info import BaseKeyAndMask
 from pacman.model.partitioner_interfaces.\
     abstract_controls_destination_of_edges import \
     AbstractControlsDestinationOfEdges
@@ -32,7 +37,7 @@ from spinn_front_end_common.abstract_models.\
     AbstractApplicationSupportsAutoPauseAndResume
 from spinn_front_end_common.utilities import globals_variables
 from spinn_front_end_common.utilities.constants import \
-    MICRO_TO_SECOND_CONVERSION
+    MICRO_TO_SECOND_CONVERSION, MICRO_TO_MILLISECOND_CONVERSION
 from spinn_front_end_common.utilities.exceptions import ConfigurationException
 from spinn_front_end_common.utilities.globals_variables import get_simulator
 
@@ -57,6 +62,8 @@ from pacman.model.partitioner_interfaces.hand_over_to_vertex import \
 from pacman.model.decorators.overrides import overrides
 from pacman.executor.injection_decorator import inject_items
 
+from data_specification.enums.data_type import DataType
+
 from spinnak_ear.spinnak_ear_edges.spinnaker_ear_machine_edge import \
     SpiNNakEarMachineEdge
 from spinnak_ear.spinnak_ear_machine_vertices.ome_machine_vertex import \
@@ -67,6 +74,27 @@ from spinnak_ear.spinnak_ear_machine_vertices.ihcan_machine_vertex import \
     IHCANMachineVertex
 from spinnak_ear.spinnak_ear_machine_vertices.an_group_machine_vertex import \
     ANGroupMachineVertex
+from spinnak_ear.spinnak_ear_utilities.ear_analysis import \
+    EarAnalysis, DEFAULT_FIBRES_PER_CHUNK, DEFAULT_SAMPLES_PER_CHUNK
+from spinnak_ear.spinnak_ear_utilities.ear_atom_map import EarAtomMap
+from spinnak_ear.spinnak_ear_utilities.ear_context import EarContext
+from spinnak_ear.spinnak_ear_utilities.ear_recording_extraction import \
+    EarRecordingExtractor
+from spinnak_ear.spinnak_ear_utilities.ear_spike_trains import \
+    EarSpikeTrains
+from spinnak_ear.spinnak_ear_utilities.ear_keys import plan_ear_keys
+from spinnak_ear.spinnak_ear_utilities.ear_placement import \
+    plan_chip_groups
+from spinnak_ear.spinnak_ear_utilities.ear_graph_index import \
+    EarGraphIndex
+from spinnak_ear.spinnak_ear_utilities.live_audio_sender import \
+    EarLiveAudioSender
+from spinnak_ear.spinnak_ear_utilities.live_spike_receiver import \
+    EarLiveSpikeReceiver
+from spinnak_ear.spinnak_ear_utilities.machine_memory_reader import \
+    MachineMemoryReader
+from spinnak_ear.spinnak_ear_utilities.quantized_probabilities import \
+    get_precision_data_type, is_quantized
 
 import numpy
 import math
@@ -113,7 +141,35 @@ class SpiNNakEarApplicationVertex(
         # the pole frequencies
         "_pole_freqs",
         # The timer period for the fast components
-        "_timer_period"
+        "_timer_period",
+        # the time scale factor the machine runs at
+        "_time_scale_factor",
+        # bool flag for recording ihcan spikes as packed bits
+        "_recording_packed_spikes",
+        # bool flag for recording quantized ihcan spike probs
+        "_recording_quantized_spike_prob",
+        # the single ome vertex, if there is one
+        "_ome_vertex",
+        # every ome vertex holding the audio input
+        "_ome_vertices",
+        # synapse sdram estimates by incoming edges, slice size and time step
+        "_synapse_sdram_cache",
+        # the ear internal connections of each machine vertex
+        "_graph_index",
+        # the ear wide parameters the drnls and ihcans share
+        "_ear_context",
+        # what each outgoing atom is, built with the machine graph
+        "_atom_map",
+        # a moc recorder that records nothing, for unselected drnls
+        "_idle_drnl_neuron_recorder",
+        # an ihcan recorder that records nothing, for unselected ihcans
+        "_idle_ihcan_neuron_recorder",
+        # the indices of the drnls or ihcans recording each variable
+        # recorded by a selection, by variable
+        "_recording_selections",
+        # the select_recording filters each selection was resolved from, by
+        # variable, to resolve again when the fibre types change
+        "_recording_filters"
     ]
 
     # NOTES IHC = inner hair cell
@@ -152,6 +208,22 @@ class SpiNNakEarApplicationVertex(
     # error message for sampling interval
     SAMPLING_INTERVAL_ERROR = "do not know how to handle variable {}"
 
+    # error message for the drnl ring buffers not fitting in the budget
+    RING_BUFFER_BUDGET_ERROR = (
+        "The sdram budget of {} bytes per drnl cannot hold a ring buffer of "
+        "{} segments of {} bytes. Please increase the ring buffer sdram "
+        "budget")
+
+    # error message for asking for live spikes from an ear not sending them
+    LIVE_OUTPUT_ERROR = (
+        "Live output is not enabled on this ear. Please set live_output on "
+        "the model")
+
+    # error message for asking to stream audio into an ear not taking it
+    LIVE_INPUT_ERROR = (
+        "Live input is not enabled on this ear. Please set live_input on "
+        "the model")
+
     # error message for incorrect neurons map
     N_NEURON_ERROR = (
         "the number of neurons {} and the number of atoms  {} do not match")
@@ -162,6 +234,12 @@ class SpiNNakEarApplicationVertex(
     # app edge sdram partition id
     SDRAM_APP_EDGE_PARTITION_ID = "internal_sdram"
 
+    # the parameter that can be swapped between runs without remapping
+    AUDIO_INPUT_PARAMETER = "audio_input"
+
+    # the parameter that picks the fibre types the selections resolve to
+    FIBRE_TYPE_SEED_PARAMETER = "ihcan_fibre_random_seed"
+
     # green wood function from https://en.wikipedia.org/wiki/Greenwood_function
     # constant below and mapped to variable names
 
@@ -196,7 +274,8 @@ class SpiNNakEarApplicationVertex(
     N_SYNAPSE_TYPES = 2
 
     # these curve values are built from profiling the IHCAN cores to deduce
-    # performance.
+    # performance. The fixed point kernel has not been profiled, so it is
+    # held to the same curve and fibres per core until it is.
     CURVE_ONE = 18.12
     CURVE_TWO = 10.99
 
@@ -209,6 +288,16 @@ class SpiNNakEarApplicationVertex(
     # min audio frequency supported
     DEFAULT_MIN_AUDIO_FREQUENCY = 30
 
+    # application cores available on a chip for a ome, drnls and ihcans
+    N_APP_CORES_PER_CHIP = 16
+
+    # smallest drnl ring buffer, a segment being written and one being read
+    MIN_N_SDRAM_BUFFERS = 2
+
+    # cost in us of a ihcan dma reading a byte of a segment from sdram, as
+    # the ihcans of a drnl all read each segment at the same time.
+    DMA_READ_US_PER_BYTE = 0.01
+
     def __init__(
             self, n_neurons, constraints, label, model, profile,
             time_scale_factor):
@@ -224,6 +313,15 @@ class SpiNNakEarApplicationVertex(
 
         self._model = model
         self._profile = profile
+        self._time_scale_factor = time_scale_factor
+        self._recording_packed_spikes = False
+        self._recording_quantized_spike_prob = False
+        self._ome_vertex = None
+        self._ome_vertices = list()
+        self._synapse_sdram_cache = dict()
+        self._graph_index = EarGraphIndex()
+        self._atom_map = None
+        self._ear_context = None
         self._remapping_required = True
         self._synapse_dynamics = None
         self._n_fibres_per_ihc = None
@@ -258,8 +356,10 @@ class SpiNNakEarApplicationVertex(
         # recording stuff
         self._drnl_neuron_recorder = NeuronRecorder(
             DRNLMachineVertex.RECORDABLES,
-            DRNLMachineVertex.get_matrix_scalar_data_types(),
-            DRNLMachineVertex.get_matrix_output_data_types(),
+            DRNLMachineVertex.get_matrix_scalar_data_types(
+                self._model.moc_record_float32),
+            DRNLMachineVertex.get_matrix_output_data_types(
+                self._model.moc_record_float32),
             self._n_dnrls)
 
         self._ihcan_neuron_recorder = NeuronRecorder(
@@ -268,8 +368,24 @@ class SpiNNakEarApplicationVertex(
             IHCANMachineVertex.get_matrix_output_data_types(),
             self._n_dnrls * self._n_fibres_per_ihc)
 
+        # recorders that are never set recording, so the vertices not
+        # selected to record reserve only the header of a recording region
+        self._idle_drnl_neuron_recorder = NeuronRecorder(
+            DRNLMachineVertex.RECORDABLES,
+            DRNLMachineVertex.get_matrix_scalar_data_types(
+                self._model.moc_record_float32),
+            DRNLMachineVertex.get_matrix_output_data_types(
+                self._model.moc_record_float32),
+            self._n_dnrls)
+        self._idle_ihcan_neuron_recorder = NeuronRecorder(
+            IHCANMachineVertex.RECORDABLES,
+            IHCANMachineVertex.get_matrix_scalar_data_types(),
+            IHCANMachineVertex.get_matrix_output_data_types(),
+            self._n_dnrls * self._n_fibres_per_ihc)
+        self._recording_selections = dict()
+        self._recording_filters = dict()
+
         # bool for if state has changed.
-        self._change_requires_mapping = True
         self._change_requires_neuron_parameters_reload = False
         self._change_requires_data_generation = False
         self._has_reset_last = True
@@ -298,10 +414,11 @@ class SpiNNakEarApplicationVertex(
     def get_expected_n_rows(
             self, current_run_timesteps_map, sampling_rate, vertex, variable):
         if isinstance(vertex, DRNLMachineVertex):
-            return int(
-                (self._drnl_neuron_recorder.expected_rows_for_a_run_time(
-                    current_run_timesteps_map, vertex, sampling_rate))
-                * self._model.seq_size)
+            return (
+                int(self._drnl_neuron_recorder.expected_rows_for_a_run_time(
+                    current_run_timesteps_map, vertex, sampling_rate)) *
+                DRNLMachineVertex.moc_rows_per_tick(
+                    self._model.seq_size, self._model.moc_decimation_factor))
         else:
             return int(
                 self._ihcan_neuron_recorder.expected_rows_for_a_run_time(
@@ -337,7 +454,7 @@ class SpiNNakEarApplicationVertex(
         self._change_requires_neuron_parameters_reload = False
 
         # If synapses change during the run,
-        if self._synapse_manager.synapse_dynamics.changes_during_run:
+        if self.__synapse_manager.synapse_dynamics.changes_during_run:
             self._change_requires_data_generation = True
 
     def get_units(self, variable):
@@ -507,6 +624,41 @@ class SpiNNakEarApplicationVertex(
         return self.__synapse_manager.get_maximum_delay_supported_in_ms(
             default_machine_time_step)
 
+    def get_synapse_sdram_usage_in_bytes(
+            self, vertex_slice, graph, default_machine_time_step):
+        """ the sdram the synapses of a drnl need. Every drnl shares the \
+        synaptic manager and the incoming edges, so the estimate is worked \
+        out once per set of incoming projections and slice size, as the \
+        most any drnl's slice of that size needs, as a connector may give \
+        some channels more synapses than others.
+
+        :param vertex_slice: the slice of the drnl
+        :param graph: the application graph
+        :param default_machine_time_step: the machine time step
+        :return: the sdram in bytes
+        :rtype: int
+        """
+        in_edges = tuple(graph.get_edges_ending_at_vertex(self))
+
+        # new projections add edges, or add synapse information to the edge
+        # from a population already projecting here, so make a new key
+        projections = tuple(
+            (edge, len(getattr(edge, "synapse_information", ())))
+            for edge in in_edges)
+        key = (projections, vertex_slice.n_atoms, default_machine_time_step)
+        if key not in self._synapse_sdram_cache:
+            # drop the estimates for projections that have since changed
+            self._synapse_sdram_cache = {
+                old_key: sdram
+                for old_key, sdram in self._synapse_sdram_cache.items()
+                if old_key[0] == projections}
+            self._synapse_sdram_cache[key] = max(
+                self.__synapse_manager.get_sdram_usage_in_bytes(
+                    Slice(drnl_index, drnl_index + vertex_slice.n_atoms - 1),
+                    in_edges, default_machine_time_step)
+                for drnl_index in range(self._n_dnrls))
+        return self._synapse_sdram_cache[key]
+
     @overrides(AbstractAcceptsIncomingSynapses.add_pre_run_connection_holder)
     def add_pre_run_connection_holder(
             self, connection_holder, projection_edge, synapse_information):
@@ -531,6 +683,7 @@ class SpiNNakEarApplicationVertex(
         if not isinstance(synapse_dynamics, SynapseDynamicsStatic):
             raise Exception(self.PLASTIC_SYNAPSE_ERROR)
         self._synapse_dynamics = synapse_dynamics
+        self._synapse_sdram_cache.clear()
 
     @overrides(AbstractAcceptsIncomingSynapses.get_connections_from_machine)
     def get_connections_from_machine(
@@ -556,8 +709,46 @@ class SpiNNakEarApplicationVertex(
 
     @overrides(SimplePopulationSettable.set_value)
     def set_value(self, key, value):
-        SimplePopulationSettable.set_value(self, key, value)
-        self._remapping_required = True
+        invalidation = self._model.set_parameter(key, value)
+        if key == self.AUDIO_INPUT_PARAMETER and self._swap_audio_input():
+            return
+
+        # nothing is built yet, so the mapping will pick it up anyway
+        if self._remapping_required or not self._ihcan_vertices:
+            invalidation = self._model.INVALIDATION.MAPPING
+
+        if invalidation == self._model.INVALIDATION.MAPPING:
+            self._remapping_required = True
+        elif invalidation == self._model.INVALIDATION.DATA:
+            self._update_ihcan_random_choices()
+            self._atom_map = self._build_atom_map()
+            self._change_requires_data_generation = True
+
+        # selections by fibre type point at the ihcans of the old fibre
+        # types; resolving them again remaps if they move
+        if key == self.FIBRE_TYPE_SEED_PARAMETER:
+            for variable, filters in list(self._recording_filters.items()):
+                self.select_recording(variable, **filters)
+
+    def _swap_audio_input(self):
+        """ hands the model audio to the loaded ome vertices, which reload \
+        only their params and data regions on the next run. Only possible \
+        when the audio fits in the data regions they already have and is \
+        filtered on the machine.
+
+        :return: bool saying if the audio was swapped without remapping
+        :rtype: bool
+        """
+        if (self._remapping_required or not self._ome_vertices or
+                self._model.host_ome or self._model.live_input):
+            return False
+        audio_input = self._model.audio_input
+        if any(len(audio_input) > ome_vertex.n_stored_samples
+               for ome_vertex in self._ome_vertices):
+            return False
+        for ome_vertex in self._ome_vertices:
+            ome_vertex.set_input_data(audio_input)
+        return True
 
     def describe(self):
         """ Returns a human-readable description of the cell or synapse type.
@@ -598,14 +789,16 @@ class SpiNNakEarApplicationVertex(
         :param graph_mapper: graph mapper
         :param slice: slice
         :param vertex: machien vertex
-        :param resource_tracker: resource tracker
+        :param resource_tracker: resource tracker, or None if the vertex is \
+        allocated later with its chip group
         :rtype: None
         """
 
         machine_graph.add_vertex(vertex)
         graph_mapper.add_vertex_mapping(vertex, slice, self)
-        resource_tracker.allocate_constrained_resources(
-            vertex.resources_required, vertex.constraints)
+        if resource_tracker is not None:
+            resource_tracker.allocate_constrained_resources(
+                vertex.resources_required, vertex.constraints)
 
     def _build_ome_vertex(
             self, machine_graph, graph_mapper, lo_atom, resource_tracker,
@@ -620,10 +813,22 @@ class SpiNNakEarApplicationVertex(
         the ear vertex
         :return: the ome vertex and the new low atom
         """
+        # streamed audio comes in through the single ome
+        live_input_port = None
+        live_input_credit_address = None
+        if self._model.live_input:
+            live_input_port = self._model.live_input_port
+            live_input_credit_address = (
+                self._model.live_input_credit_host,
+                self._model.live_input_credit_port)
+
         # build the ome machine vertex
         ome_vertex = OMEMachineVertex(
             self._model.audio_input, self._model.fs, self._n_channels,
-            self._model.seq_size, timer_period, self._profile)
+            self._model.seq_size, timer_period, self._profile,
+            live_input_port=live_input_port,
+            live_input_credit_address=live_input_credit_address,
+            live_input_n_buffers=self._model.live_input_n_buffers)
 
         # allocate resources and updater graphs
         self._add_to_graph_components(
@@ -631,28 +836,163 @@ class SpiNNakEarApplicationVertex(
             resource_tracker)
         return ome_vertex, lo_atom + 1
 
+    def _build_ome_broadcast_groups(
+            self, machine_graph, graph_mapper, resource_tracker,
+            timer_period, app_edge, sdram_app_edge):
+        """ builds a ome vertex per chip sized group of drnls, which\
+        shares its output with the group through a sdram ring buffer
+
+        :param machine_graph: machine graph
+        :param graph_mapper: graph mapper
+        :param resource_tracker: the resource tracker
+        :param timer_period: the timer period for all machine verts based on\
+        the ear vertex
+        :param app_edge: the app edge to link all mc machine edges to
+        :param sdram_app_edge: the app sdram edge to link all sdram machine\
+        edges to
+        :return: the ome vertices
+        """
+        n_drnls_per_chip = self.drnls_per_chip(
+            int(self._model.n_fibres_per_ihc / self._n_fibres_per_ihcan_core))
+
+        ome_vertices = list()
+        for group_index, lo in enumerate(range(
+                0, len(self._drnl_vertices), n_drnls_per_chip)):
+            ome_vertex = OMEMachineVertex(
+                self._model.audio_input, self._model.fs, self._n_channels,
+                self._model.seq_size, timer_period, self._profile,
+                sdram_broadcast=True,
+                label="OME Node for group {}".format(group_index))
+
+            # every ome covers the same single ome atom
+            self._add_to_graph_components(
+                machine_graph, graph_mapper, Slice(0, 0), ome_vertex,
+                resource_tracker)
+            ome_vertices.append(ome_vertex)
+
+            sdram_partition = ConstantSDRAMMachinePartition(
+                ome_vertex.OME_SDRAM_PARTITION_ID, ome_vertex,
+                "sdram edge between ome vertex {} and its "
+                "DRNLS".format(group_index))
+            machine_graph.add_outgoing_edge_partition(sdram_partition)
+            self._graph_index.add_outgoing_sdram_partition(
+                ome_vertex, sdram_partition)
+
+            for drnl_vertex in self._drnl_vertices[lo:lo + n_drnls_per_chip]:
+                # multicast, carrying the segment index
+                mc_edge = SpiNNakEarMachineEdge(ome_vertex, drnl_vertex)
+                machine_graph.add_edge(mc_edge, ome_vertex.OME_PARTITION_ID)
+                graph_mapper.add_edge_mapping(mc_edge, app_edge)
+                self._graph_index.add_key_source_edge(drnl_vertex, mc_edge)
+                self._graph_index.add_incoming_sdram_partition(
+                    drnl_vertex, sdram_partition)
+
+                # sdram edge, carrying the samples
+                sdram_edge = SDRAMMachineEdge(
+                    ome_vertex, drnl_vertex, ome_vertex.sdram_broadcast_size,
+                    "sdram between {} and {}".format(ome_vertex, drnl_vertex))
+                machine_graph.add_edge(
+                    sdram_edge, ome_vertex.OME_SDRAM_PARTITION_ID)
+                graph_mapper.add_edge_mapping(sdram_edge, sdram_app_edge)
+        return ome_vertices
+
+    @classmethod
+    def drnls_per_chip(cls, n_ihcans_per_drnl):
+        """ how many drnls, with their ihcans, fit on a chip alongside a \
+        ome
+
+        :param n_ihcans_per_drnl: the number of ihcan cores per drnl
+        :return: the number of drnls sharing a ome
+        :rtype: int
+        """
+        return max(
+            1, (cls.N_APP_CORES_PER_CHIP - 1) // (1 + n_ihcans_per_drnl))
+
+    def _ihcan_segment_latency(self):
+        """ the time in us a ihcan core takes to process a segment, as \
+        measured if given else from the profiled curve
+
+        :rtype: float
+        """
+        if self._model.ihcan_segment_latency is not None:
+            return self._model.ihcan_segment_latency
+        return self._model.seq_size * (
+            self.CURVE_ONE + self.CURVE_TWO * self._n_fibres_per_ihcan_core)
+
+    def _n_sdram_buffers_per_drnl(self, timer_period):
+        """ the ring buffer depth for each drnl, as given or sized from the\
+        ihcans latency and the sdram budget
+
+        :param timer_period: the timer period for all machine verts based on\
+        the ear vertex
+        :rtype: int
+        """
+        if self._model.n_buffers_in_sdram_total is not None:
+            return self._model.n_buffers_in_sdram_total
+
+        n_ihcans_per_drnl = int(
+            self._model.n_fibres_per_ihc / self._n_fibres_per_ihcan_core)
+        return self.calculate_n_sdram_buffers(
+            n_ihcans_per_drnl, timer_period * self._time_scale_factor,
+            self._ihcan_segment_latency(), self._model.seq_size,
+            self._model.ring_buffer_sdram_budget //
+            self.drnls_per_chip(n_ihcans_per_drnl))
+
+    @classmethod
+    def calculate_n_sdram_buffers(
+            cls, n_consumers, segment_period, consumer_latency, seq_size,
+            sdram_budget):
+        """ deduces the power of 2 number of segments a drnl ring buffer \
+        needs so its slowest consumer never has a segment overwritten \
+        before reading it.
+
+        :param n_consumers: the number of ihcans reading the ring buffer
+        :param segment_period: the wall clock time in us between segments
+        :param consumer_latency: the time in us a consumer takes to process \
+        a segment
+        :param seq_size: the number of samples in a segment
+        :param sdram_budget: the sdram bytes the ring buffer can use
+        :return: the number of segments in the ring buffer
+        :rtype: int
+        """
+        segment_bytes = seq_size * DataType.FLOAT_64.size
+
+        # the consumers dma each segment in turn before processing it
+        latency = (
+            consumer_latency +
+            n_consumers * segment_bytes * cls.DMA_READ_US_PER_BYTE)
+        n_buffers = cls.MIN_N_SDRAM_BUFFERS + int(
+            math.ceil(latency / segment_period))
+        n_buffers = 2 ** int(math.ceil(math.log(n_buffers, 2)))
+
+        # shrink to the budget, but never below double buffering
+        while (n_buffers * segment_bytes > sdram_budget and
+                n_buffers > cls.MIN_N_SDRAM_BUFFERS):
+            n_buffers //= 2
+        if n_buffers * segment_bytes > sdram_budget:
+            raise Exception(cls.RING_BUFFER_BUDGET_ERROR.format(
+                sdram_budget, n_buffers, segment_bytes))
+        return n_buffers
+
     def _build_drnl_verts(
             self, machine_graph, graph_mapper, new_low_atom, resource_tracker,
-            ome_vertex, timer_period):
+            timer_period):
         """ build the drnl verts
 
         :param machine_graph: machine graph
         :param graph_mapper: graph mapper
         :param new_low_atom: the current low atom count for the graph mapper
         :param resource_tracker: the resource tracker for placement
-        :param ome_vertex: the ome vertex to tie edges to
         :param timer_period: the timer period for all machine verts based on\
         the ear vertex
         :return: new low atom count
         """
+        n_buffers_in_sdram = self._n_sdram_buffers_per_drnl(timer_period)
         pole_index = 0
         for _ in range(self._n_channels):
             drnl_vertex = DRNLMachineVertex(
-                self._pole_freqs[pole_index], self._model.fs,
-                ome_vertex.n_data_points, pole_index, self._profile,
-                self._model.seq_size, self.__synapse_manager, self,
-                self._model.n_buffers_in_sdram_total,
-                self._drnl_neuron_recorder, timer_period)
+                self._ear_context, pole_index, self._pole_freqs[pole_index],
+                n_buffers_in_sdram)
             pole_index += 1
             self._add_to_graph_components(
                 machine_graph, graph_mapper, Slice(new_low_atom, new_low_atom),
@@ -675,10 +1015,70 @@ class SpiNNakEarApplicationVertex(
             edge = SpiNNakEarMachineEdge(ome_vertex, drnl_vert)
             machine_graph.add_edge(edge, ome_vertex.OME_PARTITION_ID)
             graph_mapper.add_edge_mapping(edge, app_edge)
+            self._graph_index.add_key_source_edge(drnl_vert, edge)
+
+    def _generate_ihc_seeds(self):
+        """ generates the random number generator seeds of every ihcan, \
+        N_SEEDS_PER_IHCAN_VERTEX per ihcan in build order
+
+        :rtype: numpy.ndarray
+        """
+        n_ihcans = self._n_channels * self._model.n_fibres_per_ihc
+        random_range = numpy.arange(
+            n_ihcans * IHCANMachineVertex.N_SEEDS_PER_IHCAN_VERTEX,
+            dtype=numpy.uint32)
+        numpy.random.seed(self._model.ihc_seeds_seed)
+        return numpy.random.choice(
+            random_range,
+            int(n_ihcans * IHCANMachineVertex.N_SEEDS_PER_IHCAN_VERTEX),
+            replace=False)
+
+    def _choose_ihcan_fibre_counts(self):
+        """ randomly picks the fibre types of the ihcans of a channel, \
+        which every channel shares
+
+        :return: the (n lsr, n msr, n hsr) of each ihcan of a channel
+        :rtype: list(tuple(int, int, int))
+        """
+        fibres = []
+        for _ in range(self._model.n_hsr_per_ihc):
+            fibres.append(self.HSR_FLAG)
+        for __ in range(self._model.n_msr_per_ihc):
+            fibres.append(self.MSR_FLAG)
+        for ___ in range(self._model.n_lsr_per_ihc):
+            fibres.append(self.LSR_FLAG)
+
+        random.seed(self._model.ihcan_fibre_random_seed)
+        random.shuffle(fibres)
+
+        fibre_counts = list()
+        for _ in range(
+                int(self._model.n_fibres_per_ihc /
+                    self._n_fibres_per_ihcan_core)):
+
+            # randomly pick fibre types
+            chosen_indices = [
+                fibres.pop() for _ in range(self._n_fibres_per_ihcan_core)]
+            fibre_counts.append((
+                chosen_indices.count(self.LSR_FLAG),
+                chosen_indices.count(self.MSR_FLAG),
+                chosen_indices.count(self.HSR_FLAG)))
+        return fibre_counts
+
+    def _update_ihcan_random_choices(self):
+        """ seeds the fibre types and seeds of every ihcan in the ear \
+        context, which the ihcans write on the next data generation
+
+        :rtype: None
+        """
+        self._ear_context.set_random_choices(
+            self._generate_ihc_seeds(),
+            numpy.tile(self._choose_ihcan_fibre_counts(),
+                       (self._n_channels, 1)))
 
     def _build_ihcan_vertices_and_sdram_edges(
             self, machine_graph, graph_mapper, new_low_atom,
-            resource_tracker, app_edge, sdram_app_edge, timer_period):
+            resource_tracker, app_edge, sdram_app_edge):
         """ builds the ihcan verts and adds edges from drnl to them
 
         :param machine_graph: machine graph
@@ -688,82 +1088,37 @@ class SpiNNakEarApplicationVertex(
         :param app_edge: the app edge to link all mc machine edges to
         :param sdram_app_edge: the application sdram edge between drnl and \
         inchan to link all sdram machine edges to.
-        :param timer_period: the timer period for all machine verts based on\
-        the ear vertex
         :return: iterable of ihcan verts
         """
 
         ihcans = list()
 
-        # generate ihc seeds
-        n_ihcans = self._n_channels * self._model.n_fibres_per_ihc
-        seed_index = 0
-        random_range = numpy.arange(
-            n_ihcans * IHCANMachineVertex.N_SEEDS_PER_IHCAN_VERTEX,
-            dtype=numpy.uint32)
-        numpy.random.seed(self._model.ihc_seeds_seed)
-        ihc_seeds = numpy.random.choice(
-            random_range,
-            int(n_ihcans * IHCANMachineVertex.N_SEEDS_PER_IHCAN_VERTEX),
-            replace=False)
-
-        ihcan_recording_index = 0
+        # generate ihc seeds and fibre types into the ear context tables
+        self._update_ihcan_random_choices()
+        n_ihcans_per_drnl = int(
+            self._model.n_fibres_per_ihc / self._n_fibres_per_ihcan_core)
 
         for drnl_vertex in self._drnl_vertices:
-            machine_graph.add_outgoing_edge_partition(
-                ConstantSDRAMMachinePartition(
-                    drnl_vertex.DRNL_SDRAM_PARTITION_ID, drnl_vertex,
-                    "sdram edge between drnl vertex {} and its "
-                    "IHCANS".format(drnl_vertex.drnl_index)))
-
-            fibres = []
-            for _ in range(self._model.n_hsr_per_ihc):
-                fibres.append(self.HSR_FLAG)
-            for __ in range(self._model.n_msr_per_ihc):
-                fibres.append(self.MSR_FLAG)
-            for ___ in range(self._model.n_lsr_per_ihc):
-                fibres.append(self.LSR_FLAG)
-
-            random.seed(self._model.ihcan_fibre_random_seed)
-            random.shuffle(fibres)
-
-            for _ in range(
-                    int(self._model.n_fibres_per_ihc /
-                        self._n_fibres_per_ihcan_core)):
-
-                # randomly pick fibre types
-                chosen_indices = [
-                    fibres.pop() for _ in range(self._n_fibres_per_ihcan_core)]
-
+            sdram_partition = ConstantSDRAMMachinePartition(
+                drnl_vertex.DRNL_SDRAM_PARTITION_ID, drnl_vertex,
+                "sdram edge between drnl vertex {} and its "
+                "IHCANS".format(drnl_vertex.drnl_index))
+            machine_graph.add_outgoing_edge_partition(sdram_partition)
+            self._graph_index.add_outgoing_sdram_partition(
+                drnl_vertex, sdram_partition)
+
+            for _ in range(n_ihcans_per_drnl):
                 ihcan_slice = Slice(
                     new_low_atom, new_low_atom + (
                         self._n_fibres_per_ihcan_core *
                         self._model.seq_size) - 1)
 
-                ihcan_recording_slice = Slice(
-                    ihcan_recording_index, ihcan_recording_index + (
-                        self._n_fibres_per_ihcan_core *
-                        self._model.seq_size) - 1)
-                ihcan_recording_index += ihcan_recording_slice.n_atoms
-
                 vertex = IHCANMachineVertex(
-                    self._model.resample_factor,
-                    ihc_seeds[
-                        seed_index:
-                        seed_index +
-                        IHCANMachineVertex.N_SEEDS_PER_IHCAN_VERTEX],
-                    self._n_fibres_per_ihcan_core,
-                    self._model.ear_index, self._profile, self._model.fs,
-                    chosen_indices.count(self.LSR_FLAG),
-                    chosen_indices.count(self.MSR_FLAG),
-                    chosen_indices.count(self.HSR_FLAG),
-                    self._model.n_buffers_in_sdram_total,
-                    self._model.seq_size, self._ihcan_neuron_recorder,
-                    ihcan_recording_slice, timer_period)
+                    self._ear_context, len(ihcans),
+                    drnl_vertex.n_buffers_in_sdram_total)
 
                 # update indexes
                 new_low_atom += ihcan_slice.n_atoms
-                seed_index += IHCANMachineVertex.N_SEEDS_PER_IHCAN_VERTEX
 
                 # add to list of ihcans
                 ihcans.append(vertex)
@@ -785,22 +1140,42 @@ class SpiNNakEarApplicationVertex(
                 machine_graph.add_edge(
                     sdram_edge, drnl_vertex.DRNL_SDRAM_PARTITION_ID)
                 graph_mapper.add_edge_mapping(sdram_edge, sdram_app_edge)
+                self._graph_index.add_incoming_sdram_partition(
+                    vertex, sdram_partition)
         return ihcans, new_low_atom
 
     def _build_aggregation_group_vertices_and_edges(
             self, machine_graph, graph_mapper,
             new_low_atom, resource_tracker, app_edge):
+        """ builds the rows of the aggregation tree over the ihcans and \
+        the edges from each row to the next
 
+        :param machine_graph: machine graph
+        :param graph_mapper: the graph mapper
+        :param new_low_atom: the lo atom sued to keep the graph mapper happy
+        :param resource_tracker: the resource tracker for placement
+        :param app_edge: the app edge to link all mc machine edges to
+        :return: the aggregation verts of each row
+        :rtype: list(list(ANGroupMachineVertex))
+        """
+
+        rows = list()
         to_process = list()
         to_process.extend(self._ihcan_vertices)
         n_child_per_group = self._model.max_input_to_aggregation_group
 
+        # the final row nodes stream their spikes to the host if asked
+        live_output = None
+        if self._model.live_output:
+            live_output = (
+                self._model.live_output_host, self._model.live_output_port)
+
+        final_row_lo_atom = 0
         for row in range(self._n_group_tree_rows):
             aggregation_verts = list()
             n_row_angs = int(
                 numpy.ceil(float(len(to_process)) / n_child_per_group))
             for an in range(n_row_angs):
-                final_row_lo_atom = 0
                 child_verts = to_process[
                     an * n_child_per_group:
                     an * n_child_per_group + n_child_per_group]
@@ -820,12 +1195,14 @@ class SpiNNakEarApplicationVertex(
                 final_row_slice = None
                 if final_row:
                     final_row_slice = Slice(
-                        final_row_lo_atom, final_row_lo_atom + n_atoms)
+                        final_row_lo_atom, final_row_lo_atom + n_atoms - 1)
                     final_row_lo_atom += n_atoms
 
                 ag_vertex = ANGroupMachineVertex(
                     n_atoms, len(child_verts), final_row, row,
-                    self._model.ear_index, final_row_slice)
+                    self._model.ear_index, final_row_slice,
+                    live_output if final_row else None,
+                    len(self._final_agg_vertices), self._graph_index)
 
                 # only store it in the agg array if its in the final row
                 if final_row:
@@ -851,8 +1228,11 @@ class SpiNNakEarApplicationVertex(
                     mc_edge = SpiNNakEarMachineEdge(child_vert, ag_vertex)
                     machine_graph.add_edge(mc_edge, partition_id)
                     graph_mapper.add_edge_mapping(mc_edge, app_edge)
+                    self._graph_index.add_child_edge(ag_vertex, mc_edge)
 
             to_process = aggregation_verts
+            rows.append(aggregation_verts)
+        return rows
 
     @inject_items({"application_graph": "MemoryApplicationGraph"})
     @overrides(
@@ -869,37 +1249,387 @@ class SpiNNakEarApplicationVertex(
         application_graph.add_edge(
             sdram_app_edge, self.SDRAM_APP_EDGE_PARTITION_ID)
 
+        # a fresh index for the new machine graph
+        self._graph_index = EarGraphIndex()
+
         # atom tracker
         current_atom_count = 0
 
         timer_period = (
             MICRO_TO_SECOND_CONVERSION * self._model.seq_size / self._model.fs)
 
-        # ome vertex
-        ome_vertex, current_atom_count = self._build_ome_vertex(
-            machine_graph, graph_mapper, current_atom_count, resource_tracker,
-            timer_period)
+        # the host filters and live audio take priority over sharing the ome
+        # output, as both need the single ome
+        sdram_broadcast = (
+            self._model.ome_sdram_broadcast and not self._model.host_ome and
+            not self._model.live_input)
+
+        if self._model.host_ome:
+            # the OME filters run here, so the ome atom goes unused
+            ome_vertex = None
+            current_atom_count += 1
+            host_input_data = OMEMachineVertex.calculate_stapes_displacement(
+                self._model.audio_input, self._model.fs)
+        elif sdram_broadcast:
+            # the ome verts are built per drnl group below
+            ome_vertex = None
+            current_atom_count += 1
+            host_input_data = None
+        else:
+            # ome vertex
+            ome_vertex, current_atom_count = self._build_ome_vertex(
+                machine_graph, graph_mapper, current_atom_count,
+                resource_tracker, timer_period)
+            host_input_data = None
+        self._ome_vertex = ome_vertex
+
+        # the ear wide parameters the drnls and ihcans share
+        self._ear_context = self._make_ear_context(
+            timer_period, host_input_data, sdram_broadcast)
+
+        # chip packing allocates the rest of the ear a chip at a time once
+        # it is built
+        group_tracker = resource_tracker
+        if self._model.chip_packing:
+            group_tracker = None
 
         # handle the drnl verts
         current_atom_count = self._build_drnl_verts(
-            machine_graph, graph_mapper, current_atom_count, resource_tracker,
-            ome_vertex, timer_period)
+            machine_graph, graph_mapper, current_atom_count, group_tracker,
+            timer_period)
 
         # handle edges between ome and drnls
-        self._build_edges_between_ome_drnls(
-            ome_vertex, machine_graph, mc_app_edge, graph_mapper)
+        if sdram_broadcast:
+            self._ome_vertices = self._build_ome_broadcast_groups(
+                machine_graph, graph_mapper, group_tracker, timer_period,
+                mc_app_edge, sdram_app_edge)
+        elif ome_vertex is not None:
+            self._ome_vertices = [ome_vertex]
+            self._build_edges_between_ome_drnls(
+                ome_vertex, machine_graph, mc_app_edge, graph_mapper)
+        else:
+            self._ome_vertices = list()
 
         # build the ihcan verts.
         self._ihcan_vertices, current_atom_count = (
             self._build_ihcan_vertices_and_sdram_edges(
                 machine_graph, graph_mapper, current_atom_count,
-                resource_tracker, mc_app_edge, sdram_app_edge, timer_period))
+                group_tracker, mc_app_edge, sdram_app_edge))
 
         # build aggregation group verts and edges
-        self._build_aggregation_group_vertices_and_edges(
-            machine_graph, graph_mapper, current_atom_count, resource_tracker,
+        aggregation_rows = self._build_aggregation_group_vertices_and_edges(
+            machine_graph, graph_mapper, current_atom_count, group_tracker,
             mc_app_edge)
 
+        if self._model.chip_packing:
+            self._allocate_chip_groups(
+                resource_tracker, aggregation_rows, sdram_broadcast)
+
+        if self._model.internal_key_base is not None:
+            self._fix_internal_keys(machine_graph, aggregation_rows)
+
+        # describe the outgoing atoms
+        self._atom_map = self._build_atom_map()
+
+    def _allocate_chip_groups(
+            self, resource_tracker, aggregation_rows, sdram_broadcast):
+        """ ties each chip sized group of drnls, with their ihcans, the \
+        first row aggregation nodes over those ihcans and any ome feeding \
+        them, to the chip of the first vertex of the group, and allocates \
+        the groups and then the rest of the tree
+
+        :param resource_tracker: the resource tracker
+        :param aggregation_rows: the aggregation verts of each row
+        :param sdram_broadcast: bool flag for if a ome feeds each group of \
+        drnls through sdram
+        :rtype: None
+        """
+        n_ihcans_per_drnl = int(
+            self._model.n_fibres_per_ihc / self._n_fibres_per_ihcan_core)
+        n_drnls_per_ome = None
+        if sdram_broadcast:
+            n_drnls_per_ome = self.drnls_per_chip(n_ihcans_per_drnl)
+
+        for group_index, group in enumerate(plan_chip_groups(
+                len(self._drnl_vertices), n_ihcans_per_drnl,
+                self._model.max_input_to_aggregation_group,
+                self.N_APP_CORES_PER_CHIP, n_drnls_per_ome)):
+            vertices = list()
+            if group.ome:
+                vertices.append(self._ome_vertices[group_index])
+            vertices.extend(self._drnl_vertices[drnl] for drnl in group.drnls)
+            vertices.extend(
+                self._ihcan_vertices[ihcan] for ihcan in group.ihcans)
+            vertices.extend(
+                aggregation_rows[0][node] for node in group.an_nodes)
+            for vertex in vertices[1:]:
+                vertex.add_constraint(SameChipAsConstraint(vertices[0]))
+            resource_tracker.allocate_constrained_group_resources([
+                (vertex.resources_required, vertex.constraints)
+                for vertex in vertices])
+
+        for aggregation_verts in aggregation_rows[1:]:
+            for ag_vertex in aggregation_verts:
+                resource_tracker.allocate_constrained_resources(
+                    ag_vertex.resources_required, ag_vertex.constraints)
+
+    def _fix_internal_keys(self, machine_graph, aggregation_rows):
+        """ fixes the keys of the partitions inside the ear to the \
+        compact layout from the internal key base, so the drnls of a chip \
+        and the children of each aggregation node take an aligned block of \
+        keys; the final row partitions leave the ear and keep their keys \
+        from the key allocator
+
+        :param machine_graph: machine graph
+        :param aggregation_rows: the aggregation verts of each row
+        :rtype: None
+        """
+        n_ihcans_per_drnl = int(
+            self._model.n_fibres_per_ihc / self._n_fibres_per_ihcan_core)
+        keys = plan_ear_keys(
+            len(self._drnl_vertices), len(self._ihcan_vertices),
+            self._n_fibres_per_ihcan_core,
+            self._model.max_input_to_aggregation_group,
+            len(aggregation_rows) - 1,
+            self.drnls_per_chip(n_ihcans_per_drnl),
+            self._model.internal_key_base)
+
+        vertices_and_keys = [
+            (self._drnl_vertices, DRNLMachineVertex.DRNL_PARTITION_ID,
+             keys.drnls),
+            (self._ihcan_vertices, IHCANMachineVertex.IHCAN_PARTITION_ID,
+             keys.ihcans)]
+        for aggregation_verts, row_keys in zip(
+                aggregation_rows, keys.an_rows):
+            vertices_and_keys.append((
+                aggregation_verts,
+                ANGroupMachineVertex.AN_GROUP_PARTITION_IDENTIFIER,
+                row_keys))
+        get_partition = \
+            machine_graph.get_outgoing_edge_partition_starting_at_vertex
+        for vertices, partition_id, vertex_keys in vertices_and_keys:
+            for vertex, (key, mask) in zip(vertices, vertex_keys):
+                partition = get_partition(vertex, partition_id)
+                if partition is not None:
+                    partition.add_constraint(FixedKeyAndMaskConstraint(
+                        [BaseKeyAndMask(key, mask)]))
+
+    def _make_ear_context(
+            self, timer_period, host_input_data, shared_sdram_input):
+        """ makes the ear wide parameters the drnls and ihcans share
+
+        :param timer_period: the timer period for all machine verts based on\
+        the ear vertex
+        :param host_input_data: the host generated stapes displacement, or \
+        None if an OME core feeds the drnls
+        :param shared_sdram_input: bool flag for if the ome output is read \
+        from a shared sdram ring buffer
+        :rtype: EarContext
+        """
+        n_segments = len(self._model.audio_input) // self._model.seq_size
+
+        # a packed spike row per segment of audio
+        n_packed_spike_rows = 0
+        if self._recording_packed_spikes:
+            n_packed_spike_rows = n_segments
+
+        # a quantized spike prob row per segment of audio
+        n_quantized_spike_prob_rows = 0
+        if self._recording_quantized_spike_prob:
+            n_quantized_spike_prob_rows = n_segments
+
+        # an ihcan records with its recorder if selected for any variable
+        # the recorder records
+        recording_ihcans = numpy.zeros(self._n_ihcans, dtype=bool)
+        for variable in IHCANMachineVertex.RECORDABLES:
+            if (self._ihcan_neuron_recorder.is_recording(variable) and
+                    not self._records_outside_recorder(variable)):
+                recording_ihcans |= self._recording_mask(
+                    variable, self._n_ihcans)
+
+        return EarContext(
+            self, self.__synapse_manager, self._graph_index, self._model.fs,
+            self._model.seq_size, len(self._model.audio_input), timer_period,
+            self._profile, self._model.resample_factor,
+            self._drnl_neuron_recorder, self._ihcan_neuron_recorder,
+            host_input_data, shared_sdram_input,
+            self._model.moc_decimation_factor,
+            self._model.moc_decimation_average,
+            self._model.moc_record_float32, self._n_fibres_per_ihcan_core,
+            n_packed_spike_rows, n_quantized_spike_prob_rows,
+            self._spike_prob_data_type(), self._model.spike_prob_max_rate,
+            self._model.ihcan_fixed_point,
+            self._idle_drnl_neuron_recorder, self._idle_ihcan_neuron_recorder,
+            self._recording_mask(DRNLMachineVertex.MOC, self._n_dnrls),
+            recording_ihcans,
+            self._recording_mask(IHCANMachineVertex.SPIKES, self._n_ihcans),
+            self._recording_mask(
+                IHCANMachineVertex.SPIKE_PROB, self._n_ihcans))
+
+    @property
+    def _n_ihcans(self):
+        """ the number of ihcan vertices the ear is built with
+
+        :rtype: int
+        """
+        return self._n_dnrls * int(
+            self._model.n_fibres_per_ihc / self._n_fibres_per_ihcan_core)
+
+    def _records_outside_recorder(self, variable):
+        """ bool saying if an ihcan variable is recorded into its own region \
+        rather than by the ihcan recorder
+
+        :param variable: the variable
+        :rtype: bool
+        """
+        return (
+            (variable == IHCANMachineVertex.SPIKES and
+             self._model.ihcan_packed_spikes) or
+            (variable == IHCANMachineVertex.SPIKE_PROB and
+             is_quantized(self._spike_prob_data_type())))
+
+    def _recording_mask(self, variable, n_vertices):
+        """ bool per drnl or ihcan saying if it is selected to record a \
+        variable, every vertex being selected when the variable is not \
+        recorded by a selection
+
+        :param variable: the variable
+        :param n_vertices: the drnls or ihcans there are
+        :rtype: numpy.ndarray
+        """
+        selection = self._recording_selections.get(variable)
+        if selection is None:
+            return numpy.ones(n_vertices, dtype=bool)
+        mask = numpy.zeros(n_vertices, dtype=bool)
+        mask[list(selection)] = True
+        return mask
+
+    def _recorded_vertices(self, variable):
+        """ the drnl or ihcan vertices selected to record a variable
+
+        :param variable: the variable
+        :rtype: list(MachineVertex)
+        """
+        if variable == DRNLMachineVertex.MOC:
+            vertices = self._drnl_vertices
+        else:
+            vertices = self._ihcan_vertices
+        selection = self._recording_selections.get(variable)
+        if selection is None:
+            return vertices
+        return [vertices[index] for index in selection]
+
+    def _recorded_columns(self, variable):
+        """ the channels or fibres a variable is recorded for, in the order \
+        the selected vertices hold them
+
+        :param variable: the variable
+        :rtype: numpy.ndarray
+        """
+        if variable == DRNLMachineVertex.MOC:
+            return numpy.array([
+                vertex.drnl_index
+                for vertex in self._recorded_vertices(variable)], dtype=int)
+        n_fibres = self._n_fibres_per_ihcan_core
+        return numpy.concatenate([
+            numpy.arange(n_fibres) + vertex.ihcan_index * n_fibres
+            for vertex in self._recorded_vertices(variable)] + [
+            numpy.zeros(0, dtype=int)])
+
+    def _planned_atom_map(self):
+        """ the atom map the ear will be built with, from its fibre type \
+        seed rather than its machine graph, so recordings can be selected \
+        before the ear is partitioned or while it waits to be remapped
+
+        :rtype: EarAtomMap
+        """
+        if self._atom_map is not None and not self._remapping_required:
+            return self._atom_map
+        n_ihcans_per_drnl = self._n_ihcans // self._n_dnrls
+        return EarAtomMap.build(
+            numpy.repeat(numpy.arange(self._n_dnrls), n_ihcans_per_drnl),
+            numpy.tile(self._choose_ihcan_fibre_counts(), (self._n_dnrls, 1)),
+            self._pole_freqs, self._model.max_input_to_aggregation_group,
+            self._n_group_tree_rows)
+
+    def select_recording(
+            self, variable, channels=None, min_cf=None, max_cf=None,
+            fibre_types=None, new_state=True):
+        """ records a variable on only the drnls or ihcans holding the \
+        channels, characteristic frequencies and fibre types given. Only \
+        those vertices reserve recording regions and are read back; the \
+        others run without recording. The fibre types do not select moc, \
+        which is recorded per channel.
+
+        :param variable: the variable to record
+        :param channels: the channels to record, or None for all
+        :param min_cf: the lowest characteristic frequency in Hz to record
+        :param max_cf: the highest characteristic frequency in Hz to record
+        :param fibre_types: the fibre types to record by name or code, or \
+        None for all
+        :param new_state: bool saying if the variable is recorded
+        :rtype: None
+        """
+        atom_map = self._planned_atom_map()
+        if variable == DRNLMachineVertex.MOC:
+            indexes = numpy.unique(atom_map.data["channel"][atom_map.mask(
+                channels=channels, min_cf=min_cf, max_cf=max_cf)])
+        else:
+            indexes = atom_map.atoms(
+                channels=channels, min_cf=min_cf, max_cf=max_cf,
+                fibre_types=fibre_types)
+        self.set_recording(
+            variable, get_simulator().default_machine_time_step, new_state,
+            indexes=indexes)
+        if new_state:
+            self._recording_filters[variable] = dict(
+                channels=channels, min_cf=min_cf, max_cf=max_cf,
+                fibre_types=fibre_types)
+
+    def _build_atom_map(self):
+        """ builds the map of what each outgoing atom is. The aggregation \
+        tree keeps the ihcan fibres in order, so the outgoing atoms are the \
+        fibres of each ihcan in turn.
+
+        :rtype: EarAtomMap
+        """
+        ihcan_channels = [
+            self._graph_index.get_incoming_sdram_partition(
+                ihcan_vertex).pre_vertex.drnl_index
+            for ihcan_vertex in self._ihcan_vertices]
+        ihcan_fibre_counts = [
+            (ihcan_vertex.n_lsr, ihcan_vertex.n_msr, ihcan_vertex.n_hsr)
+            for ihcan_vertex in self._ihcan_vertices]
+        return EarAtomMap.build(
+            ihcan_channels, ihcan_fibre_counts, self._pole_freqs,
+            self._model.max_input_to_aggregation_group,
+            self._n_group_tree_rows)
+
+    @property
+    def graph_index(self):
+        return self._graph_index
+
+    @property
+    def atom_map(self):
+        """ what each outgoing atom is, once the ear has been partitioned
+
+        :rtype: EarAtomMap
+        """
+        return self._atom_map
+
+    @property
+    def channel_cfs(self):
+        """ the characteristic frequency of each channel in Hz, known \
+        before the ear is partitioned
+
+        :rtype: numpy.ndarray
+        """
+        return self._pole_freqs
+
+    @property
+    def n_fibres_per_ihc(self):
+        return self._model.n_fibres_per_ihc
+
     @property
     @overrides(ApplicationVertex.n_atoms)
     def n_atoms(self):
@@ -935,14 +1665,22 @@ class SpiNNakEarApplicationVertex(
     @overrides(AbstractChangableAfterRun.mark_no_changes)
     def mark_no_changes(self):
         self._remapping_required = False
+        self._change_requires_data_generation = False
 
     @property
     @overrides(AbstractChangableAfterRun.requires_mapping)
     def requires_mapping(self):
         return self._remapping_required
 
+    @property
+    @overrides(AbstractChangableAfterRun.requires_data_generation)
+    def requires_data_generation(self):
+        return self._change_requires_data_generation
+
     @overrides(AbstractSpikeRecordable.is_recording_spikes)
     def is_recording_spikes(self):
+        if self._model.ihcan_packed_spikes:
+            return self._recording_packed_spikes
         return self._ihcan_neuron_recorder.is_recording(
             IHCANMachineVertex.SPIKES)
 
@@ -959,22 +1697,162 @@ class SpiNNakEarApplicationVertex(
 
     @overrides(AbstractSpikeRecordable.clear_spike_recording)
     def clear_spike_recording(self, buffer_manager, placements, graph_mapper):
-        for ihcan_vertex in self._ihcan_vertices:
-            placement = placements.get_placement_of_vertex(ihcan_vertex)
-            buffer_manager.clear_recorded_data(
-                placement.x, placement.y, placement.p,
-                IHCANMachineVertex.SPIKE_RECORDING_REGION_ID)
+        self.clear_recording(
+            IHCANMachineVertex.SPIKES, buffer_manager, placements,
+            graph_mapper)
 
     @overrides(AbstractSpikeRecordable.get_spikes)
     def get_spikes(
             self, placements, graph_mapper, buffer_manager,
             local_timer_period_map):
+        if self._model.ihcan_packed_spikes:
+            return self._get_packed_spikes(placements, buffer_manager)
+        if self._reads_with_extractor(IHCANMachineVertex.SPIKES):
+            return self._get_buffered_spikes(placements, buffer_manager)
         return self._ihcan_neuron_recorder.get_spikes(
             self._label, buffer_manager,
             IHCANMachineVertex.RECORDING_REGIONS.SPIKE_RECORDING_REGION_ID
                 .value,
             placements, graph_mapper, self, local_timer_period_map)
 
+    def get_spike_trains(
+            self, run_time, placements, graph_mapper, buffer_manager,
+            local_timer_period_map):
+        """ the spikes of the ihcan fibres in columns, each fibre annotated \
+        with its channel and fibre type from the atom map
+
+        :param run_time: the time in ms the ear has run for
+        :param placements: the placements
+        :param graph_mapper: the graph mapper
+        :param buffer_manager: the buffer manager
+        :param local_timer_period_map: the timer period of each vertex
+        :rtype: EarSpikeTrains
+        """
+        return EarSpikeTrains.from_atom_map(
+            self.get_spikes(
+                placements, graph_mapper, buffer_manager,
+                local_timer_period_map),
+            self._model.seq_size,
+            MICRO_TO_MILLISECOND_CONVERSION / float(self._model.fs),
+            self._atom_map, run_time)
+
+    def get_analysis(
+            self, fibres_per_chunk=DEFAULT_FIBRES_PER_CHUNK,
+            samples_per_chunk=DEFAULT_SAMPLES_PER_CHUNK):
+        """ the analysis of the output of this ear, with the characteristic \
+        frequency of each channel, the channel of each fibre and the time \
+        between the samples of a timer tick
+
+        :param fibres_per_chunk: the most fibres whose spikes are worked on \
+        at once
+        :param samples_per_chunk: the most samples of spike probability \
+        worked on at once
+        :rtype: EarAnalysis
+        """
+        return EarAnalysis(
+            self._pole_freqs, self._atom_map.data["channel"],
+            self._timer_period / float(
+                MICRO_TO_MILLISECOND_CONVERSION * self._model.seq_size),
+            fibres_per_chunk, samples_per_chunk)
+
+    def _reads_with_extractor(self, variable):
+        """ bool saying if a variable is read back by the ear rather than \
+        its neuron recorder, as it is when read with extraction threads or \
+        recorded by only some of the vertices
+
+        :param variable: the variable
+        :rtype: bool
+        """
+        return bool(
+            self._model.recording_extraction_threads or
+            variable in self._recording_selections)
+
+    def _recording_extractor(self, placements, buffer_manager):
+        """ an extractor reading the recordings of the ear cores with the \
+        model's extraction threads, or in turn when it has none
+
+        :param placements: the placements
+        :param buffer_manager: the buffer manager
+        :rtype: EarRecordingExtractor
+        """
+        return EarRecordingExtractor(
+            buffer_manager, placements,
+            self._model.recording_extraction_threads)
+
+    def _map_machine_reads(
+            self, placements, buffer_manager, vertices, read, decode, label):
+        """ reads a region the ear cores record into themselves with a \
+        reader of its own for each of the model's extraction threads, \
+        decoding each core as it is read
+
+        :param placements: the placements
+        :param buffer_manager: the buffer manager
+        :param vertices: the vertices to read
+        :param read: called with a vertex, its placement and a \
+        MachineMemoryReader to read its data
+        :param decode: called with a vertex, its placement and the data \
+        read
+        :param label: what the progress bar says is being done
+        :return: the decoded results, in the order of the vertices
+        :rtype: list
+        """
+        simulator = get_simulator()
+        readers = [
+            MachineMemoryReader(simulator.transceiver, simulator.machine)
+            for _ in range(max(self._model.recording_extraction_threads, 1))]
+        try:
+            return self._recording_extractor(
+                placements, buffer_manager).map_vertices(
+                    vertices, read, decode, label, readers)
+        finally:
+            for reader in readers:
+                reader.close()
+
+    def _n_recorded_ticks(self, run_time):
+        """ the ticks the ear cores record a row in during a run time
+
+        :param run_time: the run time in ms
+        :rtype: int
+        """
+        return int(math.ceil(
+            run_time * MICRO_TO_MILLISECOND_CONVERSION / self._timer_period))
+
+    def _get_buffered_spikes(self, placements, buffer_manager):
+        """ reads the spikes of all the ihcan cores from the buffer \
+        manager, with the model's extraction threads
+
+        :param placements: the placements
+        :param buffer_manager: the buffer manager
+        :return: numpy array of (id, time) pairs
+        """
+        return self._recording_extractor(
+            placements, buffer_manager).get_spikes(
+                self._recorded_vertices(IHCANMachineVertex.SPIKES),
+                IHCANMachineVertex.RECORDING_REGIONS.
+                SPIKE_RECORDING_REGION_ID.value,
+                self._timer_period / MICRO_TO_MILLISECOND_CONVERSION,
+                "Getting spikes for {}".format(self._label))
+
+    def _get_packed_spikes(self, placements, buffer_manager):
+        """ reads the packed spikes of all the ihcan cores
+
+        :param placements: the placements
+        :param buffer_manager: the buffer manager
+        :return: numpy array of (id, time) pairs
+        """
+        spikes = self._map_machine_reads(
+            placements, buffer_manager,
+            self._recorded_vertices(IHCANMachineVertex.SPIKES),
+            lambda ihcan_vertex, placement, reader:
+                ihcan_vertex.read_packed_spikes(reader, placement),
+            lambda ihcan_vertex, placement, data:
+                ihcan_vertex.decode_packed_spikes(*data),
+            "Getting packed spikes for {}".format(self._label))
+        if not spikes:
+            return numpy.zeros((0, 2))
+        spikes = numpy.concatenate(spikes)
+        return spikes[numpy.lexsort((spikes[:, 1], spikes[:, 0]))]
+
     @overrides(AbstractSpikeRecordable.set_recording_spikes)
     def set_recording_spikes(
             self, default_machine_time_step, new_state=True,
@@ -994,33 +1872,45 @@ class SpiNNakEarApplicationVertex(
 
     @overrides(AbstractSpikeRecordable.get_spike_machine_vertices)
     def get_spike_machine_vertices(self, graph_mapper):
-        return self._ihcan_vertices
+        return self._recorded_vertices(IHCANMachineVertex.SPIKES)
 
     @overrides(AbstractNeuronRecordable.get_machine_vertices_for)
     def get_machine_vertices_for(self, variable, graph_mapper):
-        if variable == DRNLMachineVertex.MOC:
-            return self._drnl_vertices
-        else:
-            return self._ihcan_vertices
+        return self._recorded_vertices(variable)
 
     @overrides(AbstractNeuronRecordable.clear_recording)
     def clear_recording(self, variable, buffer_manager, placements,
                         graph_mapper):
         if variable == DRNLMachineVertex.MOC:
-            for drnl_vertex in self._drnl_vertices:
+            for drnl_vertex in self._recorded_vertices(variable):
                 placement = placements.get_placement_of_vertex(drnl_vertex)
                 buffer_manager.clear_recorded_data(
                     placement.x, placement.y, placement.p,
-                    DRNLMachineVertex.MOC_RECORDING_REGION_ID.value)
-        if variable == self.SPIKES:
-            for ihcan_vertex in self._ihcan_vertices:
+                    DRNLMachineVertex.RECORDING_REGIONS.
+                    MOC_RECORDING_REGION_ID.value)
+        elif (variable == IHCANMachineVertex.SPIKES and
+                self._model.ihcan_packed_spikes):
+            transceiver = get_simulator().transceiver
+            for ihcan_vertex in self._recorded_vertices(variable):
+                ihcan_vertex.clear_packed_spikes(
+                    transceiver,
+                    placements.get_placement_of_vertex(ihcan_vertex))
+        elif variable == IHCANMachineVertex.SPIKES:
+            for ihcan_vertex in self._recorded_vertices(variable):
                 placement = placements.get_placement_of_vertex(ihcan_vertex)
                 buffer_manager.clear_recorded_data(
                     placement.x, placement.y, placement.p,
                     (IHCANMachineVertex.RECORDING_REGIONS
                      .SPIKE_RECORDING_REGION_ID.value))
-        if variable == self.SPIKE_PROB:
-            for ihcan_vertex in self._ihcan_vertices:
+        elif (variable == IHCANMachineVertex.SPIKE_PROB and
+                is_quantized(self._spike_prob_data_type())):
+            transceiver = get_simulator().transceiver
+            for ihcan_vertex in self._recorded_vertices(variable):
+                ihcan_vertex.clear_quantized_spike_probs(
+                    transceiver,
+                    placements.get_placement_of_vertex(ihcan_vertex))
+        elif variable == IHCANMachineVertex.SPIKE_PROB:
+            for ihcan_vertex in self._recorded_vertices(variable):
                 placement = placements.get_placement_of_vertex(ihcan_vertex)
                 buffer_manager.clear_recorded_data(
                     placement.x, placement.y, placement.p,
@@ -1033,14 +1923,20 @@ class SpiNNakEarApplicationVertex(
     @overrides(AbstractNeuronRecordable.get_neuron_sampling_interval)
     def get_neuron_sampling_interval(
             self, variable, graph_mapper, local_time_period_map):
+        if variable == DRNLMachineVertex.MOC:
+            return self._moc_sampling_interval()
+
+        # the ear gives a row per sample when it reads the spike probs back
+        if (variable == IHCANMachineVertex.SPIKE_PROB and (
+                is_quantized(self._spike_prob_data_type()) or
+                self._reads_with_extractor(variable))):
+            return MICRO_TO_MILLISECOND_CONVERSION / float(self._model.fs)
+
         if graph_mapper is None or local_time_period_map is None:
             return self.my_variable_local_time_period(
                 get_simulator().default_machine_time_step, variable)
 
-        if variable == DRNLMachineVertex.MOC:
-            return self._drnl_neuron_recorder.get_neuron_sampling_interval(
-                variable, self._drnl_vertices[0], local_time_period_map)
-        elif variable in IHCANMachineVertex.RECORDABLES:
+        if variable in IHCANMachineVertex.RECORDABLES:
             return self._ihcan_neuron_recorder.get_neuron_sampling_interval(
                 variable, self._ihcan_vertices[0], local_time_period_map)
         else:
@@ -1050,8 +1946,36 @@ class SpiNNakEarApplicationVertex(
     def set_recording(
             self, variable, default_machine_time_step, new_state=True,
             sampling_interval=None, indexes=None):
-        self._change_requires_mapping = not self.is_recording(variable)
-        if variable == DRNLMachineVertex.MOC:
+        # the recording regions and the recording masks of the ear context
+        # are sized when the ear is mapped
+        if new_state != self.is_recording(variable):
+            self._remapping_required = True
+
+        # indexes select the vertices that record rather than the neurons,
+        # being the channels for moc and the fibres for the ihcans; given
+        # here they no longer follow the filters of select_recording
+        self._recording_filters.pop(variable, None)
+        selection = None
+        if indexes is not None:
+            indexes = numpy.asarray(indexes, dtype=int)
+            if variable != DRNLMachineVertex.MOC:
+                indexes = indexes // self._n_fibres_per_ihcan_core
+            selection = tuple(int(index) for index in numpy.unique(indexes))
+        if selection != self._recording_selections.get(variable):
+            self._remapping_required = True
+        if selection is None:
+            self._recording_selections.pop(variable, None)
+        else:
+            self._recording_selections[variable] = selection
+        indexes = None
+
+        if (variable == IHCANMachineVertex.SPIKES and
+                self._model.ihcan_packed_spikes):
+            self._recording_packed_spikes = new_state
+        elif (variable == IHCANMachineVertex.SPIKE_PROB and
+                is_quantized(self._spike_prob_data_type())):
+            self._recording_quantized_spike_prob = new_state
+        elif variable == DRNLMachineVertex.MOC:
             self._drnl_neuron_recorder.set_recording(
                 variable, sampling_interval, indexes, self,
                 default_machine_time_step, new_state)
@@ -1064,7 +1988,12 @@ class SpiNNakEarApplicationVertex(
 
     @overrides(AbstractNeuronRecordable.is_recording)
     def is_recording(self, variable):
-        if variable == DRNLMachineVertex.MOC:
+        if variable == IHCANMachineVertex.SPIKES:
+            return self.is_recording_spikes()
+        elif (variable == IHCANMachineVertex.SPIKE_PROB and
+                is_quantized(self._spike_prob_data_type())):
+            return self._recording_quantized_spike_prob
+        elif variable == DRNLMachineVertex.MOC:
             return self._drnl_neuron_recorder.is_recording(variable)
         elif variable in IHCANMachineVertex.RECORDABLES:
             return self._ihcan_neuron_recorder.is_recording(variable)
@@ -1079,11 +2008,51 @@ class SpiNNakEarApplicationVertex(
     def get_data(
             self, variable, run_time, placements, graph_mapper,
             buffer_manager, local_time_period_map):
-        if variable == DRNLMachineVertex.MOC:
-            return self._drnl_neuron_recorder.get_matrix_data(
+        if (variable == DRNLMachineVertex.MOC and
+                self._reads_with_extractor(variable)):
+            channels = self._recorded_columns(variable)
+            data = self._recording_extractor(
+                placements, buffer_manager).get_matrix(
+                    self._recorded_vertices(variable),
+                    DRNLMachineVertex.MOC_RECORDABLE_REGION_ID, 1,
+                    (numpy.float32 if self._model.moc_record_float32
+                     else numpy.float64),
+                    self._n_recorded_ticks(run_time) *
+                    DRNLMachineVertex.moc_rows_per_tick(
+                        self._model.seq_size,
+                        self._model.moc_decimation_factor),
+                    self._n_dnrls,
+                    "Getting {} for {}".format(variable, self._label))
+            return data[:, channels], channels, self._moc_sampling_interval()
+        elif variable == DRNLMachineVertex.MOC:
+            data, indexes, _ = self._drnl_neuron_recorder.get_matrix_data(
                 self._label, buffer_manager,
                 DRNLMachineVertex.MOC_RECORDABLE_REGION_ID, placements,
                 graph_mapper, self, variable, run_time, local_time_period_map)
+
+            # a row is recorded per decimated window of samples
+            return data, indexes, self._moc_sampling_interval()
+        elif (variable == IHCANMachineVertex.SPIKE_PROB and
+                is_quantized(self._spike_prob_data_type())):
+            return self._get_quantized_spike_probs(
+                placements, buffer_manager, run_time)
+        elif (variable == IHCANMachineVertex.SPIKE_PROB and
+                self._reads_with_extractor(variable)):
+            n_fibres = self._n_dnrls * self._n_fibres_per_ihc
+            fibres = self._recorded_columns(variable)
+            data = self._recording_extractor(
+                placements, buffer_manager).get_matrix(
+                    self._recorded_vertices(variable),
+                    IHCANMachineVertex.RECORDING_REGIONS.
+                    SPIKE_PROBABILITY_REGION_ID.value,
+                    self._model.seq_size, numpy.float32,
+                    self._n_recorded_ticks(run_time), n_fibres,
+                    "Getting {} for {}".format(variable, self._label))
+            if len(fibres) < n_fibres:
+                data = data[:, fibres]
+            return (
+                data, fibres,
+                MICRO_TO_MILLISECOND_CONVERSION / float(self._model.fs))
         elif variable == IHCANMachineVertex.SPIKE_PROB:
             matrix_data = self._ihcan_neuron_recorder.get_matrix_data(
                 self._label, buffer_manager,
@@ -1102,6 +2071,12 @@ class SpiNNakEarApplicationVertex(
                 for time_step in seq_elements:
                     new_matrix_data.append(time_step)
             return new_matrix_data, matrix_data[1][0:10], matrix_data[2]
+        elif (variable == IHCANMachineVertex.SPIKES and
+                self._model.ihcan_packed_spikes):
+            return self._get_packed_spikes(placements, buffer_manager)
+        elif (variable == IHCANMachineVertex.SPIKES and
+                self._reads_with_extractor(variable)):
+            return self._get_buffered_spikes(placements, buffer_manager)
         elif variable == IHCANMachineVertex.SPIKES:
             return self._ihcan_neuron_recorder.get_spikes(
                 self._label, buffer_manager,
@@ -1111,6 +2086,95 @@ class SpiNNakEarApplicationVertex(
         else:
             raise ConfigurationException(self.RECORDING_ERROR.format(variable))
 
+    def _spike_prob_data_type(self):
+        """ the data type spike probs are recorded as
+
+        :rtype: DataType
+        """
+        return get_precision_data_type(self._model.spike_prob_precision)
+
+    def _get_quantized_spike_probs(
+            self, placements, buffer_manager, run_time):
+        """ reads and dequantizes the spike probs of all the ihcan cores \
+        into a column per fibre, leaving nan where a core recorded fewer \
+        samples
+
+        :param placements: the placements
+        :param buffer_manager: the buffer manager
+        :param run_time: the run time in ms
+        :return: the data as samples by fibres, the fibre indexes and the \
+        sampling interval in ms
+        """
+        seq_size = self._model.seq_size
+        n_samples = self._n_recorded_ticks(run_time) * seq_size
+        n_fibres = self._n_dnrls * self._n_fibres_per_ihc
+        fibres = self._recorded_columns(IHCANMachineVertex.SPIKE_PROB)
+        data = numpy.full((n_samples, n_fibres), numpy.nan, numpy.float32)
+
+        def decode(ihcan_vertex, placement, read):
+            probs = ihcan_vertex.decode_quantized_spike_probs(
+                *read)[:n_samples]
+            recorded_slice = ihcan_vertex.recorded_slice()
+            lo_fibre = recorded_slice.lo_atom // seq_size
+            data[:len(probs), lo_fibre:lo_fibre + probs.shape[1]] = probs
+
+        self._map_machine_reads(
+            placements, buffer_manager,
+            self._recorded_vertices(IHCANMachineVertex.SPIKE_PROB),
+            lambda ihcan_vertex, placement, reader:
+                ihcan_vertex.read_quantized_spike_probs(reader, placement),
+            decode,
+            "Getting quantized spike probs for {}".format(self._label))
+        if len(fibres) < n_fibres:
+            data = data[:, fibres]
+        return (
+            data, fibres,
+            MICRO_TO_MILLISECOND_CONVERSION / float(self._model.fs))
+
+    def create_live_spike_receiver(self, local_host="0.0.0.0"):
+        """ makes a receiver for the spikes streamed by the final \
+        aggregation nodes, listening on the live output port
+
+        :param local_host: the address to listen on
+        :rtype: EarLiveSpikeReceiver
+        """
+        if not self._model.live_output:
+            raise ConfigurationException(self.LIVE_OUTPUT_ERROR)
+        return EarLiveSpikeReceiver(
+            self, self._model.n_fibres_per_ihc, local_host,
+            self._model.live_output_port)
+
+    def create_live_audio_sender(self, board_address=None):
+        """ makes a sender for streaming audio into the ome, which \
+        listens for its credits on the live input credit port
+
+        :param board_address: the address of the board the ome is on, or \
+        None to look it up from the placement of the ome
+        :rtype: EarLiveAudioSender
+        """
+        if not self._model.live_input:
+            raise ConfigurationException(self.LIVE_INPUT_ERROR)
+        if board_address is None:
+            simulator = get_simulator()
+            placement = simulator.placements.get_placement_of_vertex(
+                self._ome_vertex)
+            chip = simulator.machine.get_chip_at(placement.x, placement.y)
+            board_address = simulator.machine.get_chip_at(
+                chip.nearest_ethernet_x, chip.nearest_ethernet_y).ip_address
+        return EarLiveAudioSender(
+            board_address, self._model.live_input_port,
+            self._model.seq_size, self._model.live_input_n_buffers,
+            credit_port=self._model.live_input_credit_port)
+
+    def _moc_sampling_interval(self):
+        """ the time in ms between recorded moc values
+
+        :rtype: float
+        """
+        return (
+            self._model.moc_decimation_factor *
+            MICRO_TO_MILLISECOND_CONVERSION / float(self._model.fs))
+
     def get_sampling_interval(self, sample_size_window):
         return (
             (self._timer_period * sample_size_window) *
@@ -0,0 +1,284 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+
+from pacman.model.decorators.overrides import overrides
+
+from spynnaker.pyNN.models.neural_projections.connectors import \
+    AbstractConnector
+
+from spinnak_ear.spinnak_ear_application_vertex.\
+    spinnakear_application_vertex import SpiNNakEarApplicationVertex
+
+
+class TonotopicConnector(AbstractConnector):
+    """ Connects the fibres of an ear to the neurons of a population by \
+    characteristic frequency. Each fibre connects to the post neurons whose \
+    characteristic frequency is within half the bandwidth of its own, \
+    optionally only the fibre types asked for, and optionally only the \
+    fan out post neurons centred on the closest one.
+
+    The connections of each block are made as needed with numpy, so the \
+    host never holds the whole connection list.
+    """
+
+    __slots__ = [
+        # the characteristic frequency of each post neuron, or None to spread
+        # the post neurons evenly in octaves over the ear channels
+        "_post_cfs",
+        # the width of the band a fibre connects across, in octaves
+        "_bandwidth",
+        # the fibre types to connect, or None for all
+        "_fibre_types",
+        # the most post neurons a fibre connects to, or None for no limit
+        "_fan_out",
+        # the sorted post neuron log2 characteristic frequencies and the
+        # post neuron of each, by the synapse information of the projection
+        "_post_cfs_by_synapse_info"
+    ]
+
+    # the default width of the band a fibre connects across, in octaves
+    DEFAULT_BANDWIDTH = 0.5
+
+    # error message for a projection not from an ear
+    PRE_POPULATION_ERROR = (
+        "The TonotopicConnector only supports projections from a "
+        "SpiNNakEar population, not {}")
+
+    # error message for post frequencies that dont match the post population
+    POST_CFS_ERROR = (
+        "The TonotopicConnector has {} post characteristic frequencies but "
+        "the post population has {} neurons")
+
+    # error message for a bandwidth that connects nothing
+    BANDWIDTH_ERROR = "The bandwidth must be positive, not {}"
+
+    # error message for a fan out that connects nothing
+    FAN_OUT_ERROR = "The fan out must be at least 1, not {}"
+
+    # error message for selecting fibre types before the ear is partitioned
+    NO_ATOM_MAP_ERROR = (
+        "The fibre types of the ear are not known until it is partitioned")
+
+    def __init__(
+            self, post_cfs=None, bandwidth=DEFAULT_BANDWIDTH,
+            fibre_types=None, fan_out=None, safe=True, verbose=False):
+        """
+        :param post_cfs: the characteristic frequency of each post neuron \
+        in Hz, or None to spread the post neurons evenly in octaves over \
+        the ear channels
+        :param bandwidth: the width of the band a fibre connects across, \
+        in octaves
+        :param fibre_types: the fibre types to connect by name or code, or \
+        None for all
+        :param fan_out: the most post neurons a fibre connects to, or None \
+        for no limit
+        :param safe: see AbstractConnector
+        :param verbose: see AbstractConnector
+        """
+        AbstractConnector.__init__(self, safe=safe, verbose=verbose)
+        if bandwidth <= 0:
+            raise Exception(self.BANDWIDTH_ERROR.format(bandwidth))
+        if fan_out is not None and fan_out < 1:
+            raise Exception(self.FAN_OUT_ERROR.format(fan_out))
+        self._post_cfs = post_cfs
+        self._bandwidth = bandwidth
+        self._fibre_types = fibre_types
+        self._fan_out = fan_out
+        self._post_cfs_by_synapse_info = dict()
+
+    @property
+    def bandwidth(self):
+        return self._bandwidth
+
+    @property
+    def fibre_types(self):
+        return self._fibre_types
+
+    @property
+    def fan_out(self):
+        return self._fan_out
+
+    def _get_ear(self, synapse_info):
+        """ the ear the projection comes from
+
+        :param synapse_info: the synapse information of the projection
+        :rtype: SpiNNakEarApplicationVertex
+        """
+        ear = synapse_info.pre_population._get_vertex
+        if not isinstance(ear, SpiNNakEarApplicationVertex):
+            raise Exception(self.PRE_POPULATION_ERROR.format(ear))
+        return ear
+
+    def _get_post_cfs(self, synapse_info):
+        """ sorts the post neuron log2 characteristic frequencies, once \
+        per projection, as the connector may be shared by projections to \
+        different post populations
+
+        :param synapse_info: the synapse information of the projection
+        :return: the sorted log2 frequencies and the post neuron of each
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        if synapse_info not in self._post_cfs_by_synapse_info:
+            n_post_neurons = synapse_info.n_post_neurons
+            if self._post_cfs is None:
+                channel_cfs = self._get_ear(synapse_info).channel_cfs
+                log_post_cfs = numpy.linspace(
+                    numpy.log2(numpy.min(channel_cfs)),
+                    numpy.log2(numpy.max(channel_cfs)), n_post_neurons)
+            else:
+                if len(self._post_cfs) != n_post_neurons:
+                    raise Exception(self.POST_CFS_ERROR.format(
+                        len(self._post_cfs), n_post_neurons))
+                log_post_cfs = numpy.log2(
+                    numpy.asarray(self._post_cfs, dtype=float))
+            post_order = numpy.argsort(log_post_cfs, kind="stable")
+            self._post_cfs_by_synapse_info[synapse_info] = (
+                log_post_cfs[post_order], post_order)
+        return self._post_cfs_by_synapse_info[synapse_info]
+
+    def _get_windows(self, pre_cfs, synapse_info):
+        """ the range of sorted post neurons each pre atom connects to
+
+        :param pre_cfs: the characteristic frequency of each pre atom in Hz
+        :param synapse_info: the synapse information of the projection
+        :return: the start and end (exclusive) of each range
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        sorted_log_post_cfs, _ = self._get_post_cfs(synapse_info)
+        log_pre_cfs = numpy.log2(numpy.asarray(pre_cfs, dtype=float))
+        half_band = self._bandwidth / 2.0
+        starts = numpy.searchsorted(
+            sorted_log_post_cfs, log_pre_cfs - half_band, side="left")
+        ends = numpy.searchsorted(
+            sorted_log_post_cfs, log_pre_cfs + half_band, side="right")
+        if self._fan_out is not None:
+            closest = numpy.searchsorted(sorted_log_post_cfs, log_pre_cfs)
+            starts = numpy.maximum(numpy.minimum(
+                closest - self._fan_out // 2, ends - self._fan_out), starts)
+            ends = numpy.minimum(starts + self._fan_out, ends)
+        return starts, ends
+
+    def _get_pairs(self, pre_ids, pre_cfs, synapse_info):
+        """ the (pre, post) pairs the pre atoms connect as
+
+        :param pre_ids: the id of each pre atom
+        :param pre_cfs: the characteristic frequency of each pre atom in Hz
+        :param synapse_info: the synapse information of the projection
+        :return: the pre id and post neuron of each connection
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        _, post_order = self._get_post_cfs(synapse_info)
+        starts, ends = self._get_windows(pre_cfs, synapse_info)
+        counts = ends - starts
+        first_of_pre = numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        positions = (
+            numpy.repeat(starts, counts) +
+            numpy.arange(numpy.sum(counts)) - first_of_pre)
+        return numpy.repeat(pre_ids, counts), post_order[positions]
+
+    def _get_channel_pairs(self, synapse_info):
+        """ the (channel, post) pairs, which every fibre of the channel \
+        connects as when no fibre types are filtered out
+
+        :param synapse_info: the synapse information of the projection
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        channel_cfs = self._get_ear(synapse_info).channel_cfs
+        return self._get_pairs(
+            numpy.arange(len(channel_cfs)), channel_cfs, synapse_info)
+
+    def _get_n_connections_maximum(self, synapse_info):
+        """ the most connections the projection can have
+
+        :param synapse_info: the synapse information of the projection
+        :rtype: int
+        """
+        channels, _ = self._get_channel_pairs(synapse_info)
+        return len(channels) * self._get_ear(synapse_info).n_fibres_per_ihc
+
+    @overrides(AbstractConnector.get_delay_maximum)
+    def get_delay_maximum(self, synapse_info):
+        return self._get_delay_maximum(
+            synapse_info.delays, self._get_n_connections_maximum(synapse_info))
+
+    @overrides(AbstractConnector.get_n_connections_from_pre_vertex_maximum)
+    def get_n_connections_from_pre_vertex_maximum(
+            self, post_vertex_slice, synapse_info, min_delay=None,
+            max_delay=None):
+        channels, posts = self._get_channel_pairs(synapse_info)
+        in_slice = (
+            (posts >= post_vertex_slice.lo_atom) &
+            (posts <= post_vertex_slice.hi_atom))
+        n_connections = int(numpy.max(
+            numpy.bincount(channels[in_slice], minlength=1)))
+        if min_delay is None or max_delay is None:
+            return n_connections
+        return self._get_n_connections_from_pre_vertex_with_delay_maximum(
+            synapse_info.delays, self._get_n_connections_maximum(synapse_info),
+            n_connections, min_delay, max_delay)
+
+    @overrides(AbstractConnector.get_n_connections_to_post_vertex_maximum)
+    def get_n_connections_to_post_vertex_maximum(self, synapse_info):
+        _, posts = self._get_channel_pairs(synapse_info)
+        return int(
+            numpy.max(numpy.bincount(posts, minlength=1)) *
+            self._get_ear(synapse_info).n_fibres_per_ihc)
+
+    @overrides(AbstractConnector.get_weight_maximum)
+    def get_weight_maximum(self, synapse_info):
+        return self._get_weight_maximum(
+            synapse_info.weights,
+            self._get_n_connections_maximum(synapse_info))
+
+    @overrides(AbstractConnector.create_synaptic_block)
+    def create_synaptic_block(
+            self, pre_slices, pre_slice_index, post_slices, post_slice_index,
+            pre_vertex_slice, post_vertex_slice, synapse_type, synapse_info):
+        atom_map = self._get_ear(synapse_info).atom_map
+        if atom_map is None:
+            raise Exception(self.NO_ATOM_MAP_ERROR)
+        atoms = atom_map.data[
+            pre_vertex_slice.lo_atom:pre_vertex_slice.hi_atom + 1]
+        if self._fibre_types is not None:
+            atoms = atoms[atom_map.mask(fibre_types=self._fibre_types)[
+                pre_vertex_slice.lo_atom:pre_vertex_slice.hi_atom + 1]]
+
+        sources, targets = self._get_pairs(
+            atoms["atom"], atoms["cf"], synapse_info)
+        in_slice = (
+            (targets >= post_vertex_slice.lo_atom) &
+            (targets <= post_vertex_slice.hi_atom))
+        n_connections = int(numpy.count_nonzero(in_slice))
+
+        block = numpy.zeros(
+            n_connections, dtype=AbstractConnector.NUMPY_SYNAPSES_DTYPE)
+        block["source"] = sources[in_slice]
+        block["target"] = targets[in_slice]
+        block["weight"] = self._generate_weights(
+            n_connections, None, pre_vertex_slice, post_vertex_slice,
+            synapse_info)
+        block["delay"] = self._generate_delays(
+            n_connections, None, pre_vertex_slice, post_vertex_slice,
+            synapse_info)
+        block["synapse_type"] = synapse_type
+        return block
+
+    def __repr__(self):
+        return (
+            "TonotopicConnector(bandwidth={}, fibre_types={}, "
+            "fan_out={})".format(
+                self._bandwidth, self._fibre_types, self._fan_out))
@@ -23,6 +23,10 @@ from spinn_utilities.overrides import overrides
 @add_metaclass(AbstractBase)
 class AbstractEarProfiled(AbstractHasProfileData):
 
+    # the profile state lives in the slots of each vertex, so the vertices
+    # dont each carry a __dict__
+    __slots__ = ()
+
     PROFILER_N_SAMPLES = 10000
 
     PROFILE_TAG_LABELS = {
@@ -16,7 +16,7 @@
 from pacman.model.graphs.machine import MachineVertex
 from pacman.model.resources.resource_container import ResourceContainer
 from pacman.model.resources.dtcm_resource import DTCMResource
-from pacman.model.resources import ConstantSDRAM
+from pacman.model.resources import ConstantSDRAM, IPtagResource
 from pacman.model.resources.cpu_cycles_per_tick_resource \
     import CPUCyclesPerTickResource
 from pacman.model.decorators.overrides import overrides
@@ -40,6 +40,9 @@ from spinn_front_end_common.abstract_models\
     .abstract_provides_n_keys_for_partition \
     import AbstractProvidesNKeysForPartition
 
+from spinnak_ear.spinnak_ear_utilities.ear_region_schemas import \
+    AN_PARAMETERS, AN_KEY_MASK_ENTRY, AN_LIVE_OUTPUT
+
 import numpy
 from enum import Enum
 
@@ -56,7 +59,13 @@ class ANGroupMachineVertex(
         "_n_atoms",
         "_n_children",
         "_is_final_row",
-        "_connection_slice"
+        "_connection_slice",
+        # the (host, port) to stream spikes to, or None
+        "_live_output",
+        # the index of this vertex among the final row
+        "_live_output_index",
+        # the ear internal connections of each machine vertex
+        "_graph_index"
     ]
 
     # provenance items
@@ -68,25 +77,47 @@ class ANGroupMachineVertex(
     AN_GROUP_PARTITION_IDENTIFIER = "AN"
 
     # The data type of the keys
-    _KEY_MASK_ENTRY_DTYPE = [
-        ("key", "<u4"), ("mask", "<u4"), ("offset", "<u4")]
+    _KEY_MASK_ENTRY_DTYPE = AN_KEY_MASK_ENTRY.dtype
+
+    _KEY_MASK_ENTRY_SIZE_BYTES = AN_KEY_MASK_ENTRY.size
+
+    # the size of the parameters region
+    _N_PARAMETER_BYTES = AN_PARAMETERS.size
 
-    _KEY_MASK_ENTRY_SIZE_BYTES = 12
+    # the size of the live output region
+    _N_LIVE_OUTPUT_BYTES = AN_LIVE_OUTPUT.size
 
-    # 1 n child, 2. has key, 3. key, 4. is final, 5= n atoms
-    _N_PARAMETER_BYTES = 5 * constants.WORD_TO_BYTE_MULTIPLIER
+    # error message for children sending more fibres than the node has
+    KEY_MAP_ATOMS_ERROR = (
+        "The children of {} send ids up to {}, but it forwards only {} "
+        "fibres")
+
+    # the traffic identifier of the live output ip tags
+    LIVE_OUTPUT_TRAFFIC_IDENTIFIER = "SpiNNakEarLiveOutput"
 
     REGIONS = Enum(
         value="REGIONS",
         names=[('SYSTEM', 0),
                ('PARAMETERS', 1),
                ('KEY_MAP', 2),
-               ('PROVENANCE', 3)])
+               ('PROVENANCE', 3),
+               ('LIVE_OUTPUT', 4)])
 
     def __init__(
             self, n_atoms, n_children, is_final_row, row,
-            ear_index, connection_slice):
+            ear_index, connection_slice, live_output=None,
+            live_output_index=0, graph_index=None):
         """
+        :param n_atoms: the number of fibres this node forwards
+        :param n_children: the number of nodes feeding this node
+        :param is_final_row: if this node is in the final row
+        :param row: the row of the aggregation tree this node is in
+        :param ear_index: the ear this node belongs to
+        :param connection_slice: the out going slice of a final row node
+        :param live_output: the (host, port) to stream spikes to, or None
+        :param live_output_index: the index of this node in the final row
+        :param graph_index: the ear internal connections of each machine \
+        vertex
         """
         if is_final_row:
             label = (
@@ -102,6 +133,9 @@ class ANGroupMachineVertex(
         self._n_children = n_children
         self._is_final_row = is_final_row
         self._connection_slice = connection_slice
+        self._live_output = live_output
+        self._live_output_index = live_output_index
+        self._graph_index = graph_index
 
     @property
     def is_final_row(self):
@@ -111,21 +145,34 @@ class ANGroupMachineVertex(
     def connection_slice(self):
         return self._connection_slice
 
+    @property
+    def live_output_index(self):
+        return self._live_output_index
+
     @property
     @overrides(MachineVertex.resources_required)
     def resources_required(self):
         sdram = constants.SYSTEM_BYTES_REQUIREMENT
         sdram += self._N_PARAMETER_BYTES
         sdram += self._KEY_MASK_ENTRY_SIZE_BYTES * self._n_children
+        sdram += self._N_LIVE_OUTPUT_BYTES
         # provenance region
         sdram += self.get_provenance_data_size(
             self.EXTRA_PROVENANCE_DATA_ENTRIES.N_PROVENANCE_ELEMENTS.value)
 
+        # the live output goes out the ethernet through an ip tag
+        iptags = []
+        if self._live_output is not None:
+            host, port = self._live_output
+            iptags.append(IPtagResource(
+                host, port, strip_sdp=True,
+                traffic_identifier=self.LIVE_OUTPUT_TRAFFIC_IDENTIFIER))
+
         resources = ResourceContainer(
             dtcm=DTCMResource(0),
             sdram=ConstantSDRAM(sdram),
             cpu_cycles=CPUCyclesPerTickResource(0),
-            iptags=[], reverse_iptags=[])
+            iptags=iptags, reverse_iptags=[])
         return resources
 
     @overrides(AbstractHasAssociatedBinary.get_binary_file_name)
@@ -185,6 +232,11 @@ class ANGroupMachineVertex(
             self.REGIONS.KEY_MAP.value,
             self._n_children * self._KEY_MASK_ENTRY_SIZE_BYTES)
 
+        # reserve live output region
+        spec.reserve_memory_region(
+            self.REGIONS.LIVE_OUTPUT.value, self._N_LIVE_OUTPUT_BYTES,
+            "live output")
+
         # reserve provenance data region
         self.reserve_provenance_data_region(spec)
 
@@ -198,35 +250,24 @@ class ANGroupMachineVertex(
         """
         spec.switch_write_focus(self.REGIONS.PARAMETERS.value)
 
-        # Write the number of child nodes
-        spec.write_value(self._n_children)
-
-        # Write the routing key
+        # the routing key, if there is anywhere to send to
+        has_key = 0
+        key = 0
         partitions = list(
             machine_graph.get_outgoing_edge_partitions_starting_at_vertex(
                 self))
-        if len(partitions) == 0:
-            # write false is_key
-            spec.write_value(0)
-            # write 0 key
-            spec.write_value(0)
-        else:
-            # write true is_key
-            spec.write_value(1)
-
+        if len(partitions) != 0:
+            has_key = 1
             key = routing_info.get_first_key_from_partition(partitions[0])
-            spec.write_value(key)
 
-        # write is final
-        spec.write_value(self._is_final_row)
-        # write n_atoms
-        spec.write_value(self._n_atoms)
+        AN_PARAMETERS.write(
+            spec, n_children=self._n_children, has_key=has_key, key=key,
+            is_final_row=int(self._is_final_row), n_atoms=self._n_atoms)
 
-    def _fill_in_key_map_region(self, spec, machine_graph, routing_info):
+    def _fill_in_key_map_region(self, spec, routing_info):
         """ fill in the key map region
 
         :param spec: dsg spec
-        :param machine_graph: machine graph
         :param routing_info: routing info
         :rtype: None
         """
@@ -236,21 +277,46 @@ class ANGroupMachineVertex(
         key_and_mask_table = numpy.zeros(
             self._n_children, dtype=self._KEY_MASK_ENTRY_DTYPE)
 
-        # build master pop table thing
+        # build master pop table thing; a child's fibres follow on from the
+        # fibres of the children before it, however many keys its mask spans
         offset = 0
+        largest_id = -1
         for i, incoming_edge in enumerate(
-                machine_graph.get_edges_ending_at_vertex(self)):
+                self._graph_index.get_child_edges(self)):
             key_and_mask = routing_info.get_routing_info_for_edge(
                 incoming_edge).first_key_and_mask
             key_and_mask_table[i]['key'] = key_and_mask.key
             key_and_mask_table[i]['mask'] = key_and_mask.mask
             key_and_mask_table[i]['offset'] = offset
-            offset += key_and_mask.n_keys
+            n_child_atoms = incoming_edge.pre_vertex.n_atoms
+            largest_id = max(largest_id, offset + n_child_atoms - 1)
+            offset += n_child_atoms
+
+        # the core sends offset + (key & ~mask) for each child key
+        if largest_id >= self._n_atoms:
+            raise Exception(self.KEY_MAP_ATOMS_ERROR.format(
+                self, largest_id, self._n_atoms))
 
         # sort entries by key
         key_and_mask_table.sort(order='key')
         spec.write_array(key_and_mask_table.view("<u4"))
 
+    def _fill_in_live_output_region(self, spec, tags):
+        """ fill in the live output region
+
+        :param spec: dsg spec
+        :param tags: the tags
+        :rtype: None
+        """
+        spec.switch_write_focus(self.REGIONS.LIVE_OUTPUT.value)
+        if self._live_output is None:
+            AN_LIVE_OUTPUT.write(
+                spec, enabled=0, tag=0, index=self._live_output_index)
+        else:
+            AN_LIVE_OUTPUT.write(
+                spec, enabled=1, tag=tags.get_ip_tags_for_vertex(self)[0].tag,
+                index=self._live_output_index)
+
     @inject_items({
         "time_period_map": "MachineTimeStepMap",
         "time_scale_factor": "TimeScaleFactor",
@@ -280,7 +346,8 @@ class ANGroupMachineVertex(
 
         # app level regions fill in
         self._fill_in_params_region(spec, machine_graph, routing_info)
-        self._fill_in_key_map_region(spec, machine_graph, routing_info)
+        self._fill_in_key_map_region(spec, routing_info)
+        self._fill_in_live_output_region(spec, tags)
 
         # End the specification
         spec.end_specification()
@@ -14,10 +14,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import division
-from pacman.model.graphs.abstract_sdram_partition import AbstractSDRAMPartition
 from pacman.model.graphs.common import Slice
 from pacman.model.graphs.machine import MachineVertex
-from pacman.model.resources import ConstantSDRAM
+from pacman.model.resources import ConstantSDRAM, VariableSDRAM
 from pacman.model.resources.resource_container import ResourceContainer
 from pacman.model.resources.dtcm_resource import DTCMResource
 from pacman.model.resources.cpu_cycles_per_tick_resource \
@@ -54,6 +53,9 @@ from spinnak_ear.spinnak_ear_machine_vertices.abstract_ear_profiled import \
     AbstractEarProfiled
 from spinnak_ear.spinnak_ear_machine_vertices.ome_machine_vertex import \
     OMEMachineVertex
+from spinnak_ear.spinnak_ear_utilities.ear_region_schemas import \
+    DRNL_PARAMETERS, DRNL_DOUBLE_PARAMS, DRNL_FILTER_PARAMS, \
+    DRNL_HOST_INPUT_DATA, DRNL_SHARED_INPUT, DRNL_SDRAM_EDGE
 
 from enum import Enum
 import numpy
@@ -77,57 +79,68 @@ class DRNLMachineVertex(
     """
 
     __slots__ = [
+        # the ear wide parameters shared by every drnl
+        "_context",
+        # the characteristic frequency of this channel
         "_cf",
-        "_fs",
-        "_delay",
+        # the index of this drnl in the ear
         "_drnl_index",
-        "_num_data_points",
-        "_n_moc_data_points",
-        "_recording_size",
-        "_profile",
-        "_n_profile_samples",
-        "_process_profile_times",
-        "_filter_params",
-        "_seq_size",
-        "_synapse_manager",
-        "_parent",
+        # the number of distinct buffers in the sdram edge to the ihcans
         "_n_buffers_in_sdram_total",
-        "__on_chip_generatable_area",
+        # the filter params of this channel
+        "_filter_params",
+        # where in the synaptic matrix the on chip generated part starts
+        "__on_chip_generatable_offset",
+        # the size of the on chip generated part of the synaptic matrix
         "__on_chip_generatable_size",
-        "_neuron_recorder",
-        "_timer_period"
+        # bool flag for profiling
+        "_profile",
+        # the profile region id
+        "_profile_region",
+        # the number of profile samples
+        "_n_profile_samples",
+        # the profiled timer times
+        "_process_profile_times"
     ]
 
     FAIL_TO_RECORD_MESSAGE = (
         "recording not complete, reduce Fs or disable RT!\n recorded output "
         "length:{}, expected length:{} at placement:{},{},{}")
 
+    # the label of a drnl, made as needed
+    DRNL_LABEL = "DRNL Node of {}"
+
     # the outgoing partition id for DRNL
     DRNL_PARTITION_ID = "DRNLData"
     DRNL_SDRAM_PARTITION_ID = "DRNLSDRAMData"
 
     # The number of bytes for the parameters
-    #  1: data key, 2: ome data key,
-    # 3: seq size, 4:n buffers in sdram, 5. n synapse types
-    # 6. moc_resample_factor,
-    _N_PARAMS = 6
-    _N_PARAMETER_BYTES = _N_PARAMS * BYTES_PER_WORS
+    _N_PARAMETER_BYTES = DRNL_PARAMETERS.size
 
-    # 1 moc_dec1, 2. moc_dec_2, 3 moc_dec_3, 4 moc_factor_1, 5 ctbm,
-    # 6 recip_ctbm 7 disp_thresh
-    _N_DOUBLE_PARAMS = 7
-    _N_DOUBLE_PARAMS_BYTES = _N_DOUBLE_PARAMS * DataType.FLOAT_64.size
+    # The number of bytes for the double parameters
+    _N_DOUBLE_PARAMS_BYTES = DRNL_DOUBLE_PARAMS.size
 
     # sdram edge address in sdram
-    # 1. address, 2. size. 3. double elements
-    SDRAM_EDGE_ADDRESS_SIZE_IN_WORDS = 3
+    SDRAM_EDGE_ADDRESS_SIZE_IN_WORDS = DRNL_SDRAM_EDGE.size // BYTES_PER_WORS
 
     # n filter params
-    # 1. la1 2. la2 3. lb0 4. lb1 5. nla1 6. nla2 7.nlb0 8. nlb1
-    N_FILTER_PARAMS = 8
+    N_FILTER_PARAMS = len(DRNL_FILTER_PARAMS.field_names)
 
     # n bytes for filter param region
-    FILTER_PARAMS_IN_BYTES = N_FILTER_PARAMS * DataType.FLOAT_64.size
+    FILTER_PARAMS_IN_BYTES = DRNL_FILTER_PARAMS.size
+
+    # host input data region header
+    _N_HOST_INPUT_HEADER_BYTES = DRNL_HOST_INPUT_DATA.size
+
+    # shared sdram input region
+    _N_SHARED_INPUT_BYTES = DRNL_SHARED_INPUT.size
+
+    # where the input samples come from
+    INPUT_MODES = Enum(
+        value="INPUT_MODES",
+        names=[("MULTICAST", 0),
+               ("HOST", 1),
+               ("SHARED_SDRAM", 2)])
 
     # recording regions
     RECORDING_REGIONS = Enum(
@@ -186,60 +199,45 @@ class DRNLMachineVertex(
                ('DIRECT_MATRIX', 12),
                ('BIT_FIELD_FILTER', 13),
                ('BIT_FIELD_BUILDER', 14),
-               ('BIT_FIELD_KEY_MAP', 15)])
+               ('BIT_FIELD_KEY_MAP', 15),
+               ('HOST_INPUT_DATA', 16),
+               ('SHARED_INPUT_SDRAM', 17)])
 
-    def __init__(
-            self, cf, fs, n_data_points, drnl_index, profile, seq_size,
-            synapse_manager, parent, n_buffers_in_sdram_total,
-            neuron_recorder, timer_period):
+    def __init__(self, context, drnl_index, cf, n_buffers_in_sdram_total):
         """ builder of the drnl machine vertex
 
-        :param cf: ????????
-        :param fs: sampling freequency of the OME
-        :param n_data_points: the number of elements.....
+        :param context: the ear wide parameters shared by every drnl of \
+        the ear
         :param drnl_index:  the index in the list of drnls (used for slices)
-        :param profile: bool flag saying if this vertex is set to profile
-        :param seq_size: the size of a block
-        :param synapse_manager: the synaptic manager
-        :param parent: the app vertex
+        :param cf: the characteristic frequency of this channel
         :param n_buffers_in_sdram_total: the number of buffers in sequence in\
          the sdram edge
-        :param neuron_recorder: the recorder for moc
-        :param timer_period: the timer period of this core
         """
 
-        MachineVertex.__init__(
-            self, label="DRNL Node of {}".format(drnl_index), constraints=None)
-        AbstractEarProfiled.__init__(self, profile, self.REGIONS.PROFILE.value)
+        # the label is made as needed, so the base holds the shared format
+        # rather than making a string for every vertex from None
+        MachineVertex.__init__(self, label=self.DRNL_LABEL, constraints=None)
+        AbstractEarProfiled.__init__(
+            self, context.profile, self.REGIONS.PROFILE.value)
         AbstractProvidesNKeysForPartition.__init__(self)
 
         # storage for the synapse manager locations
         self.__on_chip_generatable_offset = None
         self.__on_chip_generatable_size = None
 
+        self._context = context
         self._cf = cf
-        self._fs = fs
         self._drnl_index = drnl_index
-        self._seq_size = seq_size
-        self._synapse_manager = synapse_manager
-        self._parent = parent
         self._n_buffers_in_sdram_total = n_buffers_in_sdram_total
-        self._neuron_recorder = neuron_recorder
-        self._timer_period = timer_period
-
-        self._sdram_edge_size = (
-            self._n_buffers_in_sdram_total * self._seq_size *
-            DataType.FLOAT_64.size)
-
-        self._num_data_points = n_data_points
-
-        # recording size
-        self._recording_size_per_sim_time_step = (
-            DataType.FLOAT_64.size * self.MOC_BUFFER_SIZE)
 
         # filter params
         self._filter_params = self._calculate_filter_parameters()
 
+    @property
+    @overrides(MachineVertex.label)
+    def label(self):
+        return self.DRNL_LABEL.format(self._drnl_index)
+
     @overrides(AbstractSupportsBitFieldRoutingCompression.
                key_to_atom_map_region_base_address)
     def key_to_atom_map_region_base_address(self, transceiver, placement):
@@ -271,23 +269,60 @@ class DRNLMachineVertex(
 
     @overrides(AbstractMachineSupportsAutoPauseAndResume.my_local_time_period)
     def my_local_time_period(self, simulator_time_step):
-        return self._timer_period
+        return self._context.timer_period
 
     @staticmethod
-    def get_matrix_scalar_data_types():
+    def get_matrix_scalar_data_types(moc_float32=False):
+        if moc_float32:
+            return {DRNLMachineVertex.MOC: DataType.FLOAT_32}
         return {DRNLMachineVertex.MOC: DataType.FLOAT_64}
 
     @staticmethod
-    def get_matrix_output_data_types():
+    def get_matrix_output_data_types(moc_float32=False):
+        if moc_float32:
+            return {DRNLMachineVertex.MOC: DataType.FLOAT_32}
         return {DRNLMachineVertex.MOC: DataType.FLOAT_64}
 
+    @staticmethod
+    def moc_rows_per_tick(seq_size, moc_decimation_factor):
+        """ how many moc values are recorded per timer tick, the \
+        decimation factor dividing the samples of a tick evenly
+
+        :param seq_size: the number of samples processed per tick
+        :param moc_decimation_factor: the number of samples per moc value
+        :rtype: int
+        """
+        return seq_size // moc_decimation_factor
+
     @property
     def sdram_edge_size(self):
-        return self._sdram_edge_size
+        return self._context.sdram_edge_size(self._n_buffers_in_sdram_total)
+
+    @property
+    def n_buffers_in_sdram_total(self):
+        return self._n_buffers_in_sdram_total
 
     @property
     def n_data_points(self):
-        return self._num_data_points
+        return self._context.n_data_points
+
+    @property
+    def is_host_input(self):
+        return self._context.host_input_data is not None
+
+    @property
+    def input_mode(self):
+        if self.is_host_input:
+            return self.INPUT_MODES.HOST
+        if self._context.shared_sdram_input:
+            return self.INPUT_MODES.SHARED_SDRAM
+        return self.INPUT_MODES.MULTICAST
+
+    def _host_input_data_size(self):
+        size = self._N_HOST_INPUT_HEADER_BYTES
+        if self.is_host_input:
+            size += len(self._context.host_input_data) * DataType.FLOAT_32.size
+        return size
 
     @property
     def drnl_index(self):
@@ -305,7 +340,7 @@ class DRNLMachineVertex(
 
         :return: list of 8 parameters used by the core.
         """
-        dt = 1.0 / self._fs
+        dt = 1.0 / self._context.fs
         nl_b_wq = 180.0
         nl_b_wp = 0.14
         nlin_bw = nl_b_wp * self._cf + nl_b_wq
@@ -381,26 +416,37 @@ class DRNLMachineVertex(
         # bitfield builder region
         sdram += bit_field_utilities.exact_sdram_for_bit_field_builder_region()
         # the actual size needed by sdram edge
-        sdram += self._sdram_edge_size
+        sdram += self.sdram_edge_size
         # filter params
         sdram += self.FILTER_PARAMS_IN_BYTES
         # params
         sdram += self._N_PARAMETER_BYTES
         # double params
         sdram += self._N_DOUBLE_PARAMS_BYTES
+        # host input data
+        sdram += self._host_input_data_size()
+        # shared sdram input
+        sdram += self._N_SHARED_INPUT_BYTES
         # profile
         sdram += self._profile_size()
         # synapses
-        sdram += self._synapse_manager.get_sdram_usage_in_bytes(
-            Slice(self._drnl_index, self._drnl_index + 1),
-            graph.get_edges_ending_at_vertex(self._parent),
+        sdram += self._context.parent.get_synapse_sdram_usage_in_bytes(
+            Slice(self._drnl_index, self._drnl_index + 1), graph,
             default_machine_time_step)
         # recording stuff
-        sdram += self._neuron_recorder.get_sdram_usage_in_bytes(
+        recorder = self._context.get_drnl_neuron_recorder(self._drnl_index)
+        sdram += recorder.get_sdram_usage_in_bytes(
             Slice(self._drnl_index, self._drnl_index))
-        variable_sdram = self._neuron_recorder.get_variable_sdram_usage(
+        variable_sdram = recorder.get_variable_sdram_usage(
             Slice(self._drnl_index, self._drnl_index))
 
+        # the recorder sizes a moc row per tick, but a tick records a row
+        # per decimated window of its samples
+        variable_sdram = VariableSDRAM(
+            variable_sdram.fixed,
+            variable_sdram.per_timestep * self.moc_rows_per_tick(
+                self._context.seq_size, self._context.moc_decimation_factor))
+
         # find variable sdram
         resources = ResourceContainer(
             dtcm=DTCMResource(0),
@@ -446,10 +492,12 @@ class DRNLMachineVertex(
             self.REGIONS.DOUBLE_PARAMS.value, self._N_DOUBLE_PARAMS_BYTES,
             "double params")
 
-        # reserve recording region
+        # reserve recording region, which holds only its header on a drnl
+        # not selected to record
+        recorder = self._context.get_drnl_neuron_recorder(self._drnl_index)
         spec.reserve_memory_region(
             self.REGIONS.NEURON_RECORDING.value,
-            self._neuron_recorder.get_static_sdram_usage(
+            recorder.get_static_sdram_usage(
                 Slice(self._drnl_index, self._drnl_index)),
             "recording")
 
@@ -464,6 +512,16 @@ class DRNLMachineVertex(
             self.REGIONS.FILTER_PARAMS.value,
             self.FILTER_PARAMS_IN_BYTES, "filter params")
 
+        # host input data region
+        spec.reserve_memory_region(
+            self.REGIONS.HOST_INPUT_DATA.value, self._host_input_data_size(),
+            "host input data")
+
+        # shared sdram input region
+        spec.reserve_memory_region(
+            self.REGIONS.SHARED_INPUT_SDRAM.value, self._N_SHARED_INPUT_BYTES,
+            "shared sdram input")
+
         # bitfields region
         bit_field_utilities.reserve_bit_field_regions(
             spec, machine_graph, n_key_map, vertex,
@@ -474,38 +532,46 @@ class DRNLMachineVertex(
         # handle profile stuff
         self._reserve_profile_memory_regions(spec)
 
-    def _write_param_region(self, spec, machine_graph, routing_info):
+    def _write_param_region(self, spec, routing_info):
         """ writes the param region
 
         :param spec: spec
-        :param machine_graph: machine graph
         :param routing_info: the holder of keys
         :rtype: None
         """
         spec.switch_write_focus(self.REGIONS.PARAMETERS.value)
 
-        ome_data_key = None
-        for edge in machine_graph.get_edges_ending_at_vertex(self):
-            if isinstance(edge.pre_vertex, OMEMachineVertex):
-                ome_data_key = routing_info.get_first_key_for_edge(edge)
-
-        # Write the key
-        spec.write_value(self._get_data_key(routing_info))
-
-        # write the OME data key
-        spec.write_value(ome_data_key)
-
-        # write seq size
-        spec.write_value(self._seq_size)
+        # no OME core when the input is generated on the host
+        ome_data_key = 0
+        ome_edge = self._context.graph_index.get_key_source_edge(self)
+        if ome_edge is not None:
+            ome_data_key = routing_info.get_first_key_for_edge(ome_edge)
+
+        DRNL_PARAMETERS.write(
+            spec, key=self._get_data_key(routing_info),
+            ome_data_key=ome_data_key, seq_size=self._context.seq_size,
+            n_buffers_in_sdram=self._n_buffers_in_sdram_total,
+            n_synapse_types=self.N_SYNAPSE_TYPES,
+            moc_decimation_factor=self._context.moc_decimation_factor,
+            input_mode=self.input_mode.value,
+            moc_decimation_average=int(self._context.moc_decimation_average),
+            moc_float32=int(self._context.moc_float32))
+
+    def _write_host_input_data(self, spec):
+        """ writes the host generated stapes displacement, if used
 
-        # write n buffers
-        spec.write_value(self._n_buffers_in_sdram_total)
-
-        # write n synapses
-        spec.write_value(self.N_SYNAPSE_TYPES)
-
-        # write moc resample factor
-        spec.write_value(self._fs / constants.MICRO_TO_MILLISECOND_CONVERSION)
+        :param spec: the data spec writer
+        :rtype: None
+        """
+        spec.switch_write_focus(self.REGIONS.HOST_INPUT_DATA.value)
+        if not self.is_host_input:
+            DRNL_HOST_INPUT_DATA.write(spec, n_samples=0)
+            return
+        DRNL_HOST_INPUT_DATA.write(
+            spec, n_samples=len(self._context.host_input_data))
+        spec.write_array(numpy.asarray(
+            self._context.host_input_data,
+            dtype=numpy.float32).view(numpy.uint32))
 
     def _write_double_params_region(self, spec, sim_period):
         """ writes the parameters which are double types
@@ -516,58 +582,53 @@ class DRNLMachineVertex(
 
         spec.switch_write_focus(self.REGIONS.DOUBLE_PARAMS.value)
 
-        # moc dec 1
-        dt = 1.0 / self._fs
+        dt = 1.0 / self._context.fs
+        ctbm = 1e-9 * math.pow(10.0, 32.0 / 20.0)
 
-        spec.write_value(
-            math.exp(-(dt / self.MOC_TAU_0)), data_type=DataType.FLOAT_64)
         # moc dec 2 & 3 are currently redundant as moc_factor_2 & 3 are
         # hard coded = 0 in c code - i.e. current version only uses moc
         # dec 1 and moc_factor_1
-
-        # moc dec 2
-        spec.write_value(
-            math.exp(-(dt / self.MOC_TAU_1)), data_type=DataType.FLOAT_64)
-
-        # moc dec 3
-        spec.write_value(
-            math.exp(-(dt / self.MOC_TAU_2)), data_type=DataType.FLOAT_64)
-
-        # moc_factor_1 (scaled by 1/sim time step * ratio of drnl dt and
-        # sim time step)
-        spec.write_value(
-            self.RATE_TO_ATTENTUATION_FACTOR * self.MOC_TAU_WEIGHT * dt,
-            data_type=DataType.FLOAT_64)
-
-        # ctbm
-        ctbm = 1e-9 * math.pow(10.0, 32.0 / 20.0)
-        spec.write_value(ctbm, data_type=DataType.FLOAT_64)
-
-        # recip_ctbm
-        spec.write_value(1.0 / ctbm, data_type=DataType.FLOAT_64)
-
-        # disp_thresh
-        spec.write_value(ctbm / 30e4, data_type=DataType.FLOAT_64)
-
-    def _write_sdram_edge_region(self, spec, machine_graph):
+        DRNL_DOUBLE_PARAMS.write(
+            spec, moc_dec_1=math.exp(-(dt / self.MOC_TAU_0)),
+            moc_dec_2=math.exp(-(dt / self.MOC_TAU_1)),
+            moc_dec_3=math.exp(-(dt / self.MOC_TAU_2)),
+            # scaled by 1/sim time step * ratio of drnl dt and sim time step
+            moc_factor_1=(
+                self.RATE_TO_ATTENTUATION_FACTOR * self.MOC_TAU_WEIGHT * dt),
+            ctbm=ctbm, receip_ctbm=1.0 / ctbm, disp_thresh=ctbm / 30e4)
+
+    def _write_sdram_edge_region(self, spec):
         """ writes data for the sdram edge reading
 
         :param spec: the data spec writer
-        :param machine_graph: the machine graph
         :rtype: None
         """
 
         spec.switch_write_focus(self.REGIONS.SDRAM_EDGE_ADDRESS.value)
-        for edge in machine_graph.get_edges_starting_at_vertex(self):
-            partition = machine_graph.get_outgoing_partition_for_edge(edge)
-            if (isinstance(partition, AbstractSDRAMPartition) and
-                    partition.identifier == self.DRNL_SDRAM_PARTITION_ID):
-                spec.write_value(partition.sdram_base_address)
-                spec.write_value(partition.total_sdram_requirements())
-                spec.write_value(
-                    partition.total_sdram_requirements() /
-                    DataType.FLOAT_64.size)
-                break
+        partition = self._context.graph_index.get_outgoing_sdram_partition(
+            self)
+        if partition is not None:
+            sdram_edge_size = partition.total_sdram_requirements()
+            DRNL_SDRAM_EDGE.write(
+                spec, sdram_base_address=partition.sdram_base_address,
+                sdram_edge_size=sdram_edge_size,
+                n_elements=sdram_edge_size // DataType.FLOAT_64.size)
+
+    def _write_shared_input_region(self, spec):
+        """ writes where the shared sdram ring buffer from the OME is
+
+        :param spec: the data spec writer
+        :rtype: None
+        """
+        spec.switch_write_focus(self.REGIONS.SHARED_INPUT_SDRAM.value)
+        partition = self._context.graph_index.get_incoming_sdram_partition(
+            self)
+        if partition is None:
+            DRNL_SHARED_INPUT.write(spec, sdram_base_address=0, n_buffers=0)
+            return
+        DRNL_SHARED_INPUT.write(
+            spec, sdram_base_address=partition.sdram_base_address,
+            n_buffers=OMEMachineVertex.N_SDRAM_BROADCAST_BUFFERS)
 
     def _write_filter_params(self, spec):
         """ writes the filter params
@@ -576,8 +637,7 @@ class DRNLMachineVertex(
         :rtype: None
         """
         spec.switch_write_focus(self.REGIONS.FILTER_PARAMS.value)
-        for param in self._filter_params:
-            spec.write_value(param, data_type=DataType.FLOAT_64)
+        DRNL_FILTER_PARAMS.write_values(spec, self._filter_params)
 
     @inject_items({
         "time_period_map": "MachineTimeStepMap",
@@ -612,7 +672,7 @@ class DRNLMachineVertex(
             time_scale_factor))
 
         # params
-        self._write_param_region(spec, machine_graph, routing_info)
+        self._write_param_region(spec, routing_info)
 
         # float params
         self._write_double_params_region(spec, time_period_map[self])
@@ -621,7 +681,13 @@ class DRNLMachineVertex(
         self._write_filter_params(spec)
 
         # sdram edge
-        self._write_sdram_edge_region(spec, machine_graph)
+        self._write_sdram_edge_region(spec)
+
+        # host generated input
+        self._write_host_input_data(spec)
+
+        # shared sdram input
+        self._write_shared_input_region(spec)
 
         # only write params if used
         self._write_profile_dsg(spec)
@@ -637,12 +703,13 @@ class DRNLMachineVertex(
             self.REGIONS.BIT_FIELD_KEY_MAP.value)
 
         # Write the recording regions
-        self._neuron_recorder.write_neuron_recording_region(
+        recorder = self._context.get_drnl_neuron_recorder(self._drnl_index)
+        recorder.write_neuron_recording_region(
             spec, self.REGIONS.NEURON_RECORDING.value,
             Slice(self._drnl_index, self._drnl_index),
             data_n_time_steps)
 
-        self._synapse_manager.write_data_spec(
+        self._context.synapse_manager.write_data_spec(
             spec, graph_mapper.get_application_vertex(self),
             Slice(self._drnl_index, self._drnl_index), self, placement,
             machine_graph, application_graph, routing_info, graph_mapper,
@@ -655,10 +722,10 @@ class DRNLMachineVertex(
             self.REGIONS.CONNECTOR_BUILDER.value)
 
         self.__on_chip_generatable_offset = \
-            self._synapse_manager.host_written_matrix_size
+            self._context.synapse_manager.host_written_matrix_size
 
         self.__on_chip_generatable_size = \
-            self._synapse_manager.on_chip_written_matrix_size
+            self._context.synapse_manager.on_chip_written_matrix_size
 
         # End the specification
         spec.end_specification()
@@ -668,7 +735,8 @@ class DRNLMachineVertex(
 
     @overrides(AbstractReceiveBuffersToHost.get_recorded_region_ids)
     def get_recorded_region_ids(self):
-        return self._neuron_recorder.recorded_region_ids
+        return self._context.get_drnl_neuron_recorder(
+            self._drnl_index).recorded_region_ids
 
     @overrides(AbstractReceiveBuffersToHost.get_recording_region_base_address)
     def get_recording_region_base_address(self, txrx, placement):
@@ -13,8 +13,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from pacman.model.graphs.common import EdgeTrafficType
 from pacman.model.graphs.machine import MachineVertex
+from pacman.model.resources import ConstantSDRAM
 from pacman.model.resources.resource_container import ResourceContainer
 from pacman.model.resources.dtcm_resource import DTCMResource
 from pacman.model.resources.cpu_cycles_per_tick_resource \
@@ -46,8 +46,18 @@ from spinn_front_end_common.interface.simulation import simulation_utilities
 
 from spinnak_ear.spinnak_ear_machine_vertices.abstract_ear_profiled import \
     AbstractEarProfiled
-from spinnak_ear.spinnak_ear_machine_vertices.drnl_machine_vertex import \
-    DRNLMachineVertex
+from spinnak_ear.spinnak_ear_utilities.packed_spikes import \
+    decode_packed_spikes, packed_spike_words_per_row
+from spinnak_ear.spinnak_ear_utilities.quantized_probabilities import \
+    dequantize_probabilities, quantized_words_per_row
+from spinnak_ear.spinnak_ear_utilities.ear_region_schemas import \
+    IHCAN_PARAMETERS, IHCAN_PACKED_SPIKES, IHCAN_QUANTIZED_SPIKE_PROB, \
+    IHCAN_DT_PARAMS, IHCAN_SDRAM_EDGE, IHCAN_CILIA_PARAMS, \
+    IHCAN_INNER_EAR_PARAMS, IHCAN_FIXED_POINT_PARAMS
+from spinnak_ear.spinnak_ear_utilities.fixed_point import to_s1615, to_u032
+from spinnak_ear.spinnak_ear_utilities.ihcan_lookup_tables import \
+    LOOKUP_TABLE_DTCM_BYTES, apical_conductance, calcium_activation, \
+    ihcan_lookup_tables, lookup_table_region
 
 from enum import Enum
 import numpy
@@ -66,50 +76,26 @@ class IHCANMachineVertex(
 
     __slots__ = [
 
-        # which ear (left or right)
-        "_ear_index",
+        # the ear wide parameters and tables shared by every ihcan
+        "_context",
 
-        # ????
-        "_re_sample_factor",
-
-        # sample freq
-        "_fs",
-
-        # ?????????
-        "_dt",
-
-        # n atoms in this vertex (inner hair cells?)
-        "_n_atoms",
-
-        # n low freq hair cells in here
-        "_n_lsr",
-
-        # n medium freq hair cells in here
-        "_n_msr",
-
-        # n high freq hair cells in here
-        "_n_hsr",
-
-        # the seg size
-        "_seq_size",
-
-        # data points.....
-        "_num_data_points",
-
-        # seed for random
-        "_seed",
+        # the index of this ihcan in the ear, into the context tables
+        "_ihcan_index",
 
         # the number of distinct buffers in the sdram
         "_n_buffers_in_sdram_total",
 
-        # the ihcan recorder
-        "_ihcan_neuron_recorder",
+        # bool flag for profiling
+        "_profile",
+
+        # the profile region id
+        "_profile_region",
 
-        # the slice of atoms for this ihcan vertex from the global atoms
-        "_ihcan_recording_atom_slice",
+        # the number of profile samples
+        "_n_profile_samples",
 
-        # timer period
-        "_timer_period"
+        # the profiled timer times
+        "_process_profile_times"
     ]
 
     # converts voltage into release rate
@@ -202,26 +188,70 @@ class IHCANMachineVertex(
     # ???????????????
     AN_REPRO_HSR = (AN_CLEFT_HSR * _R) / _X
 
-    # The number of params for the parameters region
-    # 1. resampling factor, 2. n fibres, 3. seg size
-    # 4. number of sdram buffers. 5. num_lsr. 6. num_msr. 7. num_hsr.
-    # 8. my_key
-    _N_PARAMETERS = 8
+    # the number of params in the synapse params region
+    _N_SYANPSE_PARAMS = 5
 
-    # the number of params for the sdram edge region
-    _N_SDRAM_EDGE_PARAMS = 1
+    # the model constants the fixed point kernel and the lookup tables are
+    # worked out from, which the float kernel otherwise builds in
+    # cilia time constant in s
+    _CILIA_TC = 0.00012
 
-    # the number of params in the dt params region
-    _N_DT_PARAMS = 2
+    # cilia displacement scale
+    _CILIA_C = 0.05
 
-    # the number of params in the synapse params region
-    _N_SYANPSE_PARAMS = 5
+    # cilia boltzmann displacements in m
+    _CILIA_U0 = 0.3e-9
+    _CILIA_U1 = 1e-9
+
+    # apical conductances in S
+    _CILIA_GA = 0.1e-9
+    _CILIA_G_MAX = 6e-9
+
+    # potassium conductance in S
+    _CILIA_GK = 2.1e-8
+
+    # endocochlear potential in V
+    _CILIA_ET = 0.1
+
+    # calcium activation per V
+    _GAMMA = 100.0
+
+    # calcium activation ratio
+    _RECIP_BETA = 1.0 / 400.0
+
+    # calcium reversal potential in V
+    _ECA = 0.066
+
+    # hair cell capacitance in F
+    _HAIR_CELL_CAPACITANCE = 5e-12
+
+    # calcium activation time constant in s
+    _TAU_M = 5e-5
+
+    # calcium current time constants in s of each fibre type
+    _TAU_CA_LSR = 200e-6
+    _TAU_CA_MSR = 350e-6
+    _TAU_CA_HSR = 500e-6
+
+    # refractory period in s
+    _REFRACTORY_PERIOD = 7.5e-4
+
+    # the units the fixed point kernel holds displacements (nm),
+    # conductances (nS) and potentials (mV) in, per SI unit
+    _NM_PER_M = 1e9
+    _NS_PER_S = 1e9
+    _MV_PER_V = 1e3
 
-    # the number of params in the cilia_constants_param region
-    _N_CILIA_PARAMS = 2
+    # the pA per A the fixed point kernel holds currents in
+    _PA_PER_A = 1e12
 
-    # the number of params in the inner ear params region
-    _N_INNER_EAR_PARAM_PARAMS = 16
+    # the packed spike region header
+    _N_PACKED_SPIKES_HEADER_WORDS = (
+        IHCAN_PACKED_SPIKES.size // constants.WORD_TO_BYTE_MULTIPLIER)
+
+    # the quantized spike prob region header
+    _N_QUANTIZED_SPIKE_PROB_HEADER_WORDS = (
+        IHCAN_QUANTIZED_SPIKE_PROB.size // constants.WORD_TO_BYTE_MULTIPLIER)
 
     # the number of elements in the seeds
     N_SEEDS_PER_IHCAN_VERTEX = 4
@@ -244,7 +274,11 @@ class IHCANMachineVertex(
                ('NEURON_RECORDING', 6),
                ('SDRAM_EDGE', 7),
                ('PROFILE', 8),
-               ('PROVENANCE', 9)])
+               ('PROVENANCE', 9),
+               ('PACKED_SPIKES', 10),
+               ('QUANTIZED_SPIKE_PROB', 11),
+               ('FIXED_POINT_PARAMS', 12),
+               ('LOOKUP_TABLES', 13)])
 
     # provenance items
     EXTRA_PROVENANCE_DATA_ENTRIES = Enum(
@@ -256,7 +290,8 @@ class IHCANMachineVertex(
                ("DATA_WRITE_COUNT_SPIKE_PROB", 4),
                ("MC_RX_COUNT", 5),
                ("MC_TRANSMISSION_COUNT", 6),
-               ("N_PROVENANCE_ELEMENTS", 7)])
+               ("PEAK_BUFFER_OCCUPANCY", 7),
+               ("N_PROVENANCE_ELEMENTS", 8)])
 
     # recording regions
     RECORDING_REGIONS = Enum(
@@ -280,70 +315,192 @@ class IHCANMachineVertex(
         SPIKE_PROB: "%"
     }
 
-    # fibres error
-    N_FIBRES_ERROR = (
-        "Only {} fibres can be modelled per IHCAN, currently requesting {} "
-        "lsr, {}msr, {}hsr")
+    # the label of an ihcan, made as needed
+    IHCAN_LABEL = "IHCAN Node {}"
+
+    # message when the drnl ring buffer overflowed
+    BUFFER_OCCUPANCY_WARNING = (
+        "The IHCAN {} on {}, {}, {} had {} unread segments in a sdram ring "
+        "buffer of {} segments, so segments were overwritten before being "
+        "read. Please increase n_buffers_in_sdram_total or leave it as None "
+        "to size it automatically")
 
     # message when recording not complete
     RECORDING_WARNING = (
         "recording not complete, reduce Fs or disable RT!\n recorded output "
         "length:{}, expected length:{} at placement:{},{},{}")
 
-    def __init__(
-            self, resample_factor, seed, n_fibres, ear_index, profile, fs,
-            n_lsr, n_msr, n_hsr, n_buffers_in_sdram_total, seq_size,
-            ihcan_neuron_recorder, ihcan_atom_slice, timer_period):
+    def __init__(self, context, ihcan_index, n_buffers_in_sdram_total):
         """ constructor
 
-        :param resample_factor: resample factor
-        :param seed: the seed used for its random number generator in SpiNNaker
-        :param n_fibres: how many fibres to simulate
-        :param ear_index: which ear its based on
-        :param profile: bool flag for profiling
-        :param fs: sample freq
-        :param n_lsr: number of low freq hair cells
-        :param n_msr: number of med freq hair cells
-        :param n_hsr: number of high freq hair cells
+        :param context: the ear wide parameters and tables shared by every \
+        ihcan of the ear
+        :param ihcan_index: the index of this ihcan in the ear
         :param n_buffers_in_sdram_total: the total number of sdram buffers in \
         the sdram edge
-        :param seg_size: the seq size
-        :param ihcan_neuron_recorder: recorder for the ihcan recordings
-        :param ihcan_atom_slice: the slice of atoms for the ihcan vertex from \
-        the global.
         """
 
-        MachineVertex.__init__(self, label="IHCAN Node", constraints=None)
+        # the label is made as needed, so the base holds the shared format
+        # rather than making a string for every vertex from None
+        MachineVertex.__init__(self, label=self.IHCAN_LABEL, constraints=None)
         AbstractProvidesNKeysForPartition.__init__(self)
-        AbstractEarProfiled.__init__(self, profile, self.REGIONS.PROFILE.value)
+        AbstractEarProfiled.__init__(
+            self, context.profile, self.REGIONS.PROFILE.value)
         ProvidesProvenanceDataFromMachineImpl.__init__(self)
         AbstractHasAssociatedBinary.__init__(self)
         AbstractGeneratesDataSpecification.__init__(self)
         AbstractReceiveBuffersToHost.__init__(self)
 
-        self._ihcan_neuron_recorder = ihcan_neuron_recorder
-        self._ihcan_recording_atom_slice = ihcan_atom_slice
-        self._ear_index = ear_index
-
-        self._re_sample_factor = resample_factor
-        self._fs = fs
-        self._dt = 1.0 / self._fs
-        self._n_atoms = n_fibres
+        self._context = context
+        self._ihcan_index = ihcan_index
         self._n_buffers_in_sdram_total = n_buffers_in_sdram_total
-        self._seq_size = seq_size
-        self._timer_period = timer_period
 
-        if n_lsr + n_msr + n_hsr > n_fibres:
-            raise Exception(
-                self.N_FIBRES_ERROR.format(n_fibres, n_lsr, n_msr, n_hsr))
+    @property
+    @overrides(MachineVertex.label)
+    def label(self):
+        return self.IHCAN_LABEL.format(self._ihcan_index)
+
+    @property
+    def _packed_spikes_size(self):
+        """ the size in bytes of the packed spike region
+        """
+        return (
+            self._N_PACKED_SPIKES_HEADER_WORDS +
+            self._context.get_n_packed_spike_rows(self._ihcan_index) *
+            packed_spike_words_per_row(
+                self.recorded_slice().n_atoms)) * \
+            constants.WORD_TO_BYTE_MULTIPLIER
+
+    def read_packed_spikes(self, reader, placement):
+        """ reads the packed spikes recorded by this core
+
+        :param reader: the MachineMemoryReader to read with
+        :param placement: the placement of this vertex
+        :return: the header of the region and the bytes of its rows
+        :rtype: tuple(dict, bytearray)
+        """
+        return self._read_recorded_rows(
+            reader, placement, self.REGIONS.PACKED_SPIKES.value,
+            IHCAN_PACKED_SPIKES)
+
+    def decode_packed_spikes(self, header, data):
+        """ decodes the packed spikes read from this core
+
+        :param header: the header of the region, as read_packed_spikes \
+        gives it
+        :param data: the bytes of its rows
+        :return: numpy array of (id, time) pairs
+        """
+        recorded_slice = self.recorded_slice()
+        return decode_packed_spikes(
+            data, int(header["n_rows_recorded"]), recorded_slice.n_atoms,
+            recorded_slice.lo_atom,
+            self._context.timer_period /
+            constants.MICRO_TO_MILLISECOND_CONVERSION)
+
+    @staticmethod
+    def _read_recorded_rows(reader, placement, region, schema):
+        """ reads the header of a region this core records into itself \
+        and the rows recorded after it
+
+        :param reader: the MachineMemoryReader to read with
+        :param placement: the placement of this vertex
+        :param region: the region
+        :param schema: the schema of the header of the region
+        :return: the header and the bytes of the rows
+        :rtype: tuple(dict, bytearray)
+        """
+        address = reader.locate_memory_region(placement, region)
+        header = schema.unpack(reader.read_memory(
+            placement.x, placement.y, address, schema.size))
+        data = reader.read_memory(
+            placement.x, placement.y, address + schema.size,
+            int(header["n_rows_recorded"]) *
+            int(header["n_words_per_row"]) *
+            constants.WORD_TO_BYTE_MULTIPLIER)
+        return header, data
 
-        self._n_lsr = n_lsr
-        self._n_msr = n_msr
-        self._n_hsr = n_hsr
-        self._seed = seed
+    @property
+    def _quantized_spike_prob_size(self):
+        """ the size in bytes of the quantized spike prob region
+        """
+        size = self._N_QUANTIZED_SPIKE_PROB_HEADER_WORDS
+        n_rows = self._context.get_n_quantized_spike_prob_rows(
+            self._ihcan_index)
+        if n_rows:
+            size += n_rows * \
+                quantized_words_per_row(
+                    self.recorded_slice().n_atoms,
+                    self._context.spike_prob_data_type)
+        return size * constants.WORD_TO_BYTE_MULTIPLIER
+
+    def read_quantized_spike_probs(self, reader, placement):
+        """ reads the quantized spike probabilities recorded by this core
+
+        :param reader: the MachineMemoryReader to read with
+        :param placement: the placement of this vertex
+        :return: the header of the region and the bytes of its rows
+        :rtype: tuple(dict, bytearray)
+        """
+        return self._read_recorded_rows(
+            reader, placement, self.REGIONS.QUANTIZED_SPIKE_PROB.value,
+            IHCAN_QUANTIZED_SPIKE_PROB)
+
+    def decode_quantized_spike_probs(self, header, data):
+        """ dequantizes the spike probabilities read from this core, as a \
+        row per sample and a column per fibre
+
+        :param header: the header of the region, as \
+        read_quantized_spike_probs gives it
+        :param data: the bytes of its rows
+        :return: float32 numpy array of samples by fibres
+        """
+        n_rows = int(header["n_rows_recorded"])
+
+        # codes are release probabilities, the recorded value is the rate
+        probs = dequantize_probabilities(
+            data, n_rows, self.recorded_slice().n_atoms,
+            self._context.spike_prob_data_type,
+            self._context.resample_factor * self._context.dt,
+            float(header["full_scale"]))
+
+        # values are stored fibre major within a segment
+        n_fibres = self._context.n_fibres_per_ihcan
+        seq_size = self._context.seq_size
+        return probs.reshape(
+            n_rows, n_fibres, seq_size).transpose(0, 2, 1).reshape(
+                n_rows * seq_size, n_fibres)
+
+    def clear_quantized_spike_probs(self, transceiver, placement):
+        """ zeros the quantized spike probs recorded so far by this core
+
+        :param transceiver: the spinnman interface
+        :param placement: the placement of this vertex
+        :rtype: None
+        """
+        address = helpful_functions.locate_memory_region_for_placement(
+            placement, self.REGIONS.QUANTIZED_SPIKE_PROB.value, transceiver)
+        header_size = IHCAN_QUANTIZED_SPIKE_PROB.size
+        transceiver.write_memory(
+            placement.x, placement.y, address + header_size,
+            bytearray(self._quantized_spike_prob_size - header_size))
+
+    def clear_packed_spikes(self, transceiver, placement):
+        """ zeros the packed spikes recorded so far by this core
+
+        :param transceiver: the spinnman interface
+        :param placement: the placement of this vertex
+        :rtype: None
+        """
+        address = helpful_functions.locate_memory_region_for_placement(
+            placement, self.REGIONS.PACKED_SPIKES.value, transceiver)
+        header_size = IHCAN_PACKED_SPIKES.size
+        transceiver.write_memory(
+            placement.x, placement.y, address + header_size,
+            bytearray(self._packed_spikes_size - header_size))
 
     def recorded_slice(self):
-        return self._ihcan_recording_atom_slice
+        return self._context.get_ihcan_recording_slice(self._ihcan_index)
 
     @staticmethod
     def get_matrix_scalar_data_types():
@@ -355,7 +512,7 @@ class IHCANMachineVertex(
 
     @overrides(AbstractMachineSupportsAutoPauseAndResume.my_local_time_period)
     def my_local_time_period(self, simulator_time_step):
-        return self._timer_period
+        return self._context.timer_period
 
     @property
     @overrides(ProvidesProvenanceDataFromMachineImpl._n_additional_data_items)
@@ -391,6 +548,8 @@ class IHCANMachineVertex(
             self.EXTRA_PROVENANCE_DATA_ENTRIES.MC_RX_COUNT.value]
         mc_transmission_count = provenance_data[
             self.EXTRA_PROVENANCE_DATA_ENTRIES.MC_TRANSMISSION_COUNT.value]
+        peak_buffer_occupancy = provenance_data[
+            self.EXTRA_PROVENANCE_DATA_ENTRIES.PEAK_BUFFER_OCCUPANCY.value]
 
         label, x, y, p, names = self._get_placement_details(placement)
 
@@ -414,6 +573,13 @@ class IHCANMachineVertex(
         provenance_items.append(ProvenanceDataItem(
             self._add_name(names, "how many multicast packets sent"),
             mc_transmission_count))
+        provenance_items.append(ProvenanceDataItem(
+            self._add_name(names, "peak sdram buffer occupancy"),
+            peak_buffer_occupancy,
+            report=peak_buffer_occupancy > self._n_buffers_in_sdram_total,
+            message=self.BUFFER_OCCUPANCY_WARNING.format(
+                label, x, y, p, peak_buffer_occupancy,
+                self._n_buffers_in_sdram_total)))
         return provenance_items
 
     @property
@@ -425,85 +591,139 @@ class IHCANMachineVertex(
 
         # params + cilia + inner ear + seeds + sdram edge + DT elements +
         # synapse
-        sdram_params = (
-            self._N_PARAMETERS + self._N_CILIA_PARAMS + self._N_DT_PARAMS +
-            + self._N_INNER_EAR_PARAM_PARAMS + self._N_SDRAM_EDGE_PARAMS +
-            self.N_SEEDS_PER_IHCAN_VERTEX)
-        sdram += sdram_params * constants.WORD_TO_BYTE_MULTIPLIER
+        sdram += (
+            IHCAN_PARAMETERS.size + IHCAN_CILIA_PARAMS.size +
+            IHCAN_DT_PARAMS.size + IHCAN_INNER_EAR_PARAMS.size +
+            IHCAN_SDRAM_EDGE.size +
+            self.N_SEEDS_PER_IHCAN_VERTEX * constants.WORD_TO_BYTE_MULTIPLIER)
 
         # profile region
         sdram += self._profile_size()
 
+        # packed spike region
+        sdram += self._packed_spikes_size
+
+        # quantized spike prob region
+        sdram += self._quantized_spike_prob_size
+
+        # fixed point constants region
+        if self._context.ihcan_fixed_point:
+            sdram += IHCAN_FIXED_POINT_PARAMS.size
+
+        # lookup table region
+        sdram += LOOKUP_TABLE_DTCM_BYTES
+
         # provenance region
         sdram += self.get_provenance_data_size(
             self.EXTRA_PROVENANCE_DATA_ENTRIES.N_PROVENANCE_ELEMENTS.value)
 
         # recording region
         # recording stuff
-        sdram += self._ihcan_neuron_recorder.get_sdram_usage_in_bytes(
-            self._ihcan_recording_atom_slice)
-        variable_sdram = self._ihcan_neuron_recorder.get_variable_sdram_usage(
-            self._ihcan_recording_atom_slice)
+        recorder = self._context.get_ihcan_neuron_recorder(
+            self._ihcan_index)
+        sdram += recorder.get_sdram_usage_in_bytes(self.recorded_slice())
+        variable_sdram = recorder.get_variable_sdram_usage(
+            self.recorded_slice())
 
         resources = ResourceContainer(
             dtcm=DTCMResource(0),
-            sdram=variable_sdram,
+            sdram=variable_sdram + ConstantSDRAM(sdram),
             cpu_cycles=CPUCyclesPerTickResource(0),
             iptags=[], reverse_iptags=[])
         return resources
 
     @overrides(AbstractHasAssociatedBinary.get_binary_file_name)
     def get_binary_file_name(self):
+        if self._context.ihcan_fixed_point:
+            return "SpiNNakEar_IHCAN_fixed.aplx"
         return "SpiNNakEar_IHCAN.aplx"
 
     @overrides(AbstractHasAssociatedBinary.get_binary_start_type)
     def get_binary_start_type(self):
         return ExecutableType.USES_SIMULATION_INTERFACE
 
+    @property
+    def ihcan_index(self):
+        return self._ihcan_index
+
+    @property
+    def n_lsr(self):
+        return self._context.get_ihcan_fibre_counts(self._ihcan_index)[0]
+
+    @property
+    def n_msr(self):
+        return self._context.get_ihcan_fibre_counts(self._ihcan_index)[1]
+
+    @property
+    def n_hsr(self):
+        return self._context.get_ihcan_fibre_counts(self._ihcan_index)[2]
+
     @property
     def n_atoms(self):
-        return self._n_atoms
+        return self._context.n_fibres_per_ihcan
 
     @overrides(AbstractProvidesNKeysForPartition.get_n_keys_for_partition)
     def get_n_keys_for_partition(self, partition, graph_mapper):
-        return self._n_atoms
-
-    def _fill_in_sdram_edge_region(self, spec, machine_graph):
-        sdram_partition = None
-        for edge in machine_graph.get_edges_ending_at_vertex(self):
-            if isinstance(edge.pre_vertex, DRNLMachineVertex):
-                if edge.traffic_type == EdgeTrafficType.SDRAM:
-                    sdram_partition = \
-                        machine_graph.get_outgoing_partition_for_edge(edge)
+        return self._context.n_fibres_per_ihcan
+
+    def _fill_in_sdram_edge_region(self, spec):
+        sdram_partition = \
+            self._context.graph_index.get_incoming_sdram_partition(self)
         spec.switch_write_focus(self.REGIONS.SDRAM_EDGE.value)
-        spec.write_value(sdram_partition.sdram_base_address)
+        IHCAN_SDRAM_EDGE.write(
+            spec, sdram_base_address=sdram_partition.sdram_base_address)
 
     def _fill_in_parameter_region(self, spec, routing_info):
 
         # write parameters
         spec.switch_write_focus(self.REGIONS.PARAMETERS.value)
+        n_lsr, n_msr, n_hsr = self._context.get_ihcan_fibre_counts(
+            self._ihcan_index)
+        IHCAN_PARAMETERS.write(
+            spec, resampling_factor=self._context.resample_factor,
+            number_fibres=self._context.n_fibres_per_ihcan,
+            seg_size=self._context.seq_size,
+            number_of_sdram_buffers=self._n_buffers_in_sdram_total,
+            num_lsr=n_lsr, num_msr=n_msr, num_hsr=n_hsr,
+            my_key=routing_info.get_first_key_from_pre_vertex(
+                self, self.IHCAN_PARTITION_ID))
+
+    def _fill_in_packed_spikes_region(self, spec):
+        """ writes the packed spike region header, leaving the rows zeroed
 
-        # Write the spike resample factor
-        spec.write_value(self._re_sample_factor)
-
-        # write n fibres
-        spec.write_value(self._n_atoms)
-
-        # write seg size
-        spec.write_value(self._seq_size)
-
-        # write n sdram buffers
-        spec.write_value(self._n_buffers_in_sdram_total)
+        :param spec: dsg
+        :rtype: None
+        """
+        spec.switch_write_focus(self.REGIONS.PACKED_SPIKES.value)
+        IHCAN_PACKED_SPIKES.write(
+            spec, n_words_per_row=packed_spike_words_per_row(
+                self.recorded_slice().n_atoms),
+            n_rows=self._context.get_n_packed_spike_rows(
+                self._ihcan_index), n_rows_recorded=0)
 
-        # Write number of spontaneous fibres
-        spec.write_value(int(self._n_lsr))
-        spec.write_value(int(self._n_msr))
-        spec.write_value(int(self._n_hsr))
+    def _fill_in_quantized_spike_prob_region(self, spec):
+        """ writes the quantized spike prob region header, leaving the \
+        rows zeroed
 
-        # Write the routing key
-        key = routing_info.get_first_key_from_pre_vertex(
-            self, self.IHCAN_PARTITION_ID)
-        spec.write_value(key)
+        :param spec: dsg
+        :rtype: None
+        """
+        spec.switch_write_focus(self.REGIONS.QUANTIZED_SPIKE_PROB.value)
+        bytes_per_value = 0
+        n_words_per_row = 0
+        n_rows = self._context.get_n_quantized_spike_prob_rows(
+            self._ihcan_index)
+        if n_rows:
+            bytes_per_value = self._context.spike_prob_data_type.size
+            n_words_per_row = quantized_words_per_row(
+                self.recorded_slice().n_atoms,
+                self._context.spike_prob_data_type)
+        IHCAN_QUANTIZED_SPIKE_PROB.write(
+            spec, bytes_per_value=bytes_per_value,
+            full_scale=self._context.spike_prob_full_scale,
+            n_words_per_row=n_words_per_row,
+            n_rows=n_rows,
+            n_rows_recorded=0)
 
     def _fill_in_cilia_parameter_region(self, spec):
         """ writes cilia recips constants
@@ -512,8 +732,8 @@ class IHCANMachineVertex(
         :rtype: None
         """
         spec.switch_write_focus(self.REGIONS.CILIA_PARAMS.value)
-        spec.write_value(self.CILIA_RECIPS0, DataType.FLOAT_32)
-        spec.write_value(self.CILIA_RECIPS1, DataType.FLOAT_32)
+        IHCAN_CILIA_PARAMS.write(
+            spec, recips0=self.CILIA_RECIPS0, recips1=self.CILIA_RECIPS1)
 
     def _fill_in_inner_ear_parameter_region(self, spec):
         """ writes the inner ear constants
@@ -522,22 +742,12 @@ class IHCANMachineVertex(
         :rtype: None
         """
         spec.switch_write_focus(self.REGIONS.INNER_EAR_PARAMS.value)
-        spec.write_value(self.AN_CLEFT_LSR, DataType.FLOAT_32)
-        spec.write_value(self.AN_CLEFT_MSR, DataType.FLOAT_32)
-        spec.write_value(self.AN_CLEFT_HSR, DataType.FLOAT_32)
-        spec.write_value(self.AN_AVAIL_LSR, DataType.FLOAT_32)
-        spec.write_value(self.AN_AVAIL_MSR, DataType.FLOAT_32)
-        spec.write_value(self.AN_AVAIL_HSR, DataType.FLOAT_32)
-        spec.write_value(self.AN_REPRO_LSR, DataType.FLOAT_32)
-        spec.write_value(self.AN_REPRO_MSR, DataType.FLOAT_32)
-        spec.write_value(self.AN_REPRO_HSR, DataType.FLOAT_32)
-        spec.write_value(self.IHCV, DataType.FLOAT_32)
-        spec.write_value(self.M_ICA_CURR, DataType.FLOAT_32)
-        spec.write_value(self.EKP, DataType.FLOAT_32)
-        spec.write_value(self.CA_CURR_LSR, DataType.FLOAT_32)
-        spec.write_value(self.CA_CURR_MSR, DataType.FLOAT_32)
-        spec.write_value(self.CA_CURR_HSR, DataType.FLOAT_32)
-        spec.write_value(self.R_MAX_RECIP, DataType.FLOAT_32)
+        IHCAN_INNER_EAR_PARAMS.write_values(spec, [
+            self.AN_CLEFT_LSR, self.AN_CLEFT_MSR, self.AN_CLEFT_HSR,
+            self.AN_AVAIL_LSR, self.AN_AVAIL_MSR, self.AN_AVAIL_HSR,
+            self.AN_REPRO_LSR, self.AN_REPRO_MSR, self.AN_REPRO_HSR,
+            self.IHCV, self.M_ICA_CURR, self.EKP, self.CA_CURR_LSR,
+            self.CA_CURR_MSR, self.CA_CURR_HSR, self.R_MAX_RECIP])
 
     def _fill_in_dt_param_region(self, spec):
         """ writes the dt based constants
@@ -546,8 +756,112 @@ class IHCANMachineVertex(
         :rtype: None
         """
         spec.switch_write_focus(self.REGIONS.DT_BASED_PARAMS.value)
-        spec.write_value(self._dt, DataType.FLOAT_32)
-        spec.write_value(self.Z, DataType.FLOAT_32)
+        IHCAN_DT_PARAMS.write(spec, dt=self._context.dt, z=self.Z)
+
+    def _fill_in_fixed_point_region(self, spec):
+        """ writes the constants of the fixed point kernel, in the units \
+        and formats it works in
+
+        :param spec: the specification writer
+        :rtype: None
+        """
+        dt = self._context.dt
+        dt_spikes = self._context.resample_factor * dt
+        spec.switch_write_focus(self.REGIONS.FIXED_POINT_PARAMS.value)
+        IHCAN_FIXED_POINT_PARAMS.write(
+            spec,
+            cilia_feedback=to_s1615(
+                (dt / self._CILIA_TC - 1.0) - dt / self._CILIA_TC),
+            cilia_c=to_u032(self._CILIA_C),
+            cilia_u0=to_s1615(self._CILIA_U0 * self._NM_PER_M),
+            cilia_u1=to_s1615(self._CILIA_U1 * self._NM_PER_M),
+            cilia_recips0=to_s1615(self.CILIA_RECIPS0 / self._NM_PER_M),
+            cilia_recips1=to_s1615(self.CILIA_RECIPS1 / self._NM_PER_M),
+            cilia_ga=to_s1615(self._CILIA_GA * self._NS_PER_S),
+            cilia_g_max=to_s1615(self._CILIA_G_MAX * self._NS_PER_S),
+            cilia_gk=to_s1615(self._CILIA_GK * self._NS_PER_S),
+            cilia_et=to_s1615(self._CILIA_ET * self._MV_PER_V),
+            ekp=to_s1615(self.EKP * self._MV_PER_V),
+            cilia_dt_cap=to_u032(
+                dt / self._HAIR_CELL_CAPACITANCE * self._MV_PER_V /
+                self._PA_PER_A),
+            gamma=to_u032(self._GAMMA / self._MV_PER_V),
+            recip_beta=to_u032(self._RECIP_BETA),
+            dt_tau_m=to_s1615(dt / self._TAU_M),
+            ihcv=to_s1615(self.IHCV * self._MV_PER_V),
+            m_ica_curr=to_u032(self.M_ICA_CURR),
+            eca=to_s1615(self._ECA * self._MV_PER_V),
+            ca_gain=to_u032(self._GMAXCA * self.Z * dt / self._MV_PER_V),
+            ca_decay_lsr=to_u032(dt / self._TAU_CA_LSR),
+            ca_decay_msr=to_u032(dt / self._TAU_CA_MSR),
+            ca_decay_hsr=to_u032(dt / self._TAU_CA_HSR),
+            ca_rate_root_lsr=to_s1615(-self.CA_CURR_LSR * self.Z),
+            ca_rate_root_msr=to_s1615(-self.CA_CURR_MSR * self.Z),
+            ca_rate_root_hsr=to_s1615(-self.CA_CURR_HSR * self.Z),
+            an_cleft_lsr=to_s1615(self.AN_CLEFT_LSR),
+            an_cleft_msr=to_s1615(self.AN_CLEFT_MSR),
+            an_cleft_hsr=to_s1615(self.AN_CLEFT_HSR),
+            an_avail_lsr=self.AN_AVAIL_LSR,
+            an_avail_msr=self.AN_AVAIL_MSR,
+            an_avail_hsr=self.AN_AVAIL_HSR,
+            an_repro_lsr=to_s1615(self.AN_REPRO_LSR),
+            an_repro_msr=to_s1615(self.AN_REPRO_MSR),
+            an_repro_hsr=to_s1615(self.AN_REPRO_HSR),
+            max_neurotransmitters=self._MSR,
+            dt_spikes=to_u032(dt_spikes),
+            refrac_period=to_s1615(self._REFRACTORY_PERIOD / dt_spikes),
+            y_keep=to_u032(1.0 - min(self._Y * dt_spikes, 1.0)),
+            x_keep=to_u032(1.0 - self._X * dt_spikes),
+            rdt=to_u032(self._R * dt_spikes),
+            cleft_loss=to_u032((self._R + self._L) * dt_spikes))
+
+    @classmethod
+    def apical_conductance_of(cls, displacement):
+        """ the apical conductance in S the model gives a cilia \
+        displacement, as the apical conductance table holds it
+
+        :param displacement: the scaled cilia displacements in m
+        :rtype: numpy.ndarray
+        """
+        return apical_conductance(
+            displacement, cls._CILIA_U0, cls._CILIA_U1, cls.CILIA_RECIPS0,
+            cls.CILIA_RECIPS1, cls._CILIA_GA, cls._CILIA_G_MAX)
+
+    @classmethod
+    def calcium_activation_of(cls, potential):
+        """ the calcium activation the model gives a receptor potential, \
+        as the calcium activation table holds it
+
+        :param potential: the receptor potentials in V
+        :rtype: numpy.ndarray
+        """
+        return calcium_activation(potential, cls._GAMMA, cls._RECIP_BETA)
+
+    @classmethod
+    def build_lookup_tables(cls, dt_spikes):
+        """ the tables the float kernel looks up in place of the apical \
+        conductance and calcium activation exponentials and the vesicle \
+        powers
+
+        :param dt_spikes: the time in s between spike samples
+        :rtype: IhcanLookupTables
+        """
+        return ihcan_lookup_tables(
+            cls.apical_conductance_of, cls.calcium_activation_of,
+            replenish_keep=1.0 - min(cls._Y * dt_spikes, 1.0),
+            reprocessing_keep=1.0 - cls._X * dt_spikes,
+            max_neurotransmitters=cls._MSR)
+
+    def _fill_in_lookup_table_region(self, spec):
+        """ writes the lookup tables of the float kernel
+
+        :param spec: the specification writer
+        :rtype: None
+        """
+        tables = self.build_lookup_tables(
+            self._context.resample_factor * self._context.dt)
+        spec.switch_write_focus(self.REGIONS.LOOKUP_TABLES.value)
+        spec.write_array(lookup_table_region(tables))
 
     def _fill_in_seed_region(self, spec):
         """ stores seeds needed for the RNG on spinnaker
@@ -558,7 +872,9 @@ class IHCANMachineVertex(
 
         # Write the seed
         spec.switch_write_focus(self.REGIONS.RANDOM_SEEDS.value)
-        data = numpy.array(self._seed, dtype=numpy.uint32)
+        data = numpy.array(
+            self._context.get_ihc_seeds(self._ihcan_index),
+            dtype=numpy.uint32)
         spec.write_array(data.view(numpy.uint32))
 
     def _reserve_memory_regions(self, spec):
@@ -575,25 +891,24 @@ class IHCANMachineVertex(
 
         # Reserve the parameters region
         spec.reserve_memory_region(
-            self.REGIONS.PARAMETERS.value,
-            self._N_PARAMETERS * constants.WORD_TO_BYTE_MULTIPLIER, "params")
+            self.REGIONS.PARAMETERS.value, IHCAN_PARAMETERS.size, "params")
 
         # Reserve the cilia params region
         spec.reserve_memory_region(
             self.REGIONS.CILIA_PARAMS.value,
-            self._N_CILIA_PARAMS * constants.WORD_TO_BYTE_MULTIPLIER,
+            IHCAN_CILIA_PARAMS.size,
             "cilia params")
 
         # Reserve the inner ear params region
         spec.reserve_memory_region(
             self.REGIONS.INNER_EAR_PARAMS.value,
-            self._N_INNER_EAR_PARAM_PARAMS * constants.WORD_TO_BYTE_MULTIPLIER,
+            IHCAN_INNER_EAR_PARAMS.size,
             "inner ear params")
 
         # Reserve the dt based params
         spec.reserve_memory_region(
             self.REGIONS.DT_BASED_PARAMS.value,
-            self._N_DT_PARAMS * constants.WORD_TO_BYTE_MULTIPLIER,
+            IHCAN_DT_PARAMS.size,
             "dt based params")
 
         spec.reserve_memory_region(
@@ -603,17 +918,40 @@ class IHCANMachineVertex(
 
         spec.reserve_memory_region(
             self.REGIONS.SDRAM_EDGE.value,
-            self._N_SDRAM_EDGE_PARAMS * constants.WORD_TO_BYTE_MULTIPLIER,
+            IHCAN_SDRAM_EDGE.size,
             "sdram edge region")
 
         # reserve provenance data region
         self.reserve_provenance_data_region(spec)
 
-        # reserve recording region
+        # reserve packed spike region
+        spec.reserve_memory_region(
+            self.REGIONS.PACKED_SPIKES.value, self._packed_spikes_size,
+            "packed spikes")
+
+        # reserve quantized spike prob region
+        spec.reserve_memory_region(
+            self.REGIONS.QUANTIZED_SPIKE_PROB.value,
+            self._quantized_spike_prob_size, "quantized spike probs")
+
+        # reserve the fixed point constants region
+        if self._context.ihcan_fixed_point:
+            spec.reserve_memory_region(
+                self.REGIONS.FIXED_POINT_PARAMS.value,
+                IHCAN_FIXED_POINT_PARAMS.size, "fixed point params")
+
+        # reserve the lookup table region, which the kernel copies into dtcm
+        spec.reserve_memory_region(
+            self.REGIONS.LOOKUP_TABLES.value, LOOKUP_TABLE_DTCM_BYTES,
+            "lookup tables")
+
+        # reserve recording region, which holds only its header on an ihcan
+        # not selected to record
+        recorder = self._context.get_ihcan_neuron_recorder(
+            self._ihcan_index)
         spec.reserve_memory_region(
             self.REGIONS.NEURON_RECORDING.value,
-            self._ihcan_neuron_recorder.get_static_sdram_usage(
-                self._ihcan_recording_atom_slice))
+            recorder.get_static_sdram_usage(self.recorded_slice()))
 
         # profiler region
         self._reserve_profile_memory_regions(spec)
@@ -657,16 +995,31 @@ class IHCANMachineVertex(
         # fill in the dt based params region
         self._fill_in_dt_param_region(spec)
 
+        # fill in the fixed point constants
+        if self._context.ihcan_fixed_point:
+            self._fill_in_fixed_point_region(spec)
+
+        # fill in the lookup tables
+        self._fill_in_lookup_table_region(spec)
+
         # fill in the random seed region
         self._fill_in_seed_region(spec)
 
         # fill in the sdram edge data region
-        self._fill_in_sdram_edge_region(spec, machine_graph)
+        self._fill_in_sdram_edge_region(spec)
+
+        # fill in the packed spike region header
+        self._fill_in_packed_spikes_region(spec)
+
+        # fill in the quantized spike prob region header
+        self._fill_in_quantized_spike_prob_region(spec)
 
         # Write the recording regions
-        self._ihcan_neuron_recorder.write_neuron_recording_region(
+        recorder = self._context.get_ihcan_neuron_recorder(
+            self._ihcan_index)
+        recorder.write_neuron_recording_region(
             spec, self.REGIONS.NEURON_RECORDING.value,
-            self._ihcan_recording_atom_slice, data_n_time_steps)
+            self.recorded_slice(), data_n_time_steps)
 
         # Write profile regions
         self._write_profile_dsg(spec)
@@ -676,7 +1029,8 @@ class IHCANMachineVertex(
 
     @overrides(AbstractReceiveBuffersToHost.get_recorded_region_ids)
     def get_recorded_region_ids(self):
-        return self._ihcan_neuron_recorder.recorded_region_ids
+        return self._context.get_ihcan_neuron_recorder(
+            self._ihcan_index).recorded_region_ids
 
     @overrides(AbstractReceiveBuffersToHost.get_recording_region_base_address)
     def get_recording_region_base_address(self, txrx, placement):
@@ -13,10 +13,12 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from pacman.model.graphs.abstract_sdram_partition import AbstractSDRAMPartition
 from pacman.model.graphs.machine import MachineVertex
 from pacman.model.resources.resource_container import ResourceContainer
 from pacman.model.resources.dtcm_resource import DTCMResource
-from pacman.model.resources import ConstantSDRAM
+from pacman.model.resources import ConstantSDRAM, IPtagResource, \
+    ReverseIPtagResource
 from pacman.model.resources.cpu_cycles_per_tick_resource \
     import CPUCyclesPerTickResource
 from pacman.model.decorators.overrides import overrides
@@ -29,6 +31,9 @@ from spinn_front_end_common.abstract_models.abstract_has_associated_binary \
 from spinn_front_end_common.abstract_models\
     .abstract_generates_data_specification \
     import AbstractGeneratesDataSpecification
+from spinn_front_end_common.abstract_models.\
+    abstract_rewrites_data_specification import \
+    AbstractRewritesDataSpecification
 from spinn_front_end_common.abstract_models.\
     abstract_machine_supports_auto_pause_and_resume import \
     AbstractMachineSupportsAutoPauseAndResume
@@ -44,6 +49,9 @@ from spinn_front_end_common.interface.simulation import simulation_utilities
 
 from spinnak_ear.spinnak_ear_machine_vertices.abstract_ear_profiled import \
     AbstractEarProfiled
+from spinnak_ear.spinnak_ear_utilities.ear_region_schemas import \
+    OME_PARAMETERS, OME_FILTER_COEFFS, OME_CONCHA_PARAMS, \
+    OME_SDRAM_BROADCAST, OME_LIVE_INPUT
 
 from enum import Enum
 import numpy
@@ -52,7 +60,7 @@ import scipy.signal as sig
 
 class OMEMachineVertex(
         MachineVertex, AbstractEarProfiled, AbstractHasAssociatedBinary,
-        AbstractGeneratesDataSpecification,
+        AbstractGeneratesDataSpecification, AbstractRewritesDataSpecification,
         AbstractProvidesNKeysForPartition,
         AbstractMachineSupportsAutoPauseAndResume,
         ProvidesProvenanceDataFromMachineImpl):
@@ -75,32 +83,85 @@ class OMEMachineVertex(
         # filter coeffs
         "_sha",
         # timer period
-        "_timer_period"
+        "_timer_period",
+        # bool flag for writing the output into a shared sdram ring buffer
+        "_sdram_broadcast",
+        # the board port live audio arrives on, or None for recorded audio
+        "_live_input_port",
+        # the (host, port) the live input credits go to
+        "_live_input_credit_address",
+        # how many segments the live input jitter buffer holds
+        "_live_input_n_buffers",
+        # how many times the input data has been swapped since loading
+        "_input_generation",
+        # bool flag for the input data needing reloading
+        "_input_changed",
+        # bool flag for profiling
+        "_profile",
+        # the profile region id
+        "_profile_region",
+        # the number of profile samples
+        "_n_profile_samples",
+        # the profiled timer times
+        "_process_profile_times"
     ]
 
     # The number of bytes for the parameters
-    # ints 1. total_ticks, 2. seq_size, 3. key, 4. timer_tick_period
-    # floats 1. dt
-    _N_PARAMETER_BYTES = (
-        (4 * DataType.UINT32.size) + (1 * DataType.FLOAT_64.size))
+    _N_PARAMETER_BYTES = OME_PARAMETERS.size
 
-    # 1. CONCHA_GAIN_SCALAR, 2. EAR_CANAL_GAIN_SCALAR
-    _N_CONCHA_PARAMS_BYTES = 2 * DataType.FLOAT_64.size
+    # The number of bytes for the concha params
+    _N_CONCHA_PARAMS_BYTES = OME_CONCHA_PARAMS.size
 
-    # The filter coeffs
-    # 1. shb1, 2. shb2, 3. shb3, 4. sha1, 5.sha2, 6.sha3
-    _N_FILTER_COEFFS_ITEMS = 6
-    _N_FILTER_COEFFS_BYTES = _N_FILTER_COEFFS_ITEMS * DataType.FLOAT_64.size
+    # The number of bytes for the filter coeffs
+    _N_FILTER_COEFFS_BYTES = OME_FILTER_COEFFS.size
 
     # outgoing partition name from OME vertex
     OME_PARTITION_ID = "OMEData"
 
+    # outgoing sdram partition name from OME vertex to co-located drnls
+    OME_SDRAM_PARTITION_ID = "OMESDRAMData"
+
+    # how many segments the shared sdram ring buffer holds (power of 2)
+    N_SDRAM_BROADCAST_BUFFERS = 4
+
+    # sdram broadcast region
+    _N_SDRAM_BROADCAST_BYTES = OME_SDRAM_BROADCAST.size
+
+    # live input region
+    _N_LIVE_INPUT_BYTES = OME_LIVE_INPUT.size
+
+    # the sdp port live audio packets are delivered to the core on
+    LIVE_INPUT_SDP_PORT = 2
+
+    # the traffic identifiers of the live input tags
+    LIVE_INPUT_TRAFFIC_IDENTIFIER = "SpiNNakEarLiveInput"
+    LIVE_INPUT_CREDIT_TRAFFIC_IDENTIFIER = "SpiNNakEarLiveInputCredit"
+
+    # error message for swapped input data too big for the data region
+    INPUT_DATA_SIZE_ERROR = (
+        "{} samples of input data do not fit in the {} samples the data "
+        "region of {} was sized for")
+
+    # error message for a jitter buffer that is not a power of 2
+    LIVE_INPUT_N_BUFFERS_ERROR = (
+        "The live input jitter buffer holds {} segments, which is not a "
+        "power of 2")
+
     # ???????????????
     MAGIC_THREE = 10.0
     MAGIC_TWO = 700.0
 
     CONCHA_G = 0.25
 
+    # filter constants mirrored from OME_SpiNN.h for the host side filters
+    CONCHA_H = 3000.0
+    CONCHA_1 = 1500.0
+    EAR_CANAL_L = 3000.0
+    EAR_CANAL_H = 3800.0
+    STAPES_SCALAR = 5e-7
+    STAPES_1 = 10.0
+    A_RATT = 1.0
+
     # dsg regions
     REGIONS = Enum(
         value="REGIONS",
@@ -110,7 +171,9 @@ class OMEMachineVertex(
                ('DATA', 3),
                ("CONCHA_PARAMS", 4),
                ('PROFILE', 5),
-               ('PROVENANCE', 6)])
+               ('PROVENANCE', 6),
+               ('SDRAM_BROADCAST', 7),
+               ('LIVE_INPUT', 8)])
 
     # provenance items
     EXTRA_PROVENANCE_DATA_ENTRIES = Enum(
@@ -123,17 +186,47 @@ class OMEMachineVertex(
                ("A2", 5),
                ("N_PROVENANCE_ELEMENTS", 6)])
 
+    # live input provenance items, stored after the filter coeffs
+    LIVE_INPUT_PROVENANCE_DATA_ENTRIES = Enum(
+        value="LIVE_INPUT_PROVENANCE_DATA_ENTRIES",
+        names=[("N_SEGMENTS_RECEIVED", 0),
+               ("N_UNDERRUNS", 1),
+               ("N_OVERFLOWS", 2),
+               ("PEAK_OCCUPANCY", 3),
+               ("N_LIVE_INPUT_PROVENANCE_ELEMENTS", 4)])
+
+    # warning for segments the ome had to make up
+    LIVE_INPUT_UNDERRUN_WARNING = (
+        "The live input of {} ran dry {} times and played silence instead. "
+        "Please send audio faster or increase live_input_n_buffers")
+
+    # warning for segments the ome had to throw away
+    LIVE_INPUT_OVERFLOW_WARNING = (
+        "The live input of {} dropped {} segments as its jitter buffer was "
+        "full. Please respect the credits sent back to the host")
+
     def __init__(
-            self, data, fs, n_channels, seq_size, timer_period, profile=False):
+            self, data, fs, n_channels, seq_size, timer_period, profile=False,
+            sdram_broadcast=False, label="OME Node", live_input_port=None,
+            live_input_credit_address=None, live_input_n_buffers=16):
         """ constructor for OME vertex
 
         :param data: the input data
         :param fs: the sampling freq
         :param n_channels: how many channels to process
         :param profile: bool stating if profiling or now
+        :param sdram_broadcast: bool stating if the output goes through a \
+        shared sdram ring buffer with one multicast packet per segment
+        :param label: the label of the vertex
+        :param live_input_port: the board port the host sends live audio \
+        to, or None to play the recorded audio
+        :param live_input_credit_address: the (host, port) told how many \
+        segments have been played, so the sender knows when to send more
+        :param live_input_n_buffers: how many segments the live input \
+        jitter buffer holds (power of 2)
         """
 
-        MachineVertex.__init__(self, label="OME Node", constraints=None)
+        MachineVertex.__init__(self, label=label, constraints=None)
         AbstractProvidesNKeysForPartition.__init__(self)
         AbstractEarProfiled.__init__(self, profile, self.REGIONS.PROFILE.value)
         AbstractMachineSupportsAutoPauseAndResume.__init__(self)
@@ -142,19 +235,100 @@ class OMEMachineVertex(
         self._fs = fs
         self._n_channels = n_channels
         self._seq_size = seq_size
-
-        # size then list of doubles
+        self._sdram_broadcast = sdram_broadcast
+        self._live_input_port = live_input_port
+        self._live_input_credit_address = live_input_credit_address
+        self._live_input_n_buffers = live_input_n_buffers
+        self._input_generation = 0
+        self._input_changed = False
+
+        if live_input_n_buffers & (live_input_n_buffers - 1):
+            raise Exception(self.LIVE_INPUT_N_BUFFERS_ERROR.format(
+                live_input_n_buffers))
+
+        # size then list of doubles, which live audio does not need
+        n_stored_samples = len(self._data)
+        if self.live_input:
+            n_stored_samples = 0
         self._data_size = (
-            (len(self._data) * DataType.FLOAT_64.size) + DataType.UINT32.size)
+            (n_stored_samples * DataType.FLOAT_64.size) +
+            DataType.UINT32.size)
 
         # write timer period
         self._timer_period = timer_period
 
         # calculate stapes hpf coefficients
-        wn = 1.0 / self._fs * 2.0 * self.MAGIC_TWO
+        self._shb, self._sha = self.stapes_hp_filter_coeffs(self._fs)
+
+    @classmethod
+    def stapes_hp_filter_coeffs(cls, fs):
+        """ the butterworth coeffs of the stapes high pass filter
+
+        :param fs: the sampling freq
+        :return: the b and a coeffs
+        """
+        wn = 1.0 / fs * 2.0 * cls.MAGIC_TWO
 
         # noinspection PyTypeChecker
-        [self._shb, self._sha] = sig.butter(2, wn, 'high')
+        [shb, sha] = sig.butter(2, wn, 'high')
+        return shb, sha
+
+    @staticmethod
+    def _band_pass_filter_coeffs(dt, low_freq, high_freq):
+        """ the concha and ear canal filter coeffs, as built in the c code
+
+        :param dt: the time step of the audio
+        :param low_freq: the lower cut off
+        :param high_freq: the upper cut off
+        :return: the b and a coeffs
+        """
+        q = numpy.pi * dt * (high_freq - low_freq)
+        coeff_j = 1.0 / (1.0 + (1.0 / numpy.tan(q)))
+        coeff_k = (
+            2.0 * numpy.cos(numpy.pi * dt * (high_freq + low_freq))) / (
+            (1.0 + numpy.tan(q)) * numpy.cos(q))
+        coeff_l = (numpy.tan(q) - 1.0) / (numpy.tan(q) + 1.0)
+        return [coeff_j, 0.0, -coeff_j], [1.0, -coeff_k, -coeff_l]
+
+    @classmethod
+    def calculate_stapes_displacement(cls, data, fs):
+        """ runs the OME filter chain on the host, producing what the OME\
+        core would have sent to every DRNL.
+
+        :param data: the input audio
+        :param fs: the sampling freq
+        :return: the stapes displacement for each audio sample
+        :rtype: numpy.ndarray of float32
+        """
+        data = numpy.asarray(data, dtype=numpy.float64)
+        dt = 1.0 / fs
+        gain = pow(cls.MAGIC_THREE, cls.CONCHA_G)
+
+        # concha
+        b, a = cls._band_pass_filter_coeffs(dt, cls.CONCHA_1, cls.CONCHA_H)
+        ear_canal_input = gain * sig.lfilter(b, a, data) + data
+
+        # ear canal
+        b, a = cls._band_pass_filter_coeffs(
+            dt, cls.EAR_CANAL_L, cls.EAR_CANAL_H)
+        ear_canal_output = (
+            gain * sig.lfilter(b, a, ear_canal_input) + ear_canal_input)
+
+        # acoustic reflex
+        ar_output = cls.A_RATT * cls.STAPES_SCALAR * ear_canal_output
+
+        # stapes velocity
+        shb, sha = cls.stapes_hp_filter_coeffs(fs)
+        stapes_velocity = sig.lfilter(shb, sha, ar_output)
+
+        # stapes displacement
+        stapes_tau = 1.0 / (2.0 * numpy.pi * cls.STAPES_1)
+        stapes_lp_a1 = dt / stapes_tau - 1.0
+        stapes_displacement = sig.lfilter(
+            [1.0 + stapes_lp_a1], [1.0, stapes_lp_a1], stapes_velocity)
+
+        # the DRNLs work off single precision input
+        return stapes_displacement.astype(numpy.float32)
 
     @overrides(AbstractMachineSupportsAutoPauseAndResume.my_local_time_period)
     def my_local_time_period(self, simulator_time_step):
@@ -168,8 +342,12 @@ class OMEMachineVertex(
     @property
     @overrides(ProvidesProvenanceDataFromMachineImpl._n_additional_data_items)
     def _n_additional_data_items(self):
-        return (
+        # the filter coeffs are doubles, so take 2 words each
+        n_coeff_words = (
             self.EXTRA_PROVENANCE_DATA_ENTRIES.N_PROVENANCE_ELEMENTS.value * 2)
+        return n_coeff_words + (
+            self.LIVE_INPUT_PROVENANCE_DATA_ENTRIES.
+            N_LIVE_INPUT_PROVENANCE_ELEMENTS.value)
 
     @overrides(ProvidesProvenanceDataFromMachineImpl.
                get_provenance_data_from_machine)
@@ -179,8 +357,12 @@ class OMEMachineVertex(
             provenance_data, placement)
         provenance_data = self._get_remaining_provenance_data_items(
             provenance_data)
+        n_double_words = (
+            self.EXTRA_PROVENANCE_DATA_ENTRIES.N_PROVENANCE_ELEMENTS.value * 2)
+        live_input_data = provenance_data[n_double_words:]
         byte_level = numpy.asarray(
-            provenance_data, dtype="uint32").view(dtype="uint8")
+            provenance_data[:n_double_words], dtype="uint32").view(
+                dtype="uint8")
         double_level = byte_level.view(dtype=numpy.float64)
         b0 = double_level[self.EXTRA_PROVENANCE_DATA_ENTRIES.B0.value]
         b1 = double_level[self.EXTRA_PROVENANCE_DATA_ENTRIES.B1.value]
@@ -204,12 +386,92 @@ class OMEMachineVertex(
             ProvenanceDataItem(self._add_name(names, "a1"), a1))
         provenance_items.append(
             ProvenanceDataItem(self._add_name(names, "a2"), a2))
+
+        if self.live_input:
+            provenance_items.extend(
+                self._get_live_input_provenance_items(
+                    live_input_data, label, names))
         return provenance_items
 
+    def _get_live_input_provenance_items(self, live_input_data, label, names):
+        """ translates the live input counters into provenance items
+
+        :param live_input_data: the live input provenance words
+        :param label: the label of the vertex
+        :param names: the provenance names of the vertex
+        :return: the provenance items
+        """
+        n_segments_received = live_input_data[
+            self.LIVE_INPUT_PROVENANCE_DATA_ENTRIES.N_SEGMENTS_RECEIVED.value]
+        n_underruns = live_input_data[
+            self.LIVE_INPUT_PROVENANCE_DATA_ENTRIES.N_UNDERRUNS.value]
+        n_overflows = live_input_data[
+            self.LIVE_INPUT_PROVENANCE_DATA_ENTRIES.N_OVERFLOWS.value]
+        peak_occupancy = live_input_data[
+            self.LIVE_INPUT_PROVENANCE_DATA_ENTRIES.PEAK_OCCUPANCY.value]
+        return [
+            ProvenanceDataItem(
+                self._add_name(names, "live input segments received"),
+                n_segments_received),
+            ProvenanceDataItem(
+                self._add_name(names, "live input underruns"), n_underruns,
+                report=n_underruns > 0,
+                message=self.LIVE_INPUT_UNDERRUN_WARNING.format(
+                    label, n_underruns)),
+            ProvenanceDataItem(
+                self._add_name(names, "live input overflows"), n_overflows,
+                report=n_overflows > 0,
+                message=self.LIVE_INPUT_OVERFLOW_WARNING.format(
+                    label, n_overflows)),
+            ProvenanceDataItem(
+                self._add_name(names, "live input peak buffer occupancy"),
+                peak_occupancy)]
+
     @property
     def n_data_points(self):
         return len(self._data)
 
+    @property
+    def n_stored_samples(self):
+        """ how many samples the data region was sized for
+
+        :rtype: int
+        """
+        return (
+            (self._data_size - DataType.UINT32.size) //
+            DataType.FLOAT_64.size)
+
+    def set_input_data(self, data):
+        """ swaps the input data for the next run, reloading only the \
+        params and data regions. The c code plays it from its start with \
+        fresh filters when it resumes.
+
+        :param data: the new input data, no longer than the old
+        :rtype: None
+        """
+        if len(data) > self.n_stored_samples:
+            raise Exception(self.INPUT_DATA_SIZE_ERROR.format(
+                len(data), self.n_stored_samples, self.label))
+        self._data = data
+        self._input_generation += 1
+        self._input_changed = True
+
+    @property
+    def sdram_broadcast(self):
+        return self._sdram_broadcast
+
+    @property
+    def live_input(self):
+        return self._live_input_port is not None
+
+    @property
+    def sdram_broadcast_size(self):
+        """ the size of the shared sdram ring buffer of float segments
+        """
+        return (
+            self.N_SDRAM_BROADCAST_BUFFERS * self._seq_size *
+            DataType.FLOAT_32.size)
+
     @property
     @overrides(MachineVertex.resources_required)
     def resources_required(self):
@@ -223,17 +485,35 @@ class OMEMachineVertex(
         sdram += self._data_size
         # filter coeffs
         sdram += self._N_FILTER_COEFFS_BYTES
+        # sdram broadcast params
+        sdram += self._N_SDRAM_BROADCAST_BYTES
+        # the shared sdram ring buffer
+        if self._sdram_broadcast:
+            sdram += self.sdram_broadcast_size
+        # live input params
+        sdram += self._N_LIVE_INPUT_BYTES
         # profile
         sdram += self._profile_size()
         # provenance region
-        sdram += self.get_provenance_data_size(
-            self.EXTRA_PROVENANCE_DATA_ENTRIES.N_PROVENANCE_ELEMENTS.value)
+        sdram += self.get_provenance_data_size(self._n_additional_data_items)
+
+        # live audio comes in on a reverse ip tag, and credits go back out
+        iptags = []
+        reverse_iptags = []
+        if self.live_input:
+            reverse_iptags.append(ReverseIPtagResource(
+                port=self._live_input_port,
+                sdp_port=self.LIVE_INPUT_SDP_PORT))
+            host, port = self._live_input_credit_address
+            iptags.append(IPtagResource(
+                host, port, strip_sdp=True,
+                traffic_identifier=self.LIVE_INPUT_CREDIT_TRAFFIC_IDENTIFIER))
 
         resources = ResourceContainer(
             dtcm=DTCMResource(0),
             sdram=ConstantSDRAM(sdram),
             cpu_cycles=CPUCyclesPerTickResource(0),
-            iptags=[], reverse_iptags=[])
+            iptags=iptags, reverse_iptags=reverse_iptags)
         return resources
 
     @overrides(AbstractHasAssociatedBinary.get_binary_file_name)
@@ -260,24 +540,29 @@ class OMEMachineVertex(
             region=self.REGIONS.SYSTEM.value,
             size=constants.SIMULATION_N_BYTES, label='systemInfo')
 
-        # Reserve the parameters region
-        spec.reserve_memory_region(
-            self.REGIONS.PARAMETERS.value, self._N_PARAMETER_BYTES, "params")
+        # Reserve the parameters and data regions
+        self._reserve_input_data_regions(spec)
 
         # reserve the filter coeffs
         spec.reserve_memory_region(
             self.REGIONS.FILTER_COEFFS.value, self._N_FILTER_COEFFS_BYTES,
             "filter")
 
-        # reserve data region
-        spec.reserve_memory_region(
-            self.REGIONS.DATA.value, self._data_size, "data region")
-
         # reserve concha params
         spec.reserve_memory_region(
             self.REGIONS.CONCHA_PARAMS.value, self._N_CONCHA_PARAMS_BYTES,
             "concha params")
 
+        # reserve sdram broadcast params
+        spec.reserve_memory_region(
+            self.REGIONS.SDRAM_BROADCAST.value, self._N_SDRAM_BROADCAST_BYTES,
+            "sdram broadcast")
+
+        # reserve live input params
+        spec.reserve_memory_region(
+            self.REGIONS.LIVE_INPUT.value, self._N_LIVE_INPUT_BYTES,
+            "live input")
+
         # reserve provenance data region
         self.reserve_provenance_data_region(spec)
 
@@ -293,25 +578,14 @@ class OMEMachineVertex(
         """
 
         spec.switch_write_focus(self.REGIONS.PARAMETERS.value)
-
-        # Write total ticks
-        spec.write_value(len(self._data) / self._seq_size)
-
-        # write seq size
-        spec.write_value(self._seq_size)
-
-        # Write the key
-        data_key = routing_info.get_first_key_from_pre_vertex(
-            self, self.OME_PARTITION_ID)
-        spec.write_value(data_key)
-
-        # padding due to utilising a struct in the c code.
-        # NOTE DO NOT REMOVE!
-        spec.write_value(0)
-
-        # Write dt
-        dt = 1.0 / self._fs
-        spec.write_value(dt, DataType.FLOAT_64)
+        OME_PARAMETERS.write(
+            spec, total_ticks=len(self._data) // self._seq_size,
+            seg_size=self._seq_size,
+            key=routing_info.get_first_key_from_pre_vertex(
+                self, self.OME_PARTITION_ID),
+            # which the c code checks on resume for swapped data
+            input_generation=self._input_generation,
+            dt=1.0 / self._fs)
 
     def _write_filter_coeffs(self, spec):
         """ write filter coeffs to dsg
@@ -321,12 +595,8 @@ class OMEMachineVertex(
         """
 
         spec.switch_write_focus(self.REGIONS.FILTER_COEFFS.value)
-
-        # write the filter params
-        for param in self._shb:
-            spec.write_value(param, data_type=DataType.FLOAT_64)
-        for param in self._sha:
-            spec.write_value(param, data_type=DataType.FLOAT_64)
+        OME_FILTER_COEFFS.write_values(
+            spec, list(self._shb) + list(self._sha))
 
     def _write_input_data(self, spec):
         """ write input data to dsg
@@ -337,32 +607,85 @@ class OMEMachineVertex(
 
         spec.switch_write_focus(self.REGIONS.DATA.value)
 
+        # live audio arrives while running instead
+        if self.live_input:
+            return
+
         # Write the data - Arrays must be 32-bit values, so convert
         data = numpy.array(self._data, dtype=numpy.double)
         spec.write_array(data.view(numpy.uint32))
 
+    def _write_sdram_broadcast(self, spec, machine_graph):
+        """ write where the shared sdram ring buffer lives, if used
+
+        :param spec: data spec writer
+        :param machine_graph: machine graph
+        :rtype: None
+        """
+        spec.switch_write_focus(self.REGIONS.SDRAM_BROADCAST.value)
+        partition = \
+            machine_graph.get_outgoing_edge_partition_starting_at_vertex(
+                self, self.OME_SDRAM_PARTITION_ID)
+        if (not self._sdram_broadcast or
+                not isinstance(partition, AbstractSDRAMPartition)):
+            OME_SDRAM_BROADCAST.write(
+                spec, enabled=0, sdram_base_address=0, n_buffers=0)
+            return
+        OME_SDRAM_BROADCAST.write(
+            spec, enabled=1, sdram_base_address=partition.sdram_base_address,
+            n_buffers=self.N_SDRAM_BROADCAST_BUFFERS)
+
+    def _write_live_input(self, spec, tags):
+        """ write how live audio is buffered and credited, if used
+
+        :param spec: data spec writer
+        :param tags: the tags
+        :rtype: None
+        """
+        spec.switch_write_focus(self.REGIONS.LIVE_INPUT.value)
+        if not self.live_input:
+            OME_LIVE_INPUT.write_values(spec, [0, 0, 0, 0])
+            return
+        OME_LIVE_INPUT.write(
+            spec, enabled=1, n_buffers=self._live_input_n_buffers,
+            credit_tag=tags.get_ip_tags_for_vertex(self)[0].tag,
+            # credit twice per buffer so the sender never waits a whole
+            # buffer
+            segments_per_credit=max(1, self._live_input_n_buffers // 2))
+
+    def _reserve_input_data_regions(self, spec):
+        """ reserve the dsg regions the input data changes
+
+        :param spec: data spec
+        :rtype: None
+        """
+        spec.reserve_memory_region(
+            self.REGIONS.PARAMETERS.value, self._N_PARAMETER_BYTES, "params")
+        spec.reserve_memory_region(
+            self.REGIONS.DATA.value, self._data_size, "data region")
+
     def _write_concha_params(self, spec):
         spec.switch_write_focus(self.REGIONS.CONCHA_PARAMS.value)
-        spec.write_value(
-            pow(self.MAGIC_THREE, self.CONCHA_G), DataType.FLOAT_64)
-        spec.write_value(
-            pow(self.MAGIC_THREE, self.CONCHA_G), DataType.FLOAT_64)
+        OME_CONCHA_PARAMS.write(
+            spec, concha_gain_scalar=pow(self.MAGIC_THREE, self.CONCHA_G),
+            ear_canal_gain_scalar=pow(self.MAGIC_THREE, self.CONCHA_G))
 
     @inject_items({
         "routing_info": "MemoryRoutingInfos",
         "tags": "MemoryTags",
         "placements": "MemoryPlacements",
         "local_time_step_map": "MachineTimeStepMap",
-        "time_scale_factor": "TimeScaleFactor"
+        "time_scale_factor": "TimeScaleFactor",
+        "machine_graph": "MemoryMachineGraph"
     })
     @overrides(
         AbstractGeneratesDataSpecification.generate_data_specification,
         additional_arguments=[
             "routing_info", "tags", "placements", "local_time_step_map",
-            "time_scale_factor"])
+            "time_scale_factor", "machine_graph"])
     def generate_data_specification(
             self, spec, placement, routing_info, tags, placements,
-            local_time_step_map, time_scale_factor):
+            local_time_step_map, time_scale_factor, machine_graph):
 
         self._reserve_memory_regions(spec)
 
@@ -377,6 +700,27 @@ class OMEMachineVertex(
         self._write_input_data(spec)
         self._write_profile_dsg(spec)
         self._write_concha_params(spec)
+        self._write_sdram_broadcast(spec, machine_graph)
+        self._write_live_input(spec, tags)
 
         # End the specification
         spec.end_specification()
+
+    @inject_items({"routing_info": "MemoryRoutingInfos"})
+    @overrides(
+        AbstractRewritesDataSpecification.regenerate_data_specification,
+        additional_arguments=["routing_info"])
+    def regenerate_data_specification(self, spec, placement, routing_info):
+        self._reserve_input_data_regions(spec)
+        self._write_params(spec, routing_info)
+        self._write_input_data(spec)
+        spec.end_specification()
+
+    @overrides(AbstractRewritesDataSpecification.
+               requires_memory_regions_to_be_reloaded)
+    def requires_memory_regions_to_be_reloaded(self):
+        return self._input_changed
+
+    @overrides(AbstractRewritesDataSpecification.mark_regions_reloaded)
+    def mark_regions_reloaded(self):
+        self._input_changed = False
@@ -15,6 +15,7 @@
 
 import os
 
+from enum import Enum
 import numpy as np
 
 from spinn_front_end_common.utilities import globals_variables
@@ -22,6 +23,8 @@ from spinn_utilities.overrides import overrides
 from spinnak_ear import model_binaries
 from spinnak_ear.spinnak_ear_application_vertex.spinnakear_application_vertex \
     import SpiNNakEarApplicationVertex
+from spinnak_ear.spinnak_ear_utilities.quantized_probabilities import \
+    get_precision_data_type
 from spynnaker.pyNN.models.abstract_pynn_model import AbstractPyNNModel
 
 
@@ -41,7 +44,29 @@ class SpiNNakEar(AbstractPyNNModel):
     _DEFAULT_RESAMPLE_FACTOR = 1
     _DEFAULT_SEG_SIZE = 8
     _DEFAULT_PROFILE = False
-    _DEFAULT_N_BUFFERS_IN_SDRAM_TOTAL = 4
+    _DEFAULT_N_BUFFERS_IN_SDRAM_TOTAL = None
+    _DEFAULT_RING_BUFFER_SDRAM_BUDGET = 1024 * 1024
+    _DEFAULT_IHCAN_SEGMENT_LATENCY = None
+    _DEFAULT_HOST_OME = False
+    _DEFAULT_IHCAN_PACKED_SPIKES = False
+    _DEFAULT_SPIKE_PROB_PRECISION = "float32"
+    _DEFAULT_SPIKE_PROB_MAX_RATE = 4000.0
+    _DEFAULT_LIVE_OUTPUT = False
+    _DEFAULT_LIVE_OUTPUT_HOST = "0.0.0.0"
+    _DEFAULT_LIVE_OUTPUT_PORT = 17896
+    _DEFAULT_LIVE_INPUT = False
+    _DEFAULT_LIVE_INPUT_PORT = 17897
+    _DEFAULT_LIVE_INPUT_CREDIT_HOST = "0.0.0.0"
+    _DEFAULT_LIVE_INPUT_CREDIT_PORT = 17898
+    _DEFAULT_LIVE_INPUT_N_BUFFERS = 16
+    _DEFAULT_MOC_DECIMATION_FACTOR = 1
+    _DEFAULT_MOC_DECIMATION_AVERAGE = True
+    _DEFAULT_MOC_RECORD_FLOAT32 = False
+    _DEFAULT_OME_SDRAM_BROADCAST = False
+    _DEFAULT_IHCAN_FIXED_POINT = False
+    _DEFAULT_RECORDING_EXTRACTION_THREADS = 0
+    _DEFAULT_CHIP_PACKING = False
+    _DEFAULT_INTERNAL_KEY_BASE = None
 
     # scale max
     FULL_SCALE = 1.0
@@ -73,9 +98,82 @@ class SpiNNakEar(AbstractPyNNModel):
         'resample_factor': _DEFAULT_RESAMPLE_FACTOR,
         # auto generate from thesis (robert James's)
         'seq_size': _DEFAULT_SEG_SIZE,
+        # None sizes each drnl ring buffer from its ihcans latency
         "n_buffers_in_sdram_total": _DEFAULT_N_BUFFERS_IN_SDRAM_TOTAL,
+        # bytes of sdram on a chip the drnl ring buffers can use
+        "ring_buffer_sdram_budget": _DEFAULT_RING_BUFFER_SDRAM_BUDGET,
+        # measured ihcan us per segment, None uses the profiled curve
+        "ihcan_segment_latency": _DEFAULT_IHCAN_SEGMENT_LATENCY,
+        # how many moc samples go into each recorded moc value
+        "moc_decimation_factor": _DEFAULT_MOC_DECIMATION_FACTOR,
+        # record the mean of the decimated moc samples, else the last
+        "moc_decimation_average": _DEFAULT_MOC_DECIMATION_AVERAGE,
+        # record moc as float32 rather than float64
+        "moc_record_float32": _DEFAULT_MOC_RECORD_FLOAT32,
+        # record ihcan spikes as a bit per fibre per sample
+        "ihcan_packed_spikes": _DEFAULT_IHCAN_PACKED_SPIKES,
+        # float32, uint16 or uint8 precision of recorded spike probs
+        "spike_prob_precision": _DEFAULT_SPIKE_PROB_PRECISION,
+        # the vesicle release rate in /s the largest quantized spike prob
+        # code stands for; faster release clips to it
+        "spike_prob_max_rate": _DEFAULT_SPIKE_PROB_MAX_RATE,
+        # stream the final aggregation node spikes to the host as they happen
+        "live_output": _DEFAULT_LIVE_OUTPUT,
+        # the host the live spikes go to
+        "live_output_host": _DEFAULT_LIVE_OUTPUT_HOST,
+        # the port the live spikes go to
+        "live_output_port": _DEFAULT_LIVE_OUTPUT_PORT,
+        # stream the audio into the OME from the host while running
+        "live_input": _DEFAULT_LIVE_INPUT,
+        # the board port the live audio is sent to
+        "live_input_port": _DEFAULT_LIVE_INPUT_PORT,
+        # the host the OME sends its live input credits to
+        "live_input_credit_host": _DEFAULT_LIVE_INPUT_CREDIT_HOST,
+        # the port the OME sends its live input credits to
+        "live_input_credit_port": _DEFAULT_LIVE_INPUT_CREDIT_PORT,
+        # how many segments the OME jitter buffer holds (power of 2)
+        "live_input_n_buffers": _DEFAULT_LIVE_INPUT_N_BUFFERS,
+        # run the OME filters on the host and feed the DRNLs from sdram
+        "host_ome": _DEFAULT_HOST_OME,
+        # pass OME output to the drnls through shared sdram on each chip
+        "ome_sdram_broadcast": _DEFAULT_OME_SDRAM_BROADCAST,
+        # run the fixed point ihcan kernel rather than the soft float one
+        "ihcan_fixed_point": _DEFAULT_IHCAN_FIXED_POINT,
+        # decode the recordings of this many cores at once into one array
+        # per variable, or 0 to read them through the neuron recorders
+        "recording_extraction_threads": _DEFAULT_RECORDING_EXTRACTION_THREADS,
+        # place the drnls, their ihcans and the aggregation nodes above them
+        # in chip sized groups, rather than a vertex at a time
+        "chip_packing": _DEFAULT_CHIP_PACKING,
+        # the base of an aligned block of keys for the partitions inside the
+        # ear, laid out so each chip needs few routing entries, or None to
+        # leave their keys to the key allocator
+        "internal_key_base": _DEFAULT_INTERNAL_KEY_BASE,
     }
 
+    # what changing a parameter of a built ear makes it redo. 1. re-partition,
+    # place and route, 2. regenerate the data specs, 3. nothing on the machine
+    INVALIDATION = Enum(
+        value="INVALIDATION",
+        names=[("MAPPING", 0),
+               ("DATA", 1),
+               ("NOTHING", 2)])
+
+    # the parameters that invalidate less than the whole mapping
+    PARAMETER_INVALIDATION = {
+        # picks the fibre types of each ihcan, which keeps their sizes
+        "ihcan_fibre_random_seed": INVALIDATION.DATA,
+        # seeds the ihcan random number generators
+        "ihc_seeds_seed": INVALIDATION.DATA,
+        # only used when the ear is made
+        "param_file": INVALIDATION.NOTHING,
+        # only used when reading the recordings back
+        "recording_extraction_threads": INVALIDATION.NOTHING,
+    }
+
+    # error message for a parameter that cannot be changed
+    SET_PARAMETER_ERROR = "The ear parameter {} cannot be changed once set"
+
     NAME = "SpikeSourceSpiNNakEar"
 
     __slots__ = [
@@ -119,6 +217,50 @@ class SpiNNakEar(AbstractPyNNModel):
         "_seq_size",
         #
         "_n_buffers_in_sdram_total",
+        # sdram bytes per chip for the drnl ring buffers
+        "_ring_buffer_sdram_budget",
+        # measured ihcan time in us to process a segment, or None
+        "_ihcan_segment_latency",
+        # moc samples per recorded moc value
+        "_moc_decimation_factor",
+        # bool flag for averaging the decimated moc samples
+        "_moc_decimation_average",
+        # bool flag for recording moc as float32
+        "_moc_record_float32",
+        # bool flag for recording ihcan spikes as packed bits
+        "_ihcan_packed_spikes",
+        # the precision recorded spike probs are stored at
+        "_spike_prob_precision",
+        # the release rate in /s the largest quantized spike prob stands for
+        "_spike_prob_max_rate",
+        # bool flag for streaming spikes to the host
+        "_live_output",
+        # the host the live spikes go to
+        "_live_output_host",
+        # the port the live spikes go to
+        "_live_output_port",
+        # bool flag for streaming audio into the OME
+        "_live_input",
+        # the board port the live audio is sent to
+        "_live_input_port",
+        # the host the live input credits go to
+        "_live_input_credit_host",
+        # the port the live input credits go to
+        "_live_input_credit_port",
+        # how many segments the OME jitter buffer holds
+        "_live_input_n_buffers",
+        # bool flag for running the OME filter chain on the host
+        "_host_ome",
+        # bool flag for sending OME output to drnls through shared sdram
+        "_ome_sdram_broadcast",
+        # bool flag for running the fixed point ihcan kernel
+        "_ihcan_fixed_point",
+        # the cores to decode recordings of at once, or 0 for the recorders
+        "_recording_extraction_threads",
+        # bool flag for placing the ear in chip sized groups
+        "_chip_packing",
+        # the base key of the partitions inside the ear, or None
+        "_internal_key_base",
         #
         "_app_vertex"
     ]
@@ -143,7 +285,31 @@ class SpiNNakEar(AbstractPyNNModel):
             resample_factor=DEFAULT_PARAMS['resample_factor'],
             seq_size=DEFAULT_PARAMS['seq_size'],
             n_buffers_in_sdram_total=DEFAULT_PARAMS[
-                'n_buffers_in_sdram_total']):
+                'n_buffers_in_sdram_total'],
+            ring_buffer_sdram_budget=DEFAULT_PARAMS[
+                'ring_buffer_sdram_budget'],
+            ihcan_segment_latency=DEFAULT_PARAMS['ihcan_segment_latency'],
+            moc_decimation_factor=DEFAULT_PARAMS['moc_decimation_factor'],
+            moc_decimation_average=DEFAULT_PARAMS['moc_decimation_average'],
+            moc_record_float32=DEFAULT_PARAMS['moc_record_float32'],
+            ihcan_packed_spikes=DEFAULT_PARAMS['ihcan_packed_spikes'],
+            spike_prob_precision=DEFAULT_PARAMS['spike_prob_precision'],
+            spike_prob_max_rate=DEFAULT_PARAMS['spike_prob_max_rate'],
+            live_output=DEFAULT_PARAMS['live_output'],
+            live_output_host=DEFAULT_PARAMS['live_output_host'],
+            live_output_port=DEFAULT_PARAMS['live_output_port'],
+            live_input=DEFAULT_PARAMS['live_input'],
+            live_input_port=DEFAULT_PARAMS['live_input_port'],
+            live_input_credit_host=DEFAULT_PARAMS['live_input_credit_host'],
+            live_input_credit_port=DEFAULT_PARAMS['live_input_credit_port'],
+            live_input_n_buffers=DEFAULT_PARAMS['live_input_n_buffers'],
+            host_ome=DEFAULT_PARAMS['host_ome'],
+            ome_sdram_broadcast=DEFAULT_PARAMS['ome_sdram_broadcast'],
+            ihcan_fixed_point=DEFAULT_PARAMS['ihcan_fixed_point'],
+            recording_extraction_threads=DEFAULT_PARAMS[
+                'recording_extraction_threads'],
+            chip_packing=DEFAULT_PARAMS['chip_packing'],
+            internal_key_base=DEFAULT_PARAMS['internal_key_base']):
         self._fs = fs
         self._pole_freqs = pole_freqs
         self._param_file = param_file
@@ -164,31 +330,86 @@ class SpiNNakEar(AbstractPyNNModel):
         self._resample_factor = resample_factor
         self._seq_size = seq_size
         self._n_buffers_in_sdram_total = n_buffers_in_sdram_total
+        self._ring_buffer_sdram_budget = ring_buffer_sdram_budget
+        self._ihcan_segment_latency = ihcan_segment_latency
+        self._moc_decimation_factor = moc_decimation_factor
+        self._moc_decimation_average = moc_decimation_average
+        self._moc_record_float32 = moc_record_float32
+        self._ihcan_packed_spikes = ihcan_packed_spikes
+        self._spike_prob_precision = spike_prob_precision
+        self._spike_prob_max_rate = spike_prob_max_rate
+        self._live_output = live_output
+        self._live_output_host = live_output_host
+        self._live_output_port = live_output_port
+        self._live_input = live_input
+        self._live_input_port = live_input_port
+        self._live_input_credit_host = live_input_credit_host
+        self._live_input_credit_port = live_input_credit_port
+        self._live_input_n_buffers = live_input_n_buffers
+        self._host_ome = host_ome
+        self._ome_sdram_broadcast = ome_sdram_broadcast
+        self._ihcan_fixed_point = ihcan_fixed_point
+        self._recording_extraction_threads = recording_extraction_threads
+        self._chip_packing = chip_packing
+        self._internal_key_base = internal_key_base
         self._app_vertex = None
 
         if self._seq_size == 0:
             raise Exception("The seq size must be greater than 0")
 
-        if isinstance(audio_input, list):
-            audio_input = np.asarray(audio_input)
+        if self._moc_decimation_factor < 1:
+            raise Exception("The moc decimation factor must be at least 1")
 
-        if len(audio_input.shape) > 1:
+        if self._seq_size % self._moc_decimation_factor:
             raise Exception(
-                "For binaural simulation please create separate "
-                "SpiNNak-Ear populations (left/right)")
+                "The moc decimation factor must divide the seq size {} "
+                "evenly, not {}".format(
+                    self._seq_size, self._moc_decimation_factor))
 
-        if audio_input is None:
-            audio_input = np.asarray([])
+        if self._live_input and self._host_ome:
+            raise Exception(
+                "Live input needs the OME on the machine, so cannot be used "
+                "with host_ome")
 
-        self._audio_input = (
-            audio_input[0:int(
-                np.floor(len(audio_input) / self.SEG_SIZE) * self.SEG_SIZE)])
-        self._audio_input = np.asarray(self._audio_input)
+        # fails early on a precision we cant record at
+        get_precision_data_type(self._spike_prob_precision)
+
+        if (self._n_buffers_in_sdram_total is not None and (
+                self._n_buffers_in_sdram_total <= 0 or
+                self._n_buffers_in_sdram_total &
+                (self._n_buffers_in_sdram_total - 1))):
+            raise Exception(
+                "The n buffers in sdram total must be a power of 2")
+
+        self.audio_input = audio_input
 
         # update finder to look inside ear model binaries location
         globals_variables.get_simulator().executable_finder.add_path(
             os.path.dirname(model_binaries.__file__))
 
+    def set_parameter(self, key, value):
+        """ changes a parameter once the ear has been made
+
+        :param key: the parameter name
+        :param value: the new value
+        :return: what the change invalidates
+        :rtype: INVALIDATION
+        """
+        if key == "audio_input":
+            self.audio_input = value
+            return self.INVALIDATION.MAPPING
+        if key not in self.DEFAULT_PARAMS or not hasattr(self, "_" + key):
+            raise Exception(self.SET_PARAMETER_ERROR.format(key))
+
+        # setting the value it already has changes nothing
+        old_value = getattr(self, "_" + key)
+        if (np.isscalar(old_value) or old_value is None) and (
+                np.isscalar(value) or value is None) and old_value == value:
+            return self.INVALIDATION.NOTHING
+
+        setattr(self, "_" + key, value)
+        return self.PARAMETER_INVALIDATION.get(key, self.INVALIDATION.MAPPING)
+
     @overrides(AbstractPyNNModel.create_vertex)
     def create_vertex(self, n_neurons, label, constraints):
         self._app_vertex = SpiNNakEarApplicationVertex(
@@ -230,6 +451,94 @@ class SpiNNakEar(AbstractPyNNModel):
     def n_buffers_in_sdram_total(self):
         return self._n_buffers_in_sdram_total
 
+    @property
+    def ring_buffer_sdram_budget(self):
+        return self._ring_buffer_sdram_budget
+
+    @property
+    def ihcan_segment_latency(self):
+        return self._ihcan_segment_latency
+
+    @property
+    def moc_decimation_factor(self):
+        return self._moc_decimation_factor
+
+    @property
+    def moc_decimation_average(self):
+        return self._moc_decimation_average
+
+    @property
+    def moc_record_float32(self):
+        return self._moc_record_float32
+
+    @property
+    def ihcan_packed_spikes(self):
+        return self._ihcan_packed_spikes
+
+    @property
+    def spike_prob_precision(self):
+        return self._spike_prob_precision
+
+    @property
+    def spike_prob_max_rate(self):
+        return self._spike_prob_max_rate
+
+    @property
+    def live_output(self):
+        return self._live_output
+
+    @property
+    def live_output_host(self):
+        return self._live_output_host
+
+    @property
+    def live_output_port(self):
+        return self._live_output_port
+
+    @property
+    def live_input(self):
+        return self._live_input
+
+    @property
+    def live_input_port(self):
+        return self._live_input_port
+
+    @property
+    def live_input_credit_host(self):
+        return self._live_input_credit_host
+
+    @property
+    def live_input_credit_port(self):
+        return self._live_input_credit_port
+
+    @property
+    def live_input_n_buffers(self):
+        return self._live_input_n_buffers
+
+    @property
+    def host_ome(self):
+        return self._host_ome
+
+    @property
+    def ome_sdram_broadcast(self):
+        return self._ome_sdram_broadcast
+
+    @property
+    def ihcan_fixed_point(self):
+        return self._ihcan_fixed_point
+
+    @property
+    def recording_extraction_threads(self):
+        return self._recording_extraction_threads
+
+    @property
+    def chip_packing(self):
+        return self._chip_packing
+
+    @property
+    def internal_key_base(self):
+        return self._internal_key_base
+
     @property
     def seq_size(self):
         return self._seq_size
@@ -254,6 +563,28 @@ class SpiNNakEar(AbstractPyNNModel):
     def audio_input(self):
         return self._audio_input
 
+    @audio_input.setter
+    def audio_input(self, audio_input):
+        """ sets the audio, trimmed to whole segments
+
+        :param audio_input: the audio samples
+        :rtype: None
+        """
+        if audio_input is None:
+            audio_input = np.asarray([])
+
+        if isinstance(audio_input, list):
+            audio_input = np.asarray(audio_input)
+
+        if len(audio_input.shape) > 1:
+            raise Exception(
+                "For binaural simulation please create separate "
+                "SpiNNak-Ear populations (left/right)")
+
+        self._audio_input = np.asarray(
+            audio_input[0:int(
+                np.floor(len(audio_input) / self.SEG_SIZE) * self.SEG_SIZE)])
+
     @property
     def profile(self):
         return self._profile
@@ -0,0 +1,281 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import namedtuple
+
+import numpy
+
+from spinnak_ear.spinnak_ear_utilities.ear_atom_map import FIBRE_TYPES
+
+# the most fibres whose spikes are worked on at once by default
+DEFAULT_FIBRES_PER_CHUNK = 1024
+
+# the most samples of spike probability worked on at once by default
+DEFAULT_SAMPLES_PER_CHUNK = 4096
+
+# ms in a s, for rates in spikes per s
+_MS_PER_S = 1000.0
+
+# how well the spikes of each fibre lock to the phase of a frequency
+PhaseLocking = namedtuple(
+    "PhaseLocking", [
+        "vector_strength", "mean_phase", "rayleigh_z", "n_spikes"])
+
+# error message for a window of no time
+WINDOW_ERROR = "The window from {} ms to {} ms holds no time"
+
+# error message for spike probabilities whose columns are not the fibres
+COLUMNS_ERROR = (
+    "The spike probabilities have {} columns but {} fibres are given")
+
+
+class EarAnalysis(object):
+    """ The usual measures of auditory nerve output, worked out for all the \
+    fibres of an ear at once from its columnar spike trains and spike \
+    probabilities, a bounded chunk of fibres or samples at a time.
+
+    Rates are in spikes per s and times in ms. The fibre types are \
+    indexed by their codes in the atom map.
+    """
+
+    __slots__ = [
+        # the characteristic frequency in Hz of each channel
+        "_channel_cfs",
+        # the channel of each fibre of the ear
+        "_fibre_channels",
+        # the time in ms between samples
+        "_sample_period",
+        # the most fibres whose spikes are worked on at once
+        "_fibres_per_chunk",
+        # the most samples of spike probability worked on at once
+        "_samples_per_chunk"
+    ]
+
+    def __init__(
+            self, channel_cfs, fibre_channels, sample_period,
+            fibres_per_chunk=DEFAULT_FIBRES_PER_CHUNK,
+            samples_per_chunk=DEFAULT_SAMPLES_PER_CHUNK):
+        """
+        :param channel_cfs: the characteristic frequency in Hz of each \
+        channel
+        :param fibre_channels: the channel of each fibre of the ear, in \
+        recording order
+        :param sample_period: the time in ms between samples
+        :param fibres_per_chunk: the most fibres whose spikes are worked on \
+        at once
+        :param samples_per_chunk: the most samples of spike probability \
+        worked on at once
+        """
+        self._channel_cfs = numpy.asarray(channel_cfs, dtype=float)
+        self._fibre_channels = numpy.asarray(fibre_channels)
+        self._sample_period = sample_period
+        self._fibres_per_chunk = fibres_per_chunk
+        self._samples_per_chunk = samples_per_chunk
+
+    @property
+    def channel_cfs(self):
+        return self._channel_cfs
+
+    @property
+    def n_channels(self):
+        return len(self._channel_cfs)
+
+    @property
+    def sample_period(self):
+        return self._sample_period
+
+    @staticmethod
+    def _window(spike_trains, t_start, t_stop):
+        """ the window to count spikes in, defaulting to the whole recording
+
+        :param spike_trains: the spike trains
+        :param t_start: the start of the window in ms
+        :param t_stop: the end of the window in ms, or None for the end of \
+        the recording
+        :rtype: tuple(float, float)
+        """
+        if t_stop is None:
+            t_stop = spike_trains.t_stop
+        if t_stop <= t_start:
+            raise Exception(WINDOW_ERROR.format(t_start, t_stop))
+        return t_start, t_stop
+
+    def psth(self, spike_trains, bin_width, t_start=0.0, t_stop=None):
+        """ the post stimulus time histogram of the fibres, as the mean \
+        rate of a fibre in each bin
+
+        :param spike_trains: the spike trains of the fibres
+        :param bin_width: the width of a bin in ms
+        :param t_start: the start of the first bin in ms
+        :param t_stop: the end of the last bin in ms, or None for the end \
+        of the recording
+        :return: the edges of the bins in ms and the rate in each
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        t_start, t_stop = self._window(spike_trains, t_start, t_stop)
+        n_bins = int(numpy.ceil((t_stop - t_start) / bin_width))
+        counts = numpy.zeros(n_bins, dtype=numpy.int64)
+        for chunk in spike_trains.chunks(self._fibres_per_chunk):
+            _, times = chunk.flat_spikes()
+            times = times[(times >= t_start) & (times < t_stop)]
+            counts += numpy.bincount(
+                ((times - t_start) / bin_width).astype(numpy.int64),
+                minlength=n_bins)[:n_bins]
+        edges = t_start + bin_width * numpy.arange(n_bins + 1)
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            rates = counts / (len(spike_trains) * bin_width / _MS_PER_S)
+        return edges, rates
+
+    def fibre_rates(self, spike_trains, t_start=0.0, t_stop=None):
+        """ the rate of each fibre in a window
+
+        :param spike_trains: the spike trains of the fibres
+        :param t_start: the start of the window in ms
+        :param t_stop: the end of the window in ms, or None for the end of \
+        the recording
+        :return: the rate of each fibre of the spike trains
+        :rtype: numpy.ndarray
+        """
+        t_start, t_stop = self._window(spike_trains, t_start, t_stop)
+        counts = numpy.zeros(len(spike_trains), dtype=numpy.int64)
+        start = 0
+        for chunk in spike_trains.chunks(self._fibres_per_chunk):
+            rows, times = chunk.flat_spikes()
+            in_window = (times >= t_start) & (times < t_stop)
+            counts[start:start + len(chunk)] = numpy.bincount(
+                rows[in_window], minlength=len(chunk))
+            start += len(chunk)
+        return counts / ((t_stop - t_start) / _MS_PER_S)
+
+    def rate_place(self, spike_trains, t_start=0.0, t_stop=None):
+        """ the mean rate of the fibres of each type in each channel, nan \
+        where a channel has no fibres of a type
+
+        :param spike_trains: the spike trains of the fibres
+        :param t_start: the start of the window in ms
+        :param t_stop: the end of the window in ms, or None for the end of \
+        the recording
+        :return: a row per fibre type code and a column per channel
+        :rtype: numpy.ndarray
+        """
+        rates = self.fibre_rates(spike_trains, t_start, t_stop)
+        groups = (spike_trains.fibre_types.astype(numpy.int64) *
+                  self.n_channels + spike_trains.channels)
+        n_groups = len(FIBRE_TYPES) * self.n_channels
+        totals = numpy.bincount(groups, weights=rates, minlength=n_groups)
+        n_fibres = numpy.bincount(groups, minlength=n_groups)
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            means = totals / n_fibres
+        return means.reshape(len(FIBRE_TYPES), self.n_channels)
+
+    def phase_locking(
+            self, spike_trains, frequency=None, t_start=0.0, t_stop=None):
+        """ the vector strength and mean phase of the spikes of each fibre \
+        relative to a frequency, with the rayleigh statistic of each; fibres \
+        without spikes get nan
+
+        :param spike_trains: the spike trains of the fibres
+        :param frequency: the frequency in Hz, one per fibre of the spike \
+        trains, or None for the characteristic frequency of each fibre
+        :param t_start: the start of the window in ms
+        :param t_stop: the end of the window in ms, or None for the end of \
+        the recording
+        :rtype: PhaseLocking
+        """
+        t_start, t_stop = self._window(spike_trains, t_start, t_stop)
+        if frequency is None:
+            frequency = self._channel_cfs[spike_trains.channels]
+        frequency = numpy.broadcast_to(
+            numpy.asarray(frequency, dtype=float), (len(spike_trains),))
+
+        cos_sums = numpy.zeros(len(spike_trains))
+        sin_sums = numpy.zeros(len(spike_trains))
+        counts = numpy.zeros(len(spike_trains), dtype=numpy.int64)
+        start = 0
+        for chunk in spike_trains.chunks(self._fibres_per_chunk):
+            rows, times = chunk.flat_spikes()
+            in_window = (times >= t_start) & (times < t_stop)
+            rows = rows[in_window]
+            phases = (2.0 * numpy.pi / _MS_PER_S) * (
+                frequency[start:start + len(chunk)][rows] *
+                times[in_window])
+            stop = start + len(chunk)
+            cos_sums[start:stop] = numpy.bincount(
+                rows, weights=numpy.cos(phases), minlength=len(chunk))
+            sin_sums[start:stop] = numpy.bincount(
+                rows, weights=numpy.sin(phases), minlength=len(chunk))
+            counts[start:stop] = numpy.bincount(rows, minlength=len(chunk))
+            start = stop
+
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            strength = numpy.hypot(cos_sums, sin_sums) / counts
+        mean_phase = numpy.where(
+            counts > 0, numpy.arctan2(sin_sums, cos_sums), numpy.nan)
+        return PhaseLocking(
+            strength, mean_phase, counts * strength ** 2, counts)
+
+    def cochleagram(self, spike_probs, bin_width, fibres=None):
+        """ the mean spike probability of the recorded fibres of each \
+        channel in each bin of time; channels without recorded fibres get nan
+
+        :param spike_probs: the spike probabilities as get_data gives them, \
+        a row per sample and a column per recorded fibre; any array that can \
+        be sliced a chunk of rows at a time, such as a memory mapped file
+        :param bin_width: the width of a bin in ms, rounded to whole samples
+        :param fibres: the fibre of each column, as get_data gives them \
+        with the data, or None when there is a column for every fibre of \
+        the ear in recording order
+        :return: a row per channel and a column per bin
+        :rtype: numpy.ndarray
+        """
+        samples_per_bin = max(int(round(bin_width / self._sample_period)), 1)
+        n_samples = len(spike_probs)
+        n_bins = (n_samples + samples_per_bin - 1) // samples_per_bin
+
+        # group the columns by channel, keeping them in place when the
+        # fibres of a channel are already consecutive
+        if fibres is None:
+            column_channels = self._fibre_channels
+        else:
+            column_channels = self._fibre_channels[numpy.asarray(
+                fibres, dtype=int)]
+        if len(column_channels) != numpy.shape(spike_probs)[1]:
+            raise Exception(COLUMNS_ERROR.format(
+                numpy.shape(spike_probs)[1], len(column_channels)))
+        column_order = None
+        if numpy.any(numpy.diff(column_channels) < 0):
+            column_order = numpy.argsort(column_channels, kind="stable")
+            column_channels = column_channels[column_order]
+        channels, channel_starts, fibres_per_channel = numpy.unique(
+            column_channels, return_index=True, return_counts=True)
+
+        output = numpy.full((self.n_channels, n_bins), numpy.nan)
+        if not len(channels):
+            return output
+        rows_per_chunk = samples_per_bin * max(
+            self._samples_per_chunk // samples_per_bin, 1)
+        for first in range(0, n_samples, rows_per_chunk):
+            chunk = numpy.asarray(
+                spike_probs[first:first + rows_per_chunk], dtype=float)
+            if column_order is not None:
+                chunk = chunk[:, column_order]
+            channel_sums = numpy.add.reduceat(chunk, channel_starts, axis=1)
+            bin_starts = numpy.arange(0, len(chunk), samples_per_bin)
+            samples = numpy.diff(numpy.append(bin_starts, len(chunk)))
+            first_bin = first // samples_per_bin
+            output[channels, first_bin:first_bin + len(bin_starts)] = (
+                numpy.add.reduceat(channel_sums, bin_starts, axis=0) /
+                samples[:, None] / fibres_per_channel).T
+        return output
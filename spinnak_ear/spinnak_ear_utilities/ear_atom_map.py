@@ -0,0 +1,162 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+
+# the fibre type codes, matching the flags of the ear vertex
+LSR = 0
+MSR = 1
+HSR = 2
+
+# the fibre type codes by name
+FIBRE_TYPES = {"lsr": LSR, "msr": MSR, "hsr": HSR}
+
+# error message for a fibre type we dont know
+FIBRE_TYPE_ERROR = "Unknown fibre type {}, pick one of {}"
+
+
+def ear_atom_dtype(n_aggregation_rows):
+    """ the layout of a row of the atom map
+
+    :param n_aggregation_rows: the number of rows in the aggregation tree
+    :rtype: numpy.dtype
+    """
+    return numpy.dtype([
+        ("atom", "<u4"), ("channel", "<u4"), ("cf", "<f8"),
+        ("fibre_type", "u1"), ("fibre", "<u4"), ("ihcan", "<u4"),
+        ("aggregation_path", "<u4", (n_aggregation_rows,))])
+
+
+class EarAtomMap(object):
+    """ What each outgoing atom of an ear is, as a numpy structured array \
+    with a row per atom holding its channel, characteristic frequency, \
+    fibre type, fibre index in the channel, the index of the ihcan vertex \
+    it comes from, and the index of the aggregation node it passes through \
+    in each row of the aggregation tree.
+    """
+
+    __slots__ = [
+        # the structured array, a row per outgoing atom
+        "_data"
+    ]
+
+    def __init__(self, data):
+        """
+        :param data: the structured array, of ear_atom_dtype
+        """
+        self._data = data
+
+    @classmethod
+    def build(
+            cls, ihcan_channels, ihcan_fibre_counts, channel_cfs,
+            n_child_per_group, n_aggregation_rows):
+        """ builds the map from the ihcan vertices, in the order their \
+        fibres appear in the outgoing atoms
+
+        :param ihcan_channels: the channel of each ihcan vertex
+        :param ihcan_fibre_counts: the (n lsr, n msr, n hsr) of each ihcan \
+        vertex, which it lays out in that order
+        :param channel_cfs: the characteristic frequency of each channel
+        :param n_child_per_group: the number of children per aggregation node
+        :param n_aggregation_rows: the number of rows in the aggregation tree
+        :rtype: EarAtomMap
+        """
+        channels = numpy.asarray(ihcan_channels, dtype="<u4")
+        counts = numpy.asarray(ihcan_fibre_counts, dtype=int).reshape(-1, 3)
+        n_atoms_per_ihcan = counts.sum(axis=1)
+        ihcans = numpy.repeat(
+            numpy.arange(len(channels), dtype="<u4"), n_atoms_per_ihcan)
+
+        data = numpy.zeros(
+            len(ihcans), dtype=ear_atom_dtype(n_aggregation_rows))
+        data["atom"] = numpy.arange(len(ihcans))
+        data["ihcan"] = ihcans
+        data["channel"] = channels[ihcans]
+        data["cf"] = numpy.asarray(channel_cfs, dtype="<f8")[data["channel"]]
+        data["fibre_type"] = numpy.repeat(
+            numpy.tile([LSR, MSR, HSR], len(channels)), counts.ravel())
+
+        # the fibres of a channel are numbered across its ihcans
+        channel_starts = numpy.searchsorted(data["channel"], data["channel"])
+        data["fibre"] = data["atom"] - channel_starts
+
+        # the tree groups consecutive children, row by row
+        for row in range(n_aggregation_rows):
+            data["aggregation_path"][:, row] = (
+                ihcans // (n_child_per_group ** (row + 1)))
+        return cls(data)
+
+    @property
+    def data(self):
+        return self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def mask(
+            self, channels=None, fibre_types=None, min_cf=None, max_cf=None,
+            ihcans=None):
+        """ a boolean mask over the atoms matching all the given filters
+
+        :param channels: the channels to keep, or None for all
+        :param fibre_types: the fibre types to keep by name or code, or \
+        None for all
+        :param min_cf: the lowest characteristic frequency to keep in Hz
+        :param max_cf: the highest characteristic frequency to keep in Hz
+        :param ihcans: the ihcan vertex indices to keep, or None for all
+        :rtype: numpy.ndarray of bool
+        """
+        mask = numpy.ones(len(self._data), dtype=bool)
+        if channels is not None:
+            mask &= numpy.isin(self._data["channel"], channels)
+        if fibre_types is not None:
+            mask &= numpy.isin(
+                self._data["fibre_type"], self.fibre_type_codes(fibre_types))
+        if min_cf is not None:
+            mask &= self._data["cf"] >= min_cf
+        if max_cf is not None:
+            mask &= self._data["cf"] <= max_cf
+        if ihcans is not None:
+            mask &= numpy.isin(self._data["ihcan"], ihcans)
+        return mask
+
+    def atoms(self, **filters):
+        """ the outgoing atoms matching all the given filters, e.g. \
+        atoms(fibre_types="hsr", min_cf=1000, max_cf=4000)
+
+        :param filters: the filters of mask
+        :rtype: numpy.ndarray
+        """
+        return self._data["atom"][self.mask(**filters)]
+
+    @staticmethod
+    def fibre_type_codes(fibre_types):
+        """ the codes of fibre types given by name or code
+
+        :param fibre_types: a fibre type or a list of them
+        :rtype: list(int)
+        """
+        if isinstance(fibre_types, (str, int)):
+            fibre_types = [fibre_types]
+        codes = list()
+        for fibre_type in fibre_types:
+            if fibre_type in FIBRE_TYPES.values():
+                codes.append(fibre_type)
+            elif str(fibre_type).lower() in FIBRE_TYPES:
+                codes.append(FIBRE_TYPES[str(fibre_type).lower()])
+            else:
+                raise Exception(FIBRE_TYPE_ERROR.format(
+                    fibre_type, sorted(FIBRE_TYPES.keys())))
+        return codes
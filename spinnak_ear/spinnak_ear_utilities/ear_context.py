@@ -0,0 +1,382 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+
+from pacman.model.graphs.common import Slice
+
+from data_specification.enums.data_type import DataType
+
+
+class EarContext(object):
+    """ The ear wide parameters and per vertex tables the DRNL and IHCAN \
+    machine vertices of an ear share, so each vertex only holds its index \
+    and what is truly its own. Made afresh each time the ear is mapped.
+    """
+
+    __slots__ = [
+        # the app vertex
+        "_parent",
+        # the synaptic manager of the app vertex
+        "_synapse_manager",
+        # the ear internal connections of each machine vertex
+        "_graph_index",
+        # sampling freq
+        "_fs",
+        # the seg size
+        "_seq_size",
+        # the number of audio samples to process
+        "_n_data_points",
+        # timer period of every ear core
+        "_timer_period",
+        # bool flag for profiling
+        "_profile",
+        # ????
+        "_resample_factor",
+        # the recorder for moc
+        "_drnl_neuron_recorder",
+        # the recorder for the ihcan recordings
+        "_ihcan_neuron_recorder",
+        # the recorder of the drnls that record no moc, which records nothing
+        "_idle_drnl_neuron_recorder",
+        # the recorder of the ihcans that record through no neuron recorder,
+        # which records nothing
+        "_idle_ihcan_neuron_recorder",
+        # bool per drnl saying if it records moc
+        "_recording_drnls",
+        # bool per ihcan saying if it records with the ihcan recorder
+        "_recording_ihcans",
+        # bool per ihcan saying if it records packed spikes
+        "_packed_spike_ihcans",
+        # bool per ihcan saying if it records quantized spike probs
+        "_quantized_spike_prob_ihcans",
+        # the stapes displacement made on the host, or None
+        "_host_input_data",
+        # bool flag for the ome output being read from shared sdram
+        "_shared_sdram_input",
+        # how many moc samples go into each recorded moc value
+        "_moc_decimation_factor",
+        # bool flag for recording the mean of the decimated moc samples
+        "_moc_decimation_average",
+        # bool flag for recording moc as float32
+        "_moc_float32",
+        # how many fibres each ihcan simulates
+        "_n_fibres_per_ihcan",
+        # how many segments the packed spike region holds, 0 if unused
+        "_n_packed_spike_rows",
+        # how many segments the quantized spike prob region holds, 0 if unused
+        "_n_quantized_spike_prob_rows",
+        # the data type quantized spike probs are recorded as
+        "_spike_prob_data_type",
+        # the release rate in /s the largest quantized spike prob stands for
+        "_spike_prob_max_rate",
+        # bool flag for the ihcans running the fixed point kernel
+        "_ihcan_fixed_point",
+        # the random number generator seeds, a row per ihcan
+        "_ihc_seeds",
+        # the (n lsr, n msr, n hsr) of each ihcan, a row per ihcan
+        "_ihcan_fibre_counts"
+    ]
+
+    # error message for more fibre types than fibres
+    N_FIBRES_ERROR = (
+        "Only {} fibres can be modelled per IHCAN, currently requesting {} "
+        "lsr, {} msr, {} hsr")
+
+    def __init__(
+            self, parent, synapse_manager, graph_index, fs, seq_size,
+            n_data_points, timer_period, profile, resample_factor,
+            drnl_neuron_recorder, ihcan_neuron_recorder, host_input_data,
+            shared_sdram_input, moc_decimation_factor, moc_decimation_average,
+            moc_float32, n_fibres_per_ihcan, n_packed_spike_rows,
+            n_quantized_spike_prob_rows, spike_prob_data_type,
+            spike_prob_max_rate, ihcan_fixed_point, idle_drnl_neuron_recorder,
+            idle_ihcan_neuron_recorder, recording_drnls, recording_ihcans,
+            packed_spike_ihcans, quantized_spike_prob_ihcans):
+        """
+        :param parent: the app vertex
+        :param synapse_manager: the synaptic manager of the app vertex
+        :param graph_index: the ear internal connections of each machine \
+        vertex
+        :param fs: sampling freq
+        :param seq_size: the seg size
+        :param n_data_points: the number of audio samples to process
+        :param timer_period: timer period of every ear core
+        :param profile: bool flag for profiling
+        :param resample_factor: resample factor
+        :param drnl_neuron_recorder: the recorder for moc
+        :param ihcan_neuron_recorder: the recorder for the ihcan recordings
+        :param host_input_data: the stapes displacement made on the host, \
+        or None if an OME core feeds the drnls
+        :param shared_sdram_input: bool flag for the ome output being read \
+        from a shared sdram ring buffer
+        :param moc_decimation_factor: how many moc samples go into each \
+        recorded moc value
+        :param moc_decimation_average: bool flag for recording the mean of \
+        the decimated moc samples rather than the last of them
+        :param moc_float32: bool flag for recording moc as float32
+        :param n_fibres_per_ihcan: how many fibres each ihcan simulates
+        :param n_packed_spike_rows: the number of segments to record spikes \
+        for as packed bits, or 0 to not record packed spikes
+        :param n_quantized_spike_prob_rows: the number of segments to record \
+        quantized spike probabilities for, or 0 to not record them
+        :param spike_prob_data_type: the data type of the quantized spike \
+        probabilities
+        :param spike_prob_max_rate: the vesicle release rate in /s the \
+        largest quantized spike prob code stands for
+        :param ihcan_fixed_point: bool flag for the ihcans running the \
+        fixed point kernel
+        :param idle_drnl_neuron_recorder: a recorder for moc that records \
+        nothing, for the drnls not selected to record
+        :param idle_ihcan_neuron_recorder: a recorder for the ihcan \
+        recordings that records nothing, for the ihcans not selected to \
+        record
+        :param recording_drnls: bool per drnl saying if it records moc
+        :param recording_ihcans: bool per ihcan saying if it records with \
+        the ihcan recorder
+        :param packed_spike_ihcans: bool per ihcan saying if it records \
+        packed spikes
+        :param quantized_spike_prob_ihcans: bool per ihcan saying if it \
+        records quantized spike probs
+        """
+        self._parent = parent
+        self._synapse_manager = synapse_manager
+        self._graph_index = graph_index
+        self._fs = fs
+        self._seq_size = seq_size
+        self._n_data_points = n_data_points
+        self._timer_period = timer_period
+        self._profile = profile
+        self._resample_factor = resample_factor
+        self._drnl_neuron_recorder = drnl_neuron_recorder
+        self._ihcan_neuron_recorder = ihcan_neuron_recorder
+        self._host_input_data = host_input_data
+        self._shared_sdram_input = shared_sdram_input
+        self._moc_decimation_factor = moc_decimation_factor
+        self._moc_decimation_average = moc_decimation_average
+        self._moc_float32 = moc_float32
+        self._n_fibres_per_ihcan = n_fibres_per_ihcan
+        self._n_packed_spike_rows = n_packed_spike_rows
+        self._n_quantized_spike_prob_rows = n_quantized_spike_prob_rows
+        self._spike_prob_data_type = spike_prob_data_type
+        self._spike_prob_max_rate = spike_prob_max_rate
+        self._ihcan_fixed_point = ihcan_fixed_point
+        self._idle_drnl_neuron_recorder = idle_drnl_neuron_recorder
+        self._idle_ihcan_neuron_recorder = idle_ihcan_neuron_recorder
+        self._recording_drnls = recording_drnls
+        self._recording_ihcans = recording_ihcans
+        self._packed_spike_ihcans = packed_spike_ihcans
+        self._quantized_spike_prob_ihcans = quantized_spike_prob_ihcans
+        self._ihc_seeds = None
+        self._ihcan_fibre_counts = None
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @property
+    def synapse_manager(self):
+        return self._synapse_manager
+
+    @property
+    def graph_index(self):
+        return self._graph_index
+
+    @property
+    def fs(self):
+        return self._fs
+
+    @property
+    def dt(self):
+        return 1.0 / self._fs
+
+    @property
+    def seq_size(self):
+        return self._seq_size
+
+    @property
+    def n_data_points(self):
+        return self._n_data_points
+
+    @property
+    def timer_period(self):
+        return self._timer_period
+
+    @property
+    def profile(self):
+        return self._profile
+
+    @property
+    def resample_factor(self):
+        return self._resample_factor
+
+    @property
+    def drnl_neuron_recorder(self):
+        return self._drnl_neuron_recorder
+
+    @property
+    def ihcan_neuron_recorder(self):
+        return self._ihcan_neuron_recorder
+
+    @property
+    def host_input_data(self):
+        return self._host_input_data
+
+    @property
+    def shared_sdram_input(self):
+        return self._shared_sdram_input
+
+    @property
+    def moc_decimation_factor(self):
+        return self._moc_decimation_factor
+
+    @property
+    def moc_decimation_average(self):
+        return self._moc_decimation_average
+
+    @property
+    def moc_float32(self):
+        return self._moc_float32
+
+    @property
+    def n_fibres_per_ihcan(self):
+        return self._n_fibres_per_ihcan
+
+    @property
+    def n_packed_spike_rows(self):
+        return self._n_packed_spike_rows
+
+    @property
+    def n_quantized_spike_prob_rows(self):
+        return self._n_quantized_spike_prob_rows
+
+    @property
+    def spike_prob_data_type(self):
+        return self._spike_prob_data_type
+
+    @property
+    def spike_prob_full_scale(self):
+        """ the release probability per spike sample the largest \
+        quantized spike prob code stands for, from the largest release rate
+
+        :rtype: float
+        """
+        return min(
+            self._spike_prob_max_rate * self._resample_factor * self.dt, 1.0)
+
+    @property
+    def ihcan_fixed_point(self):
+        return self._ihcan_fixed_point
+
+    def sdram_edge_size(self, n_buffers_in_sdram_total):
+        """ the size in bytes of a drnl to ihcan sdram ring buffer
+
+        :param n_buffers_in_sdram_total: the segments the ring buffer holds
+        :rtype: int
+        """
+        return (
+            n_buffers_in_sdram_total * self._seq_size *
+            DataType.FLOAT_64.size)
+
+    def set_random_choices(self, ihc_seeds, ihcan_fibre_counts):
+        """ sets the seeds and fibre types of every ihcan, which they \
+        write on the next data generation
+
+        :param ihc_seeds: the seeds, a row per ihcan
+        :param ihcan_fibre_counts: the (n lsr, n msr, n hsr), a row per ihcan
+        :rtype: None
+        """
+        ihcan_fibre_counts = numpy.asarray(
+            ihcan_fibre_counts, dtype=numpy.uint32).reshape(-1, 3)
+        for n_lsr, n_msr, n_hsr in ihcan_fibre_counts:
+            if n_lsr + n_msr + n_hsr > self._n_fibres_per_ihcan:
+                raise Exception(self.N_FIBRES_ERROR.format(
+                    self._n_fibres_per_ihcan, n_lsr, n_msr, n_hsr))
+        self._ihc_seeds = numpy.asarray(
+            ihc_seeds, dtype=numpy.uint32).reshape(
+                len(ihcan_fibre_counts), -1)
+        self._ihcan_fibre_counts = ihcan_fibre_counts
+
+    def get_ihc_seeds(self, ihcan_index):
+        """ the random number generator seeds of an ihcan
+
+        :param ihcan_index: the index of the ihcan
+        :rtype: numpy.ndarray
+        """
+        return self._ihc_seeds[ihcan_index]
+
+    def get_ihcan_fibre_counts(self, ihcan_index):
+        """ the fibre types of an ihcan
+
+        :param ihcan_index: the index of the ihcan
+        :return: the n lsr, n msr and n hsr
+        :rtype: tuple(int, int, int)
+        """
+        n_lsr, n_msr, n_hsr = self._ihcan_fibre_counts[ihcan_index]
+        return int(n_lsr), int(n_msr), int(n_hsr)
+
+    def get_drnl_neuron_recorder(self, drnl_index):
+        """ the recorder a drnl sizes and writes its recording region with, \
+        which records nothing when the drnl is not selected to record
+
+        :param drnl_index: the index of the drnl
+        :rtype: NeuronRecorder
+        """
+        if self._recording_drnls[drnl_index]:
+            return self._drnl_neuron_recorder
+        return self._idle_drnl_neuron_recorder
+
+    def get_ihcan_neuron_recorder(self, ihcan_index):
+        """ the recorder an ihcan sizes and writes its recording region \
+        with, which records nothing when the ihcan is not selected to record
+
+        :param ihcan_index: the index of the ihcan
+        :rtype: NeuronRecorder
+        """
+        if self._recording_ihcans[ihcan_index]:
+            return self._ihcan_neuron_recorder
+        return self._idle_ihcan_neuron_recorder
+
+    def get_n_packed_spike_rows(self, ihcan_index):
+        """ the segments an ihcan records packed spikes for, 0 if it does \
+        not record them
+
+        :param ihcan_index: the index of the ihcan
+        :rtype: int
+        """
+        if self._packed_spike_ihcans[ihcan_index]:
+            return self._n_packed_spike_rows
+        return 0
+
+    def get_n_quantized_spike_prob_rows(self, ihcan_index):
+        """ the segments an ihcan records quantized spike probs for, 0 if \
+        it does not record them
+
+        :param ihcan_index: the index of the ihcan
+        :rtype: int
+        """
+        if self._quantized_spike_prob_ihcans[ihcan_index]:
+            return self._n_quantized_spike_prob_rows
+        return 0
+
+    def get_ihcan_recording_slice(self, ihcan_index):
+        """ the slice of the ihcan recording atoms an ihcan records
+
+        :param ihcan_index: the index of the ihcan
+        :rtype: Slice
+        """
+        n_atoms = self._n_fibres_per_ihcan * self._seq_size
+        return Slice(
+            ihcan_index * n_atoms, (ihcan_index + 1) * n_atoms - 1)
@@ -0,0 +1,107 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+class EarGraphIndex(object):
+    """ The ear internal connections of each machine vertex, filled in as \
+    the ear builds its machine graph, so the data specs can look them up \
+    without scanning the graph edges.
+    """
+
+    __slots__ = [
+        # the multicast edge each vertex takes its input key from
+        "_key_source_edges",
+        # the sdram partition each vertex reads its input from
+        "_incoming_sdram_partitions",
+        # the sdram partition each vertex writes its output to
+        "_outgoing_sdram_partitions",
+        # the edges from the children of each vertex, in order
+        "_child_edges"
+    ]
+
+    def __init__(self):
+        self._key_source_edges = dict()
+        self._incoming_sdram_partitions = dict()
+        self._outgoing_sdram_partitions = dict()
+        self._child_edges = dict()
+
+    def add_key_source_edge(self, vertex, edge):
+        """ records the multicast edge a vertex takes its input key from
+
+        :param vertex: the receiving machine vertex
+        :param edge: the multicast edge
+        :rtype: None
+        """
+        self._key_source_edges[vertex] = edge
+
+    def get_key_source_edge(self, vertex):
+        """ the multicast edge a vertex takes its input key from
+
+        :param vertex: the receiving machine vertex
+        :return: the edge, or None if the vertex has no key source
+        """
+        return self._key_source_edges.get(vertex)
+
+    def add_outgoing_sdram_partition(self, vertex, partition):
+        """ records the sdram partition a vertex writes its output to
+
+        :param vertex: the writing machine vertex
+        :param partition: the sdram partition
+        :rtype: None
+        """
+        self._outgoing_sdram_partitions[vertex] = partition
+
+    def get_outgoing_sdram_partition(self, vertex):
+        """ the sdram partition a vertex writes its output to
+
+        :param vertex: the writing machine vertex
+        :return: the partition, or None if the vertex has none
+        """
+        return self._outgoing_sdram_partitions.get(vertex)
+
+    def add_incoming_sdram_partition(self, vertex, partition):
+        """ records the sdram partition a vertex reads its input from
+
+        :param vertex: the reading machine vertex
+        :param partition: the sdram partition
+        :rtype: None
+        """
+        self._incoming_sdram_partitions[vertex] = partition
+
+    def get_incoming_sdram_partition(self, vertex):
+        """ the sdram partition a vertex reads its input from
+
+        :param vertex: the reading machine vertex
+        :return: the partition, or None if the vertex has none
+        """
+        return self._incoming_sdram_partitions.get(vertex)
+
+    def add_child_edge(self, vertex, edge):
+        """ records an edge from a child of an aggregation vertex
+
+        :param vertex: the aggregation machine vertex
+        :param edge: the edge from the child
+        :rtype: None
+        """
+        self._child_edges.setdefault(vertex, list()).append(edge)
+
+    def get_child_edges(self, vertex):
+        """ the edges from the children of an aggregation vertex
+
+        :param vertex: the aggregation machine vertex
+        :return: the edges, in the order the children were added
+        :rtype: list
+        """
+        return self._child_edges.get(vertex, list())
@@ -0,0 +1,323 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Lays out the keys of the partitions inside an ear so the partitions \
+that share a route share a key and mask: the drnls of a channel group, and \
+the children of each aggregation node, take an aligned power of 2 block of \
+keys, so a router can send the whole block with one entry.
+
+Run as a module it places an ear in chip groups, and counts the routing \
+entries its partitions need with keys given out in the order they are \
+built and with the compact layout::
+
+    python -m spinnak_ear.spinnak_ear_utilities.ear_keys \\
+        --channels 3000 --ihcans-per-drnl 5 --child-per-group 4
+"""
+
+import argparse
+from collections import namedtuple, defaultdict
+
+from spinnak_ear.spinnak_ear_utilities.ear_placement import place_ear
+
+# the keys of a full mask
+_FULL_MASK = 0xFFFFFFFF
+
+# the (dx, dy) a packet moves along each link of a chip
+_LINK_MOVES = [(1, 0), (1, 1), (0, 1), (-1, 0), (-1, -1), (0, -1)]
+
+# the (key, mask) of the partition of each drnl, ihcan and aggregation node \
+# of each row but the last, whose partitions leave the ear, and the number \
+# of keys the ear takes from its base
+EarKeys = namedtuple("EarKeys", ["drnls", "ihcans", "an_rows", "n_keys"])
+
+# the routing entries the partitions of an ear need
+RoutingEntryCount = namedtuple(
+    "RoutingEntryCount", ["n_entries", "max_entries_per_chip", "n_chips"])
+
+# error message for a base key that is not aligned to the block of the ear
+KEY_BASE_ALIGNMENT_ERROR = (
+    "The internal key base {} of the ear is not a multiple of {}, the "
+    "largest block of keys in it")
+
+
+def _bits(n_values):
+    """ the bits that hold a number of values
+
+    :param n_values: the number of values
+    :rtype: int
+    """
+    return int(n_values - 1).bit_length()
+
+
+def _padded_index(index, n_per_group):
+    """ the index of an item of consecutive groups, with the place of each \
+    item in its group padded to a power of 2, so each group starts on an \
+    aligned boundary
+
+    :param index: the index of the item
+    :param n_per_group: the items in each group
+    :rtype: int
+    """
+    return ((index // n_per_group) << _bits(n_per_group)) | (
+        index % n_per_group)
+
+
+def _region(n_items, n_per_group, item_bits):
+    """ the key offset of each of a run of items and the keys they take, \
+    each item taking an aligned block of 2 ** item_bits keys and each group \
+    an aligned block of a power of 2 items
+
+    :param n_items: the number of items
+    :param n_per_group: the items in each group
+    :param item_bits: the bits of the keys of each item
+    :return: the offset of each item and the power of 2 keys of the run
+    :rtype: tuple(list(int), int)
+    """
+    offsets = [_padded_index(index, n_per_group) << item_bits
+               for index in range(n_items)]
+    n_keys = 1
+    if offsets:
+        n_keys = 2 ** _bits(offsets[-1] + (1 << item_bits))
+    return offsets, n_keys
+
+
+def plan_ear_keys(
+        n_drnls, n_ihcans, n_keys_per_ihcan, n_child_per_group,
+        n_internal_rows, n_drnls_per_group, base_key=0):
+    """ lays out the keys of the drnls, ihcans and aggregation nodes of an \
+    ear from a base key. Each run of partitions takes an aligned block, the \
+    largest first, so the base must be a multiple of the largest block. An \
+    aggregation node passes on the fibres of its children after one \
+    another, so it takes a block that holds the fibres of all its children, \
+    whatever the padding of their own blocks.
+
+    :param n_drnls: the number of drnls
+    :param n_ihcans: the number of ihcans
+    :param n_keys_per_ihcan: the keys each ihcan sends, one per fibre
+    :param n_child_per_group: the children of each aggregation node
+    :param n_internal_rows: the rows of the aggregation tree whose \
+    partitions stay in the ear, all but the last
+    :param n_drnls_per_group: the drnls of a channel group, which share a \
+    chip
+    :param base_key: the first key of the ear
+    :rtype: EarKeys
+    """
+    runs = list()
+    runs.append(_region(n_drnls, n_drnls_per_group, 0) + (0,))
+    child_bits = _bits(n_keys_per_ihcan)
+    runs.append(_region(n_ihcans, n_child_per_group, child_bits) +
+                (child_bits,))
+    n_children = n_ihcans
+    n_child_atoms = n_keys_per_ihcan
+    for _ in range(n_internal_rows):
+        n_nodes = (n_children + n_child_per_group - 1) // n_child_per_group
+        n_child_atoms *= min(n_children, n_child_per_group)
+        node_bits = _bits(n_child_atoms)
+        runs.append(
+            _region(n_nodes, n_child_per_group, node_bits) + (node_bits,))
+        n_children = n_nodes
+
+    # the largest run first keeps every run aligned to its size
+    largest = max(n_keys for _, n_keys, _ in runs)
+    if base_key % largest:
+        raise Exception(KEY_BASE_ALIGNMENT_ERROR.format(base_key, largest))
+    run_bases = dict()
+    next_key = base_key
+    for index in sorted(
+            range(len(runs)), key=lambda run: runs[run][1], reverse=True):
+        run_bases[index] = next_key
+        next_key += runs[index][1]
+
+    keys = list()
+    for index, (offsets, _, item_bits) in enumerate(runs):
+        mask = _FULL_MASK ^ ((1 << item_bits) - 1)
+        keys.append([(run_bases[index] + offset, mask)
+                     for offset in offsets])
+    return EarKeys(keys[0], keys[1], keys[2:], next_key - base_key)
+
+
+def _route(source, target):
+    """ the chips a packet passes through from a chip to another and the \
+    link it leaves each by, going along the diagonal first
+
+    :param source: the (x, y) of the chip the packet starts on
+    :param target: the (x, y) of the chip the packet is for
+    :rtype: list(tuple(tuple(int, int), int))
+    """
+    dx = target[0] - source[0]
+    dy = target[1] - source[1]
+    moves = list()
+    if dx * dy > 0:
+        diagonal = min(abs(dx), abs(dy))
+        moves += [1 if dx > 0 else 4] * diagonal
+        dx -= diagonal if dx > 0 else -diagonal
+        dy -= diagonal if dy > 0 else -diagonal
+    moves += [0 if dx > 0 else 3] * abs(dx)
+    moves += [2 if dy > 0 else 5] * abs(dy)
+    steps = list()
+    chip = source
+    for link in moves:
+        steps.append((chip, link))
+        chip = (chip[0] + _LINK_MOVES[link][0],
+                chip[1] + _LINK_MOVES[link][1])
+    return steps
+
+
+def _merge_blocks(keys_and_masks):
+    """ merges pairs of aligned blocks of keys that together make the next \
+    larger aligned block, until none are left to merge
+
+    :param keys_and_masks: the (key, mask) of each block
+    :rtype: set(tuple(int, int))
+    """
+    blocks = set(keys_and_masks)
+    merged = True
+    while merged:
+        merged = False
+        for key, mask in sorted(blocks):
+            bit = mask & -mask
+            if not bit or (key, mask) not in blocks:
+                continue
+            buddy = (key ^ bit, mask)
+            if buddy in blocks:
+                blocks.difference_update(((key, mask), buddy))
+                blocks.add((key & ~bit, mask & ~bit))
+                merged = True
+    return blocks
+
+
+def count_routing_entries(partitions, chip_of, merge=True):
+    """ counts the routing entries the partitions need on each chip of a \
+    placement. A chip a packet passes straight through needs no entry. \
+    With merging, the entries of a chip with the same route whose blocks of \
+    keys together make a larger aligned block become one entry.
+
+    :param partitions: the pre vertex, post vertices, key and mask of each \
+    partition
+    :param chip_of: the (x, y) chip of each vertex
+    :param merge: bool flag for merging entries
+    :rtype: RoutingEntryCount
+    """
+    tables = defaultdict(lambda: defaultdict(list))
+    for pre, posts, key, mask in partitions:
+        routes = defaultdict(set)
+        arrivals = dict()
+        for post in posts:
+            for chip, link in _route(chip_of[pre], chip_of[post]):
+                routes[chip].add(link)
+                next_chip = (chip[0] + _LINK_MOVES[link][0],
+                             chip[1] + _LINK_MOVES[link][1])
+                arrivals[next_chip] = link
+            routes[chip_of[post]].add(post)
+        for chip, route in routes.items():
+            if (chip != chip_of[pre] and len(route) == 1 and
+                    arrivals.get(chip) in route):
+                continue
+            tables[chip][frozenset(route)].append((key, mask))
+
+    n_entries = dict()
+    for chip, routes in tables.items():
+        n_entries[chip] = sum(
+            len(_merge_blocks(blocks)) if merge else len(blocks)
+            for blocks in routes.values())
+    return RoutingEntryCount(
+        sum(n_entries.values()), max(n_entries.values()), len(n_entries))
+
+
+def build_order_keys(partitions, n_keys):
+    """ gives each partition the next block of keys aligned to its own \
+    power of 2 size in the order given, as a key allocator does without a \
+    layout to follow
+
+    :param partitions: the pre vertex and post vertices of each partition
+    :param n_keys: the number of keys of each pre vertex
+    :return: the pre vertex, post vertices, key and mask of each partition
+    :rtype: list(tuple)
+    """
+    keyed = list()
+    next_key = 0
+    for pre, posts in partitions:
+        size = 2 ** _bits(n_keys[pre])
+        key = -(-next_key // size) * size
+        keyed.append((pre, posts, key, _FULL_MASK ^ (size - 1)))
+        next_key = key + size
+    return keyed
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Counts the routing entries of an ear's partitions")
+    parser.add_argument("--channels", type=int, default=3000)
+    parser.add_argument("--ihcans-per-drnl", type=int, default=5)
+    parser.add_argument("--fibres-per-ihcan", type=int, default=2)
+    parser.add_argument("--child-per-group", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cores-per-chip", type=int, default=16)
+    options = parser.parse_args(args)
+
+    n_ihcans = options.channels * options.ihcans_per_drnl
+    chip_of, _, edges = place_ear(
+        options.channels, options.ihcans_per_drnl, options.child_per_group,
+        options.rows, options.cores_per_chip)
+
+    # the partitions inside the ear, in the order they are built
+    posts = defaultdict(list)
+    for pre, post in edges:
+        posts[pre].append(post)
+    n_keys = dict()
+    order = list()
+    for drnl in range(options.channels):
+        order.append(("drnl", drnl))
+        n_keys[("drnl", drnl)] = 1
+    for ihcan in range(n_ihcans):
+        order.append(("ihcan", ihcan))
+        n_keys[("ihcan", ihcan)] = options.fibres_per_ihcan
+    for pre, post in edges:
+        if post[0] == "an":
+            n_keys[post] = n_keys.get(post, 0) + n_keys[pre]
+    order += sorted(vertex for vertex in posts if vertex[0] == "an")
+    partitions = [(pre, posts[pre]) for pre in order]
+
+    # drnls a chip holds in the plan, as the channel groups
+    n_drnls_per_group = max(
+        options.cores_per_chip // (1 + options.ihcans_per_drnl), 1)
+    keys = plan_ear_keys(
+        options.channels, n_ihcans, options.fibres_per_ihcan,
+        options.child_per_group, options.rows - 1, n_drnls_per_group)
+    key_of = dict()
+    key_of.update(
+        (("drnl", index), key) for index, key in enumerate(keys.drnls))
+    key_of.update(
+        (("ihcan", index), key) for index, key in enumerate(keys.ihcans))
+    for row, row_keys in enumerate(keys.an_rows):
+        key_of.update(
+            (("an", row, index), key) for index, key in enumerate(row_keys))
+    compact = [(pre, post_vertices) + key_of[pre]
+               for pre, post_vertices in partitions]
+
+    built = build_order_keys(partitions, n_keys)
+    for name, keyed, merge in (
+            ("build order keys, unmerged", built, False),
+            ("build order keys, merged", built, True),
+            ("compact keys, merged", compact, True)):
+        count = count_routing_entries(keyed, chip_of, merge)
+        print("{}: {} entries on {} chips, at most {} on a chip".format(
+            name, count.n_entries, count.n_chips,
+            count.max_entries_per_chip))
+    print("compact keys take {} keys".format(keys.n_keys))
+
+
+if __name__ == "__main__":
+    main()
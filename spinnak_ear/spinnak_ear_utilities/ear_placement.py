@@ -0,0 +1,378 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Plans the chips of an ear: each chip takes as many drnls as fit with \
+their ihcans, which their sdram edges tie to the chip anyway, and the first \
+row aggregation nodes whose last child ihcan is on it, so the spikes of \
+most ihcans reach their aggregation node without leaving the chip.
+
+Run as a module it simulates placing an ear a group at a time on a machine, \
+first as the placer groups it without a plan and then with the plan, and \
+reports the chips used, how full they are and how many hops the multicast \
+edges of the ear take::
+
+    python -m spinnak_ear.spinnak_ear_utilities.ear_placement \\
+        --channels 3000 --ihcans-per-drnl 5 --child-per-group 4
+"""
+
+import argparse
+import math
+from collections import namedtuple
+
+import numpy
+
+# the drnls, ihcans and first row aggregation nodes placed on a chip, by
+# index, and whether the chip holds a broadcasting ome
+EarChipGroup = namedtuple(
+    "EarChipGroup", ["ome", "drnls", "ihcans", "an_nodes"])
+
+# what a simulated placement of an ear comes to
+PackingReport = namedtuple(
+    "PackingReport", [
+        "n_chips", "utilization", "mean_hops", "max_hops",
+        "mean_ihcan_hops", "off_chip_ihcans"])
+
+# error message for a machine too small to take the ear
+MACHINE_FULL_ERROR = "A {} by {} machine cannot take a group of {} cores"
+
+
+def n_first_row_nodes(n_ihcans, n_child_per_group):
+    """ how many aggregation nodes the first row of the tree has
+
+    :param n_ihcans: the number of ihcans
+    :param n_child_per_group: the children of each aggregation node
+    :rtype: int
+    """
+    return (n_ihcans + n_child_per_group - 1) // n_child_per_group
+
+
+def _nodes_ending_by(ihcan_end, n_ihcans, n_child_per_group):
+    """ the first row aggregation nodes whose last child comes before an \
+    ihcan, as the index after the last of them
+
+    :param ihcan_end: the index of the ihcan
+    :param n_ihcans: the number of ihcans
+    :param n_child_per_group: the children of each aggregation node
+    :rtype: int
+    """
+    if ihcan_end >= n_ihcans:
+        return n_first_row_nodes(n_ihcans, n_child_per_group)
+    return ihcan_end // n_child_per_group
+
+
+def plan_chip_groups(
+        n_drnls, n_ihcans_per_drnl, n_child_per_group, n_cores_per_chip,
+        n_drnls_per_ome=None):
+    """ splits the drnls, ihcans and first row aggregation nodes of an ear \
+    into chips. Each chip takes the drnls that, with their ihcans and the \
+    aggregation nodes whose last child is among those ihcans, fill the \
+    most of its cores; the nodes that do not fit fill chips of their own \
+    after the others. With broadcasting omes, each chip takes an ome and the \
+    drnls it feeds.
+
+    :param n_drnls: the number of drnls
+    :param n_ihcans_per_drnl: the number of ihcans of each drnl
+    :param n_child_per_group: the children of each aggregation node
+    :param n_cores_per_chip: the cores a chip gives the ear
+    :param n_drnls_per_ome: the drnls each broadcasting ome feeds, or None \
+    when the omes do not broadcast
+    :rtype: list(EarChipGroup)
+    """
+    n_ihcans = n_drnls * n_ihcans_per_drnl
+    n_ome_cores = 0 if n_drnls_per_ome is None else 1
+    groups = list()
+    overflow = list()
+    drnl = 0
+    node = 0
+    while drnl < n_drnls:
+        if n_drnls_per_ome is not None:
+            candidates = [min(n_drnls_per_ome, n_drnls - drnl)]
+        else:
+            most = max(n_cores_per_chip // (1 + n_ihcans_per_drnl), 1)
+            candidates = range(min(most, n_drnls - drnl), 0, -1)
+
+        # the drnls that with as many of their nodes as fit fill the most
+        # cores, preferring the choice that leaves no node out
+        best = None
+        for n_chip_drnls in candidates:
+            free = (n_cores_per_chip - n_ome_cores -
+                    n_chip_drnls * (1 + n_ihcans_per_drnl))
+            node_end = _nodes_ending_by(
+                (drnl + n_chip_drnls) * n_ihcans_per_drnl, n_ihcans,
+                n_child_per_group)
+            n_chip_nodes = max(min(node_end - node, free), 0)
+            choice = (n_cores_per_chip - free + n_chip_nodes,
+                      n_chip_nodes == node_end - node,
+                      n_chip_drnls, n_chip_nodes, node_end)
+            if best is None or choice[:2] > best[:2]:
+                best = choice
+        _, _, n_chip_drnls, n_chip_nodes, node_end = best
+        overflow.extend(range(node + n_chip_nodes, node_end))
+
+        groups.append(EarChipGroup(
+            n_drnls_per_ome is not None,
+            range(drnl, drnl + n_chip_drnls),
+            range(drnl * n_ihcans_per_drnl,
+                  (drnl + n_chip_drnls) * n_ihcans_per_drnl),
+            list(range(node, node + n_chip_nodes))))
+        drnl += n_chip_drnls
+        node = node_end
+
+    # nodes no chip had room for fill chips of their own
+    for first in range(0, len(overflow), n_cores_per_chip):
+        groups.append(EarChipGroup(
+            False, range(0), range(0),
+            overflow[first:first + n_cores_per_chip]))
+    return groups
+
+
+def hops(chip_a, chip_b):
+    """ the fewest links between two chips of a machine without wrap \
+    around, whose links run along x, y and the diagonal x = y
+
+    :param chip_a: the (x, y) of a chip
+    :param chip_b: the (x, y) of the other chip
+    :rtype: int
+    """
+    dx = chip_b[0] - chip_a[0]
+    dy = chip_b[1] - chip_a[1]
+    if dx * dy > 0:
+        return max(abs(dx), abs(dy))
+    return abs(dx) + abs(dy)
+
+
+def radial_chips(width, height):
+    """ the chips of a machine in the order a radial placer fills them, \
+    nearest to 0, 0 first
+
+    :param width: the chips across the machine
+    :param height: the chips up the machine
+    :rtype: list(tuple(int, int))
+    """
+    return sorted(
+        ((x, y) for x in range(width) for y in range(height)),
+        key=lambda chip: (hops((0, 0), chip), chip[1], chip[0]))
+
+
+def ear_tree(n_drnls, n_ihcans_per_drnl, n_child_per_group, n_rows):
+    """ the aggregation nodes of each row of the tree over the ihcans, and \
+    the multicast edges of the ear, its vertices being named by tuples of \
+    their kind and index
+
+    :param n_drnls: the number of drnls
+    :param n_ihcans_per_drnl: the number of ihcans of each drnl
+    :param n_child_per_group: the children of each aggregation node
+    :param n_rows: the rows of the aggregation tree
+    :return: the nodes of each row and the (pre, post) vertex of each edge
+    :rtype: tuple(list(list(tuple)), list(tuple(tuple, tuple)))
+    """
+    edges = list()
+    for ihcan in range(n_drnls * n_ihcans_per_drnl):
+        edges.append((("drnl", ihcan // n_ihcans_per_drnl), ("ihcan", ihcan)))
+    children = [("ihcan", ihcan)
+                for ihcan in range(n_drnls * n_ihcans_per_drnl)]
+    rows = list()
+    for row in range(n_rows):
+        nodes = [("an", row, index) for index in range(
+            n_first_row_nodes(len(children), n_child_per_group))]
+        for index, child in enumerate(children):
+            edges.append((child, nodes[index // n_child_per_group]))
+        rows.append(nodes)
+        children = nodes
+    return rows, edges
+
+
+def place_first_fit(groups, chips, n_cores_per_chip):
+    """ places each group of vertices on the first chip with room for all \
+    of them, as the placer does with vertices that must share a chip
+
+    :param groups: the groups of vertices, in the order they are placed
+    :param chips: the chips in the order they are filled
+    :param n_cores_per_chip: the cores a chip gives the ear
+    :return: the chip of each vertex and the cores used on each chip
+    :rtype: tuple(dict, dict)
+    """
+    used = dict()
+    chip_of = dict()
+    for group in groups:
+        for chip in chips:
+            if used.get(chip, 0) + len(group) <= n_cores_per_chip:
+                break
+        else:
+            raise Exception(MACHINE_FULL_ERROR.format(
+                max(x for x, _ in chips) + 1, max(y for _, y in chips) + 1,
+                len(group)))
+        used[chip] = used.get(chip, 0) + len(group)
+        for vertex in group:
+            chip_of[vertex] = chip
+    return chip_of, used
+
+
+def packing_report(chip_of, used, edges, n_cores_per_chip):
+    """ what a placement of the ear comes to
+
+    :param chip_of: the chip of each vertex
+    :param used: the cores used on each chip
+    :param edges: the (pre, post) vertex of each multicast edge
+    :param n_cores_per_chip: the cores a chip gives the ear
+    :rtype: PackingReport
+    """
+    edge_hops = numpy.array(
+        [hops(chip_of[pre], chip_of[post]) for pre, post in edges])
+    ihcan_hops = numpy.array([
+        hops(chip_of[pre], chip_of[post]) for pre, post in edges
+        if pre[0] == "ihcan"])
+    return PackingReport(
+        len(used),
+        sum(used.values()) / float(len(used) * n_cores_per_chip),
+        float(numpy.mean(edge_hops)), int(numpy.max(edge_hops)),
+        float(numpy.mean(ihcan_hops)), int(numpy.count_nonzero(ihcan_hops)))
+
+
+def place_ear(
+        n_drnls, n_ihcans_per_drnl, n_child_per_group, n_rows,
+        n_cores_per_chip, n_drnls_per_ome=None, planned=True, width=None,
+        height=None):
+    """ places an ear on a machine in the planned chip groups, or as the \
+    placer groups it without a plan, a drnl and its ihcans to a group and \
+    every other vertex alone in the order they are built
+
+    :param n_drnls: the number of drnls
+    :param n_ihcans_per_drnl: the number of ihcans of each drnl
+    :param n_child_per_group: the children of each aggregation node
+    :param n_rows: the rows of the aggregation tree
+    :param n_cores_per_chip: the cores a chip gives the ear
+    :param n_drnls_per_ome: the drnls each broadcasting ome feeds, or None \
+    for a single ome feeding every drnl
+    :param planned: bool flag for placing the planned chip groups
+    :param width: the chips across the machine, or None for a square \
+    machine with room to spare
+    :param height: the chips up the machine, or None to match the width
+    :return: the chip of each vertex, the cores used on each chip and the \
+    (pre, post) vertex of each multicast edge
+    :rtype: tuple(dict, dict, list(tuple(tuple, tuple)))
+    """
+    rows, edges = ear_tree(
+        n_drnls, n_ihcans_per_drnl, n_child_per_group, n_rows)
+    n_ihcans = n_drnls * n_ihcans_per_drnl
+    if n_drnls_per_ome is None:
+        omes = [[("ome", 0)]]
+        edges += [(("ome", 0), ("drnl", drnl)) for drnl in range(n_drnls)]
+    else:
+        omes = [[("ome", index)] for index in range(
+            (n_drnls + n_drnls_per_ome - 1) // n_drnls_per_ome)]
+        edges += [(("ome", drnl // n_drnls_per_ome), ("drnl", drnl))
+                  for drnl in range(n_drnls)]
+
+    if width is None:
+        n_cores = (len(omes) + n_drnls + n_ihcans +
+                   sum(len(nodes) for nodes in rows))
+        width = int(math.ceil(math.sqrt(
+            2.0 * n_cores / n_cores_per_chip))) + 1
+    if height is None:
+        height = width
+    chips = radial_chips(width, height)
+
+    groups = list()
+    if planned:
+        if n_drnls_per_ome is None:
+            groups.extend(omes)
+        for index, group in enumerate(plan_chip_groups(
+                n_drnls, n_ihcans_per_drnl, n_child_per_group,
+                n_cores_per_chip, n_drnls_per_ome)):
+            groups.append(
+                (omes[index] if group.ome else []) +
+                [("drnl", drnl) for drnl in group.drnls] +
+                [("ihcan", ihcan) for ihcan in group.ihcans] +
+                [rows[0][node] for node in group.an_nodes])
+        groups += [[node] for nodes in rows[1:] for node in nodes]
+    else:
+        # the sdram edges group a drnl and its ihcans, and a broadcasting
+        # ome with its drnls
+        drnl_groups = [
+            [("drnl", drnl)] + [
+                ("ihcan", ihcan) for ihcan in range(
+                    drnl * n_ihcans_per_drnl,
+                    (drnl + 1) * n_ihcans_per_drnl)]
+            for drnl in range(n_drnls)]
+        if n_drnls_per_ome is None:
+            groups = omes + drnl_groups
+        else:
+            groups = [
+                omes[index] + sum(
+                    drnl_groups[lo:lo + n_drnls_per_ome], [])
+                for index, lo in enumerate(
+                    range(0, n_drnls, n_drnls_per_ome))]
+        groups += [[node] for nodes in rows for node in nodes]
+
+    chip_of, used = place_first_fit(groups, chips, n_cores_per_chip)
+    return chip_of, used, edges
+
+
+def simulate_ear_packing(
+        n_drnls, n_ihcans_per_drnl, n_child_per_group, n_rows,
+        n_cores_per_chip, n_drnls_per_ome=None, width=None, height=None):
+    """ places an ear on a machine first without and then with the planned \
+    chip groups
+
+    :param n_drnls: the number of drnls
+    :param n_ihcans_per_drnl: the number of ihcans of each drnl
+    :param n_child_per_group: the children of each aggregation node
+    :param n_rows: the rows of the aggregation tree
+    :param n_cores_per_chip: the cores a chip gives the ear
+    :param n_drnls_per_ome: the drnls each broadcasting ome feeds, or None \
+    for a single ome feeding every drnl
+    :param width: the chips across the machine, or None for a square \
+    machine with room to spare
+    :param height: the chips up the machine, or None to match the width
+    :return: the report without and with the plan
+    :rtype: tuple(PackingReport, PackingReport)
+    """
+    reports = list()
+    for planned in (False, True):
+        chip_of, used, edges = place_ear(
+            n_drnls, n_ihcans_per_drnl, n_child_per_group, n_rows,
+            n_cores_per_chip, n_drnls_per_ome, planned, width, height)
+        reports.append(packing_report(chip_of, used, edges, n_cores_per_chip))
+    return tuple(reports)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Simulates placing an ear with and without chip groups")
+    parser.add_argument("--channels", type=int, default=3000)
+    parser.add_argument("--ihcans-per-drnl", type=int, default=5)
+    parser.add_argument("--child-per-group", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cores-per-chip", type=int, default=16)
+    parser.add_argument(
+        "--drnls-per-ome", type=int, default=None,
+        help="the drnls each broadcasting ome feeds")
+    options = parser.parse_args(args)
+
+    reports = simulate_ear_packing(
+        options.channels, options.ihcans_per_drnl, options.child_per_group,
+        options.rows, options.cores_per_chip, options.drnls_per_ome)
+    for name, report in zip(("without plan", "with plan"), reports):
+        print("{}: {} chips, {:.1%} of their cores used, {:.2f} mean and {} "
+              "max hops per edge, {:.2f} mean hops from an ihcan with {} "
+              "ihcans off their node's chip".format(
+                  name, report.n_chips, report.utilization,
+                  report.mean_hops, report.max_hops, report.mean_ihcan_hops,
+                  report.off_chip_ihcans))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from multiprocessing.pool import ThreadPool
+from threading import Lock
+
+import numpy
+from six.moves.queue import Queue
+
+from spinn_utilities.progress_bar import ProgressBar
+
+from pacman.model.placements import Placements
+
+from spinnak_ear.spinnak_ear_utilities.packed_spikes import BITS_PER_WORD
+
+# the time stamp the recording library writes before each row
+N_BYTES_FOR_TIMESTAMP = 4
+
+# the word layout the rows are stored in on the machine
+_WORD_DTYPE = "<u4"
+
+
+class EarRecordingExtractor(object):
+    """ Reads the recordings of the ear cores on a bounded number of \
+    threads, decoding each core's rows straight into its columns of one \
+    array per variable rather than building a list per core and joining \
+    them.
+
+    Regions the buffer manager holds are first fetched for all the cores \
+    at once by the buffer manager, which is not safe to use from several \
+    threads; each core's bytes are then looked up in turn and decoded in \
+    parallel. Regions read straight from the machine are read on the \
+    threads themselves, each through a reader no other thread is using, \
+    so as many reads are in flight as there are threads and readers.
+
+    Each core's rows are a time stamp and then its values, atom major, as \
+    the ear kernels record them: value k of atom a is at a * \
+    values_per_atom + k. The recorded_slice of a core covers these values, \
+    so its atoms, and so its columns, are those of the slice divided by \
+    values_per_atom.
+    """
+
+    __slots__ = [
+        # the buffer manager the recordings are read from
+        "_buffer_manager",
+        # the placements of the vertices
+        "_placements",
+        # the most cores read and decoded at once, or 0 to read and decode
+        # them in turn on the calling thread
+        "_n_threads",
+        # held while looking up the data of a core in the buffer manager
+        "_read_lock"
+    ]
+
+    # error message for a negative number of threads
+    N_THREADS_ERROR = "Recordings cannot be read with {} threads"
+
+    def __init__(self, buffer_manager, placements, n_threads):
+        """
+        :param buffer_manager: the buffer manager the recordings are read \
+        from
+        :param placements: the placements of the vertices
+        :param n_threads: the most cores read and decoded at once, or 0 \
+        to read and decode them in turn on the calling thread
+        """
+        if n_threads < 0:
+            raise Exception(self.N_THREADS_ERROR.format(n_threads))
+        self._buffer_manager = buffer_manager
+        self._placements = placements
+        self._n_threads = n_threads
+        self._read_lock = Lock()
+
+    @property
+    def n_threads(self):
+        return self._n_threads
+
+    def map_vertices(self, vertices, read, decode, label, readers=None):
+        """ reads and decodes the data of each vertex n_threads at a time, \
+        reporting progress as each finishes
+
+        :param vertices: the vertices
+        :param read: called with a vertex, its placement and one of the \
+        readers to read its data, on any thread but never with a reader \
+        another thread is using; without readers it is called with None \
+        and never on two threads at once
+        :param decode: called with a vertex, its placement and the data \
+        read, on any thread
+        :param label: what the progress bar says is being done
+        :param readers: the readers to share between the threads, or None
+        :return: the decoded results, in the order of the vertices
+        :rtype: list
+        """
+        vertices = list(vertices)
+        progress = ProgressBar(len(vertices), label)
+        free_readers = None
+        if readers is not None:
+            free_readers = Queue()
+            for reader in readers:
+                free_readers.put(reader)
+
+        def call(index):
+            vertex = vertices[index]
+            placement = self._placements.get_placement_of_vertex(vertex)
+            if free_readers is None:
+                with self._read_lock:
+                    data = read(vertex, placement, None)
+            else:
+                reader = free_readers.get()
+                try:
+                    data = read(vertex, placement, reader)
+                finally:
+                    free_readers.put(reader)
+            return index, decode(vertex, placement, data)
+
+        results = [None] * len(vertices)
+        if self._n_threads == 0:
+            for index in range(len(vertices)):
+                results[index] = call(index)[1]
+                progress.update()
+        else:
+            pool = ThreadPool(min(self._n_threads, max(len(vertices), 1)))
+            try:
+                for index, result in pool.imap_unordered(
+                        call, range(len(vertices))):
+                    results[index] = result
+                    progress.update()
+            finally:
+                pool.close()
+                pool.join()
+        progress.end()
+        return results
+
+    def _map_buffered(self, vertices, region, decode, label):
+        """ fetches a region of all the vertices with the buffer manager, \
+        then looks up the bytes of each in turn and decodes them n_threads \
+        at a time
+
+        :param vertices: the vertices
+        :param region: the recording region
+        :param decode: called with a vertex, its placement and its bytes, \
+        on any thread
+        :param label: what the progress bar says is being done
+        :return: the decoded results, in the order of the vertices
+        :rtype: list
+        """
+        vertices = list(vertices)
+        self._buffer_manager.get_data_for_placements(Placements(
+            self._placements.get_placement_of_vertex(vertex)
+            for vertex in vertices))
+
+        def read(vertex, placement, _reader):
+            data, _ = self._buffer_manager.get_data_by_placement(
+                placement, region)
+            return bytes(data)
+        return self.map_vertices(vertices, read, decode, label)
+
+    @staticmethod
+    def _rows(data, row_bytes):
+        """ the whole rows in the bytes a core has recorded
+
+        :param data: the bytes read
+        :param row_bytes: the bytes of each row, with its time stamp
+        :return: the rows, one per row of bytes
+        :rtype: numpy.ndarray of uint8
+        """
+        data = numpy.frombuffer(data, dtype=numpy.uint8)
+        n_rows = len(data) // row_bytes
+        return data[:n_rows * row_bytes].reshape(n_rows, row_bytes)
+
+    def get_matrix(
+            self, vertices, region, values_per_atom, dtype, n_rows,
+            n_columns, label):
+        """ reads values recorded a row per tick into a row per value and \
+        a column per atom, leaving nan where a core recorded fewer rows
+
+        :param vertices: the vertices that recorded the values
+        :param region: the recording region
+        :param values_per_atom: the values of each atom in a row
+        :param dtype: the numpy type of the values
+        :param n_rows: the rows each core is expected to record
+        :param n_columns: the atoms of all the vertices
+        :param label: what the progress bar says is being done
+        :return: the values, n_rows * values_per_atom by n_columns
+        :rtype: numpy.ndarray
+        """
+        dtype = numpy.dtype(dtype)
+        output = numpy.full(
+            (n_rows, values_per_atom, n_columns), numpy.nan, dtype=dtype)
+
+        def decode(vertex, placement, data):
+            recorded_slice = vertex.recorded_slice()
+            n_atoms = recorded_slice.n_atoms // values_per_atom
+            lo_atom = recorded_slice.lo_atom // values_per_atom
+            rows = self._rows(
+                data, N_BYTES_FOR_TIMESTAMP +
+                recorded_slice.n_atoms * dtype.itemsize)[:n_rows]
+            values = rows[:, N_BYTES_FOR_TIMESTAMP:].copy().view(dtype)
+            output[:len(rows), :, lo_atom:lo_atom + n_atoms] = \
+                values.reshape(
+                    len(rows), n_atoms, values_per_atom).transpose(0, 2, 1)
+
+        self._map_buffered(vertices, region, decode, label)
+        return output.reshape(n_rows * values_per_atom, n_columns)
+
+    def get_spikes(self, vertices, region, row_period, label):
+        """ reads spikes recorded as a bit per recording atom, a row per \
+        tick, into (id, time) pairs as the neuron recorder gives them, the \
+        id of a spike being its atom in the recorded_slice of its core
+
+        :param vertices: the vertices that recorded the spikes
+        :param region: the recording region
+        :param row_period: the time in ms between rows
+        :param label: what the progress bar says is being done
+        :return: numpy array of (id, time) pairs ordered by id then time
+        :rtype: numpy.ndarray
+        """
+
+        def decode(vertex, placement, data):
+            recorded_slice = vertex.recorded_slice()
+            n_bits = recorded_slice.n_atoms
+            n_words = (n_bits + BITS_PER_WORD - 1) // BITS_PER_WORD
+            rows = self._rows(
+                data, N_BYTES_FOR_TIMESTAMP + n_words * BITS_PER_WORD // 8)
+            bits = numpy.unpackbits(
+                rows[:, N_BYTES_FOR_TIMESTAMP:], axis=1,
+                bitorder="little")[:, :n_bits]
+            row, atom = numpy.nonzero(bits)
+            return atom + recorded_slice.lo_atom, row * row_period
+
+        per_vertex = self._map_buffered(vertices, region, decode, label)
+
+        # the spikes only have a size once every core is decoded
+        spikes = numpy.empty(
+            (sum(len(ids) for ids, _ in per_vertex), 2))
+        start = 0
+        for ids, times in per_vertex:
+            spikes[start:start + len(ids), 0] = ids
+            spikes[start:start + len(ids), 1] = times
+            start += len(ids)
+        return spikes[numpy.lexsort((spikes[:, 1], spikes[:, 0]))]
@@ -0,0 +1,332 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" The layout of every fixed size region the ear vertices write. The c \
+structs in the c_models/src/*/*_regions.h headers are generated from these; \
+after changing one, regenerate them with::
+
+    python -m spinnak_ear.spinnak_ear_utilities.ear_region_schemas
+"""
+
+import os
+import sys
+
+from spinnak_ear.spinnak_ear_utilities.region_schema import \
+    RegionSchema, UINT32, INT32, FLOAT32, FLOAT64, pointer_to
+
+# OME regions
+OME_PARAMETERS = RegionSchema(
+    "parameters_struct", "params region data format", [
+        ("total_ticks", UINT32, None),
+        ("seg_size", INT32, None),
+        ("key", UINT32, None),
+        ("input_generation", UINT32,
+         "bumped by the host each time it swaps the input audio"),
+        ("dt", FLOAT64, None)])
+
+OME_FILTER_COEFFS = RegionSchema(
+    "filter_coeffs_struct", "filter coeffs struct", [
+        ("shb1", FLOAT64, None),
+        ("shb2", FLOAT64, None),
+        ("shb3", FLOAT64, None),
+        ("sha1", FLOAT64, None),
+        ("sha2", FLOAT64, None),
+        ("sha3", FLOAT64, None)])
+
+OME_CONCHA_PARAMS = RegionSchema(
+    "concha_params_struct", "concha params", [
+        ("concha_gain_scalar", FLOAT64, None),
+        ("ear_canal_gain_scalar", FLOAT64, None)])
+
+OME_SDRAM_BROADCAST = RegionSchema(
+    "sdram_broadcast_struct",
+    "shared sdram ring buffer the drnls read the output from", [
+        ("enabled", UINT32, None),
+        ("sdram_base_address", pointer_to("float"), None),
+        ("n_buffers", UINT32, None)])
+
+OME_LIVE_INPUT = RegionSchema(
+    "live_input_struct", "live input params region data format", [
+        ("enabled", UINT32, None),
+        ("n_buffers", UINT32, None),
+        ("credit_tag", UINT32, None),
+        ("segments_per_credit", UINT32, None)])
+
+# DRNL regions
+DRNL_PARAMETERS = RegionSchema(
+    "parameters_struct", "params from the parameter region in sdram", [
+        ("key", UINT32, None),
+        ("ome_data_key", UINT32, None),
+        ("seq_size", INT32, None),
+        ("n_buffers_in_sdram", INT32, None),
+        ("n_synapse_types", INT32, None),
+        ("moc_decimation_factor", UINT32, None),
+        ("input_mode", UINT32, None),
+        ("moc_decimation_average", UINT32, None),
+        ("moc_float32", UINT32, None)])
+
+DRNL_DOUBLE_PARAMS = RegionSchema(
+    "double_parameters_struct",
+    "params from the double parameter region in sdram", [
+        ("moc_dec_1", FLOAT64, None),
+        ("moc_dec_2", FLOAT64, None),
+        ("moc_dec_3", FLOAT64, None),
+        ("moc_factor_1", FLOAT64, None),
+        ("ctbm", FLOAT64, None),
+        ("receip_ctbm", FLOAT64, None),
+        ("disp_thresh", FLOAT64, None)])
+
+DRNL_FILTER_PARAMS = RegionSchema(
+    "filter_params_struct", "params from the filter params region in sdram", [
+        ("la1", FLOAT64, None),
+        ("la2", FLOAT64, None),
+        ("lb0", FLOAT64, None),
+        ("lb1", FLOAT64, None),
+        ("nla1", FLOAT64, None),
+        ("nla2", FLOAT64, None),
+        ("nlb0", FLOAT64, None),
+        ("nlb1", FLOAT64, None)])
+
+DRNL_HOST_INPUT_DATA = RegionSchema(
+    "host_input_data_struct", "host generated stapes displacement", [
+        ("n_samples", UINT32, None)],
+    flexible_array=("samples", "float"))
+
+DRNL_SHARED_INPUT = RegionSchema(
+    "shared_input_struct", "shared sdram ring buffer written by the OME", [
+        ("sdram_base_address", pointer_to("float"), None),
+        ("n_buffers", UINT32, None)])
+
+DRNL_SDRAM_EDGE = RegionSchema(
+    "sdram_out_buffer_param", "sdram edge the ihcans read the output from", [
+        ("sdram_base_address", pointer_to("double"), None),
+        ("sdram_edge_size", INT32, "in bytes"),
+        ("n_elements", UINT32, "in doubles")])
+
+# IHCAN regions
+IHCAN_PARAMETERS = RegionSchema(
+    "parameters_struct", "the data items in sdram from the params region", [
+        ("resampling_factor", INT32, None),
+        ("number_fibres", INT32, None),
+        ("seg_size", INT32, None),
+        ("number_of_sdram_buffers", INT32, None),
+        ("num_lsr", INT32, None),
+        ("num_msr", INT32, None),
+        ("num_hsr", INT32, None),
+        ("my_key", UINT32, None)])
+
+IHCAN_PACKED_SPIKES = RegionSchema(
+    "packed_spikes_struct",
+    "spikes packed as a bit per fibre per sample, a row per segment", [
+        ("n_words_per_row", UINT32, None),
+        ("n_rows", UINT32, None),
+        ("n_rows_recorded", UINT32, None)],
+    flexible_array=("rows", "uint32_t"))
+
+IHCAN_QUANTIZED_SPIKE_PROB = RegionSchema(
+    "quantized_spike_prob_struct",
+    "spike probs quantized to 8 or 16 bits, a row per segment", [
+        ("bytes_per_value", UINT32, None),
+        ("full_scale", FLOAT32, None),
+        ("n_words_per_row", UINT32, None),
+        ("n_rows", UINT32, None),
+        ("n_rows_recorded", UINT32, None)],
+    flexible_array=("rows", "uint32_t"))
+
+IHCAN_DT_PARAMS = RegionSchema(
+    "dt_params_struct", "elements based off dt", [
+        ("dt", FLOAT32, None),
+        ("z", FLOAT32, None)])
+
+IHCAN_SDRAM_EDGE = RegionSchema(
+    "sdram_out_buffer_param", "sdram edge data from sdram", [
+        ("sdram_base_address", pointer_to("double"), None)])
+
+IHCAN_CILIA_PARAMS = RegionSchema(
+    "cilia_constants_struct", "cilia constants struct params", [
+        ("recips0", FLOAT32, None),
+        ("recips1", FLOAT32, None)])
+
+IHCAN_INNER_EAR_PARAMS = RegionSchema(
+    "inner_ear_param_struct", "inner ear params", [
+        ("an_cleft_lsr", FLOAT32, None),
+        ("an_cleft_msr", FLOAT32, None),
+        ("an_cleft_hsr", FLOAT32, None),
+        ("an_avail_lsr", FLOAT32, None),
+        ("an_avail_msr", FLOAT32, None),
+        ("an_avail_hsr", FLOAT32, None),
+        ("an_repro_lsr", FLOAT32, None),
+        ("an_repro_msr", FLOAT32, None),
+        ("an_repro_hsr", FLOAT32, None),
+        ("ihcv", FLOAT32, None),
+        ("m_ica_curr", FLOAT32, None),
+        ("ekp", FLOAT32, None),
+        ("ca_curr_lsr", FLOAT32, None),
+        ("ca_curr_msr", FLOAT32, None),
+        ("ca_curr_hsr", FLOAT32, None),
+        ("r_max_recip", FLOAT32, None)])
+
+IHCAN_FIXED_POINT_PARAMS = RegionSchema(
+    "fixed_point_params_struct",
+    "the constants of the fixed point kernel, already in its formats", [
+        ("cilia_feedback", INT32, "s16.15, cilia filter b2 - a1"),
+        ("cilia_c", UINT32, "u0.32"),
+        ("cilia_u0", INT32, "s16.15 nm"),
+        ("cilia_u1", INT32, "s16.15 nm"),
+        ("cilia_recips0", INT32, "s16.15 per nm"),
+        ("cilia_recips1", INT32, "s16.15 per nm"),
+        ("cilia_ga", INT32, "s16.15 nS"),
+        ("cilia_g_max", INT32, "s16.15 nS"),
+        ("cilia_gk", INT32, "s16.15 nS"),
+        ("cilia_et", INT32, "s16.15 mV"),
+        ("ekp", INT32, "s16.15 mV"),
+        ("cilia_dt_cap", UINT32, "u0.32 mV per pA per sample"),
+        ("gamma", UINT32, "u0.32 per mV"),
+        ("recip_beta", UINT32, "u0.32"),
+        ("dt_tau_m", INT32, "s16.15"),
+        ("ihcv", INT32, "s16.15 mV, at rest"),
+        ("m_ica_curr", UINT32, "u0.32, at rest"),
+        ("eca", INT32, "s16.15 mV"),
+        ("ca_gain", UINT32,
+         "u0.32, cube root release rate added per mV of calcium drive"),
+        ("ca_decay_lsr", UINT32, "u0.32 per sample"),
+        ("ca_decay_msr", UINT32, "u0.32 per sample"),
+        ("ca_decay_hsr", UINT32, "u0.32 per sample"),
+        ("ca_rate_root_lsr", INT32,
+         "s16.15 cube root of the release rate in Hz, at rest"),
+        ("ca_rate_root_msr", INT32, None),
+        ("ca_rate_root_hsr", INT32, None),
+        ("an_cleft_lsr", INT32, "s16.15"),
+        ("an_cleft_msr", INT32, "s16.15"),
+        ("an_cleft_hsr", INT32, "s16.15"),
+        ("an_avail_lsr", INT32, "whole vesicles"),
+        ("an_avail_msr", INT32, "whole vesicles"),
+        ("an_avail_hsr", INT32, "whole vesicles"),
+        ("an_repro_lsr", INT32, "s16.15"),
+        ("an_repro_msr", INT32, "s16.15"),
+        ("an_repro_hsr", INT32, "s16.15"),
+        ("max_neurotransmitters", INT32, "whole vesicles"),
+        ("dt_spikes", UINT32, "u0.32 s"),
+        ("refrac_period", INT32, "s16.15 resampled samples"),
+        ("y_keep", UINT32, "u0.32, 1 - ydt"),
+        ("x_keep", UINT32, "u0.32, 1 - xdt"),
+        ("rdt", UINT32, "u0.32"),
+        ("cleft_loss", UINT32, "u0.32, rdt + ldt")])
+
+IHCAN_LOOKUP_TABLES = RegionSchema(
+    "lookup_tables_struct",
+    "tables in place of exponentials and powers, then their values", [
+        ("apical_start", FLOAT32, "displacement of the first point in m"),
+        ("apical_recip_step", FLOAT32, "points per m"),
+        ("n_apical_points", UINT32, None),
+        ("calcium_start", FLOAT32, "potential of the first point in V"),
+        ("calcium_recip_step", FLOAT32, "points per V"),
+        ("n_calcium_points", UINT32, None),
+        ("n_replenish_powers", UINT32, None),
+        ("n_reprocessing_powers", UINT32, None)],
+    flexible_array=("values", "float"))
+
+# AN group regions
+AN_PARAMETERS = RegionSchema(
+    "params_struct", "params from parameter region", [
+        ("n_children", INT32, None),
+        ("has_key", INT32, None),
+        ("key", UINT32, None),
+        ("is_final_row", INT32, None),
+        ("n_atoms", INT32, None)])
+
+AN_KEY_MASK_ENTRY = RegionSchema(
+    "key_mask_table_entry", "table entry", [
+        ("key", UINT32, None),
+        ("mask", UINT32, None),
+        ("offset", UINT32, None)])
+
+AN_LIVE_OUTPUT = RegionSchema(
+    "live_output_struct", "live output params from the live output region", [
+        ("enabled", UINT32, None),
+        ("tag", UINT32, None),
+        ("index", UINT32, None)])
+
+# the generated headers, relative to c_models/src, with their include guard
+# and the schemas they declare
+C_HEADERS = {
+    os.path.join("ome_vertex", "OME_regions.h"): (
+        "OME_REGIONS_H_", [
+            OME_PARAMETERS, OME_FILTER_COEFFS, OME_CONCHA_PARAMS,
+            OME_SDRAM_BROADCAST, OME_LIVE_INPUT]),
+    os.path.join("drnl_vertex", "DRNL_regions.h"): (
+        "DRNL_REGIONS_H_", [
+            DRNL_PARAMETERS, DRNL_DOUBLE_PARAMS, DRNL_FILTER_PARAMS,
+            DRNL_HOST_INPUT_DATA, DRNL_SHARED_INPUT, DRNL_SDRAM_EDGE]),
+    os.path.join("ihcan_vertex", "IHC_AN_regions.h"): (
+        "IHC_AN_REGIONS_H_", [
+            IHCAN_PARAMETERS, IHCAN_PACKED_SPIKES,
+            IHCAN_QUANTIZED_SPIKE_PROB, IHCAN_DT_PARAMS, IHCAN_SDRAM_EDGE,
+            IHCAN_CILIA_PARAMS, IHCAN_INNER_EAR_PARAMS,
+            IHCAN_FIXED_POINT_PARAMS, IHCAN_LOOKUP_TABLES]),
+    os.path.join("an_node", "AN_group_node_regions.h"): (
+        "AN_GROUP_NODE_REGIONS_H_", [
+            AN_KEY_MASK_ENTRY, AN_PARAMETERS, AN_LIVE_OUTPUT])}
+
+# the licence and warning at the top of each generated header
+_C_HEADER_PREAMBLE = """/*
+ * Copyright (c) 2019-2020 The University of Manchester
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+// GENERATED by spinnak_ear.spinnak_ear_utilities.ear_region_schemas, do
+// not edit. Change the schemas there and regenerate instead."""
+
+
+def c_header(guard, schemas):
+    """ the text of a generated header declaring the schemas
+
+    :param guard: the include guard
+    :param schemas: the schemas to declare
+    :rtype: str
+    """
+    parts = [_C_HEADER_PREAMBLE,
+             "#ifndef {0}\n#define {0}\n\n#include <stdint.h>".format(guard)]
+    parts.extend(schema.c_struct() for schema in schemas)
+    parts.append("#endif /* {} */\n".format(guard))
+    return "\n\n".join(parts)
+
+
+def write_c_headers(c_src_dir):
+    """ regenerates every region header
+
+    :param c_src_dir: the c_models/src directory
+    :rtype: None
+    """
+    for path, (guard, schemas) in C_HEADERS.items():
+        with open(os.path.join(c_src_dir, path), "w") as header:
+            header.write(c_header(guard, schemas))
+
+
+if __name__ == "__main__":
+    write_c_headers(sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(__file__), os.pardir, os.pardir, "c_models", "src"))
@@ -0,0 +1,286 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import neo
+import numpy
+import quantities
+
+from spinnak_ear.spinnak_ear_utilities.ear_atom_map import \
+    EarAtomMap, FIBRE_TYPES
+
+# the type spike times are held as
+SPIKE_TIME_DTYPE = numpy.float32
+
+# the type the offsets into the spike times are held as
+OFFSET_DTYPE = numpy.int64
+
+
+class EarSpikeTrains(object):
+    """ The spikes of the fibres of an ear in columns: one flat array of \
+    spike times, ordered by fibre and then time, and the start and stop of \
+    each fibre's times in it, with the fibre, channel and fibre type of each.
+
+    Selections share the spike times of the ear they are taken from. A \
+    selection of consecutive fibres, such as a channel, is a view of the \
+    columns too; any other selection, such as a fibre type, holds only its \
+    own starts, stops and annotations.
+    """
+
+    __slots__ = [
+        # the spike times in ms of all the fibres, shared by selections
+        "_times",
+        # the index in the times of the first spike of each fibre
+        "_starts",
+        # the index in the times after the last spike of each fibre
+        "_stops",
+        # the index of each fibre in the ear
+        "_fibres",
+        # the channel of each fibre
+        "_channels",
+        # the fibre type code of each fibre
+        "_fibre_types",
+        # the time in ms the recording stops
+        "_t_stop"
+    ]
+
+    def __init__(
+            self, times, starts, stops, fibres, channels, fibre_types,
+            t_stop):
+        """
+        :param times: the spike times in ms, float32
+        :param starts: the index in the times of the first spike of each \
+        fibre
+        :param stops: the index in the times after the last spike of each \
+        fibre
+        :param fibres: the index of each fibre in the ear
+        :param channels: the channel of each fibre
+        :param fibre_types: the fibre type code of each fibre
+        :param t_stop: the time in ms the recording stops
+        """
+        self._times = times
+        self._starts = starts
+        self._stops = stops
+        self._fibres = fibres
+        self._channels = channels
+        self._fibre_types = fibre_types
+        self._t_stop = t_stop
+
+    @classmethod
+    def from_recorded_spikes(
+            cls, spikes, values_per_fibre, sample_period, channels,
+            fibre_types, t_stop):
+        """ builds the columns from (id, time) pairs as the ihcan cores \
+        record them, a recording atom for each sample of each fibre in a \
+        row, so recording atom a is sample a % values_per_fibre of fibre \
+        a // values_per_fibre
+
+        :param spikes: numpy array of (recording atom, row time in ms) pairs
+        :param values_per_fibre: the samples of each fibre in a row
+        :param sample_period: the time in ms between samples
+        :param channels: the channel of each fibre of the ear
+        :param fibre_types: the fibre type code of each fibre of the ear
+        :param t_stop: the time in ms the recording stops
+        :rtype: EarSpikeTrains
+        """
+        spikes = numpy.asarray(spikes).reshape(-1, 2)
+        atoms = spikes[:, 0].astype(OFFSET_DTYPE)
+        fibres = atoms // values_per_fibre
+        times = (spikes[:, 1] + (atoms % values_per_fibre) *
+                 sample_period).astype(SPIKE_TIME_DTYPE)
+        order = numpy.lexsort((times, fibres))
+        n_fibres = len(channels)
+        offsets = numpy.zeros(n_fibres + 1, dtype=OFFSET_DTYPE)
+        numpy.cumsum(
+            numpy.bincount(fibres, minlength=n_fibres), out=offsets[1:])
+        return cls(
+            times[order], offsets[:-1], offsets[1:],
+            numpy.arange(n_fibres), numpy.asarray(channels),
+            numpy.asarray(fibre_types), t_stop)
+
+    @classmethod
+    def from_atom_map(
+            cls, spikes, values_per_fibre, sample_period, atom_map, t_stop):
+        """ builds the columns from recorded (id, time) pairs, taking the \
+        channel and fibre type of each fibre from the atom map of the ear, \
+        whose atoms are the fibres in recording order
+
+        :param spikes: numpy array of (recording atom, row time in ms) pairs
+        :param values_per_fibre: the samples of each fibre in a row
+        :param sample_period: the time in ms between samples
+        :param atom_map: the atom map of the ear
+        :param t_stop: the time in ms the recording stops
+        :rtype: EarSpikeTrains
+        """
+        return cls.from_recorded_spikes(
+            spikes, values_per_fibre, sample_period,
+            atom_map.data["channel"], atom_map.data["fibre_type"], t_stop)
+
+    @property
+    def times(self):
+        """ the spike times in ms that the starts and stops index, which \
+        may hold the spikes of fibres not in this selection
+        """
+        return self._times
+
+    @property
+    def starts(self):
+        return self._starts
+
+    @property
+    def stops(self):
+        return self._stops
+
+    @property
+    def fibres(self):
+        return self._fibres
+
+    @property
+    def channels(self):
+        return self._channels
+
+    @property
+    def fibre_types(self):
+        return self._fibre_types
+
+    @property
+    def t_stop(self):
+        return self._t_stop
+
+    def __len__(self):
+        return len(self._fibres)
+
+    @property
+    def counts(self):
+        """ the number of spikes of each fibre
+
+        :rtype: numpy.ndarray
+        """
+        return self._stops - self._starts
+
+    @property
+    def n_spikes(self):
+        return int(numpy.sum(self.counts))
+
+    def spike_times(self, index):
+        """ a view of the spike times of a fibre of the selection
+
+        :param index: the index of the fibre in the selection
+        :rtype: numpy.ndarray
+        """
+        return self._times[self._starts[index]:self._stops[index]]
+
+    def select(self, mask):
+        """ the fibres of a boolean mask over the selection, as views of \
+        the columns when they are consecutive
+
+        :param mask: a bool per fibre of the selection
+        :rtype: EarSpikeTrains
+        """
+        indices = numpy.flatnonzero(mask)
+        if len(indices) and indices[-1] - indices[0] + 1 == len(indices):
+            indices = slice(indices[0], indices[-1] + 1)
+        return EarSpikeTrains(
+            self._times, self._starts[indices], self._stops[indices],
+            self._fibres[indices], self._channels[indices],
+            self._fibre_types[indices], self._t_stop)
+
+    def select_channels(self, channels):
+        """ the fibres of some channels; the fibres of a channel are \
+        consecutive, so a range of channels is a view of the columns
+
+        :param channels: a channel or a list of them
+        :rtype: EarSpikeTrains
+        """
+        return self.select(numpy.isin(self._channels, channels))
+
+    def select_fibre_types(self, fibre_types):
+        """ the fibres of some fibre types
+
+        :param fibre_types: a fibre type by name or code, or a list of them
+        :rtype: EarSpikeTrains
+        """
+        return self.select(numpy.isin(
+            self._fibre_types, EarAtomMap.fibre_type_codes(fibre_types)))
+
+    def chunks(self, n_fibres):
+        """ the selection a number of consecutive fibres at a time, each a \
+        view of the columns
+
+        :param n_fibres: the most fibres in a chunk
+        :rtype: iterable(EarSpikeTrains)
+        """
+        for start in range(0, len(self), n_fibres):
+            chunk = slice(start, start + n_fibres)
+            yield EarSpikeTrains(
+                self._times, self._starts[chunk], self._stops[chunk],
+                self._fibres[chunk], self._channels[chunk],
+                self._fibre_types[chunk], self._t_stop)
+
+    def flat_spikes(self):
+        """ the spikes of the selection fibre by fibre, as the index in the \
+        selection of the fibre of each spike and its time in ms
+
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        counts = self.counts
+        indices = (
+            numpy.arange(numpy.sum(counts), dtype=OFFSET_DTYPE) +
+            numpy.repeat(self._starts - (numpy.cumsum(counts) - counts),
+                         counts))
+        return (numpy.repeat(numpy.arange(len(self)), counts),
+                self._times[indices])
+
+    def to_spike_pairs(self):
+        """ the spikes as (fibre, time) pairs ordered by fibre then time, \
+        as get_spikes gives them once recording atoms are made fibres
+
+        :rtype: numpy.ndarray
+        """
+        rows, times = self.flat_spikes()
+        return numpy.column_stack((self._fibres[rows], times))
+
+    def to_raster(self, bin_width):
+        """ the number of spikes of each fibre of the selection in each bin \
+        of time up to t_stop, with no bins when t_stop is 0
+
+        :param bin_width: the width of a bin in ms
+        :return: a row per fibre and a column per bin
+        :rtype: numpy.ndarray
+        """
+        n_bins = int(numpy.ceil(self._t_stop / bin_width))
+        if n_bins <= 0:
+            return numpy.zeros((len(self), 0), dtype=OFFSET_DTYPE)
+        rows, times = self.flat_spikes()
+        bins = numpy.minimum(
+            (times / bin_width).astype(OFFSET_DTYPE), n_bins - 1)
+        return numpy.bincount(
+            rows * n_bins + bins, minlength=len(self) * n_bins).reshape(
+                len(self), n_bins)
+
+    def to_neo(self):
+        """ the spikes as a neo segment with a spike train per fibre, \
+        annotated with its fibre, channel and fibre type
+
+        :rtype: neo.Segment
+        """
+        fibre_type_names = {code: name for name, code in FIBRE_TYPES.items()}
+        segment = neo.Segment()
+        for index in range(len(self)):
+            segment.spiketrains.append(neo.SpikeTrain(
+                self.spike_times(index), t_stop=self._t_stop,
+                units=quantities.ms, source_id=int(self._fibres[index]),
+                channel=int(self._channels[index]),
+                fibre_type=fibre_type_names[int(self._fibre_types[index])]))
+        return segment
@@ -0,0 +1,381 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Times reading back the recordings of a whole ear of IHCAN cores from \
+stand ins, which hold made up rows and take a fixed time per core read \
+from the machine::
+
+    python -m spinnak_ear.spinnak_ear_utilities.extraction_benchmark \\
+        --cores 15000 --threads 0 4 16 --latency 0.002
+
+Regions the buffer manager holds are fetched for all the cores by the \
+stand in buffer manager at once, a read per core, before the threads \
+decode them, so threads only take the decoding off that time. Regions read \
+straight from the machine are read by the threads, each with a stand in \
+reader of its own, so the reads overlap. Each thread count is checked to \
+give the same arrays as reading the cores in turn, and is compared with \
+building a list per core and joining them.
+"""
+
+import argparse
+from threading import Lock
+import time
+
+import numpy
+
+from pacman.model.graphs.common import Slice
+from pacman.model.placements import Placement, Placements
+
+from spinnak_ear.spinnak_ear_utilities.ear_recording_extraction import \
+    EarRecordingExtractor, N_BYTES_FOR_TIMESTAMP
+from spinnak_ear.spinnak_ear_utilities.packed_spikes import \
+    BITS_PER_WORD, packed_spike_words_per_row
+
+# the recording regions of the stand in cores, as the ihcan records them
+SPIKE_REGION = 0
+SPIKE_PROB_REGION = 1
+
+# the cores a chip holds in the stand in placements
+_CORES_PER_CHIP = 16
+
+# the chance of a fibre spiking in a sample of the made up spikes
+_SPIKE_CHANCE = 0.01
+
+# error message for thread counts that decode differently
+MISMATCH_ERROR = "Reading with {} threads gave different {}"
+
+
+class StandInBufferManager(object):
+    """ Stands in for the buffer manager, holding the rows each core \
+    recorded and taking a fixed time to read each core from the machine, \
+    either all at once with get_data_for_placements or on first asking \
+    for its data.
+    """
+
+    __slots__ = [
+        # the recorded bytes, by (x, y, p, region)
+        "_recordings",
+        # the time in s reading a core takes
+        "_latency",
+        # the (x, y, p) of the cores read from the machine
+        "_read"
+    ]
+
+    def __init__(self, recordings, latency):
+        """
+        :param recordings: the recorded bytes, by (x, y, p, region)
+        :param latency: the time in s reading a core takes
+        """
+        self._recordings = recordings
+        self._latency = latency
+        self._read = set()
+
+    def _read_core(self, placement):
+        """ reads a core from the machine if it has not been yet
+
+        :param placement: the placement of the core
+        :rtype: None
+        """
+        core = (placement.x, placement.y, placement.p)
+        if core not in self._read:
+            time.sleep(self._latency)
+            self._read.add(core)
+
+    def get_data_for_placements(self, placements, progress=None):
+        """ see BufferManager.get_data_for_placements
+        """
+        for placement in placements:
+            self._read_core(placement)
+
+    def get_data_by_placement(self, placement, recording_region_id):
+        """ see BufferManager.get_data_by_placement
+        """
+        self._read_core(placement)
+        return self._recordings[
+            placement.x, placement.y, placement.p, recording_region_id], False
+
+
+class StandInMemoryReader(object):
+    """ Stands in for a MachineMemoryReader, taking a fixed time per read \
+    of a region, and failing if two threads read with it at once.
+    """
+
+    __slots__ = [
+        # the recorded bytes, by (x, y, p, region)
+        "_recordings",
+        # the time in s each read takes
+        "_latency",
+        # held while reading
+        "_lock"
+    ]
+
+    # error message for a reader used by two threads at once
+    SHARED_ERROR = "A reader was used by two threads at once"
+
+    def __init__(self, recordings, latency):
+        """
+        :param recordings: the recorded bytes, by (x, y, p, region)
+        :param latency: the time in s each read takes
+        """
+        self._recordings = recordings
+        self._latency = latency
+        self._lock = Lock()
+
+    def read_region(self, placement, region):
+        """ reads the bytes a core recorded in a region
+
+        :param placement: the placement of the core
+        :param region: the region
+        :rtype: bytes
+        """
+        if not self._lock.acquire(False):
+            raise Exception(self.SHARED_ERROR)
+        try:
+            time.sleep(self._latency)
+            return self._recordings[
+                placement.x, placement.y, placement.p, region]
+        finally:
+            self._lock.release()
+
+
+class StandInIhcan(object):
+    """ Stands in for an IHCAN machine vertex, with just its recorded slice
+    """
+
+    __slots__ = [
+        # the fibre samples the core records in each row
+        "_recorded_slice"
+    ]
+
+    def __init__(self, recorded_slice):
+        """
+        :param recorded_slice: the fibre samples the core records in each \
+        row
+        """
+        self._recorded_slice = recorded_slice
+
+    def recorded_slice(self):
+        return self._recorded_slice
+
+
+def _rows(values, n_rows):
+    """ prefixes each row of values with its time stamp
+
+    :param values: the bytes of each row, as a 2d uint8 array
+    :param n_rows: the number of rows
+    :rtype: bytes
+    """
+    stamps = numpy.arange(n_rows, dtype="<u4").view(numpy.uint8).reshape(
+        n_rows, N_BYTES_FOR_TIMESTAMP)
+    return numpy.hstack((stamps, values)).tobytes()
+
+
+def make_stand_in_ear(n_cores, n_fibres, seq_size, n_rows, seed=None):
+    """ makes IHCAN cores that have recorded random spike probabilities \
+    and spikes, each row holding a segment of every fibre
+
+    :param n_cores: the number of cores
+    :param n_fibres: the fibres of each core
+    :param seq_size: the samples of each row
+    :param n_rows: the rows each core recorded
+    :param seed: the random seed, or None
+    :return: the vertices, their placements and the recorded bytes, by \
+    (x, y, p, region)
+    :rtype: tuple(list(StandInIhcan), Placements, dict)
+    """
+    rng = numpy.random.RandomState(seed)
+    recordings = dict()
+    vertices = list()
+    placement_list = list()
+    n_bits = n_fibres * seq_size
+    n_words = packed_spike_words_per_row(n_bits)
+    for core in range(n_cores):
+        vertex = StandInIhcan(Slice(
+            core * n_bits, (core + 1) * n_bits - 1))
+        placement = Placement(
+            vertex, core // _CORES_PER_CHIP, 0, core % _CORES_PER_CHIP + 1)
+        probs = rng.random_sample((n_rows, n_bits)).astype("<f4")
+        bits = numpy.zeros((n_rows, n_words * BITS_PER_WORD), numpy.uint8)
+        bits[:, :n_bits] = rng.random_sample((n_rows, n_bits)) < _SPIKE_CHANCE
+        core_id = (placement.x, placement.y, placement.p)
+        recordings[core_id + (SPIKE_PROB_REGION, )] = _rows(
+            probs.view(numpy.uint8), n_rows)
+        recordings[core_id + (SPIKE_REGION, )] = _rows(
+            numpy.packbits(bits, axis=1, bitorder="little"), n_rows)
+        vertices.append(vertex)
+        placement_list.append(placement)
+    return vertices, Placements(placement_list), recordings
+
+
+def read_spike_probs_from_machine(
+        extractor, vertices, readers, seq_size, n_rows, n_columns):
+    """ reads the spike probabilities straight from the stand in cores \
+    with the readers, as the ear reads the regions its cores record into \
+    themselves
+
+    :param extractor: the extractor
+    :param vertices: the vertices
+    :param readers: the stand in readers, shared between the threads
+    :param seq_size: the samples of each row
+    :param n_rows: the rows each core recorded
+    :param n_columns: the fibres of all the vertices
+    :return: the values, a row per sample and a column per fibre
+    :rtype: numpy.ndarray
+    """
+    output = numpy.full(
+        (n_rows, seq_size, n_columns), numpy.nan, dtype=numpy.float32)
+
+    def decode(vertex, placement, data):
+        recorded_slice = vertex.recorded_slice()
+        n_fibres = recorded_slice.n_atoms // seq_size
+        lo_fibre = recorded_slice.lo_atom // seq_size
+        rows = EarRecordingExtractor._rows(
+            data, N_BYTES_FOR_TIMESTAMP + recorded_slice.n_atoms * 4)
+        values = rows[:, N_BYTES_FOR_TIMESTAMP:].copy().view("<f4")
+        output[:len(rows), :, lo_fibre:lo_fibre + n_fibres] = \
+            values.reshape(len(rows), n_fibres, seq_size).transpose(0, 2, 1)
+
+    extractor.map_vertices(
+        vertices,
+        lambda vertex, placement, reader:
+            reader.read_region(placement, SPIKE_PROB_REGION),
+        decode, "Reading spike probabilities from the machine", readers)
+    return output.reshape(n_rows * seq_size, n_columns)
+
+
+def list_per_core_spike_probs(
+        vertices, placements, buffer_manager, seq_size):
+    """ reads the spike probabilities the way the recorder does, a list \
+    of rows per core joined at the end, to compare against
+
+    :param vertices: the vertices
+    :param placements: their placements
+    :param buffer_manager: the buffer manager
+    :param seq_size: the samples of each row
+    :return: the values, a row per sample and a column per fibre
+    :rtype: numpy.ndarray
+    """
+    columns = list()
+    for vertex in vertices:
+        n_fibres = vertex.recorded_slice().n_atoms // seq_size
+        data, _ = buffer_manager.get_data_by_placement(
+            placements.get_placement_of_vertex(vertex), SPIKE_PROB_REGION)
+        row_bytes = N_BYTES_FOR_TIMESTAMP + n_fibres * seq_size * 4
+        rows = list()
+        for start in range(0, len(data) - row_bytes + 1, row_bytes):
+            row = numpy.frombuffer(
+                data[start + N_BYTES_FOR_TIMESTAMP:start + row_bytes],
+                dtype="<f4")
+            for sample in range(seq_size):
+                rows.append(row[sample::seq_size])
+        columns.append(numpy.array(rows))
+    return numpy.concatenate(columns, axis=1)
+
+
+def benchmark_extraction(
+        n_cores, n_fibres, seq_size, n_rows, latency, thread_counts,
+        seed=None):
+    """ times reading the spike probabilities and spikes of the stand in \
+    cores with each number of threads, from the buffer manager and \
+    straight from the machine
+
+    :param n_cores: the number of cores
+    :param n_fibres: the fibres of each core
+    :param seq_size: the samples of each row
+    :param n_rows: the rows each core recorded
+    :param latency: the time in s reading a core takes
+    :param thread_counts: the numbers of threads to time
+    :param seed: the random seed, or None
+    :return: the s taken by the list per core read, and the s taken by \
+    each number of threads to read the spike probabilities and the \
+    spikes from the buffer manager and the spike probabilities from the \
+    machine
+    :rtype: tuple(float, dict(int, tuple(float, float, float)))
+    """
+    vertices, placements, recordings = make_stand_in_ear(
+        n_cores, n_fibres, seq_size, n_rows, seed)
+
+    start = time.time()
+    expected_probs = list_per_core_spike_probs(
+        vertices, placements,
+        StandInBufferManager(recordings, latency), seq_size)
+    list_time = time.time() - start
+
+    times = dict()
+    expected_spikes = None
+    for n_threads in thread_counts:
+        extractor = EarRecordingExtractor(
+            StandInBufferManager(recordings, latency),
+            placements, n_threads)
+        start = time.time()
+        probs = extractor.get_matrix(
+            vertices, SPIKE_PROB_REGION, seq_size, numpy.float32, n_rows,
+            n_cores * n_fibres, "Reading spike probabilities")
+        probs_time = time.time() - start
+        start = time.time()
+        spikes = extractor.get_spikes(
+            vertices, SPIKE_REGION, 1.0, "Reading spikes")
+        spikes_time = time.time() - start
+        start = time.time()
+        machine_probs = read_spike_probs_from_machine(
+            extractor, vertices,
+            [StandInMemoryReader(recordings, latency)
+             for _ in range(max(n_threads, 1))],
+            seq_size, n_rows, n_cores * n_fibres)
+        machine_time = time.time() - start
+
+        if not numpy.array_equal(probs, expected_probs):
+            raise Exception(MISMATCH_ERROR.format(
+                n_threads, "spike probabilities"))
+        if not numpy.array_equal(machine_probs, expected_probs):
+            raise Exception(MISMATCH_ERROR.format(
+                n_threads, "spike probabilities from the machine"))
+        if expected_spikes is None:
+            expected_spikes = spikes
+        elif not numpy.array_equal(spikes, expected_spikes):
+            raise Exception(MISMATCH_ERROR.format(n_threads, "spikes"))
+        times[n_threads] = (probs_time, spikes_time, machine_time)
+    return list_time, times
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Times reading back the recordings of stand in IHCAN "
+                    "cores with each number of threads")
+    parser.add_argument("--cores", type=int, default=15000)
+    parser.add_argument("--fibres", type=int, default=2)
+    parser.add_argument("--seq-size", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument(
+        "--latency", type=float, default=0.002,
+        help="time in s reading a core takes")
+    parser.add_argument(
+        "--threads", type=int, nargs="+", default=[0, 4, 16])
+    parser.add_argument("--seed", type=int, default=None)
+    options = parser.parse_args(args)
+
+    list_time, times = benchmark_extraction(
+        options.cores, options.fibres, options.seq_size, options.rows,
+        options.latency, options.threads, options.seed)
+    print("list per core: spike probs {:.2f} s".format(list_time))
+    for n_threads in options.threads:
+        print(
+            "{} threads: buffered spike probs {:.2f} s, buffered spikes "
+            "{:.2f} s, spike probs from the machine {:.2f} s".format(
+                n_threads, *times[n_threads]))
+
+
+if __name__ == "__main__":
+    main()
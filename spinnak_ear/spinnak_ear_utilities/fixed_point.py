@@ -0,0 +1,80 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Converting constants to the bit patterns of the fixed point formats the \
+fixed point IHCAN kernel works in: s16.15, as an accum, and u0.32, as an \
+unsigned long fract.
+"""
+
+import numpy
+
+# the fractional bits of an s16.15
+S1615_FRACTIONAL_BITS = 15
+
+# the fractional bits of a u0.32
+U032_FRACTIONAL_BITS = 32
+
+# the range of the bit patterns of each format
+_S1615_MIN = -(1 << 31)
+_S1615_MAX = (1 << 31) - 1
+_U032_MAX = (1 << 32) - 1
+
+# error message for a value a format cannot hold
+RANGE_ERROR = "{} is outside the range of an {}"
+
+
+def to_s1615(value):
+    """ the s16.15 bit pattern nearest a value
+
+    :param value: the value
+    :rtype: int
+    """
+    bits = int(round(value * (1 << S1615_FRACTIONAL_BITS)))
+    if bits < _S1615_MIN or bits > _S1615_MAX:
+        raise Exception(RANGE_ERROR.format(value, "s16.15"))
+    return bits
+
+
+def to_u032(value):
+    """ the u0.32 bit pattern nearest a value, where a value that rounds \
+    to 1 is held as the largest u0.32
+
+    :param value: the value, from 0 up to 1
+    :rtype: int
+    """
+    bits = int(round(value * (1 << U032_FRACTIONAL_BITS)))
+    if bits < 0 or bits > _U032_MAX + 1:
+        raise Exception(RANGE_ERROR.format(value, "u0.32"))
+    return min(bits, _U032_MAX)
+
+
+def from_s1615(bits):
+    """ the values of s16.15 bit patterns
+
+    :param bits: the bit patterns, as int32s
+    :rtype: numpy.ndarray
+    """
+    return numpy.asarray(bits, dtype=numpy.int32) / float(
+        1 << S1615_FRACTIONAL_BITS)
+
+
+def from_u032(bits):
+    """ the values of u0.32 bit patterns
+
+    :param bits: the bit patterns, as uint32s
+    :rtype: numpy.ndarray
+    """
+    return numpy.asarray(bits, dtype=numpy.uint32) / float(
+        1 << U032_FRACTIONAL_BITS)
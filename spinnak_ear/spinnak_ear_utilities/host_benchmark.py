@@ -0,0 +1,196 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Runs the host builds of the ear kernels, made with ``make host`` in \
+c_models, on region blobs written by HostRegionSpec, and reports how fast \
+they go::
+
+    python -m spinnak_ear.spinnak_ear_utilities.host_benchmark \\
+        --kernel SpiNNakEar_OME ome.blob 1000 8000 \\
+        --kernel SpiNNakEar_DRNL drnl.blob 1000 8000 \\
+        --kernel SpiNNakEar_IHCAN ihcan.blob 1000 16000 drnl_out/packets.bin
+
+Each kernel is given as its binary, its region blob, the ticks to run for, \
+the samples it processes in that time and optionally the packets to feed it, \
+as captured by an earlier run with an output directory.
+"""
+
+import argparse
+import os
+import subprocess
+from collections import namedtuple
+
+import numpy
+
+from spinnak_ear.spinnak_ear_utilities.host_region_spec import \
+    read_region_blob
+
+# the directory ``make host`` puts the kernels in
+HOST_BUILD_DIR = os.path.join(
+    os.path.dirname(__file__), os.pardir, os.pardir, "c_models", "host",
+    "build")
+
+# where the host kernels map the board sdram, see spin1_host.c
+HOST_SDRAM_BASE = 0x60000000
+
+# a multicast packet a kernel sent, or that is fed to one
+PACKET_DTYPE = numpy.dtype([
+    ("tick", "<u4"), ("key", "<u4"), ("payload", "<u4"),
+    ("has_payload", "<u4")])
+
+# a value a kernel set through the neuron recording interface
+RECORDING_DTYPE = numpy.dtype([
+    ("tick", "<u4"), ("var_index", "<u4"), ("neuron_index", "<u4"),
+    ("kind", "<u4"), ("value", "<f8")])
+
+# the kinds of recorded value
+RECORDING_FLOAT = 0
+RECORDING_DOUBLE = 1
+RECORDING_SPIKE = 2
+
+# what a host kernel run reports, and captures if given an output directory
+HostKernelRun = namedtuple(
+    "HostKernelRun", ["stats", "packets", "recording", "regions"])
+
+# error message for a kernel that stopped before pausing
+KERNEL_FAILED_ERROR = "{} exited with {}: {}"
+
+# error message for a badly given kernel on the command line
+KERNEL_ARGS_ERROR = (
+    "--kernel takes BINARY BLOB N_TICKS N_SAMPLES [PACKETS], not {}")
+
+
+def host_binary(name):
+    """ the path of a host kernel, given either as a path or as the name of \
+    one in the host build directory
+
+    :param name: the path or name
+    :rtype: str
+    """
+    if os.path.dirname(name):
+        return name
+    return os.path.join(HOST_BUILD_DIR, name)
+
+
+def write_packets(packets, path):
+    """ writes packets to feed a kernel
+
+    :param packets: the (tick, key, payload, has payload) of each packet
+    :param path: the file to write
+    :rtype: None
+    """
+    numpy.asarray(packets, dtype=PACKET_DTYPE).tofile(path)
+
+
+def run_host_kernel(
+        binary, region_blob, n_ticks, out_dir=None, packets=None,
+        sdram=None, n_samples=None):
+    """ runs a host kernel once
+
+    :param binary: the kernel, see host_binary
+    :param region_blob: the regions of the kernel
+    :param n_ticks: the ticks to run for
+    :param out_dir: the directory to capture the output in, or None to not \
+    capture it, which is best when timing
+    :param packets: the packets to feed the kernel, or None
+    :param sdram: the file to back the sdram with, or None
+    :param n_samples: the samples the run processes, or None
+    :return: the stats the kernel reported, and the packets, recording and \
+    regions it left if captured, else None
+    :rtype: HostKernelRun
+    """
+    command = [host_binary(binary), region_blob, str(n_ticks)]
+    if out_dir is not None:
+        if not os.path.isdir(out_dir):
+            os.makedirs(out_dir)
+        command.extend(["-o", out_dir])
+    if packets is not None:
+        command.extend(["-i", packets])
+    if sdram is not None:
+        command.extend(["-s", sdram])
+    if n_samples is not None:
+        command.extend(["-n", str(n_samples)])
+
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    output, error = process.communicate()
+    if process.returncode != 0:
+        raise Exception(KERNEL_FAILED_ERROR.format(
+            binary, process.returncode, error.decode().strip()))
+    stats = dict()
+    for item in output.decode().split():
+        name, value = item.split("=")
+        stats[name] = float(value) if "." in value else int(value)
+
+    if out_dir is None:
+        return HostKernelRun(stats, None, None, None)
+    return HostKernelRun(
+        stats,
+        numpy.fromfile(
+            os.path.join(out_dir, "packets.bin"), dtype=PACKET_DTYPE),
+        numpy.fromfile(
+            os.path.join(out_dir, "recording.bin"), dtype=RECORDING_DTYPE),
+        read_region_blob(os.path.join(out_dir, "regions.bin")))
+
+
+def benchmark_host_kernel(
+        binary, region_blob, n_ticks, n_samples, packets=None, sdram=None,
+        repeats=5):
+    """ times a host kernel, without capturing its output
+
+    :param binary: the kernel, see host_binary
+    :param region_blob: the regions of the kernel
+    :param n_ticks: the ticks to run for
+    :param n_samples: the samples the run processes
+    :param packets: the packets to feed the kernel, or None
+    :param sdram: the file to back the sdram with, or None
+    :param repeats: how many times to run it
+    :return: the best ns per sample of the runs
+    :rtype: float
+    """
+    return min(
+        run_host_kernel(
+            binary, region_blob, n_ticks, packets=packets, sdram=sdram,
+            n_samples=n_samples).stats["ns_per_sample"]
+        for _ in range(repeats))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Reports the ns per sample of the host ear kernels")
+    parser.add_argument(
+        "--kernel", nargs="+", action="append", required=True,
+        metavar="ARG",
+        help="BINARY BLOB N_TICKS N_SAMPLES [PACKETS] of a kernel to time")
+    parser.add_argument(
+        "--sdram", default=None, help="file to back the sdram with")
+    parser.add_argument(
+        "--repeats", type=int, default=5, help="runs of each kernel")
+    options = parser.parse_args(args)
+
+    for kernel in options.kernel:
+        if len(kernel) not in (4, 5):
+            parser.error(KERNEL_ARGS_ERROR.format(" ".join(kernel)))
+        binary, region_blob, n_ticks, n_samples = kernel[:4]
+        packets = kernel[4] if len(kernel) == 5 else None
+        ns_per_sample = benchmark_host_kernel(
+            binary, region_blob, int(n_ticks), int(n_samples), packets,
+            options.sdram, options.repeats)
+        print("{}: {:.1f} ns per sample (best of {})".format(
+            os.path.basename(binary), ns_per_sample, options.repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Runs the float and fixed point host builds of the IHCAN kernel on the \
+same drnl output and compares the spike probabilities they record::
+
+    python -m spinnak_ear.spinnak_ear_utilities.host_ihcan_comparison \\
+        ihcan.blob work_dir --tone 1000 1e-8 8000
+
+The region blob must be of an IHCAN written for the fixed point kernel, \
+which holds the regions of the float kernel as well. The drnl output is put \
+straight into the sdram edge, which is made big enough to hold all of it, \
+so no drnl needs to run.
+"""
+
+import argparse
+import os
+from collections import namedtuple
+
+import numpy
+
+from spinnak_ear.spinnak_ear_utilities.ear_region_schemas import \
+    IHCAN_PARAMETERS, IHCAN_SDRAM_EDGE, IHCAN_QUANTIZED_SPIKE_PROB, \
+    IHCAN_DT_PARAMS
+from spinnak_ear.spinnak_ear_utilities.host_benchmark import \
+    HOST_SDRAM_BASE, RECORDING_FLOAT, RECORDING_SPIKE, run_host_kernel, \
+    write_packets
+from spinnak_ear.spinnak_ear_utilities.host_region_spec import \
+    read_region_blob, write_region_blob
+
+# the regions of the IHCAN kernels the comparison reads and changes
+_PARAMETERS_REGION = 1
+_DT_BASED_PARAMS_REGION = 4
+_SDRAM_EDGE_REGION = 7
+_QUANTIZED_SPIKE_PROB_REGION = 11
+_FIXED_POINT_PARAMS_REGION = 12
+
+# the recording region the spike probabilities are recorded in
+_SPIKE_PROBABILITY_REGION_ID = 1
+
+# the host builds of the two kernels
+FLOAT_KERNEL = "SpiNNakEar_IHCAN"
+FIXED_POINT_KERNEL = "SpiNNakEar_IHCAN_fixed"
+
+# how the spike probabilities of the two kernels compare, each as a row per
+# sample and a column per fibre
+IhcanComparison = namedtuple(
+    "IhcanComparison", [
+        "float_probs", "fixed_probs", "max_abs_error", "rms_error",
+        "max_error_of_peak", "float_spikes", "fixed_spikes"])
+
+# error message for a blob without the fixed point constants
+NO_FIXED_POINT_REGION_ERROR = (
+    "{} is not the regions of an IHCAN written for the fixed point kernel")
+
+# error message for a kernel that recorded the wrong number of values
+N_RECORDED_ERROR = "{} recorded {} spike probabilities, not {}"
+
+
+def prepare_ihcan_input(region_blob, displacement, work_dir):
+    """ writes a copy of the regions of an IHCAN with an sdram edge big \
+    enough to hold all the drnl output and recording its spike \
+    probabilities as floats, the sdram holding the drnl output, and a \
+    packet for each segment of it
+
+    :param region_blob: the regions of the IHCAN
+    :param displacement: the drnl output, in m
+    :param work_dir: the directory to write the files in
+    :return: the region blob, sdram and packet files, the fibres and \
+    segment size of the IHCAN and the segments of drnl output
+    :rtype: tuple(str, str, str, int, int, int)
+    """
+    regions = read_region_blob(region_blob)
+    if _FIXED_POINT_PARAMS_REGION not in regions:
+        raise Exception(NO_FIXED_POINT_REGION_ERROR.format(region_blob))
+    parameters = IHCAN_PARAMETERS.unpack(regions[_PARAMETERS_REGION])
+    seg_size = int(parameters["seg_size"])
+    n_segments = len(displacement) // seg_size
+
+    # a power of 2 buffers, as the ring buffer is indexed with a mask
+    n_buffers = 1
+    while n_buffers < n_segments:
+        n_buffers *= 2
+    values = {name: parameters[name] for name in IHCAN_PARAMETERS.field_names}
+    values["number_of_sdram_buffers"] = n_buffers
+    regions[_PARAMETERS_REGION] = IHCAN_PARAMETERS.pack(**values).tobytes()
+
+    # the float kernel only records floats when not quantizing
+    quantized = IHCAN_QUANTIZED_SPIKE_PROB.unpack(
+        regions[_QUANTIZED_SPIKE_PROB_REGION])
+    regions[_QUANTIZED_SPIKE_PROB_REGION] = \
+        IHCAN_QUANTIZED_SPIKE_PROB.pack(
+            bytes_per_value=quantized["bytes_per_value"],
+            full_scale=quantized["full_scale"],
+            n_words_per_row=quantized["n_words_per_row"], n_rows=0,
+            n_rows_recorded=0).tobytes()
+
+    if not os.path.isdir(work_dir):
+        os.makedirs(work_dir)
+    blob_path = os.path.join(work_dir, "ihcan.blob")
+    write_region_blob(regions, blob_path)
+
+    sdram_path = os.path.join(work_dir, "sdram.bin")
+    address = int(IHCAN_SDRAM_EDGE.unpack(regions[_SDRAM_EDGE_REGION])[
+        "sdram_base_address"])
+    with open(sdram_path, "wb") as sdram:
+        sdram.seek(address - HOST_SDRAM_BASE)
+        sdram.write(numpy.asarray(
+            displacement[:n_segments * seg_size], dtype="<f8").tobytes())
+
+    packets_path = os.path.join(work_dir, "packets.bin")
+    write_packets(
+        [(segment, 0, 0, 0) for segment in range(n_segments)], packets_path)
+    return (blob_path, sdram_path, packets_path,
+            int(parameters["number_fibres"]), seg_size, n_segments)
+
+
+def recorded_spike_probabilities(recording, n_fibres, n_samples, binary):
+    """ the spike probabilities a host kernel run recorded
+
+    :param recording: the values the run recorded
+    :param n_fibres: the fibres of the IHCAN
+    :param n_samples: the samples of drnl output the run processed
+    :param binary: the kernel, for the error message
+    :return: a row per sample and a column per fibre
+    :rtype: numpy.ndarray
+    """
+    values = recording[
+        (recording["var_index"] == _SPIKE_PROBABILITY_REGION_ID) &
+        (recording["kind"] == RECORDING_FLOAT)]["value"]
+    if len(values) != n_fibres * n_samples:
+        raise Exception(N_RECORDED_ERROR.format(
+            binary, len(values), n_fibres * n_samples))
+
+    # each sample records every fibre in turn
+    return values.reshape(n_samples, n_fibres)
+
+
+def compare_ihcan_kernels(
+        region_blob, displacement, work_dir, float_binary=FLOAT_KERNEL,
+        fixed_binary=FIXED_POINT_KERNEL):
+    """ runs the float and fixed point IHCAN kernels on the same drnl output
+
+    :param region_blob: the regions of an IHCAN written for the fixed point \
+    kernel
+    :param displacement: the drnl output, in m
+    :param work_dir: the directory to run the kernels in
+    :param float_binary: the float kernel, see host_binary
+    :param fixed_binary: the fixed point kernel, see host_binary
+    :rtype: IhcanComparison
+    """
+    blob_path, sdram_path, packets_path, n_fibres, seg_size, n_segments = \
+        prepare_ihcan_input(region_blob, displacement, work_dir)
+
+    probs = list()
+    spikes = list()
+    for binary in (float_binary, fixed_binary):
+        run = run_host_kernel(
+            binary, blob_path, n_segments + 1,
+            out_dir=os.path.join(work_dir, os.path.basename(binary)),
+            packets=packets_path, sdram=sdram_path)
+        probs.append(recorded_spike_probabilities(
+            run.recording, n_fibres, n_segments * seg_size, binary))
+        spikes.append(int(numpy.count_nonzero(
+            run.recording["kind"] == RECORDING_SPIKE)))
+
+    error = numpy.abs(probs[1] - probs[0])
+    peak = float(numpy.max(numpy.abs(probs[0])))
+    return IhcanComparison(
+        probs[0], probs[1], float(numpy.max(error)),
+        float(numpy.sqrt(numpy.mean(error ** 2))),
+        float(numpy.max(error)) / peak if peak else 0.0,
+        spikes[0], spikes[1])
+
+
+def tone(region_blob, frequency, amplitude, n_samples):
+    """ a pure tone of drnl output, at the sample rate of an IHCAN
+
+    :param region_blob: the regions of the IHCAN
+    :param frequency: the frequency of the tone in Hz
+    :param amplitude: the peak displacement in m
+    :param n_samples: the samples of the tone
+    :rtype: numpy.ndarray
+    """
+    dt = float(IHCAN_DT_PARAMS.unpack(
+        read_region_blob(region_blob)[_DT_BASED_PARAMS_REGION])["dt"])
+    return amplitude * numpy.sin(
+        2.0 * numpy.pi * frequency * dt * numpy.arange(n_samples))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Compares the spike probabilities of the float and "
+                    "fixed point IHCAN kernels")
+    parser.add_argument("region_blob", help="regions of a fixed point IHCAN")
+    parser.add_argument("work_dir", help="directory to run the kernels in")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--displacement", help=".npy file of drnl output in m")
+    source.add_argument(
+        "--tone", nargs=3, type=float, metavar=("HZ", "M", "N_SAMPLES"),
+        help="a pure tone of drnl output")
+    options = parser.parse_args(args)
+
+    if options.displacement is not None:
+        displacement = numpy.load(options.displacement)
+    else:
+        frequency, amplitude, n_samples = options.tone
+        displacement = tone(
+            options.region_blob, frequency, amplitude, int(n_samples))
+    comparison = compare_ihcan_kernels(
+        options.region_blob, displacement, options.work_dir)
+    print("max abs error {:.6g} Hz, rms error {:.6g} Hz, max error {:.3%} "
+          "of peak; spikes float {} fixed {}".format(
+              comparison.max_abs_error, comparison.rms_error,
+              comparison.max_error_of_peak, comparison.float_spikes,
+              comparison.fixed_spikes))
+
+
+if __name__ == "__main__":
+    main()
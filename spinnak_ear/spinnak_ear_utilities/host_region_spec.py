@@ -0,0 +1,225 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Writing the regions of an ear machine vertex to a region blob, which the \
+host builds of the ear kernels in c_models/host load in place of the data \
+specification executor.
+
+A region blob is the words REGION_BLOB_MAGIC and the number of regions, then \
+for each region its index, its size in bytes and its data, padded to a word.
+"""
+
+import struct
+
+import numpy
+
+from pacman.executor.injection_decorator import injection_context
+
+from data_specification.enums.data_type import DataType
+
+# the magic number at the start of a region blob, "EARB"
+REGION_BLOB_MAGIC = 0x42524145
+
+# the words before the regions and before each region's data
+_BLOB_HEADER = struct.Struct("<II")
+
+
+def write_region_blob(regions, path):
+    """ writes a region blob
+
+    :param regions: the data of each region, by region index
+    :param path: the file to write
+    :rtype: None
+    """
+    with open(path, "wb") as blob:
+        blob.write(_BLOB_HEADER.pack(REGION_BLOB_MAGIC, len(regions)))
+        for index in sorted(regions):
+            data = bytes(regions[index])
+            blob.write(_BLOB_HEADER.pack(index, len(data)))
+            blob.write(data)
+            blob.write(b"\0" * (-len(data) % 4))
+
+
+def read_region_blob(path):
+    """ reads a region blob, such as the regions a host kernel run left
+
+    :param path: the file to read
+    :return: the data of each region, by region index
+    :rtype: dict(int, bytes)
+    """
+    with open(path, "rb") as blob:
+        data = blob.read()
+    magic, n_regions = _BLOB_HEADER.unpack_from(data, 0)
+    if magic != REGION_BLOB_MAGIC:
+        raise Exception(HostRegionSpec.NOT_A_BLOB_ERROR.format(path))
+    regions = dict()
+    offset = _BLOB_HEADER.size
+    for _ in range(n_regions):
+        index, size = _BLOB_HEADER.unpack_from(data, offset)
+        offset += _BLOB_HEADER.size
+        regions[index] = data[offset:offset + size]
+        offset += size + (-size % 4)
+    return regions
+
+
+def generate_host_regions(vertex, placement, injectables, path):
+    """ runs the data specification of a machine vertex and writes the \
+    regions it makes to a region blob
+
+    :param vertex: the machine vertex
+    :param placement: the placement of the vertex
+    :param injectables: the items the vertex has injected into its data \
+    specification, by type name, e.g. "MemoryRoutingInfos"
+    :param path: the region blob to write
+    :rtype: HostRegionSpec
+    """
+    spec = HostRegionSpec()
+    with injection_context(injectables):
+        vertex.generate_data_specification(spec, placement)
+    spec.write_blob(path)
+    return spec
+
+
+class HostRegionSpec(object):
+    """ Stands in for the data specification generator, writing straight \
+    into the regions rather than into a specification for the executor. \
+    Supports the calls the ear vertices and the spynnaker helpers they call \
+    make, in the same way.
+    """
+
+    __slots__ = [
+        # the data of each reserved region, by region index
+        "_regions",
+        # the region being written
+        "_current_region",
+        # where the next write goes in each region
+        "_write_pointers",
+        # bool flag for the specification having ended
+        "_ended"
+    ]
+
+    # error message for writing to a region that is not reserved
+    NO_REGION_ERROR = "Region {} has not been reserved"
+
+    # error message for reserving a region twice
+    DUPLICATE_REGION_ERROR = "Region {} has already been reserved"
+
+    # error message for writing past the end of a region
+    REGION_FULL_ERROR = (
+        "Writing {} bytes at {} overflows region {} of {} bytes")
+
+    # error message for writing without a write focus
+    NO_FOCUS_ERROR = "No region has the write focus"
+
+    # error message for a file that is not a region blob
+    NOT_A_BLOB_ERROR = "{} is not a region blob"
+
+    def __init__(self):
+        self._regions = dict()
+        self._current_region = None
+        self._write_pointers = dict()
+        self._ended = False
+
+    @property
+    def current_region(self):
+        return self._current_region
+
+    @property
+    def ended(self):
+        return self._ended
+
+    def reserve_memory_region(
+            self, region, size, label=None, empty=False, shrink=True,
+            reference=None):
+        """ see DataSpecificationGenerator.reserve_memory_region
+        """
+        if region in self._regions:
+            raise Exception(self.DUPLICATE_REGION_ERROR.format(region))
+        self._regions[region] = bytearray(size)
+        self._write_pointers[region] = 0
+
+    def switch_write_focus(self, region):
+        """ see DataSpecificationGenerator.switch_write_focus
+        """
+        if region not in self._regions:
+            raise Exception(self.NO_REGION_ERROR.format(region))
+        self._current_region = region
+
+    def set_write_pointer(
+            self, address, address_is_register=False,
+            relative_to_current=False):
+        """ see DataSpecificationGenerator.set_write_pointer; only for \
+        addresses given as values
+        """
+        if self._current_region is None:
+            raise Exception(self.NO_FOCUS_ERROR)
+        if relative_to_current:
+            address += self._write_pointers[self._current_region]
+        self._write_pointers[self._current_region] = address
+
+    def _write_bytes(self, data):
+        """ writes at the write pointer of the current region
+
+        :param data: the bytes to write
+        :rtype: None
+        """
+        if self._current_region is None:
+            raise Exception(self.NO_FOCUS_ERROR)
+        region = self._regions[self._current_region]
+        pointer = self._write_pointers[self._current_region]
+        if pointer + len(data) > len(region):
+            raise Exception(self.REGION_FULL_ERROR.format(
+                len(data), pointer, self._current_region, len(region)))
+        region[pointer:pointer + len(data)] = data
+        self._write_pointers[self._current_region] = pointer + len(data)
+
+    def write_value(self, data, data_type=DataType.UINT32):
+        """ see DataSpecificationGenerator.write_value
+        """
+        self._write_bytes(struct.pack(
+            "<" + data_type.struct_encoding, data_type.encode_as_int(data)))
+
+    def write_array(self, array_values, data_type=DataType.UINT32):
+        """ see DataSpecificationGenerator.write_array
+        """
+        self._write_bytes(numpy.asarray(
+            array_values, dtype=data_type.numpy_typename).tobytes())
+
+    def comment(self, comment):
+        """ see DataSpecificationGenerator.comment; comments are dropped
+        """
+
+    def end_specification(self, close_writer=True):
+        """ see DataSpecificationGenerator.end_specification
+        """
+        self._ended = True
+
+    def region_data(self, region):
+        """ the data of a region, as the kernel will find it
+
+        :param region: the region index
+        :rtype: bytes
+        """
+        if region not in self._regions:
+            raise Exception(self.NO_REGION_ERROR.format(region))
+        return bytes(self._regions[region])
+
+    def write_blob(self, path):
+        """ writes the regions to a region blob
+
+        :param path: the file to write
+        :rtype: None
+        """
+        write_region_blob(self._regions, path)
@@ -0,0 +1,372 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" The lookup tables the float IHCAN kernel uses in place of the \
+exponentials and integer powers of its per sample loop. The tables are \
+worked out here on the host in double precision and looked up on the core \
+in float, in the same way as InterpolationTable.interpolate and \
+PowerTable.power do, so their error can be measured without a board.
+"""
+
+from collections import namedtuple
+
+import numpy
+
+from spinnak_ear.spinnak_ear_utilities.ear_region_schemas import \
+    IHCAN_LOOKUP_TABLES
+
+# the dtcm the lookup tables of an ihcan take, in bytes, which is also the
+# size of the sdram region they are loaded from
+LOOKUP_TABLE_DTCM_BYTES = 8192
+
+# how close to its asymptotes a sigmoid must be where its table stops and
+# clamps, as a fraction of the span between them
+SATURATION_TOLERANCE = 1e-6
+
+# the vesicles in the reprocessing store the reprocessing power table
+# covers; the kernel multiplies on past it
+N_REPROCESSING_POWERS = 16
+
+# the bisection steps used to find where a sigmoid saturates
+_N_BISECTION_STEPS = 200
+
+# the points per table step the error of a table is measured at
+_N_ERROR_POINTS_PER_STEP = 16
+
+# error message for a dtcm budget too small for the tables
+TOO_LITTLE_DTCM_ERROR = (
+    "{} bytes of dtcm cannot hold the lookup tables, which need at least {}")
+
+# error message for a bracket a sigmoid does not cross the target in
+NO_CROSSING_ERROR = "The function does not reach {} between {} and {}"
+
+# the tables of an ihcan
+IhcanLookupTables = namedtuple(
+    "IhcanLookupTables", [
+        "apical_conductance", "calcium_activation", "replenish_powers",
+        "reprocessing_powers"])
+
+
+class InterpolationTable(object):
+    """ A function sampled at evenly spaced points and linearly \
+    interpolated between them, clamping to the end values outside them.
+    """
+
+    __slots__ = [
+        # the argument of the first point
+        "_start",
+        # the argument between points
+        "_step",
+        # the value of the function at each point, as float32
+        "_values"
+    ]
+
+    # error message for a table without an interval
+    TOO_FEW_POINTS_ERROR = "An interpolation table needs 2 points, not {}"
+
+    def __init__(self, function, start, stop, n_points):
+        """
+        :param function: the numpy function to tabulate
+        :param start: the argument of the first point
+        :param stop: the argument of the last point
+        :param n_points: the points to sample the function at
+        """
+        if n_points < 2:
+            raise Exception(self.TOO_FEW_POINTS_ERROR.format(n_points))
+        self._start = float(start)
+        self._step = (float(stop) - float(start)) / (n_points - 1)
+        self._values = numpy.asarray(
+            function(numpy.linspace(start, stop, n_points)),
+            dtype=numpy.float32)
+
+    @property
+    def start(self):
+        return self._start
+
+    @property
+    def stop(self):
+        return self._start + self._step * (self.n_points - 1)
+
+    @property
+    def step(self):
+        return self._step
+
+    @property
+    def recip_step(self):
+        return 1.0 / self._step
+
+    @property
+    def n_points(self):
+        return len(self._values)
+
+    @property
+    def values(self):
+        return self._values
+
+    def interpolate(self, x):
+        """ looks up the table in float32, as the kernel does
+
+        :param x: the arguments
+        :rtype: numpy.ndarray of float32
+        """
+        position = (
+            numpy.asarray(x, dtype=numpy.float32) -
+            numpy.float32(self._start)) * numpy.float32(self.recip_step)
+        position = numpy.clip(position, 0, self.n_points - 1)
+        index = numpy.minimum(
+            position.astype(numpy.int32), self.n_points - 2)
+        fraction = position - index.astype(numpy.float32)
+        low = self._values[index]
+        return numpy.where(
+            position >= self.n_points - 1, self._values[-1],
+            low + fraction * (self._values[index + 1] - low))
+
+    def max_error(self, function, margin=None):
+        """ the largest absolute error of the table against the function, \
+        measured between the points and past both ends of the table
+
+        :param function: the numpy function the table is of
+        :param margin: how far past each end to measure, the span of the \
+        table by default
+        :rtype: float
+        """
+        if margin is None:
+            margin = self.stop - self._start
+        n_test = (
+            (self.n_points - 1) * _N_ERROR_POINTS_PER_STEP * 3 + 1)
+        x = numpy.linspace(
+            self._start - margin, self.stop + margin, n_test)
+        return float(numpy.max(numpy.abs(
+            self.interpolate(x).astype(numpy.float64) - function(x))))
+
+
+class PowerTable(object):
+    """ The whole powers of a number from 0, which the kernel carries on \
+    multiplying past the end of.
+    """
+
+    __slots__ = [
+        # the number raised to each power
+        "_base",
+        # the powers, as float32
+        "_values"
+    ]
+
+    # error message for a table without the first power
+    TOO_FEW_POWERS_ERROR = "A power table needs 2 powers, not {}"
+
+    def __init__(self, base, n_powers):
+        """
+        :param base: the number to raise
+        :param n_powers: the powers to hold, from 0
+        """
+        if n_powers < 2:
+            raise Exception(self.TOO_FEW_POWERS_ERROR.format(n_powers))
+        self._base = float(base)
+        self._values = numpy.asarray(
+            self._base ** numpy.arange(n_powers), dtype=numpy.float32)
+
+    @property
+    def base(self):
+        return self._base
+
+    @property
+    def n_powers(self):
+        return len(self._values)
+
+    @property
+    def values(self):
+        return self._values
+
+    def power(self, count):
+        """ raises the base to the number of times a loop counting up from \
+        0 while below count runs, in float32, as the kernel does
+
+        :param count: the loop bound
+        :rtype: numpy.float32
+        """
+        n = max(int(numpy.ceil(count)), 0)
+        if n < self.n_powers:
+            return self._values[n]
+        result = self._values[-1]
+        for _ in range(n - self.n_powers + 1):
+            result = numpy.float32(result * self._values[1])
+        return result
+
+    def max_error(self, max_count):
+        """ the largest absolute error of the powers up to a count, \
+        including those multiplied on past the table
+
+        :param max_count: the largest count to check
+        :rtype: float
+        """
+        return max(
+            abs(float(self.power(n)) - self._base ** n)
+            for n in range(int(max_count) + 1))
+
+
+def apical_conductance(
+        displacement, u0, u1, recips0, recips1, ga, g_max):
+    """ the apical conductance of the cilia for a displacement, as a \
+    second order boltzmann function
+
+    :param displacement: the scaled cilia displacements in m
+    :param u0: the first boltzmann displacement in m
+    :param u1: the second boltzmann displacement in m
+    :param recips0: the reciprocal of the first boltzmann scale in m
+    :param recips1: the reciprocal of the second boltzmann scale in m
+    :param ga: the conductance at rest in S
+    :param g_max: the largest conductance above it in S
+    :rtype: numpy.ndarray
+    """
+    displacement = numpy.asarray(displacement, dtype=numpy.float64)
+    with numpy.errstate(over="ignore"):
+        ex1 = numpy.exp(-(displacement - u1) * recips1)
+        ex2 = numpy.exp(-(displacement - u0) * recips0)
+        return ga + g_max / (1.0 + ex2 * (1.0 + ex1))
+
+
+def calcium_activation(potential, gamma, recip_beta):
+    """ the steady state activation of the calcium channels for a \
+    receptor potential
+
+    :param potential: the receptor potentials in V
+    :param gamma: the activation per V
+    :param recip_beta: the activation ratio
+    :rtype: numpy.ndarray
+    """
+    potential = numpy.asarray(potential, dtype=numpy.float64)
+    with numpy.errstate(over="ignore"):
+        return 1.0 / (1.0 + numpy.exp(-gamma * potential) * recip_beta)
+
+
+def crossing(function, target, low, high):
+    """ where a function that rises between two arguments reaches a value
+
+    :param function: the numpy function
+    :param target: the value to reach
+    :param low: an argument the function is below the value at
+    :param high: an argument the function is above the value at
+    :rtype: float
+    """
+    if not function(low) <= target <= function(high):
+        raise Exception(NO_CROSSING_ERROR.format(target, low, high))
+    for _ in range(_N_BISECTION_STEPS):
+        middle = (low + high) / 2.0
+        if middle in (low, high):
+            break
+        if function(middle) < target:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2.0
+
+
+def sigmoid_table(
+        function, low, high, bracket, n_points,
+        tolerance=SATURATION_TOLERANCE):
+    """ a table of a rising function between where it leaves one \
+    asymptote and reaches the other, to within the tolerance
+
+    :param function: the numpy function
+    :param low: the asymptote the function rises from
+    :param high: the asymptote the function rises to
+    :param bracket: arguments either side of both crossings
+    :param n_points: the points of the table
+    :param tolerance: how close to the asymptotes, as a fraction of the \
+    span between them
+    :rtype: InterpolationTable
+    """
+    margin = (high - low) * tolerance
+    start = crossing(function, low + margin, *bracket)
+    stop = crossing(function, high - margin, *bracket)
+    return InterpolationTable(function, start, stop, n_points)
+
+
+def n_interpolation_points(n_replenish_powers, dtcm_bytes):
+    """ the points each interpolation table gets once the header and the \
+    power tables take their share of the dtcm
+
+    :param n_replenish_powers: the powers of the replenish table
+    :param dtcm_bytes: the dtcm the lookup tables take
+    :rtype: int
+    """
+    value_bytes = numpy.dtype(numpy.float32).itemsize
+    power_bytes = (
+        (n_replenish_powers + N_REPROCESSING_POWERS) * value_bytes)
+    n_points = (
+        (dtcm_bytes - IHCAN_LOOKUP_TABLES.size - power_bytes) //
+        (2 * value_bytes))
+    if n_points < 2:
+        raise Exception(TOO_LITTLE_DTCM_ERROR.format(
+            dtcm_bytes,
+            IHCAN_LOOKUP_TABLES.size + power_bytes + 4 * value_bytes))
+    return int(n_points)
+
+
+def ihcan_lookup_tables(
+        apical_function, calcium_function, replenish_keep,
+        reprocessing_keep, max_neurotransmitters,
+        dtcm_bytes=LOOKUP_TABLE_DTCM_BYTES):
+    """ the tables of an ihcan, sharing the dtcm between the two \
+    interpolation tables
+
+    :param apical_function: the apical conductance in S of a displacement \
+    in m, see apical_conductance
+    :param calcium_function: the calcium activation of a potential in V, \
+    see calcium_activation
+    :param replenish_keep: the chance per spike sample of a missing vesicle \
+    not being replenished
+    :param reprocessing_keep: the chance per spike sample of a vesicle in \
+    the reprocessing store not being reprocessed
+    :param max_neurotransmitters: the most vesicles a synapse holds
+    :param dtcm_bytes: the dtcm the tables take
+    :rtype: IhcanLookupTables
+    """
+    n_replenish_powers = int(max_neurotransmitters) + 1
+    n_points = n_interpolation_points(n_replenish_powers, dtcm_bytes)
+
+    # both are sigmoids; the asymptotes are where the exponentials vanish
+    # and where they swamp the 1
+    ga = float(apical_function(-numpy.inf))
+    return IhcanLookupTables(
+        sigmoid_table(
+            apical_function, ga, float(apical_function(numpy.inf)),
+            (-1e-6, 1e-6), n_points),
+        sigmoid_table(calcium_function, 0.0, 1.0, (-1.0, 1.0), n_points),
+        PowerTable(replenish_keep, n_replenish_powers),
+        PowerTable(reprocessing_keep, N_REPROCESSING_POWERS))
+
+
+def lookup_table_region(tables):
+    """ lays out the tables as the words of the lookup table region
+
+    :param tables: the tables of the ihcan
+    :type tables: IhcanLookupTables
+    :rtype: numpy.ndarray of uint32
+    """
+    header = IHCAN_LOOKUP_TABLES.pack(
+        apical_start=tables.apical_conductance.start,
+        apical_recip_step=tables.apical_conductance.recip_step,
+        n_apical_points=tables.apical_conductance.n_points,
+        calcium_start=tables.calcium_activation.start,
+        calcium_recip_step=tables.calcium_activation.recip_step,
+        n_calcium_points=tables.calcium_activation.n_points,
+        n_replenish_powers=tables.replenish_powers.n_powers,
+        n_reprocessing_powers=tables.reprocessing_powers.n_powers)
+    return numpy.concatenate([header] + [
+        table.values.view("<u4") for table in (
+            tables.apical_conductance, tables.calcium_activation,
+            tables.replenish_powers, tables.reprocessing_powers)])
@@ -0,0 +1,248 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import socket
+import struct
+import threading
+
+import numpy
+
+logger = logging.getLogger(__name__)
+
+# the bytes of an sdp message after the sdp header
+MAX_SDP_PAYLOAD_BYTES = 272
+
+# a live audio packet is the number of segments then the float samples
+_PACKET_HEADER = struct.Struct("<I")
+
+# a credit is the segments played, the underruns and the overflows
+_CREDIT = struct.Struct("<III")
+
+# how long the credit thread waits before checking if it should stop
+_RECEIVE_TIMEOUT_S = 0.1
+
+# error message for the ear not making room in time
+SEND_TIMEOUT_ERROR = (
+    "The ear did not make room for {} more segments within {} seconds")
+
+# error message for a segment too big for a packet
+SEGMENT_SIZE_ERROR = (
+    "A segment of {} samples does not fit in a live input packet")
+
+
+class EarLiveAudioSender(object):
+    """ Sends live audio to the OME of an ear, a segment at a time, never \
+    having more segments in flight than the OME jitter buffer holds. The \
+    OME reports back how many segments it has played, which frees room \
+    for more.
+    """
+
+    __slots__ = [
+        # the (address, port) of the board the OME listens on
+        "_board_address",
+        # the samples per segment
+        "_seq_size",
+        # how many segments the OME jitter buffer holds
+        "_n_buffers",
+        # how many segments fit in a packet
+        "_segments_per_packet",
+        # the udp socket audio goes out and credits come in on
+        "_socket",
+        # samples waiting for a full segment
+        "_pending",
+        # how many segments have been sent
+        "_n_segments_sent",
+        # how many segments the OME has played
+        "_n_segments_played",
+        # how many times the OME ran dry
+        "_n_underruns",
+        # how many segments the OME threw away
+        "_n_overflows",
+        # guards the counters and wakes senders on a credit
+        "_condition",
+        # the thread receiving credits
+        "_thread",
+        # bool flag for the credit thread to stop
+        "_running"
+    ]
+
+    def __init__(
+            self, board_address, board_port, seq_size, n_buffers,
+            local_host="0.0.0.0", credit_port=0):
+        """
+        :param board_address: the address of the board the OME is on
+        :param board_port: the port the OME reverse ip tag listens on
+        :param seq_size: the samples per segment
+        :param n_buffers: how many segments the OME jitter buffer holds
+        :param local_host: the address to listen for credits on
+        :param credit_port: the port to listen for credits on, 0 for any
+        """
+        self._segments_per_packet = (
+            (MAX_SDP_PAYLOAD_BYTES - _PACKET_HEADER.size) //
+            (seq_size * numpy.dtype(numpy.float32).itemsize))
+        if self._segments_per_packet == 0:
+            raise Exception(SEGMENT_SIZE_ERROR.format(seq_size))
+
+        self._board_address = (board_address, board_port)
+        self._seq_size = seq_size
+        self._n_buffers = n_buffers
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((local_host, credit_port))
+        self._socket.settimeout(_RECEIVE_TIMEOUT_S)
+        self._pending = numpy.zeros(0, dtype=numpy.float32)
+        self._n_segments_sent = 0
+        self._n_segments_played = 0
+        self._n_underruns = 0
+        self._n_overflows = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    @property
+    def credit_port(self):
+        return self._socket.getsockname()[1]
+
+    @property
+    def n_segments_sent(self):
+        return self._n_segments_sent
+
+    @property
+    def n_segments_played(self):
+        return self._n_segments_played
+
+    @property
+    def n_underruns(self):
+        return self._n_underruns
+
+    @property
+    def n_overflows(self):
+        return self._n_overflows
+
+    @property
+    def n_segments_in_flight(self):
+        """ the segments sent but not yet played or thrown away
+
+        :rtype: int
+        """
+        return (
+            self._n_segments_sent - self._n_segments_played -
+            self._n_overflows)
+
+    def start(self):
+        """ starts receiving credits in a background thread
+
+        :rtype: None
+        """
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._receive_credits,
+            name="SpiNNakEar live audio credits")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """ stops receiving credits and closes the socket
+
+        :rtype: None
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._socket.close()
+
+    def send(self, samples, timeout=None):
+        """ sends the whole segments of the samples, blocking while the \
+        OME jitter buffer is full. Samples short of a segment wait for the \
+        next call.
+
+        :param samples: the audio samples
+        :param timeout: how long to wait for room for each packet in \
+        seconds, or None to wait forever
+        :return: the number of segments sent
+        :rtype: int
+        """
+        samples = numpy.concatenate((
+            self._pending, numpy.asarray(samples, dtype=numpy.float32)))
+        n_segments = len(samples) // self._seq_size
+        self._pending = samples[n_segments * self._seq_size:]
+
+        sent = 0
+        while sent < n_segments:
+            n_packet_segments = min(
+                self._segments_per_packet, n_segments - sent, self._n_buffers)
+            self._wait_for_room(n_packet_segments, timeout)
+            segments = samples[
+                sent * self._seq_size:
+                (sent + n_packet_segments) * self._seq_size]
+            self._socket.sendto(
+                _PACKET_HEADER.pack(n_packet_segments) +
+                segments.astype("<f4").tobytes(), self._board_address)
+            with self._condition:
+                self._n_segments_sent += n_packet_segments
+            sent += n_packet_segments
+        return sent
+
+    def flush(self, timeout=None):
+        """ pads the samples waiting for a full segment with silence and \
+        sends them
+
+        :param timeout: how long to wait for room in seconds, or None to \
+        wait forever
+        :return: the number of segments sent
+        :rtype: int
+        """
+        if len(self._pending) == 0:
+            return 0
+        return self.send(
+            numpy.zeros(self._seq_size - len(self._pending)), timeout)
+
+    def _wait_for_room(self, n_segments, timeout):
+        """ blocks until the OME jitter buffer has room for the segments
+
+        :param n_segments: the segments about to be sent
+        :param timeout: how long to wait in seconds, or None for forever
+        :rtype: None
+        """
+        with self._condition:
+            while self.n_segments_in_flight + n_segments > self._n_buffers:
+                if not self._condition.wait(timeout) and timeout is not None:
+                    if (self.n_segments_in_flight + n_segments >
+                            self._n_buffers):
+                        raise Exception(SEND_TIMEOUT_ERROR.format(
+                            n_segments, timeout))
+
+    def _receive_credits(self):
+        """ the credit loop of the background thread
+
+        :rtype: None
+        """
+        while self._running:
+            try:
+                data = self._socket.recv(MAX_SDP_PAYLOAD_BYTES)
+            except socket.timeout:
+                continue
+            except socket.error:
+                if self._running:
+                    logger.exception("live audio credit receive failed")
+                return
+            played, underruns, overflows = _CREDIT.unpack_from(data)
+            with self._condition:
+                self._n_segments_played = max(
+                    self._n_segments_played, played)
+                self._n_underruns = underruns
+                self._n_overflows = overflows
+                self._condition.notify_all()
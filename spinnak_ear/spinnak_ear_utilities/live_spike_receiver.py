@@ -0,0 +1,183 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import socket
+import threading
+
+import numpy
+
+logger = logging.getLogger(__name__)
+
+# the words at the front of a live output packet. 1. the time, 2. the index
+# of the final row aggregation node, 3. the number of ids
+LIVE_OUTPUT_HEADER_WORDS = 3
+
+# the layout of a live spike handed to the callbacks
+LIVE_SPIKE_DTYPE = [
+    ("time", "<u4"), ("channel", "<u4"), ("fibre", "<u4")]
+
+# the biggest udp packet the receiver will read
+_MAX_PACKET_BYTES = 512
+
+# how long the receive thread waits before checking if it should stop
+_RECEIVE_TIMEOUT_S = 0.1
+
+
+def decode_live_packet(data, lo_atoms, n_fibres_per_ihc):
+    """ decodes a live output packet into (time, channel, fibre) spikes
+
+    :param data: the udp payload of the packet
+    :param lo_atoms: the lo atom of each final row aggregation node, in the \
+    order of the out going slices
+    :param n_fibres_per_ihc: the number of fibres per inner hair cell
+    :return: a numpy array of LIVE_SPIKE_DTYPE
+    :rtype: numpy.ndarray
+    """
+    words = numpy.frombuffer(bytes(data), dtype="<u4")
+    time, index, n_ids = words[:LIVE_OUTPUT_HEADER_WORDS]
+    ids = words[LIVE_OUTPUT_HEADER_WORDS:LIVE_OUTPUT_HEADER_WORDS + n_ids]
+    fibres = ids + lo_atoms[index]
+    spikes = numpy.empty(len(fibres), dtype=LIVE_SPIKE_DTYPE)
+    spikes["time"] = time
+    spikes["channel"] = fibres // n_fibres_per_ihc
+    spikes["fibre"] = fibres % n_fibres_per_ihc
+    return spikes
+
+
+class EarLiveSpikeReceiver(object):
+    """ Listens for the spikes the final aggregation nodes of an ear stream \
+    to the host and hands them to callbacks as batched numpy arrays, a \
+    packet at a time.
+    """
+
+    __slots__ = [
+        # the ear the spikes come from, for its out going slices
+        "_ear_vertex",
+        # the number of fibres per inner hair cell
+        "_n_fibres_per_ihc",
+        # the lo atom of each final row aggregation node
+        "_lo_atoms",
+        # the udp socket
+        "_socket",
+        # the functions to hand the spikes to
+        "_callbacks",
+        # the thread receiving packets
+        "_thread",
+        # bool flag for the receive thread to stop
+        "_running"
+    ]
+
+    def __init__(
+            self, ear_vertex, n_fibres_per_ihc, local_host="0.0.0.0",
+            local_port=0):
+        """
+        :param ear_vertex: the ear, for its out going slices
+        :param n_fibres_per_ihc: the number of fibres per inner hair cell
+        :param local_host: the address to listen on
+        :param local_port: the port to listen on, 0 for any free port
+        """
+        self._ear_vertex = ear_vertex
+        self._n_fibres_per_ihc = n_fibres_per_ihc
+        self._lo_atoms = None
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((local_host, local_port))
+        self._socket.settimeout(_RECEIVE_TIMEOUT_S)
+        self._callbacks = list()
+        self._thread = None
+        self._running = False
+
+    @property
+    def local_port(self):
+        return self._socket.getsockname()[1]
+
+    def add_callback(self, callback):
+        """ adds a function to call with each batch of spikes
+
+        :param callback: function taking a numpy array of LIVE_SPIKE_DTYPE
+        :rtype: None
+        """
+        self._callbacks.append(callback)
+
+    def add_asyncio_queue(self, loop):
+        """ makes an asyncio queue that each batch of spikes is put on
+
+        :param loop: the event loop the queue is read from
+        :return: the queue
+        :rtype: asyncio.Queue
+        """
+        import asyncio
+        queue = asyncio.Queue()
+        self.add_callback(
+            lambda spikes: loop.call_soon_threadsafe(
+                queue.put_nowait, spikes))
+        return queue
+
+    def start(self):
+        """ starts receiving packets in a background thread
+
+        :rtype: None
+        """
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._receive, name="SpiNNakEar live spike receiver")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """ stops receiving packets and closes the socket
+
+        :rtype: None
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._socket.close()
+
+    def _get_lo_atoms(self):
+        """ the lo atom of each final row aggregation node, read once the \
+        ear has been mapped
+
+        :rtype: numpy.ndarray
+        """
+        if self._lo_atoms is None:
+            self._lo_atoms = numpy.array(
+                [vertex_slice.lo_atom
+                 for vertex_slice in self._ear_vertex.get_out_going_slices()],
+                dtype="<u4")
+        return self._lo_atoms
+
+    def _receive(self):
+        """ the receive loop of the background thread
+
+        :rtype: None
+        """
+        while self._running:
+            try:
+                data = self._socket.recv(_MAX_PACKET_BYTES)
+            except socket.timeout:
+                continue
+            except socket.error:
+                if self._running:
+                    logger.exception("live spike receive failed")
+                return
+            spikes = decode_live_packet(
+                data, self._get_lo_atoms(), self._n_fibres_per_ihc)
+            for callback in self._callbacks:
+                try:
+                    callback(spikes)
+                except Exception:
+                    logger.exception("live spike callback failed")
@@ -0,0 +1,120 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import struct
+
+from data_specification.utility_calls import get_region_base_address_offset
+
+from spinnman.connections.udp_packet_connections import SCAMPConnection
+from spinnman.processes import ReadMemoryProcess, \
+    RoundRobinConnectionSelector
+
+# a word of sdram
+_WORD = struct.Struct("<I")
+
+
+class MachineMemoryReader(object):
+    """ Reads the memory of cores through SCAMP connections of its own, \
+    one per board, so that readers on different threads never share a \
+    connection with each other or with the transceiver.
+    """
+
+    __slots__ = [
+        # the transceiver, for the address of the user 0 register of a core
+        "_transceiver",
+        # the machine, for the board of each chip
+        "_machine",
+        # the connections opened, by the (x, y) of the ethernet chip
+        "_connections",
+        # the read memory process over each connection, by the (x, y) of
+        # the ethernet chip
+        "_processes"
+    ]
+
+    def __init__(self, transceiver, machine):
+        """
+        :param transceiver: the spinnman interface
+        :param machine: the machine the cores are on
+        """
+        self._transceiver = transceiver
+        self._machine = machine
+        self._connections = dict()
+        self._processes = dict()
+
+    def _process(self, x, y):
+        """ the read memory process over this reader's connection to the \
+        board of a chip, connecting on first use
+
+        :param x: the x of the chip
+        :param y: the y of the chip
+        :rtype: ReadMemoryProcess
+        """
+        chip = self._machine.get_chip_at(x, y)
+        board = (chip.nearest_ethernet_x, chip.nearest_ethernet_y)
+        if board not in self._processes:
+            connection = SCAMPConnection(
+                chip_x=board[0], chip_y=board[1],
+                remote_host=self._machine.get_chip_at(*board).ip_address)
+            self._connections[board] = connection
+            self._processes[board] = ReadMemoryProcess(
+                RoundRobinConnectionSelector([connection]))
+        return self._processes[board]
+
+    def read_memory(self, x, y, base_address, length):
+        """ reads sdram of a chip
+
+        :param x: the x of the chip
+        :param y: the y of the chip
+        :param base_address: the address to read from
+        :param length: the bytes to read
+        :rtype: bytearray
+        """
+        return self._process(x, y).read_memory(x, y, 0, base_address, length)
+
+    def _read_word(self, x, y, address):
+        """ reads a word of sdram of a chip
+
+        :param x: the x of the chip
+        :param y: the y of the chip
+        :param address: the address of the word
+        :rtype: int
+        """
+        return _WORD.unpack(self.read_memory(x, y, address, _WORD.size))[0]
+
+    def locate_memory_region(self, placement, region):
+        """ the address of a region of a core, as \
+        helpful_functions.locate_memory_region_for_placement gives it
+
+        :param placement: the placement of the core
+        :param region: the region
+        :rtype: int
+        """
+        regions_base_address = self._read_word(
+            placement.x, placement.y,
+            self._transceiver.get_user_0_register_address_from_core(
+                placement.p))
+        return self._read_word(
+            placement.x, placement.y,
+            get_region_base_address_offset(regions_base_address, region))
+
+    def close(self):
+        """ closes the connections this reader opened
+
+        :rtype: None
+        """
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+        self._processes.clear()
@@ -0,0 +1,53 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+
+# bits held in each word of a packed spike row
+BITS_PER_WORD = 32
+
+# the word layout packed spike rows are stored in on the machine
+PACKED_SPIKE_WORD_DTYPE = "<u4"
+
+
+def packed_spike_words_per_row(n_atoms):
+    """ how many words hold a bit for each atom
+
+    :param n_atoms: the number of atoms in a row
+    :rtype: int
+    """
+    return (n_atoms + BITS_PER_WORD - 1) // BITS_PER_WORD
+
+
+def decode_packed_spikes(data, n_rows, n_atoms, lo_atom, row_period):
+    """ turns rows of packed spike bits into spike ids and times. Bit k of \
+    word w in a row is the spike flag of atom (w * 32) + k.
+
+    :param data: the bytes or uint32 words of the rows
+    :param n_rows: the number of rows recorded
+    :param n_atoms: the number of atoms in each row
+    :param lo_atom: the id of the first atom in each row
+    :param row_period: the time in ms between rows
+    :return: numpy array of (id, time) pairs ordered by time then id
+    :rtype: numpy.ndarray
+    """
+    words_per_row = packed_spike_words_per_row(n_atoms)
+    words = numpy.frombuffer(
+        bytes(data), dtype=PACKED_SPIKE_WORD_DTYPE)[:n_rows * words_per_row]
+    bits = numpy.unpackbits(
+        words.view(numpy.uint8), bitorder="little").reshape(
+            n_rows, words_per_row * BITS_PER_WORD)[:, :n_atoms]
+    rows, atoms = numpy.nonzero(bits)
+    return numpy.column_stack((atoms + lo_atom, rows * row_period))
@@ -0,0 +1,91 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from data_specification.enums.data_type import DataType
+from spinnak_ear.spinnak_ear_utilities.packed_spikes import BITS_PER_WORD
+import numpy
+
+# the precisions a probability can be recorded at, by name
+PRECISIONS = {
+    "float32": DataType.FLOAT_32,
+    "uint16": DataType.UINT16,
+    "uint8": DataType.UINT8}
+
+# the numpy layout of each quantized precision on the machine
+_QUANTIZED_DTYPES = {
+    DataType.UINT16: "<u2",
+    DataType.UINT8: "<u1"}
+
+# error message for a precision we dont know
+PRECISION_ERROR = "Unknown recording precision {}, pick one of {}"
+
+_BYTES_PER_WORD = BITS_PER_WORD // 8
+
+
+def get_precision_data_type(precision):
+    """ the data type of a named recording precision
+
+    :param precision: the name of the precision
+    :rtype: DataType
+    """
+    if precision not in PRECISIONS:
+        raise Exception(PRECISION_ERROR.format(
+            precision, sorted(PRECISIONS.keys())))
+    return PRECISIONS[precision]
+
+
+def is_quantized(data_type):
+    """ if values of the data type are quantized probabilities
+
+    :param data_type: the data type
+    :rtype: bool
+    """
+    return data_type in _QUANTIZED_DTYPES
+
+
+def quantized_words_per_row(n_values, data_type):
+    """ how many words hold a row of quantized values
+
+    :param n_values: the number of values in a row
+    :param data_type: the quantized data type
+    :rtype: int
+    """
+    return (
+        n_values * data_type.size + _BYTES_PER_WORD - 1) // _BYTES_PER_WORD
+
+
+def dequantize_probabilities(
+        data, n_rows, n_values, data_type, scale=1.0, full_scale=1.0):
+    """ turns rows of quantized probabilities back into floats, where the \
+    largest code of the data type is the full scale probability.
+
+    :param data: the bytes of the rows
+    :param n_rows: the number of rows recorded
+    :param n_values: the number of values in each row
+    :param data_type: the quantized data type
+    :param scale: what to divide the probabilities by
+    :param full_scale: the probability the largest code stands for, as \
+    written in the region header
+    :return: a float32 array of n_rows by n_values
+    :rtype: numpy.ndarray
+    """
+    row_bytes = quantized_words_per_row(n_values, data_type) * _BYTES_PER_WORD
+    codes = numpy.frombuffer(bytes(data), dtype=numpy.uint8)[
+        :n_rows * row_bytes].reshape(n_rows, row_bytes)[
+            :, :n_values * data_type.size]
+    codes = codes.copy().view(_QUANTIZED_DTYPES[data_type])
+    max_code = float(2 ** (data_type.size * 8) - 1)
+    return (codes.astype(numpy.float32) *
+            numpy.float32(full_scale / (max_code * scale)))
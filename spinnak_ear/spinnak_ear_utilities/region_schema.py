@@ -0,0 +1,186 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import namedtuple
+
+import numpy
+
+# how a field is laid out in sdram and declared in c
+FieldType = namedtuple("FieldType", ["numpy_type", "c_type"])
+
+# the field types the ear regions use
+UINT32 = FieldType("<u4", "uint32_t")
+INT32 = FieldType("<i4", "int32_t")
+FLOAT32 = FieldType("<f4", "float")
+FLOAT64 = FieldType("<f8", "double")
+
+
+def pointer_to(c_type):
+    """ a field holding an sdram address, declared as a c pointer
+
+    :param c_type: the c type pointed at
+    :rtype: FieldType
+    """
+    return FieldType("<u4", "{}*".format(c_type))
+
+
+class RegionSchema(object):
+    """ The layout of a fixed size dsg region, from which both the numpy \
+    structured dtype the host writes it with and the c struct the binary \
+    reads it with are made, so the two cannot drift apart.
+
+    Fields are laid out with c alignment rules, so a double after an odd \
+    number of words gets the same padding the compiler gives it.
+    """
+
+    __slots__ = [
+        # the c struct name
+        "_name",
+        # what the region holds, for the c doc comment
+        "_doc",
+        # the (name, field type, comment or None) of each field, in order
+        "_fields",
+        # the (name, c type) of a c flexible array after the fields, or None
+        "_flexible_array",
+        # the numpy structured dtype of the fields
+        "_dtype"
+    ]
+
+    # error message for writing a region without all its fields
+    MISSING_FIELDS_ERROR = "The {} region needs values for {}"
+
+    # error message for writing fields a region does not have
+    UNKNOWN_FIELDS_ERROR = "The {} region has no fields {}"
+
+    # error message for writing the wrong number of values in order
+    N_VALUES_ERROR = "The {} region has {} fields but {} values were given"
+
+    # the indent of the c struct fields
+    _C_INDENT = "    "
+
+    def __init__(self, name, doc, fields, flexible_array=None):
+        """
+        :param name: the c struct name
+        :param doc: what the region holds, for the c doc comment
+        :param fields: the (name, field type, comment or None) of each field
+        :param flexible_array: the (name, c type) of a c flexible array \
+        member after the fields, which the host writes separately, or None
+        """
+        self._name = name
+        self._doc = doc
+        self._fields = tuple(fields)
+        self._flexible_array = flexible_array
+        self._dtype = numpy.dtype(
+            [(field_name, field_type.numpy_type)
+             for field_name, field_type, _ in self._fields], align=True)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def field_names(self):
+        return self._dtype.names
+
+    @property
+    def size(self):
+        """ the size of the fixed part of the region in bytes
+
+        :rtype: int
+        """
+        return self._dtype.itemsize
+
+    def pack(self, **values):
+        """ lays out the fields as the words of the region
+
+        :param values: the value of every field, by name
+        :rtype: numpy.ndarray of uint32
+        """
+        missing = [name for name in self.field_names if name not in values]
+        if missing:
+            raise Exception(self.MISSING_FIELDS_ERROR.format(
+                self._name, missing))
+        unknown = [name for name in values if name not in self.field_names]
+        if unknown:
+            raise Exception(self.UNKNOWN_FIELDS_ERROR.format(
+                self._name, unknown))
+        data = numpy.zeros(1, dtype=self._dtype)
+        for name, value in values.items():
+            data[name] = value
+        return data.view("<u4")
+
+    def pack_values(self, values):
+        """ lays out the fields as the words of the region
+
+        :param values: the value of every field, in field order
+        :rtype: numpy.ndarray of uint32
+        """
+        values = list(values)
+        if len(values) != len(self.field_names):
+            raise Exception(self.N_VALUES_ERROR.format(
+                self._name, len(self.field_names), len(values)))
+        return self.pack(**dict(zip(self.field_names, values)))
+
+    def unpack(self, data):
+        """ reads the fields back from the bytes of the region, as read \
+        from the machine
+
+        :param data: the bytes, at least size long
+        :return: the fields, indexable by name
+        :rtype: numpy.void
+        """
+        return numpy.frombuffer(
+            bytes(data[:self.size]), dtype=self._dtype)[0]
+
+    def write(self, spec, **values):
+        """ writes the region at the current write focus
+
+        :param spec: the data spec writer
+        :param values: the value of every field, by name
+        :rtype: None
+        """
+        spec.write_array(self.pack(**values))
+
+    def write_values(self, spec, values):
+        """ writes the region at the current write focus
+
+        :param spec: the data spec writer
+        :param values: the value of every field, in field order
+        :rtype: None
+        """
+        spec.write_array(self.pack_values(values))
+
+    def c_struct(self):
+        """ the c typedef of the region
+
+        :rtype: str
+        """
+        lines = ["//! \\brief {}".format(self._doc),
+                 "typedef struct {}{{".format(self._name)]
+        for field_name, field_type, comment in self._fields:
+            if comment is not None:
+                lines.append("{}// {}".format(self._C_INDENT, comment))
+            lines.append("{}{} {};".format(
+                self._C_INDENT, field_type.c_type, field_name))
+        if self._flexible_array is not None:
+            array_name, c_type = self._flexible_array
+            lines.append("{}{} {}[];".format(
+                self._C_INDENT, c_type, array_name))
+        lines.append("}} {};".format(self._name))
+        return "\n".join(lines)
@@ -0,0 +1,160 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Measures the host memory taken by the DRNL and IHCAN machine vertices \
+of a whole ear, built as the ear builds them around one EarContext, with \
+stand ins for the parts of the ear the vertices only use once mapped::
+
+    python -m spinnak_ear.spinnak_ear_utilities.vertex_memory_benchmark \\
+        --scale 1.0
+
+tracemalloc gives the bytes still held once the vertices are built, and \
+the most held while building them. The peak resident set of the process \
+is given before and after building them.
+"""
+
+import argparse
+import resource
+import tracemalloc
+
+import numpy
+
+from data_specification.enums.data_type import DataType
+
+from spinnak_ear.spinnak_ear_machine_vertices.drnl_machine_vertex import \
+    DRNLMachineVertex
+from spinnak_ear.spinnak_ear_machine_vertices.ihcan_machine_vertex import \
+    IHCANMachineVertex
+from spinnak_ear.spinnak_ear_utilities.ear_context import EarContext
+from spinnak_ear.spinnak_ear_utilities.ear_graph_index import EarGraphIndex
+
+# the channels of a full scale ear, 30000 fibres of the default 10 a channel
+FULL_SCALE_N_CHANNELS = 3000
+
+# the ihcans of a channel, its default 10 fibres at 2 an ihcan
+N_IHCANS_PER_CHANNEL = 5
+
+# the fibres each ihcan simulates
+N_FIBRES_PER_IHCAN = 2
+
+# the (n lsr, n msr, n hsr) of the ihcans of a channel, the default 2 lsr,
+# 2 msr and 6 hsr fibres
+_IHCAN_FIBRE_COUNTS = [[2, 0, 0], [0, 2, 0], [0, 0, 2], [0, 0, 2], [0, 0, 2]]
+
+# the parameters of the default ear
+_FS = 22050.0
+_SEQ_SIZE = 8
+_N_BUFFERS_IN_SDRAM = 2
+_SPIKE_PROB_MAX_RATE = 4000.0
+
+# the lowest and highest characteristic frequencies of the channels
+_MIN_CF = 30.0
+_MAX_CF = 8000.0
+
+# the audio the ear is made to process, in s
+_AUDIO_DURATION = 1.0
+
+
+def build_ear_vertices(n_channels, seed=None):
+    """ builds the DRNL and IHCAN machine vertices of an ear and the \
+    context they share, all recording with the neuron recorders, which \
+    stand ins leave as None
+
+    :param n_channels: the channels, a DRNL each
+    :param seed: the random seed of the ihcan seeds, or None
+    :return: the context, the drnls and the ihcans
+    :rtype: tuple(EarContext, list(DRNLMachineVertex), \
+    list(IHCANMachineVertex))
+    """
+    n_ihcans = n_channels * N_IHCANS_PER_CHANNEL
+    context = EarContext(
+        None, None, EarGraphIndex(), _FS, _SEQ_SIZE,
+        int(_AUDIO_DURATION * _FS),
+        _SEQ_SIZE * 1000000.0 / _FS, False, 1, None, None, None, False, 1,
+        True, False, N_FIBRES_PER_IHCAN, 0, 0, DataType.FLOAT_32,
+        _SPIKE_PROB_MAX_RATE, False, None, None,
+        numpy.ones(n_channels, dtype=bool), numpy.ones(n_ihcans, dtype=bool),
+        numpy.zeros(n_ihcans, dtype=bool), numpy.zeros(n_ihcans, dtype=bool))
+    rng = numpy.random.RandomState(seed)
+    context.set_random_choices(
+        rng.randint(
+            0, numpy.iinfo(numpy.uint32).max,
+            n_ihcans * IHCANMachineVertex.N_SEEDS_PER_IHCAN_VERTEX,
+            dtype=numpy.uint32),
+        numpy.tile(_IHCAN_FIBRE_COUNTS, (n_channels, 1)))
+    drnls = [
+        DRNLMachineVertex(context, drnl_index, cf, _N_BUFFERS_IN_SDRAM)
+        for drnl_index, cf in enumerate(
+            numpy.geomspace(_MIN_CF, _MAX_CF, n_channels))]
+    ihcans = [
+        IHCANMachineVertex(context, ihcan_index, _N_BUFFERS_IN_SDRAM)
+        for ihcan_index in range(n_ihcans)]
+    return context, drnls, ihcans
+
+
+def _peak_rss():
+    """ the peak resident set of this process in bytes
+
+    :rtype: int
+    """
+    # linux gives kB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def benchmark_vertex_memory(scale, seed=None):
+    """ measures the memory taken to build the vertices of an ear
+
+    :param scale: the size of the ear, 1.0 being full scale
+    :param seed: the random seed of the ihcan seeds, or None
+    :return: the vertices built, the bytes held once built, the most \
+    bytes held while building and the peak resident set in bytes before \
+    and after building
+    :rtype: tuple(int, int, int, int, int)
+    """
+    n_channels = int(FULL_SCALE_N_CHANNELS * scale)
+    rss_before = _peak_rss()
+    tracemalloc.start()
+    try:
+        _, drnls, ihcans = build_ear_vertices(n_channels, seed)
+        n_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (
+        len(drnls) + len(ihcans), n_bytes, peak_bytes, rss_before,
+        _peak_rss())
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Measures the host memory the DRNL and IHCAN vertices "
+                    "of an ear take")
+    parser.add_argument(
+        "--scale", type=float, default=1.0,
+        help="size of the ear, 1.0 being full scale")
+    parser.add_argument("--seed", type=int, default=None)
+    options = parser.parse_args(args)
+
+    n_vertices, n_bytes, peak_bytes, rss_before, rss_after = \
+        benchmark_vertex_memory(options.scale, options.seed)
+    print("{} vertices: {:.1f} MB held, {:.0f} bytes a vertex, {:.1f} MB "
+          "at most while building".format(
+              n_vertices, n_bytes / 1e6, n_bytes / float(n_vertices),
+              peak_bytes / 1e6))
+    print("peak resident set: {:.1f} MB before, {:.1f} MB after".format(
+        rss_before / 1e6, rss_after / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Lock
+import time
+
+import numpy
+
+from spinnak_ear.spinnak_ear_utilities.ear_recording_extraction import \
+    EarRecordingExtractor
+from spinnak_ear.spinnak_ear_utilities.extraction_benchmark import \
+    SPIKE_PROB_REGION, SPIKE_REGION, StandInBufferManager, \
+    StandInMemoryReader, list_per_core_spike_probs, make_stand_in_ear, \
+    read_spike_probs_from_machine
+
+N_CORES = 7
+N_FIBRES = 2
+SEQ_SIZE = 4
+N_ROWS = 5
+
+
+class InFlightCounter(object):
+    """ counts the most calls in flight at once
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._in_flight = 0
+        self.most_in_flight = 0
+        self.n_calls = 0
+
+    def call(self, function, *args):
+        with self._lock:
+            self._in_flight += 1
+            self.n_calls += 1
+            self.most_in_flight = max(self.most_in_flight, self._in_flight)
+        time.sleep(0.002)
+        try:
+            return function(*args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+class CheckingBufferManager(object):
+    """ wraps a buffer manager, counting the fetches and the most \
+    lookups in flight at once
+    """
+
+    def __init__(self, buffer_manager):
+        self._buffer_manager = buffer_manager
+        self.lookups = InFlightCounter()
+        self.fetched = list()
+
+    def get_data_for_placements(self, placements, progress=None):
+        assert not self.lookups.n_calls
+        self.fetched.append([placement.vertex for placement in placements])
+        self._buffer_manager.get_data_for_placements(placements, progress)
+
+    def get_data_by_placement(self, placement, recording_region_id):
+        return self.lookups.call(
+            self._buffer_manager.get_data_by_placement, placement,
+            recording_region_id)
+
+
+class CheckingMemoryReader(StandInMemoryReader):
+    """ a stand in reader counting the reads in flight over all readers
+    """
+
+    def __init__(self, recordings, counter):
+        super(CheckingMemoryReader, self).__init__(recordings, 0.0)
+        self._counter = counter
+
+    def read_region(self, placement, region):
+        return self._counter.call(
+            super(CheckingMemoryReader, self).read_region, placement, region)
+
+
+def _stand_in_ear():
+    return make_stand_in_ear(N_CORES, N_FIBRES, SEQ_SIZE, N_ROWS, 1)
+
+
+def test_threads_read_the_same_as_in_turn():
+    vertices, placements, recordings = _stand_in_ear()
+    buffer_manager = StandInBufferManager(recordings, 0.0)
+    expected_probs = list_per_core_spike_probs(
+        vertices, placements, buffer_manager, SEQ_SIZE)
+    expected_spikes = None
+    for n_threads in (0, 1, 3, N_CORES + 2):
+        extractor = EarRecordingExtractor(
+            buffer_manager, placements, n_threads)
+        probs = extractor.get_matrix(
+            vertices, SPIKE_PROB_REGION, SEQ_SIZE, numpy.float32, N_ROWS,
+            N_CORES * N_FIBRES, "probs")
+        spikes = extractor.get_spikes(vertices, SPIKE_REGION, 1.0, "spikes")
+        machine_probs = read_spike_probs_from_machine(
+            extractor, vertices,
+            [StandInMemoryReader(recordings, 0.0)
+             for _ in range(max(n_threads, 1))],
+            SEQ_SIZE, N_ROWS, N_CORES * N_FIBRES)
+        assert numpy.array_equal(probs, expected_probs)
+        assert numpy.array_equal(machine_probs, expected_probs)
+        if expected_spikes is None:
+            expected_spikes = spikes
+        assert numpy.array_equal(spikes, expected_spikes)
+
+
+def test_buffer_manager_fetches_once_then_is_used_in_turn():
+    vertices, placements, recordings = _stand_in_ear()
+    checking = CheckingBufferManager(
+        StandInBufferManager(recordings, 0.0))
+    extractor = EarRecordingExtractor(checking, placements, 4)
+    extractor.get_matrix(
+        vertices, SPIKE_PROB_REGION, SEQ_SIZE, numpy.float32, N_ROWS,
+        N_CORES * N_FIBRES, "probs")
+    assert checking.fetched == [vertices]
+    assert checking.lookups.n_calls == N_CORES
+    assert checking.lookups.most_in_flight == 1
+
+
+def test_machine_reads_overlap_up_to_the_threads():
+    vertices, placements, recordings = _stand_in_ear()
+    for n_threads, n_readers in ((3, 3), (3, 2), (0, 1)):
+        counter = InFlightCounter()
+        extractor = EarRecordingExtractor(None, placements, n_threads)
+        probs = read_spike_probs_from_machine(
+            extractor, vertices,
+            [CheckingMemoryReader(recordings, counter)
+             for _ in range(n_readers)],
+            SEQ_SIZE, N_ROWS, N_CORES * N_FIBRES)
+        assert not numpy.isnan(probs).any()
+        assert counter.n_calls == N_CORES
+        assert 1 <= counter.most_in_flight <= max(n_readers, 1)
+        if n_threads > 1 and n_readers > 1:
+            assert counter.most_in_flight > 1
+
+
+def test_map_vertices_keeps_vertex_order():
+    vertices, placements, _ = _stand_in_ear()
+    lock = Lock()
+    in_read = []
+
+    def read(vertex, placement, reader):
+        assert reader is None
+        assert lock.acquire(False)
+        try:
+            in_read.append(vertex)
+            time.sleep(0.001)
+            return placement.p
+        finally:
+            lock.release()
+
+    extractor = EarRecordingExtractor(None, placements, 3)
+    results = extractor.map_vertices(
+        vertices, read,
+        lambda vertex, placement, data: (vertex, placement.p, data),
+        "map")
+    assert [vertex for vertex, _, _ in results] == vertices
+    assert all(p == data for _, p, data in results)
+    assert len(in_read) == N_CORES
@@ -0,0 +1,88 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+import pytest
+
+from spinnak_ear.spinnak_ear_utilities.ear_atom_map import HSR, MSR
+from spinnak_ear.spinnak_ear_utilities.ear_spike_trains import \
+    EarSpikeTrains
+
+SEQ_SIZE = 8
+N_FIBRES_PER_IHC = 6
+N_FIBRES = 60
+N_SPIKES = 500
+SAMPLE_PERIOD = 0.05
+T_STOP = 8.0
+
+# the channel and fibre type of each fibre, two of each type per channel
+CHANNELS = numpy.repeat(numpy.arange(N_FIBRES // N_FIBRES_PER_IHC),
+                        N_FIBRES_PER_IHC)
+FIBRE_TYPES = numpy.tile(numpy.repeat([0, 1, 2], 2), N_FIBRES // 6)
+
+
+def _recorded_spikes(t_stop):
+    rng = numpy.random.RandomState(0)
+    atoms = rng.randint(0, N_FIBRES * SEQ_SIZE, N_SPIKES)
+    rows = rng.randint(0, int(t_stop / (SAMPLE_PERIOD * SEQ_SIZE)) + 1,
+                       N_SPIKES)
+    return numpy.column_stack((atoms, rows * SAMPLE_PERIOD * SEQ_SIZE))
+
+
+def _trains(spikes, t_stop=T_STOP):
+    return EarSpikeTrains.from_recorded_spikes(
+        spikes, SEQ_SIZE, SAMPLE_PERIOD, CHANNELS, FIBRE_TYPES, t_stop)
+
+
+def test_spike_pairs_match_the_recording():
+    spikes = _recorded_spikes(T_STOP - 1)
+    expected = numpy.column_stack((
+        spikes[:, 0] // SEQ_SIZE,
+        spikes[:, 1] + (spikes[:, 0] % SEQ_SIZE) * SAMPLE_PERIOD)).astype(
+            numpy.float32)
+    expected = expected[numpy.lexsort((expected[:, 1], expected[:, 0]))]
+    assert numpy.allclose(_trains(spikes).to_spike_pairs(), expected)
+
+
+def test_select_fibre_types_by_name_or_code():
+    trains = _trains(_recorded_spikes(T_STOP - 1))
+    hsr = trains.select_fibre_types("HSR")
+    assert numpy.array_equal(
+        hsr.fibres, numpy.flatnonzero(FIBRE_TYPES == HSR))
+    assert hsr.times is trains.times
+    both = trains.select_fibre_types(["hsr", MSR])
+    assert numpy.array_equal(
+        both.fibres, numpy.flatnonzero(FIBRE_TYPES != 0))
+    with pytest.raises(Exception):
+        trains.select_fibre_types("fast")
+
+
+def test_select_channels_is_a_view():
+    trains = _trains(_recorded_spikes(T_STOP - 1))
+    channels = trains.select_channels([1, 2])
+    assert len(channels) == 2 * N_FIBRES_PER_IHC
+    assert numpy.shares_memory(channels.starts, trains.starts)
+
+
+def test_raster_counts_every_spike():
+    raster = _trains(_recorded_spikes(T_STOP - 1)).to_raster(1.0)
+    assert raster.shape == (N_FIBRES, int(T_STOP))
+    assert raster.sum() == N_SPIKES
+
+
+@pytest.mark.parametrize("n_spikes", [0, 3])
+def test_raster_of_no_time_has_no_bins(n_spikes):
+    spikes = numpy.zeros((n_spikes, 2))
+    assert _trains(spikes, t_stop=0.0).to_raster(1.0).shape == (N_FIBRES, 0)
@@ -0,0 +1,66 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from spinnak_ear.spinnak_ear_machine_vertices.ihcan_machine_vertex import \
+    IHCANMachineVertex
+from spinnak_ear.spinnak_ear_utilities.ihcan_lookup_tables import \
+    LOOKUP_TABLE_DTCM_BYTES, N_REPROCESSING_POWERS, lookup_table_region
+
+# the spike sampling rates the tables are checked at, in Hz
+SAMPLING_RATES = (22050.0, 48000.0, 100000.0)
+
+# the bounds the tables were built to meet
+APICAL_ERROR_OF_G_MAX = 7.4e-5
+CALCIUM_ERROR = 9.4e-6
+POWER_ERROR = 5e-7
+
+# the bytes of the tables the default model fits in the region
+REGION_BYTES = 8188
+
+# the reprocessing store the power error is checked up to, past the table
+MAX_REPROCESSING_COUNT = 2 * N_REPROCESSING_POWERS
+
+
+@pytest.fixture(params=SAMPLING_RATES)
+def tables(request):
+    return IHCANMachineVertex.build_lookup_tables(1.0 / request.param)
+
+
+def test_apical_conductance_error(tables):
+    error = tables.apical_conductance.max_error(
+        IHCANMachineVertex.apical_conductance_of)
+    assert error <= APICAL_ERROR_OF_G_MAX * (
+        tables.apical_conductance.values[-1] -
+        tables.apical_conductance.values[0])
+
+
+def test_calcium_activation_error(tables):
+    assert tables.calcium_activation.max_error(
+        IHCANMachineVertex.calcium_activation_of) <= CALCIUM_ERROR
+
+
+def test_power_errors(tables):
+    assert tables.replenish_powers.max_error(
+        tables.replenish_powers.n_powers - 1) <= POWER_ERROR
+    assert tables.reprocessing_powers.max_error(
+        MAX_REPROCESSING_COUNT) <= POWER_ERROR
+
+
+def test_tables_fit_the_region(tables):
+    region = lookup_table_region(tables)
+    assert region.nbytes == REGION_BYTES
+    assert region.nbytes <= LOOKUP_TABLE_DTCM_BYTES
@@ -0,0 +1,112 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import socket
+import struct
+import threading
+
+import numpy
+import pytest
+
+from spinnak_ear.spinnak_ear_utilities.live_audio_sender import \
+    EarLiveAudioSender
+
+SEQ_SIZE = 8
+N_BUFFERS = 4
+
+# how long to wait for a packet to come back round the loopback
+TIMEOUT_S = 5.0
+
+
+class StandInOme(object):
+    """ stands in for the OME of a board on a loopback socket, taking \
+    audio packets and sending credits back
+    """
+
+    def __init__(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.settimeout(TIMEOUT_S)
+
+    @property
+    def port(self):
+        return self._socket.getsockname()[1]
+
+    def receive(self):
+        """ the segments of the next audio packet
+        """
+        data = self._socket.recv(1024)
+        n_segments, = struct.unpack_from("<I", data)
+        samples = numpy.frombuffer(data[4:], dtype="<f4")
+        assert len(samples) == n_segments * SEQ_SIZE
+        return samples.reshape(n_segments, SEQ_SIZE)
+
+    def credit(self, credit_port, played, underruns=0, overflows=0):
+        self._socket.sendto(
+            struct.pack("<III", played, underruns, overflows),
+            ("127.0.0.1", credit_port))
+
+    def close(self):
+        self._socket.close()
+
+
+@pytest.fixture
+def ome_and_sender():
+    ome = StandInOme()
+    sender = EarLiveAudioSender(
+        "127.0.0.1", ome.port, SEQ_SIZE, N_BUFFERS, local_host="127.0.0.1")
+    sender.start()
+    yield ome, sender
+    sender.stop()
+    ome.close()
+
+
+def test_sends_whole_segments(ome_and_sender):
+    ome, sender = ome_and_sender
+    audio = numpy.arange(SEQ_SIZE * 2 + 3, dtype=numpy.float32)
+    assert sender.send(audio) == 2
+    assert numpy.array_equal(
+        ome.receive().ravel(), audio[:SEQ_SIZE * 2])
+    assert sender.flush() == 1
+    last = ome.receive().ravel()
+    assert numpy.array_equal(last[:3], audio[SEQ_SIZE * 2:])
+    assert not numpy.any(last[3:])
+    assert sender.n_segments_in_flight == 3
+
+
+def test_blocks_until_credited(ome_and_sender):
+    ome, sender = ome_and_sender
+    audio = numpy.ones(SEQ_SIZE * (N_BUFFERS + 2), dtype=numpy.float32)
+    sent = list()
+    thread = threading.Thread(target=lambda: sent.append(sender.send(audio)))
+    thread.start()
+    assert len(ome.receive()) == N_BUFFERS
+    thread.join(0.2)
+    assert thread.is_alive()
+    ome.credit(sender.credit_port, played=2, underruns=1)
+    assert len(ome.receive()) == 2
+    thread.join(TIMEOUT_S)
+    assert sent == [N_BUFFERS + 2]
+    assert sender.n_segments_played == 2
+    assert sender.n_underruns == 1
+    assert sender.n_segments_in_flight == N_BUFFERS
+
+
+def test_times_out_when_full(ome_and_sender):
+    ome, sender = ome_and_sender
+    sender.send(numpy.zeros(SEQ_SIZE * N_BUFFERS))
+    ome.receive()
+    with pytest.raises(Exception):
+        sender.send(numpy.zeros(SEQ_SIZE), timeout=0.2)
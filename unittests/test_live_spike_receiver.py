@@ -0,0 +1,94 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import namedtuple
+import socket
+import threading
+
+import numpy
+
+from spinnak_ear.spinnak_ear_utilities.live_spike_receiver import \
+    EarLiveSpikeReceiver, decode_live_packet
+
+N_FIBRES_PER_IHC = 4
+LO_ATOMS = (0, 10, 24)
+
+# how long to wait for a packet to come back round the loopback
+TIMEOUT_S = 5.0
+
+StandInSlice = namedtuple("StandInSlice", "lo_atom")
+
+
+class StandInEar(object):
+    """ stands in for an ear, with just its out going slices
+    """
+
+    def get_out_going_slices(self):
+        return [StandInSlice(lo_atom) for lo_atom in LO_ATOMS]
+
+
+class Batches(object):
+    """ collects the batches a receiver hands its callbacks
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.batches = list()
+
+    def __call__(self, spikes):
+        with self._condition:
+            self.batches.append(spikes)
+            self._condition.notify_all()
+
+    def wait_for(self, n_batches):
+        with self._condition:
+            self._condition.wait_for(
+                lambda: len(self.batches) >= n_batches, TIMEOUT_S)
+            return list(self.batches)
+
+
+def _packet(time, index, ids):
+    return numpy.array(
+        [time, index, len(ids)] + list(ids), dtype="<u4").tobytes()
+
+
+def test_decode_live_packet():
+    spikes = decode_live_packet(
+        _packet(7, 1, [0, 3]), numpy.array(LO_ATOMS, dtype="<u4"),
+        N_FIBRES_PER_IHC)
+    assert list(spikes["time"]) == [7, 7]
+    assert list(spikes["channel"]) == [2, 3]
+    assert list(spikes["fibre"]) == [2, 1]
+
+
+def test_receives_over_loopback():
+    receiver = EarLiveSpikeReceiver(
+        StandInEar(), N_FIBRES_PER_IHC, local_host="127.0.0.1")
+    batches = Batches()
+    receiver.add_callback(batches)
+    receiver.start()
+    board = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        board.sendto(
+            _packet(3, 2, [1, 5]), ("127.0.0.1", receiver.local_port))
+        board.sendto(_packet(4, 0, []), ("127.0.0.1", receiver.local_port))
+        spikes, empty = batches.wait_for(2)
+        assert list(spikes["time"]) == [3, 3]
+        assert list(spikes["channel"]) == [6, 7]
+        assert list(spikes["fibre"]) == [1, 1]
+        assert len(empty) == 0
+    finally:
+        board.close()
+        receiver.stop()
@@ -0,0 +1,38 @@
+# Copyright (c) 2019-2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from spinnak_ear.spinnak_ear_application_vertex.\
+    spinnakear_application_vertex import SpiNNakEarApplicationVertex
+
+
+def _group_cores(n_drnls, n_ihcans_per_drnl):
+    """ the cores a ome and its group of drnls, with their ihcans, take
+    """
+    return 1 + n_drnls * (1 + n_ihcans_per_drnl)
+
+
+@pytest.mark.parametrize("n_ihcans_per_drnl", range(1, 8))
+def test_group_fills_a_chip(n_ihcans_per_drnl):
+    n_drnls = SpiNNakEarApplicationVertex.drnls_per_chip(n_ihcans_per_drnl)
+    n_cores = SpiNNakEarApplicationVertex.N_APP_CORES_PER_CHIP
+    assert _group_cores(n_drnls, n_ihcans_per_drnl) <= n_cores
+    assert _group_cores(n_drnls + 1, n_ihcans_per_drnl) > n_cores
+
+
+def test_group_is_never_empty():
+    n_cores = SpiNNakEarApplicationVertex.N_APP_CORES_PER_CHIP
+    assert SpiNNakEarApplicationVertex.drnls_per_chip(n_cores) == 1